@@ -0,0 +1,44 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: add_keyset_indexes
+Revises: a174c3ff1e19
+Create Date: 2026-01-01 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_keyset_indexes'
+down_revision: Union[str, None] = 'a174c3ff1e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add (sort column, id) indexes used by cursor pagination.
+
+    List endpoints order by (updated_at DESC, id DESC) or (created_at DESC,
+    id DESC) and seek with a row comparison against the cursor, which these
+    indexes answer with a single index range scan at any page depth.
+    """
+    op.create_index('ix_courses_updated_at_id', 'courses', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_programs_updated_at_id', 'programs', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_comments_created_at_id', 'comments', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_rag_documents_uploaded_by_created_at_id',
+        'rag_documents',
+        ['uploaded_by', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Remove keyset pagination indexes."""
+    op.drop_index('ix_rag_documents_uploaded_by_created_at_id', 'rag_documents')
+    op.drop_index('ix_comments_created_at_id', 'comments')
+    op.drop_index('ix_programs_updated_at_id', 'programs')
+    op.drop_index('ix_courses_updated_at_id', 'courses')
@@ -0,0 +1,136 @@
+"""Add full-text and trigram search for courses
+
+Revision ID: add_course_search
+Revises: add_keyset_indexes
+Create Date: 2026-01-02 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_course_search'
+down_revision: Union[str, None] = 'add_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add a weighted search document to courses.
+
+    courses.search_vector combines:
+      A: subject code, course number and title
+      B: catalog description
+      C: SLO outcome text and content outline topics
+
+    SLOs and content topics live in child tables, which a GENERATED column
+    cannot reference, so the column is kept current by triggers: a BEFORE
+    trigger on courses and AFTER triggers on student_learning_outcomes and
+    course_content that recompute the parent course's vector.
+
+    When pg_trgm is available, trigram GIN indexes on the title and on
+    "SUBJ NUM" serve substring (ILIKE) and fuzzy (%) matching.
+    """
+    op.execute("ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION course_search_vector(
+            p_course_id uuid,
+            p_subject_code text,
+            p_course_number text,
+            p_title text,
+            p_catalog_description text
+        ) RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT
+                setweight(to_tsvector('english',
+                    coalesce(p_subject_code, '') || ' ' || coalesce(p_course_number, '') || ' ' || coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(p_catalog_description, '')), 'B')
+                || setweight(to_tsvector('english', coalesce(
+                    (SELECT string_agg(outcome_text, ' ') FROM student_learning_outcomes WHERE course_id = p_course_id), '')), 'C')
+                || setweight(to_tsvector('english', coalesce(
+                    (SELECT string_agg(topic, ' ') FROM course_content WHERE course_id = p_course_id), '')), 'C')
+        $$
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION courses_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := course_search_vector(
+                NEW.id, NEW.subject_code, NEW.course_number, NEW.title, NEW.catalog_description);
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER courses_search_vector_update
+        BEFORE INSERT OR UPDATE OF subject_code, course_number, title, catalog_description ON courses
+        FOR EACH ROW EXECUTE FUNCTION courses_search_vector_trigger()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION course_children_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE courses
+                SET search_vector = course_search_vector(id, subject_code, course_number, title, catalog_description)
+                WHERE id = OLD.course_id;
+            END IF;
+            IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.course_id IS DISTINCT FROM OLD.course_id) THEN
+                UPDATE courses
+                SET search_vector = course_search_vector(id, subject_code, course_number, title, catalog_description)
+                WHERE id = NEW.course_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for table in ('student_learning_outcomes', 'course_content'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_update
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION course_children_search_vector_trigger()
+        """)
+
+    # Backfill existing courses
+    op.execute("""
+        UPDATE courses
+        SET search_vector = course_search_vector(id, subject_code, course_number, title, catalog_description)
+    """)
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING GIN (search_vector)")
+
+    # Trigram indexes (pg_trgm ships with contrib; skip if the server lacks it)
+    bind = op.get_bind()
+    has_trgm = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_courses_title_trgm "
+            "ON courses USING GIN (title gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_courses_code_trgm "
+            "ON courses USING GIN ((subject_code || ' ' || course_number) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Remove course search column, triggers and indexes."""
+    op.execute("DROP INDEX IF EXISTS ix_courses_code_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_courses_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_courses_search_vector")
+
+    for table in ('course_content', 'student_learning_outcomes'):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}")
+    op.execute("DROP TRIGGER IF EXISTS courses_search_vector_update ON courses")
+
+    op.execute("DROP FUNCTION IF EXISTS course_children_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS courses_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS course_search_vector(uuid, text, text, text, text)")
+
+    op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,88 @@
+"""Add pre-aggregated course status statistics
+
+Revision ID: add_course_status_stats
+Revises: add_course_search
+Create Date: 2026-01-03 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_course_status_stats'
+down_revision: Union[str, None] = 'add_course_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add course_status_stats, one row per (department, course status).
+
+    Rows hold the number of courses in the status, the sum of their
+    updated_at (epoch seconds, for average time in status), and workflow
+    transition counters. The application keeps them current incrementally
+    (app.services.course_stats); this migration backfills them from the
+    existing courses and workflow history.
+    """
+    op.create_table(
+        'course_status_stats',
+        sa.Column('department_id', sa.Uuid(), nullable=False),
+        sa.Column(
+            'status',
+            postgresql.ENUM(name='coursestatus', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('course_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('entered_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('returned_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['department_id'], ['departments.id']),
+        sa.PrimaryKeyConstraint('department_id', 'status'),
+    )
+
+    op.execute("""
+        INSERT INTO course_status_stats (department_id, status, course_count, updated_at_sum)
+        SELECT department_id, status, count(*), sum(extract(epoch FROM updated_at))
+        FROM courses
+        GROUP BY department_id, status
+    """)
+
+    # workflow_history stores status values ('DeptReview'); the enum uses names
+    status_names = """
+        (VALUES ('Draft', 'DRAFT'), ('DeptReview', 'DEPT_REVIEW'),
+                ('CurriculumCommittee', 'CURRICULUM_COMMITTEE'),
+                ('ArticulationReview', 'ARTICULATION_REVIEW'), ('Approved', 'APPROVED'))
+    """
+    op.execute(f"""
+        INSERT INTO course_status_stats (department_id, status, entered_count)
+        SELECT c.department_id, s.name::coursestatus, count(*)
+        FROM workflow_history w
+        JOIN courses c ON c.id = w.entity_id
+        JOIN {status_names} AS s(value, name) ON s.value = w.to_status
+        WHERE w.entity_type = 'COURSE'
+        GROUP BY c.department_id, s.name
+        ON CONFLICT (department_id, status)
+        DO UPDATE SET entered_count = EXCLUDED.entered_count
+    """)
+    op.execute(f"""
+        INSERT INTO course_status_stats (department_id, status, returned_count)
+        SELECT c.department_id, s.name::coursestatus, count(*)
+        FROM workflow_history w
+        JOIN courses c ON c.id = w.entity_id
+        JOIN {status_names} AS s(value, name) ON s.value = w.from_status
+        WHERE w.entity_type = 'COURSE'
+          AND w.to_status = 'Draft'
+          AND w.from_status IN ('DeptReview', 'CurriculumCommittee', 'ArticulationReview')
+        GROUP BY c.department_id, s.name
+        ON CONFLICT (department_id, status)
+        DO UPDATE SET returned_count = EXCLUDED.returned_count
+    """)
+
+
+def downgrade() -> None:
+    """Drop course_status_stats."""
+    op.drop_table('course_status_stats')
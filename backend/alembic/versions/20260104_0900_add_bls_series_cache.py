@@ -0,0 +1,47 @@
+"""Add persistent cache for BLS API series
+
+Revision ID: add_bls_series_cache
+Revises: add_course_status_stats
+Create Date: 2026-01-04 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_bls_series_cache'
+down_revision: Union[str, None] = 'add_course_status_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add bls_series_cache, one row per BLS series and request shape.
+
+    Rows are keyed by series, year range and catalog flag and hold the
+    series object returned by the BLS API plus the times until which it is
+    fresh and may be served stale (app.services.bls_cache).
+    """
+    op.create_table(
+        'bls_series_cache',
+        sa.Column('cache_key', sa.String(), nullable=False),
+        sa.Column('series_id', sa.String(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.Column('fresh_until', sa.DateTime(), nullable=False),
+        sa.Column('stale_until', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('cache_key'),
+    )
+    op.create_index('ix_bls_series_cache_series_id', 'bls_series_cache', ['series_id'])
+    op.create_index('ix_bls_series_cache_stale_until', 'bls_series_cache', ['stale_until'])
+
+
+def downgrade() -> None:
+    """Drop the BLS series cache."""
+    op.drop_index('ix_bls_series_cache_stale_until', table_name='bls_series_cache')
+    op.drop_index('ix_bls_series_cache_series_id', table_name='bls_series_cache')
+    op.drop_table('bls_series_cache')
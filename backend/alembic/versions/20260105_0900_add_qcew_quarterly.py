@@ -0,0 +1,56 @@
+"""Add local store of QCEW quarterly data
+
+Revision ID: add_qcew_quarterly
+Revises: add_bls_series_cache
+Create Date: 2026-01-05 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_qcew_quarterly'
+down_revision: Union[str, None] = 'add_bls_series_cache'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add qcew_quarterly, rows of the QCEW quarterly single-file CSVs.
+
+    The primary key leads with area and quarter, which is how summaries and
+    trends look rows up; the industry index serves cross-area trend queries.
+    Filled by scripts/ingest_qcew.py.
+    """
+    op.create_table(
+        'qcew_quarterly',
+        sa.Column('area_fips', sa.String(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('qtr', sa.Integer(), nullable=False),
+        sa.Column('own_code', sa.String(), nullable=False),
+        sa.Column('industry_code', sa.String(), nullable=False),
+        sa.Column('agglvl_code', sa.String(), nullable=False),
+        sa.Column('size_code', sa.String(), nullable=False),
+        sa.Column('disclosure_code', sa.String(), nullable=False, server_default=''),
+        sa.Column('qtrly_estabs', sa.Integer(), nullable=True),
+        sa.Column('month1_emplvl', sa.Integer(), nullable=True),
+        sa.Column('month2_emplvl', sa.Integer(), nullable=True),
+        sa.Column('month3_emplvl', sa.Integer(), nullable=True),
+        sa.Column('total_qtrly_wages', sa.BigInteger(), nullable=True),
+        sa.Column('avg_wkly_wage', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint(
+            'area_fips', 'year', 'qtr', 'own_code', 'industry_code', 'agglvl_code', 'size_code'
+        ),
+    )
+    op.create_index(
+        'ix_qcew_quarterly_industry', 'qcew_quarterly', ['industry_code', 'own_code', 'year', 'qtr']
+    )
+
+
+def downgrade() -> None:
+    """Drop the QCEW quarterly store."""
+    op.drop_index('ix_qcew_quarterly_industry', table_name='qcew_quarterly')
+    op.drop_table('qcew_quarterly')
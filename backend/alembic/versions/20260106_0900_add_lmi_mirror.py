@@ -0,0 +1,77 @@
+"""Add local mirror of the California LMI (CKAN) datasets
+
+Revision ID: add_lmi_mirror
+Revises: add_qcew_quarterly
+Create Date: 2026-01-06 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_lmi_mirror'
+down_revision: Union[str, None] = 'add_qcew_quarterly'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add lmi_mirror_records and lmi_mirror_sync.
+
+    Records of the data.ca.gov OEWS wage and projection resources are
+    indexed by SOC code and by area and year. When pg_trgm is available, a
+    trigram GIN index on the occupation title serves keyword (ILIKE) search.
+    Filled by scripts/sync_lmi_mirror.py.
+    """
+    op.create_table(
+        'lmi_mirror_records',
+        sa.Column('resource_id', sa.String(), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('soc_code', sa.String(), nullable=False, server_default=''),
+        sa.Column('area_name', sa.String(), nullable=False, server_default=''),
+        sa.Column('year', sa.String(), nullable=False, server_default=''),
+        sa.Column('occupation_title', sa.String(), nullable=False, server_default=''),
+        sa.Column('wage_type', sa.String(), nullable=False, server_default=''),
+        sa.Column('record', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('resource_id', 'record_id'),
+    )
+    op.create_index('ix_lmi_mirror_records_soc', 'lmi_mirror_records', ['resource_id', 'soc_code'])
+    op.create_index(
+        'ix_lmi_mirror_records_area_year', 'lmi_mirror_records', ['resource_id', 'area_name', 'year']
+    )
+
+    op.create_table(
+        'lmi_mirror_sync',
+        sa.Column('resource_id', sa.String(), nullable=False),
+        sa.Column('last_modified', sa.String(), nullable=True),
+        sa.Column('record_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_record_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('resource_id'),
+    )
+
+    # Trigram index (pg_trgm ships with contrib; skip if the server lacks it)
+    bind = op.get_bind()
+    has_trgm = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_lmi_mirror_records_title_trgm "
+            "ON lmi_mirror_records USING GIN (occupation_title gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Drop the LMI mirror."""
+    op.execute("DROP INDEX IF EXISTS ix_lmi_mirror_records_title_trgm")
+    op.drop_table('lmi_mirror_sync')
+    op.drop_index('ix_lmi_mirror_records_area_year', table_name='lmi_mirror_records')
+    op.drop_index('ix_lmi_mirror_records_soc', table_name='lmi_mirror_records')
+    op.drop_table('lmi_mirror_records')
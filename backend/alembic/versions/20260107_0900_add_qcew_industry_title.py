@@ -0,0 +1,34 @@
+"""Add industry titles to the QCEW quarterly store
+
+Revision ID: add_qcew_industry_title
+Revises: add_lmi_mirror
+Create Date: 2026-01-07 09:00:00.000000+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_qcew_industry_title'
+down_revision: Union[str, None] = 'add_lmi_mirror'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add qcew_quarterly.industry_title, so summaries served from the store
+    name industries the way the QCEW API files do. Rows loaded before stay
+    empty until their file is loaded again with --industry-titles.
+    """
+    op.add_column(
+        'qcew_quarterly',
+        sa.Column('industry_title', sa.String(), nullable=False, server_default=''),
+    )
+
+
+def downgrade() -> None:
+    """Drop the QCEW industry titles."""
+    op.drop_column('qcew_quarterly', 'industry_title')
@@ -0,0 +1,108 @@
+"""
+Admin API Routes
+
+Operational endpoints for administrators:
+- Inspect slow SQL statements captured by the engine instrumentation
+- Clear the slow-query buffer
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.deps import require_admin
+from app.core.slow_queries import slow_query_log
+from app.models.user import User
+
+router = APIRouter()
+
+
+# =============================================================================
+# Response Schemas
+# =============================================================================
+
+class SlowQueryItem(BaseModel):
+    """A single captured slow statement."""
+    timestamp: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any
+    route: Optional[str]
+    request_id: Optional[str]
+    explain: Optional[str]
+
+
+class SlowQueryGroup(BaseModel):
+    """Captured slow statements sharing one normalized SQL."""
+    statement: str
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+    routes: List[str]
+    parameters: Any
+    last_seen: datetime
+    explain: Optional[str]
+
+
+class SlowQueryResponse(BaseModel):
+    """Slow-query buffer contents."""
+    threshold_ms: float
+    explain_sample_rate: float
+    captured: int
+    groups: List[SlowQueryGroup]
+    recent: List[SlowQueryItem]
+
+
+# =============================================================================
+# Slow Queries
+# =============================================================================
+
+@router.get("/slow-queries", response_model=SlowQueryResponse)
+async def list_slow_queries(
+    route: Optional[str] = Query(None, description="Only statements issued by routes containing this text"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum recent entries to return"),
+    current_user: User = Depends(require_admin()),
+):
+    """
+    Statements slower than DB_SLOW_QUERY_MS, newest first.
+
+    `groups` aggregates the buffer by normalized SQL (slowest total first)
+    with the routes that ran it and a sampled EXPLAIN plan where one was
+    captured (EXPLAIN (ANALYZE, BUFFERS) for plain SELECTs when
+    DB_SLOW_QUERY_EXPLAIN_ANALYZE is set); sequential scans in those plans
+    point to filters that need an index.
+
+    **Filters:**
+    - route: Substring match on "METHOD /route/template"
+    """
+    entries = slow_query_log.entries()
+    groups = slow_query_log.summary()
+    if route:
+        entries = [e for e in entries if e.route and route in e.route]
+        groups = [g for g in groups if any(route in r for r in g["routes"])]
+
+    return SlowQueryResponse(
+        threshold_ms=settings.DB_SLOW_QUERY_MS,
+        explain_sample_rate=settings.DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        captured=len(entries),
+        groups=[
+            SlowQueryGroup(**{**g, "last_seen": datetime.utcfromtimestamp(g["last_seen"])})
+            for g in groups
+        ],
+        recent=[
+            SlowQueryItem(**{**e.__dict__, "timestamp": datetime.utcfromtimestamp(e.timestamp)})
+            for e in entries[:limit]
+        ],
+    )
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries(
+    current_user: User = Depends(require_admin()),
+):
+    """Empty the slow-query buffer (e.g. after adding an index)."""
+    slow_query_log.clear()
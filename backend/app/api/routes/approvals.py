@@ -14,15 +14,20 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select, func, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session
 from app.core.deps import get_current_user, require_reviewer
+from app.core.loaders import loader_for
+from app.core.pagination import CountMode, apply_keyset, count_statement, parse_count, split_page, total_pages
 from app.models.user import User, UserRole
 from app.models.course import Course, CourseStatus, StudentLearningOutcome, CourseContent
 from app.models.department import Department
 from app.models.workflow import WorkflowHistory, EntityType
 from app.models.reference import CrossListing
+from app.services.course_stats import REVIEW_STATUSES, load_status_totals
 
 router = APIRouter()
 
@@ -65,10 +70,11 @@ class ApprovalQueueItem(BaseModel):
 class ApprovalQueueResponse(BaseModel):
     """Response for approval queue listing."""
     items: List[ApprovalQueueItem]
-    total: int
+    total: Optional[int]
     page: int
     limit: int
-    pages: int
+    pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class ApprovalCountsResponse(BaseModel):
@@ -196,14 +202,25 @@ def validate_cross_listings_for_approval(course: Course, session: Session) -> Li
         .order_by(CourseContent.sequence)
     ).all()
 
-    for cross_listing in cross_listings:
-        # Determine the other course in the cross-listing
-        if cross_listing.primary_course_id == course.id:
-            other_course_id = cross_listing.cross_listed_course_id
-        else:
-            other_course_id = cross_listing.primary_course_id
+    # Determine the other course in each cross-listing
+    other_course_ids = [
+        cl.cross_listed_course_id if cl.primary_course_id == course.id else cl.primary_course_id
+        for cl in cross_listings
+    ]
 
-        other_course = session.get(Course, other_course_id)
+    # Fetch the other courses, their SLOs and their content in one query each
+    other_courses = loader_for(session, Course.id).load_many(other_course_ids)
+    other_slos_by_course = loader_for(
+        session, StudentLearningOutcome.course_id, many=True,
+        order_by=StudentLearningOutcome.sequence,
+    ).load_many(other_course_ids)
+    other_content_by_course = loader_for(
+        session, CourseContent.course_id, many=True,
+        order_by=CourseContent.sequence,
+    ).load_many(other_course_ids)
+
+    for other_course_id in other_course_ids:
+        other_course = other_courses.get(other_course_id)
         if not other_course:
             continue
 
@@ -217,11 +234,7 @@ def validate_cross_listings_for_approval(course: Course, session: Session) -> Li
             )
 
         # Get other course's SLOs
-        other_slos = session.exec(
-            select(StudentLearningOutcome)
-            .where(StudentLearningOutcome.course_id == other_course_id)
-            .order_by(StudentLearningOutcome.sequence)
-        ).all()
+        other_slos = other_slos_by_course[other_course_id]
 
         # Check SLO count
         if len(course_slos) != len(other_slos):
@@ -239,11 +252,7 @@ def validate_cross_listings_for_approval(course: Course, session: Session) -> Li
                     break  # Only report first mismatch per cross-listing
 
         # Get other course's content
-        other_content = session.exec(
-            select(CourseContent)
-            .where(CourseContent.course_id == other_course_id)
-            .order_by(CourseContent.sequence)
-        ).all()
+        other_content = other_content_by_course[other_course_id]
 
         # Check content count
         if len(course_content) != len(other_content):
@@ -283,23 +292,10 @@ async def get_approval_counts(
     # Get statuses this user can review
     my_review_statuses = get_review_statuses_for_role(current_user.role)
 
-    # Count pending my review
-    if my_review_statuses:
-        pending_my_review = session.exec(
-            select(func.count(Course.id)).where(Course.status.in_(my_review_statuses))
-        ).one()
-    else:
-        pending_my_review = 0
-
-    # Count all pending
-    all_pending_statuses = [
-        CourseStatus.DEPT_REVIEW,
-        CourseStatus.CURRICULUM_COMMITTEE,
-        CourseStatus.ARTICULATION_REVIEW,
-    ]
-    all_pending = session.exec(
-        select(func.count(Course.id)).where(Course.status.in_(all_pending_statuses))
-    ).one()
+    # Pending counts come from the pre-aggregated per-status totals
+    totals = load_status_totals(session)
+    pending_my_review = totals.count(my_review_statuses)
+    all_pending = totals.count(REVIEW_STATUSES)
 
     # Count recently reviewed (by this user in last 7 days)
     from datetime import timedelta
@@ -326,9 +322,11 @@ async def list_pending_approvals(
     # Pagination
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    count: CountMode = Query(CountMode.EXACT, description="How to compute total: exact, estimate, or none"),
     # Dependencies
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     List items pending approval.
@@ -340,6 +338,11 @@ async def list_pending_approvals(
 
     **Search:**
     - Searches in course title and course number
+
+    **Pagination:**
+    - `page`/`limit`: Page-number pagination (default)
+    - `cursor`: Keyset cursor from `next_cursor`; overrides `page`
+    - `count`: `exact` (default), `estimate`, or `none`
     """
     from datetime import timedelta
 
@@ -352,7 +355,7 @@ async def list_pending_approvals(
             WorkflowHistory.entity_type == EntityType.COURSE,
             WorkflowHistory.created_at >= seven_days_ago,
         ).distinct()
-        reviewed_ids = session.exec(reviewed_ids_query).all()
+        reviewed_ids = (await session.exec(reviewed_ids_query)).all()
 
         if not reviewed_ids:
             return ApprovalQueueResponse(
@@ -403,26 +406,32 @@ async def list_pending_approvals(
         count_query = count_query.where(search_filter)
 
     # Get total count
-    total = session.exec(count_query).one()
-
-    # Apply pagination and ordering
-    offset = (page - 1) * limit
-    query = query.order_by(Course.updated_at.desc()).offset(offset).limit(limit)
+    total = None
+    count_stmt = count_statement(count, count_query, query, Course.__tablename__)
+    if count_stmt is not None:
+        total = parse_count(await session.scalar(count_stmt))
+
+    # Apply pagination and ordering, eager-loading department and submitter
+    # (lazy loading is unavailable on an async session)
+    query = apply_keyset(
+        query.options(joinedload(Course.department), joinedload(Course.creator)),
+        Course.updated_at, Course.id, limit, cursor=cursor, page=page,
+    )
 
     # Execute query
-    courses = session.exec(query).all()
+    courses, next_cursor = split_page((await session.exec(query)).all(), limit, "updated_at")
 
     # Build response items
     items = []
     for course in courses:
-        # Get department info
-        dept = session.get(Department, course.department_id)
+        # Department info (already loaded via joinedload)
+        dept = course.department
         dept_info = None
         if dept:
             dept_info = DepartmentInfo(id=dept.id, name=dept.name, code=dept.code)
 
-        # Get submitter info
-        submitter = session.get(User, course.created_by)
+        # Submitter info (already loaded via joinedload)
+        submitter = course.creator
         submitter_info = None
         if submitter:
             submitter_info = SubmitterInfo(
@@ -444,15 +453,13 @@ async def list_pending_approvals(
             updated_at=course.updated_at,
         ))
 
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if total > 0 else 1
-
     return ApprovalQueueResponse(
         items=items,
         total=total,
         page=page,
         limit=limit,
-        pages=pages,
+        pages=total_pages(total, limit),
+        next_cursor=next_cursor,
     )
 
 
@@ -528,6 +535,8 @@ async def transition_course_status(
         changed_by=current_user.id,
     )
 
+    # The flush also moves the course between course_status_stats rows and
+    # records the approval/return (see app.services.course_stats)
     session.add(course)
     session.add(workflow_history)
     session.commit()
@@ -16,8 +16,7 @@ from pydantic import BaseModel
 from sqlmodel import Session, select
 
 from app.core.database import get_session
-from app.core.firebase import verify_firebase_token
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, verify_token
 from app.models.user import User, UserRole
 from app.models.department import Department
 
@@ -131,7 +130,7 @@ async def login(
 
     # Extract and verify the token
     token = credentials.credentials
-    decoded_token = verify_firebase_token(token)
+    decoded_token = await verify_token(token)
     firebase_uid = decoded_token.get("uid")
 
     if not firebase_uid:
@@ -241,7 +240,7 @@ async def check_auth(
         return {"authenticated": False}
 
     try:
-        decoded_token = verify_firebase_token(credentials.credentials)
+        decoded_token = await verify_token(credentials.credentials)
         return {
             "authenticated": True,
             "uid": decoded_token.get("uid"),
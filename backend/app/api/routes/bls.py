@@ -10,7 +10,7 @@ Endpoints for accessing U.S. Bureau of Labor Statistics data including:
 """
 
 from typing import List, Optional, Dict
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from pydantic import BaseModel, Field
 
 from app.services.bls_client import (
@@ -21,6 +21,7 @@ from app.services.bls_client import (
     OESWageData,
     COMMON_OCCUPATIONS,
     OES_AREAS,
+    get_bls_client,
 )
 from app.services.soc_occupations import (
     SOCOccupation,
@@ -38,6 +39,12 @@ from app.services.occupation_projections import (
     EXPERIENCE_LEVELS,
     TRAINING_LEVELS,
 )
+from app.services.occupation_analytics import (
+    AnalyticsQuery,
+    GroupSummary,
+    METRICS,
+    occupation_analytics,
+)
 
 router = APIRouter()
 
@@ -153,12 +160,12 @@ async def search_occupations_endpoint(
     """
     Search all SOC occupations by title or code.
 
-    Returns matching occupations from the full BLS Standard Occupational Classification system.
-    Useful for autocomplete/typeahead functionality.
+    Returns matching occupations from the full BLS Standard Occupational Classification system,
+    best matches first. Useful for autocomplete/typeahead functionality.
 
     Examples:
-    - Search by title: "nurse", "software", "electric"
-    - Search by SOC code: "29-1141", "151252"
+    - Search by title: "nurse", "software dev", "electric" (close misspellings like "nurce" match too)
+    - Search by SOC code: "29-1141", "151252", or a prefix like "29-11"
     """
     results = search_occupations(q, limit=limit)
     return OccupationSearchResponse(
@@ -201,6 +208,7 @@ async def get_oes_wages(
         default="national,california,los_angeles",
         description="Comma-separated area keys (e.g., national,california,los_angeles,san_francisco,san_diego)"
     ),
+    client: BLSClient = Depends(get_bls_client),
 ):
     """
     Get Occupational Employment and Wage Statistics (OES) data.
@@ -224,17 +232,16 @@ async def get_oes_wages(
     try:
         area_list = [a.strip() for a in areas.split(",") if a.strip()]
 
-        async with BLSClient() as client:
-            data = await client.get_oes_wages(
-                occupation=occupation,
-                areas=area_list,
-            )
+        data = await client.get_oes_wages(
+            occupation=occupation,
+            areas=area_list,
+        )
 
-            return OESResponse(
-                data=data,
-                occupation=occupation,
-                areas=area_list,
-            )
+        return OESResponse(
+            data=data,
+            occupation=occupation,
+            areas=area_list,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch OES data: {str(e)}")
 
@@ -247,6 +254,7 @@ async def get_unemployment(
     ),
     start_year: Optional[int] = Query(default=None, description="Start year (defaults to 3 years ago)"),
     end_year: Optional[int] = Query(default=None, description="End year (defaults to current year)"),
+    client: BLSClient = Depends(get_bls_client),
 ):
     """
     Get unemployment rates for California areas.
@@ -261,17 +269,16 @@ async def get_unemployment(
     try:
         area_list = [a.strip() for a in areas.split(",") if a.strip()]
 
-        async with BLSClient() as client:
-            data = await client.get_unemployment_rates(
-                areas=area_list,
-                start_year=start_year,
-                end_year=end_year,
-            )
+        data = await client.get_unemployment_rates(
+            areas=area_list,
+            start_year=start_year,
+            end_year=end_year,
+        )
 
-            return UnemploymentResponse(
-                data=data,
-                areas=area_list,
-            )
+        return UnemploymentResponse(
+            data=data,
+            areas=area_list,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch unemployment data: {str(e)}")
 
@@ -284,6 +291,7 @@ async def get_cpi(
     ),
     start_year: Optional[int] = Query(default=None, description="Start year (defaults to 3 years ago)"),
     end_year: Optional[int] = Query(default=None, description="End year (defaults to current year)"),
+    client: BLSClient = Depends(get_bls_client),
 ):
     """
     Get Consumer Price Index (CPI) data for specified areas.
@@ -296,17 +304,16 @@ async def get_cpi(
     try:
         area_list = [a.strip() for a in areas.split(",") if a.strip()]
 
-        async with BLSClient() as client:
-            data = await client.get_cpi_data(
-                areas=area_list,
-                start_year=start_year,
-                end_year=end_year,
-            )
+        data = await client.get_cpi_data(
+            areas=area_list,
+            start_year=start_year,
+            end_year=end_year,
+        )
 
-            return CPIResponse(
-                data=data,
-                areas=area_list,
-            )
+        return CPIResponse(
+            data=data,
+            areas=area_list,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch CPI data: {str(e)}")
 
@@ -319,6 +326,7 @@ async def get_series(
     ),
     start_year: Optional[int] = Query(default=None, description="Start year"),
     end_year: Optional[int] = Query(default=None, description="End year"),
+    client: BLSClient = Depends(get_bls_client),
 ):
     """
     Fetch data for specific BLS series by their IDs.
@@ -335,14 +343,13 @@ async def get_series(
         if len(series_ids) > 50:
             raise HTTPException(status_code=400, detail="Maximum 50 series IDs per request")
 
-        async with BLSClient() as client:
-            data = await client.fetch_custom_series(
-                series_ids=series_ids,
-                start_year=start_year,
-                end_year=end_year,
-            )
+        data = await client.fetch_custom_series(
+            series_ids=series_ids,
+            start_year=start_year,
+            end_year=end_year,
+        )
 
-            return SeriesResponse(series=data)
+        return SeriesResponse(series=data)
     except HTTPException:
         raise
     except Exception as e:
@@ -350,7 +357,7 @@ async def get_series(
 
 
 @router.get("/popular", response_model=PopularSeriesResponse)
-async def get_popular_series():
+async def get_popular_series(client: BLSClient = Depends(get_bls_client)):
     """
     Get a list of popular/useful BLS series IDs.
 
@@ -360,9 +367,8 @@ async def get_popular_series():
     - Consumer Price Index data
     """
     try:
-        async with BLSClient() as client:
-            series_ids = await client.get_popular_series()
-            return PopularSeriesResponse(series_ids=series_ids)
+        series_ids = await client.get_popular_series()
+        return PopularSeriesResponse(series_ids=series_ids)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch popular series: {str(e)}")
 
@@ -443,7 +449,7 @@ async def search_projections_endpoint(
     Search occupations with projection data.
 
     Returns matching occupations that have 10-year employment projections and
-    education/training requirements data.
+    education/training requirements data, ranked like /occupations/search.
 
     Examples:
     - Search by title: "nurse", "software", "electric"
@@ -457,6 +463,74 @@ async def search_projections_endpoint(
     )
 
 
+class RankedProjection(BaseModel):
+    """A projection with the value it was ranked by."""
+    projection: OccupationProjection
+    value: Optional[float] = None
+
+
+class ProjectionAnalyticsResponse(BaseModel):
+    """Response for projection analytics."""
+    results: List[RankedProjection]
+    total: int  # Occupations matching the filters
+    sort_by: str
+    groups: Optional[List[GroupSummary]] = None
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+@router.get("/projections/analytics", response_model=ProjectionAnalyticsResponse)
+async def get_projection_analytics(
+    major_group: Optional[str] = Query(default=None, description="Comma-separated 2-digit SOC major groups (e.g. '29,31')"),
+    education: Optional[str] = Query(default=None, description="Comma-separated entry education codes"),
+    max_education: Optional[str] = Query(default=None, description="Entry education at this level or below (e.g. 'associate')"),
+    outlook: Optional[str] = Query(default=None, description="Comma-separated outlook categories"),
+    min_wage: Optional[float] = Query(default=None, description="Minimum annual median wage"),
+    min_growth: Optional[float] = Query(default=None, description="Minimum projected growth (%)"),
+    min_openings: Optional[float] = Query(default=None, description="Minimum annual openings"),
+    sort_by: str = Query(default="annual_openings", description=f"Metric to rank by: {', '.join(METRICS)}"),
+    descending: bool = Query(default=True, description="Highest values first (false: lowest first)"),
+    limit: int = Query(default=20, ge=1, le=200, description="Maximum results to return (1-200)"),
+    group_by: Optional[str] = Query(default=None, description="Also summarize matches by 'major_group'"),
+):
+    """
+    Filter, rank and summarize occupation projections in one call.
+
+    Education codes come from /projections/options; outlook categories are
+    much_faster, faster, average, slower and decline. The openings_wage
+    metric is annual openings x median wage.
+
+    Example (top 20 associate-level healthcare occupations by openings x wage):
+    /projections/analytics?major_group=29&max_education=associate&sort_by=openings_wage
+    """
+    query = AnalyticsQuery(
+        major_groups=_split(major_group),
+        education=_split(education),
+        max_education=max_education,
+        outlook=_split(outlook),
+        min_wage=min_wage,
+        min_growth=min_growth,
+        min_openings=min_openings,
+        sort_by=sort_by,
+        descending=descending,
+        limit=limit,
+        group_by=group_by,
+    )
+    try:
+        result = occupation_analytics.query(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ProjectionAnalyticsResponse(
+        results=[RankedProjection(projection=projection, value=value) for projection, value in result.rows],
+        total=result.total,
+        sort_by=sort_by,
+        groups=result.groups,
+    )
+
+
 @router.get("/projections/{soc_code}", response_model=ProjectionResponse)
 async def get_occupation_projection(
     soc_code: str,
@@ -15,12 +15,15 @@ from datetime import datetime
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
-from sqlmodel import Session, select, func, or_
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session
 from app.core.deps import get_current_user, require_role, require_admin, require_reviewer
+from app.core.loaders import loader_for
+from app.core.pagination import CountMode, apply_keyset, count_statement, parse_count, split_page, total_pages
 from app.models.user import User, UserRole
 from app.models.workflow import WorkflowHistory, EntityType
 from app.models.notification import Notification, NotificationType
@@ -37,7 +40,9 @@ from app.models.course import (
     RequisiteValidationType,
 )
 from app.models.department import Department
-from app.services.lmi_client import LMIClient
+from app.services.course_autocomplete import course_autocomplete_index
+from app.services.course_search import CourseSearch, get_search_capabilities, get_search_capabilities_async
+from app.services.lmi_client import LMIClient, get_lmi_client
 from app.services.pdf_generator import generate_lmi_pdf
 
 router = APIRouter()
@@ -132,10 +137,11 @@ class CourseListItem(BaseModel):
 class CourseListResponse(BaseModel):
     """Paginated response for course list."""
     items: List[CourseListItem]
-    total: int
+    total: Optional[int]
     page: int
     limit: int
-    pages: int
+    pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class SLOItem(BaseModel):
@@ -251,9 +257,11 @@ async def list_courses(
     # Pagination
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    count: CountMode = Query(CountMode.EXACT, description="How to compute total: exact, estimate, or none"),
     # Dependencies
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     List courses with filtering, search, and pagination.
@@ -268,8 +276,12 @@ async def list_courses(
     **Pagination:**
     - `page`: Page number (default: 1)
     - `limit`: Items per page (default: 20, max: 100)
+    - `cursor`: Keyset cursor; when given, `page` is ignored and the page after
+      the cursor is returned (constant cost at any depth)
+    - `count`: `exact` (default), `estimate` (planner estimate), or `none`
 
-    Returns paginated list with total count for pagination UI.
+    Returns paginated list with total count for pagination UI and a
+    `next_cursor` for the following page (null on the last page).
     """
     # Build base query with eager loading for department (prevents N+1 queries)
     query = select(Course).options(joinedload(Course.department))
@@ -293,23 +305,11 @@ async def list_courses(
         query = query.where(Course.status == status)
         count_query = count_query.where(Course.status == status)
 
-    # Apply search filter
+    # Apply search filter (full-text / trigram when the database supports it)
     if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_(
-                Course.title.ilike(search_term),
-                Course.course_number.ilike(search_term),
-                Course.subject_code.ilike(search_term),
-            )
-        )
-        count_query = count_query.where(
-            or_(
-                Course.title.ilike(search_term),
-                Course.course_number.ilike(search_term),
-                Course.subject_code.ilike(search_term),
-            )
-        )
+        search_filter = CourseSearch(search, await get_search_capabilities_async(session)).condition()
+        query = query.where(search_filter)
+        count_query = count_query.where(search_filter)
 
     # Apply created_by filter
     if created_by:
@@ -322,14 +322,16 @@ async def list_courses(
         count_query = count_query.where(Course.created_by == current_user.id)
 
     # Get total count
-    total = session.exec(count_query).one()
+    total = None
+    count_stmt = count_statement(count, count_query, query, Course.__tablename__)
+    if count_stmt is not None:
+        total = parse_count(await session.scalar(count_stmt))
 
-    # Apply pagination and ordering
-    offset = (page - 1) * limit
-    query = query.order_by(Course.updated_at.desc()).offset(offset).limit(limit)
+    # Apply pagination and ordering (updated_at, id) so cursors are stable
+    query = apply_keyset(query, Course.updated_at, Course.id, limit, cursor=cursor, page=page)
 
     # Execute query
-    courses = session.exec(query).all()
+    courses, next_cursor = split_page((await session.exec(query)).all(), limit, "updated_at")
 
     # Build response items with department info (already loaded via joinedload)
     items = []
@@ -356,15 +358,13 @@ async def list_courses(
             updated_at=course.updated_at,
         ))
 
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if total > 0 else 1
-
     return CourseListResponse(
         items=items,
         total=total,
         page=page,
         limit=limit,
-        pages=pages,
+        pages=total_pages(total, limit),
+        next_cursor=next_cursor,
     )
 
 
@@ -383,6 +383,8 @@ class CourseSearchItem(BaseModel):
     department_id: uuid.UUID
     department_name: Optional[str] = None
     department_code: Optional[str] = None
+    rank: Optional[float] = None  # Relevance score, higher is better
+    highlight: Optional[str] = None  # Title/description snippet with <mark> tags
 
     class Config:
         from_attributes = True
@@ -409,8 +411,12 @@ async def search_courses(
     This is a simplified search endpoint optimized for course lookups in
     requisites, cross-listings, and program management.
 
+    Matches course codes and titles, plus catalog descriptions, SLOs and
+    content topics via full-text search. Results are ranked by relevance and
+    include a highlighted snippet.
+
     **Parameters:**
-    - `q`: Search query (matches subject_code, course_number, or title)
+    - `q`: Search query (matches subject_code, course_number, title or course text)
     - `exclude_id`: Optional course ID to exclude (useful for self-reference prevention)
     - `status`: Optional status filter
     - `limit`: Maximum results (default: 20, max: 100)
@@ -418,28 +424,15 @@ async def search_courses(
     **Returns:**
     Minimal course info suitable for selection UIs.
     """
-    search_term = f"%{q}%"
+    search = CourseSearch(q, get_search_capabilities(session))
+    search_filter = search.condition()
+    rank = search.rank().label("rank")
 
     # Build search query
-    query = select(Course).where(
-        or_(
-            Course.title.ilike(search_term),
-            Course.subject_code.ilike(search_term),
-            Course.course_number.ilike(search_term),
-            # Also search combined "SUBJ 101" format
-            (Course.subject_code + " " + Course.course_number).ilike(search_term),
-        )
-    )
+    query = select(Course, rank, search.highlight().label("highlight")).where(search_filter)
 
     # Count query (without exclude filter for accurate total)
-    count_query = select(func.count(Course.id)).where(
-        or_(
-            Course.title.ilike(search_term),
-            Course.subject_code.ilike(search_term),
-            Course.course_number.ilike(search_term),
-            (Course.subject_code + " " + Course.course_number).ilike(search_term),
-        )
-    )
+    count_query = select(func.count(Course.id)).where(search_filter)
 
     # Apply exclude filter
     if exclude_id:
@@ -453,16 +446,17 @@ async def search_courses(
     # Get total count
     total = session.exec(count_query).one()
 
-    # Apply ordering and limit
-    query = query.order_by(Course.subject_code, Course.course_number).limit(limit)
+    # Best matches first, then code order
+    query = query.order_by(rank.desc(), Course.subject_code, Course.course_number).limit(limit)
 
     # Execute query
-    courses = session.exec(query).all()
+    rows = session.exec(query).all()
 
-    # Build response with department info
+    # Build response with department info (one query for all departments)
+    departments = loader_for(session, Department.id).load_many(course.department_id for course, _, _ in rows)
     items = []
-    for course in courses:
-        dept = session.get(Department, course.department_id) if course.department_id else None
+    for course, score, highlight in rows:
+        dept = departments.get(course.department_id)
         items.append(CourseSearchItem(
             id=course.id,
             subject_code=course.subject_code,
@@ -473,33 +467,83 @@ async def search_courses(
             department_id=course.department_id,
             department_name=dept.name if dept else None,
             department_code=dept.code if dept else None,
+            rank=round(float(score), 4),
+            highlight=highlight,
         ))
 
     return CourseSearchResponse(items=items, total=total)
 
 
 # =============================================================================
-# Course Detail Endpoint
+# Course Autocomplete Endpoint (In-memory prefix index for pickers)
 # =============================================================================
 
-@router.get("/{course_id}", response_model=CourseDetailResponse)
-async def get_course(
-    course_id: uuid.UUID,
+class CourseAutocompleteItem(BaseModel):
+    """Course suggestion for type-ahead pickers."""
+    id: uuid.UUID
+    subject_code: str
+    course_number: str
+    title: str
+    status: CourseStatus
+    department_id: Optional[uuid.UUID] = None
+
+
+class CourseAutocompleteResponse(BaseModel):
+    """Response for course autocomplete."""
+    items: List[CourseAutocompleteItem]
+
+
+@router.get("/autocomplete", response_model=CourseAutocompleteResponse)
+async def autocomplete_courses(
+    q: str = Query(..., min_length=1, description="Prefix of 'SUBJ NUM', 'SUBJNUM', or a title word"),
+    exclude_id: Optional[uuid.UUID] = Query(None, description="Course ID to exclude from results"),
+    status: Optional[CourseStatus] = Query(None, description="Filter by status"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions to return"),
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
 ):
     """
-    Get a single course with full details including SLOs and content outline.
+    Suggest courses as the user types.
 
-    Uses eager loading to fetch all related data in minimal queries (prevents N+1).
+    Answers from a process-local prefix index, so lookups do not query the
+    database (the index is loaded on first use, refreshed as courses change
+    and rebuilt in the background once stale). Use `/courses/search` for
+    ranked full-text search.
+
+    **Examples:**
+    - `q=MATH 1` or `q=math1`: courses whose code starts with MATH 1
+    - `q=alg`: courses with a title word starting with "alg"
     """
-    # Use eager loading to fetch course with all related data in a single query
-    # - joinedload for single relationships (department)
-    # - selectinload for collections (slos, content_items, requisites)
-    query = (
+    await course_autocomplete_index.ensure_loaded()
+    matches = course_autocomplete_index.search(q, limit=limit, status=status, exclude_id=exclude_id)
+    return CourseAutocompleteResponse(items=[
+        CourseAutocompleteItem(
+            id=entry.id,
+            subject_code=entry.subject_code,
+            course_number=entry.course_number,
+            title=entry.title,
+            status=entry.status,
+            department_id=entry.department_id,
+        )
+        for entry in matches
+    ])
+
+
+# =============================================================================
+# Course Detail Endpoint
+# =============================================================================
+
+def _course_detail_query(course_id: uuid.UUID):
+    """
+    Build the eager-loading query used by the course detail views.
+
+    - joinedload for single relationships (department, creator)
+    - selectinload for collections (slos, content_items, requisites)
+    """
+    return (
         select(Course)
         .options(
             joinedload(Course.department),
+            joinedload(Course.creator),
             selectinload(Course.slos),
             selectinload(Course.content_items),
             selectinload(Course.requisites).selectinload(CourseRequisite.requisite_course),
@@ -507,14 +551,13 @@ async def get_course(
         .where(Course.id == course_id)
     )
 
-    result = session.exec(query).first()
-    if not result:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
-    course = result
 
+def _build_course_detail_response(course: Course) -> CourseDetailResponse:
+    """
+    Build a CourseDetailResponse from a course loaded via _course_detail_query.
+
+    Performs no I/O: every relationship it touches is already loaded.
+    """
     # Department is already loaded via eager loading
     dept_info = None
     if course.department:
@@ -562,12 +605,8 @@ async def get_course(
         (int(course.outside_of_class_hours) * 18)   # Outside-of-class hours × 18 weeks
     )
 
-    # Look up creator email for ownership checks in frontend
-    creator_email = None
-    if course.created_by:
-        creator = session.get(User, course.created_by)
-        if creator:
-            creator_email = creator.email
+    # Creator email for ownership checks in frontend (creator is eager-loaded)
+    creator_email = course.creator.email if course.creator else None
 
     return CourseDetailResponse(
         id=course.id,
@@ -623,6 +662,27 @@ async def get_course(
     )
 
 
+@router.get("/{course_id}", response_model=CourseDetailResponse)
+async def get_course(
+    course_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get a single course with full details including SLOs and content outline.
+
+    Uses eager loading to fetch all related data in minimal queries (prevents N+1).
+    """
+    course = (await session.exec(_course_detail_query(course_id))).first()
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+
+    return _build_course_detail_response(course)
+
+
 # =============================================================================
 # Course Create Endpoint
 # =============================================================================
@@ -844,7 +904,8 @@ async def update_course(
     session.refresh(course)
 
     # Return updated course
-    return await get_course(course_id, current_user, session)
+    updated = session.exec(_course_detail_query(course_id)).first()
+    return _build_course_detail_response(updated)
 
 
 # =============================================================================
@@ -1047,7 +1108,8 @@ def _build_requisite_item(req: CourseRequisite, session: Session) -> RequisiteIt
     """Helper to build a RequisiteItem from a CourseRequisite."""
     req_course_info = None
     if req.requisite_course_id:
-        req_course = session.get(Course, req.requisite_course_id)
+        # Batched with any requisite courses primed by the caller
+        req_course = loader_for(session, Course.id).get(req.requisite_course_id)
         if req_course:
             req_course_info = RequisiteCourseInfo(
                 id=req_course.id,
@@ -1131,7 +1193,8 @@ async def list_course_requisites(
     )
     requisites = session.exec(requisites_query).all()
 
-    # Build requisite items with course info
+    # Build requisite items with course info (requisite courses fetched in one query)
+    loader_for(session, Course.id).prime(req.requisite_course_id for req in requisites)
     requisite_items = [_build_requisite_item(req, session) for req in requisites]
 
     return requisite_items
@@ -1163,6 +1226,7 @@ async def list_course_requisites_grouped(
     corequisites = []
     advisories = []
 
+    loader_for(session, Course.id).prime(req.requisite_course_id for req in requisites)
     for req in requisites:
         item = _build_requisite_item(req, session)
         if req.type == RequisiteType.PREREQUISITE:
@@ -3223,9 +3287,11 @@ async def refresh_lmi_data(
     course_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
+    lmi_client: LMIClient = Depends(get_lmi_client),
 ):
     """
-    Refresh LMI data for a course by re-fetching from CKAN API.
+    Refresh LMI data for a course from the California EDD datasets (the
+    local mirror when synced, otherwise the CKAN API).
 
     Uses the stored SOC code to fetch the latest wage and projection data
     from the California EDD public datasets. Preserves the user-edited
@@ -3262,30 +3328,28 @@ async def refresh_lmi_data(
 
     try:
         # Fetch fresh data from CKAN using SOC code
-        async with LMIClient() as lmi_client:
-            # Search for wage data by SOC code
-            wage_results = await lmi_client.search_wages_by_soc(
-                soc_code=course.lmi_soc_code,
-                area=course.lmi_area
-            )
+        wage_results = await lmi_client.search_wages_by_soc(
+            soc_code=course.lmi_soc_code,
+            area=course.lmi_area
+        )
 
-            if not wage_results:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Occupation with SOC code {course.lmi_soc_code} not found in CKAN data"
-                )
+        if not wage_results:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Occupation with SOC code {course.lmi_soc_code} not found in CKAN data"
+            )
 
-            # Get the most recent wage data
-            latest_wage = wage_results[0]
+        # Get the most recent wage data
+        latest_wage = wage_results[0]
 
-            # Search for projection data by SOC code
-            projection_results = await lmi_client.search_projections_by_soc(
-                soc_code=course.lmi_soc_code,
-                area=course.lmi_area
-            )
+        # Search for projection data by SOC code
+        projection_results = await lmi_client.search_projections_by_soc(
+            soc_code=course.lmi_soc_code,
+            area=course.lmi_area
+        )
 
-            # Get the most recent projection data (if available)
-            latest_projection = projection_results[0] if projection_results else None
+        # Get the most recent projection data (if available)
+        latest_projection = projection_results[0] if projection_results else None
 
     except HTTPException:
         raise
@@ -11,14 +11,16 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends
-from sqlmodel import Session, select, func
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_async_session
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.course import Course, CourseStatus
 from app.models.workflow import WorkflowHistory, EntityType
+from app.services.course_stats import REVIEW_STATUSES, load_status_totals_async
 
 router = APIRouter()
 
@@ -119,7 +121,7 @@ def get_activity_description(from_status: str, to_status: str) -> str:
 @router.get("/stats", response_model=DashboardStatsResponse)
 async def get_dashboard_stats(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Get dashboard statistics for the current user.
@@ -130,31 +132,25 @@ async def get_dashboard_stats(
     - recently_approved: Number of courses approved in the last 30 days
     """
     # Count my drafts (courses I created that are in Draft status)
-    my_drafts = session.exec(
+    my_drafts = (await session.exec(
         select(func.count(Course.id)).where(
             Course.created_by == current_user.id,
             Course.status == CourseStatus.DRAFT,
         )
-    ).one()
+    )).one()
 
-    # Count all pending review (any review status)
-    pending_statuses = [
-        CourseStatus.DEPT_REVIEW,
-        CourseStatus.CURRICULUM_COMMITTEE,
-        CourseStatus.ARTICULATION_REVIEW,
-    ]
-    pending_review = session.exec(
-        select(func.count(Course.id)).where(Course.status.in_(pending_statuses))
-    ).one()
+    # Count all pending review (any review status), from pre-aggregated totals
+    totals = await load_status_totals_async(session)
+    pending_review = totals.count(REVIEW_STATUSES)
 
     # Count recently approved (last 30 days)
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recently_approved = session.exec(
+    recently_approved = (await session.exec(
         select(func.count(Course.id)).where(
             Course.status == CourseStatus.APPROVED,
             Course.approved_at >= thirty_days_ago,
         )
-    ).one()
+    )).one()
 
     return DashboardStatsResponse(
         my_drafts=my_drafts,
@@ -169,7 +165,7 @@ async def get_dashboard_activity(
     offset: int = 0,
     activity_type: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Get recent activity for the dashboard.
@@ -189,17 +185,17 @@ async def get_dashboard_activity(
 
     # Get recent workflow history for courses the user owns or has touched
     # First, get course IDs the user created
-    user_course_ids = session.exec(
+    user_course_ids = (await session.exec(
         select(Course.id).where(Course.created_by == current_user.id)
-    ).all()
+    )).all()
 
     # Also get course IDs the user has reviewed (from workflow history)
-    reviewed_course_ids = session.exec(
+    reviewed_course_ids = (await session.exec(
         select(WorkflowHistory.entity_id).where(
             WorkflowHistory.changed_by == current_user.id,
             WorkflowHistory.entity_type == EntityType.COURSE,
         ).distinct()
-    ).all()
+    )).all()
 
     # Combine and deduplicate
     all_course_ids = list(set(user_course_ids) | set(reviewed_course_ids))
@@ -218,15 +214,15 @@ async def get_dashboard_activity(
         WorkflowHistory.entity_type == EntityType.COURSE,
         WorkflowHistory.entity_id.in_(all_course_ids),
     )
-    total_count = session.exec(count_query).one()
+    total_count = (await session.exec(count_query)).one()
 
     # Get workflow items with pagination
-    workflow_items = session.exec(
+    workflow_items = (await session.exec(
         base_query
         .order_by(WorkflowHistory.created_at.desc())
         .offset(offset)
         .limit(limit + 1)  # Fetch one extra to check if there are more
-    ).all()
+    )).all()
 
     # Check if there are more items
     has_more = len(workflow_items) > limit
@@ -238,14 +234,20 @@ async def get_dashboard_activity(
     actors = {}
     if actor_ids:
         actor_query = select(User).where(User.id.in_(actor_ids))
-        actor_users = session.exec(actor_query).all()
+        actor_users = (await session.exec(actor_query)).all()
         actors = {u.id: u.full_name for u in actor_users}
 
+    # Get the courses for this page in a single query
+    page_course_ids = {wf.entity_id for wf in workflow_items}
+    courses = {}
+    if page_course_ids:
+        course_query = select(Course).where(Course.id.in_(page_course_ids))
+        courses = {c.id: c for c in (await session.exec(course_query)).all()}
+
     # Build activity items
     items = []
     for wf in workflow_items:
-        # Get the course
-        course = session.get(Course, wf.entity_id)
+        course = courses.get(wf.entity_id)
         if not course:
             continue
 
@@ -308,7 +310,7 @@ async def get_stale_items(
     draft_threshold_days: int = 30,
     review_threshold_days: int = 7,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Get stale items for the deadline alerts widget.
@@ -328,7 +330,7 @@ async def get_stale_items(
     draft_cutoff = now - timedelta(days=draft_threshold_days)
     critical_draft_cutoff = now - timedelta(days=draft_threshold_days * 2)  # 60 days = critical
 
-    stale_draft_courses = session.exec(
+    stale_draft_courses = (await session.exec(
         select(Course)
         .where(
             Course.created_by == current_user.id,
@@ -337,7 +339,7 @@ async def get_stale_items(
         )
         .order_by(Course.updated_at.asc())
         .limit(10)
-    ).all()
+    )).all()
 
     stale_drafts = []
     for course in stale_draft_courses:
@@ -366,7 +368,7 @@ async def get_stale_items(
 
     # For reviewers, show items in review they can act on
     # For authors, show their items stuck in review
-    stale_review_courses = session.exec(
+    stale_review_courses = (await session.exec(
         select(Course)
         .where(
             Course.status.in_(review_statuses),
@@ -374,7 +376,7 @@ async def get_stale_items(
         )
         .order_by(Course.updated_at.asc())
         .limit(10)
-    ).all()
+    )).all()
 
     stale_reviews = []
     for course in stale_review_courses:
@@ -429,7 +431,7 @@ class DepartmentAnalyticsResponse(BaseModel):
 @router.get("/analytics", response_model=DepartmentAnalyticsResponse)
 async def get_department_analytics(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Get department-level analytics for curriculum work.
@@ -444,95 +446,51 @@ async def get_department_analytics(
     is_admin = current_user.role.value == "Admin"
     is_chair = current_user.role.value == "CurriculumChair"
 
-    # Build base query
+    # Determine which courses are counted
     if is_admin:
         # Admin sees all courses
-        base_query = select(Course)
+        scope = {}
         department_name = "All Departments"
         department_id = None
     elif is_chair and current_user.department_id:
         # Chair sees their department
-        base_query = select(Course).where(Course.department_id == current_user.department_id)
-        dept = session.get(Department, current_user.department_id)
+        scope = {"department_id": current_user.department_id}
+        dept = await session.get(Department, current_user.department_id)
         department_name = dept.name if dept else "Unknown Department"
         department_id = current_user.department_id
     else:
         # Faculty sees only their own courses
-        base_query = select(Course).where(Course.created_by == current_user.id)
+        scope = {"created_by": current_user.id}
         department_name = "My Courses"
         department_id = current_user.department_id
 
-    # Get all courses in scope
-    all_courses = session.exec(base_query).all()
-    total_courses = len(all_courses)
-
-    # Count by status
-    status_counts = {}
-    for course in all_courses:
-        status = course.status.value
-        status_counts[status] = status_counts.get(status, 0) + 1
+    # Course totals per status: pre-aggregated for all courses or a department,
+    # computed with one grouped query for a faculty member's own courses
+    totals = await load_status_totals_async(session, **scope)
+    total_courses = totals.total
 
     courses_by_status = [
         CoursesByStatusItem(
-            status=status,
+            status=status.value,
             count=count,
             percentage=round((count / total_courses * 100) if total_courses > 0 else 0, 1),
         )
-        for status, count in status_counts.items()
+        for status, count in totals.course_count.items()
+        if count > 0
     ]
 
     # Sort by count descending
     courses_by_status.sort(key=lambda x: x.count, reverse=True)
 
-    # Calculate approval rate (approved / (approved + returned))
-    # We'll look at workflow history for this
-    from app.models.workflow import WorkflowHistory, EntityType
-
-    # Get relevant course IDs
-    course_ids = [c.id for c in all_courses]
-
-    if course_ids:
-        # Count approvals
-        approvals_count = session.exec(
-            select(func.count(WorkflowHistory.id)).where(
-                WorkflowHistory.entity_type == EntityType.COURSE,
-                WorkflowHistory.entity_id.in_(course_ids),
-                WorkflowHistory.to_status == CourseStatus.APPROVED.value,
-            )
-        ).one()
-
-        # Count returns (to Draft from any review status)
-        returns_count = session.exec(
-            select(func.count(WorkflowHistory.id)).where(
-                WorkflowHistory.entity_type == EntityType.COURSE,
-                WorkflowHistory.entity_id.in_(course_ids),
-                WorkflowHistory.to_status == CourseStatus.DRAFT.value,
-                WorkflowHistory.from_status.in_([
-                    CourseStatus.DEPT_REVIEW.value,
-                    CourseStatus.CURRICULUM_COMMITTEE.value,
-                    CourseStatus.ARTICULATION_REVIEW.value,
-                ]),
-            )
-        ).one()
-
-        total_decisions = approvals_count + returns_count
-        approval_rate = round((approvals_count / total_decisions * 100) if total_decisions > 0 else 0, 1)
-
-        # Calculate average time in review
-        # Get courses that are currently in review and their workflow history
-        review_statuses = [
-            CourseStatus.DEPT_REVIEW,
-            CourseStatus.CURRICULUM_COMMITTEE,
-            CourseStatus.ARTICULATION_REVIEW,
-        ]
-
-        in_review_courses = [c for c in all_courses if c.status in review_statuses]
-        if in_review_courses:
-            now = datetime.utcnow()
-            total_days = sum((now - c.updated_at).days for c in in_review_courses)
-            avg_review_days = round(total_days / len(in_review_courses), 1)
-        else:
-            avg_review_days = None
+    if total_courses:
+        # Approval rate: approved / (approved + returned to Draft from review)
+        total_decisions = totals.approvals + totals.returns
+        approval_rate = round((totals.approvals / total_decisions * 100) if total_decisions > 0 else 0, 1)
+
+        # Average days courses currently in review have waited since their last update
+        avg_review_days = totals.average_age_days(REVIEW_STATUSES)
+        if avg_review_days is not None:
+            avg_review_days = round(avg_review_days, 1)
     else:
         approval_rate = 0.0
         avg_review_days = None
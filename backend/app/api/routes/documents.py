@@ -14,10 +14,11 @@ from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from pydantic import BaseModel
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
 
 from app.core.database import get_session
 from app.core.deps import get_current_user
+from app.core.pagination import CountMode, apply_keyset, count_statement, parse_count, split_page
 from app.models.user import User
 from app.models.document import (
     RAGDocument,
@@ -68,9 +69,10 @@ class DocumentUploadResponse(BaseModel):
 class DocumentListResponse(BaseModel):
     """Response for listing documents."""
     documents: List[RAGDocumentRead]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class DocumentStatusResponse(BaseModel):
@@ -193,45 +195,45 @@ async def list_documents(
     indexing_status: Optional[IndexingStatus] = Query(default=None, description="Filter by indexing status"),
     page: int = Query(default=1, ge=1, description="Page number"),
     page_size: int = Query(default=20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from a previous page's next_cursor"),
+    count: CountMode = Query(default=CountMode.EXACT, description="How to compute total: exact, estimate, or none"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     List documents with optional filtering.
 
-    Returns paginated list of documents for the current user.
+    Returns paginated list of documents for the current user. Pass the
+    returned `next_cursor` as `cursor` to fetch the following page without
+    an OFFSET scan; `count` selects an exact, estimated, or skipped total.
     """
     # Build query
     query = select(RAGDocument).where(RAGDocument.uploaded_by == current_user.id)
+    count_query = select(func.count(RAGDocument.id)).where(RAGDocument.uploaded_by == current_user.id)
 
     if course_id:
         query = query.where(RAGDocument.course_id == course_id)
-    if department_id:
-        query = query.where(RAGDocument.department_id == department_id)
-    if document_type:
-        query = query.where(RAGDocument.document_type == document_type)
-    if indexing_status:
-        query = query.where(RAGDocument.indexing_status == indexing_status)
-
-    # Get total count
-    count_query = select(RAGDocument).where(RAGDocument.uploaded_by == current_user.id)
-    if course_id:
         count_query = count_query.where(RAGDocument.course_id == course_id)
     if department_id:
+        query = query.where(RAGDocument.department_id == department_id)
         count_query = count_query.where(RAGDocument.department_id == department_id)
     if document_type:
+        query = query.where(RAGDocument.document_type == document_type)
         count_query = count_query.where(RAGDocument.document_type == document_type)
     if indexing_status:
+        query = query.where(RAGDocument.indexing_status == indexing_status)
         count_query = count_query.where(RAGDocument.indexing_status == indexing_status)
 
-    total_results = session.exec(count_query).all()
-    total = len(total_results)
+    # Get total count
+    total = None
+    count_stmt = count_statement(count, count_query, query, RAGDocument.__tablename__)
+    if count_stmt is not None:
+        total = parse_count(session.scalar(count_stmt))
 
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size).order_by(RAGDocument.created_at.desc())
+    # Apply pagination (newest first, id breaks ties)
+    query = apply_keyset(query, RAGDocument.created_at, RAGDocument.id, page_size, cursor=cursor, page=page)
 
-    documents = session.exec(query).all()
+    documents, next_cursor = split_page(session.exec(query).all(), page_size, "created_at")
 
     return DocumentListResponse(
         documents=[RAGDocumentRead(
@@ -253,7 +255,8 @@ async def list_documents(
         ) for doc in documents],
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -23,6 +23,7 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 
 from app.core.database import get_session
 from app.core.deps import get_current_user
+from app.core.loaders import loader_for
 from app.models.user import User
 from app.models.course import (
     Course,
@@ -370,6 +371,9 @@ async def export_course_pdf(
 
     story.append(Paragraph("Prerequisites & Corequisites", styles['SectionHeader']))
 
+    # Fetch all requisite courses in one query
+    requisite_courses = loader_for(session, Course.id).load_many(r.requisite_course_id for r in requisites)
+
     prereqs = [r for r in requisites if r.type.value == "PREREQUISITE"]
     coreqs = [r for r in requisites if r.type.value == "COREQUISITE"]
     advisories = [r for r in requisites if r.type.value == "ADVISORY"]
@@ -378,7 +382,7 @@ async def export_course_pdf(
         story.append(Paragraph("<b>Prerequisites:</b>", styles['CORBody']))
         for req in prereqs:
             if req.requisite_course_id:
-                req_course = session.get(Course, req.requisite_course_id)
+                req_course = requisite_courses.get(req.requisite_course_id)
                 if req_course:
                     story.append(Paragraph(
                         f"• {req_course.subject_code} {req_course.course_number} - {req_course.title}",
@@ -391,7 +395,7 @@ async def export_course_pdf(
         story.append(Paragraph("<b>Corequisites:</b>", styles['CORBody']))
         for req in coreqs:
             if req.requisite_course_id:
-                req_course = session.get(Course, req.requisite_course_id)
+                req_course = requisite_courses.get(req.requisite_course_id)
                 if req_course:
                     story.append(Paragraph(
                         f"• {req_course.subject_code} {req_course.course_number} - {req_course.title}",
@@ -404,7 +408,7 @@ async def export_course_pdf(
         story.append(Paragraph("<b>Advisories:</b>", styles['CORBody']))
         for req in advisories:
             if req.requisite_course_id:
-                req_course = session.get(Course, req.requisite_course_id)
+                req_course = requisite_courses.get(req.requisite_course_id)
                 if req_course:
                     story.append(Paragraph(
                         f"• {req_course.subject_code} {req_course.course_number} - {req_course.title}",
@@ -617,8 +621,11 @@ async def export_program_pdf(
         RequirementType.GE: [],
     }
 
+    # Fetch all program courses in one query
+    courses = loader_for(session, Course.id).load_many(pc.course_id for pc in program_courses)
+
     for pc in program_courses:
-        course = session.get(Course, pc.course_id)
+        course = courses.get(pc.course_id)
         if course:
             courses_by_type[pc.requirement_type].append({
                 "course": course,
@@ -879,14 +886,16 @@ async def get_public_course_view(
     )
     requisites = session.exec(requisites_query).all()
 
-    # Process requisites for public view
+    # Process requisites for public view (requisite courses fetched in one query)
+    loader_for(session, Course.id).prime(r.requisite_course_id for r in requisites)
+
     def format_requisite_for_public(req: CourseRequisite) -> dict:
         """Format a requisite for public display."""
         result = {
             "type": req.type.value.lower().replace("_", " ").title(),
         }
         if req.requisite_course_id:
-            req_course = session.get(Course, req.requisite_course_id)
+            req_course = loader_for(session, Course.id).get(req.requisite_course_id)
             if req_course:
                 result["course"] = f"{req_course.subject_code} {req_course.course_number}"
                 result["courseTitle"] = req_course.title
@@ -20,6 +20,8 @@ from pydantic import BaseModel
 
 from app.core.database import get_session
 from app.core.deps import get_current_user, require_admin
+from app.core.loaders import loader_for
+from app.core.pagination import CountMode, apply_keyset, count_statement, parse_count, split_page, total_pages
 from app.models.user import User, UserRole
 from app.models.program import (
     Program,
@@ -67,10 +69,11 @@ class ProgramListItem(BaseModel):
 class ProgramListResponse(BaseModel):
     """Paginated response for program list."""
     items: List[ProgramListItem]
-    total: int
+    total: Optional[int]
     page: int
     limit: int
-    pages: int
+    pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class CourseInProgramItem(BaseModel):
@@ -127,6 +130,8 @@ async def list_programs(
     # Pagination
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    count: CountMode = Query(CountMode.EXACT, description="How to compute total: exact, estimate, or none"),
     # Dependencies
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
@@ -144,8 +149,11 @@ async def list_programs(
     **Pagination:**
     - `page`: Page number (default: 1)
     - `limit`: Items per page (default: 20, max: 100)
+    - `cursor`: Keyset cursor; when given, `page` is ignored
+    - `count`: `exact` (default), `estimate` (planner estimate), or `none`
 
-    Returns paginated list with total count for pagination UI.
+    Returns paginated list with total count for pagination UI and a
+    `next_cursor` for the following page (null on the last page).
     """
     # Build base query
     query = select(Program)
@@ -186,19 +194,22 @@ async def list_programs(
         count_query = count_query.where(Program.created_by == created_by)
 
     # Get total count
-    total = session.exec(count_query).one()
+    total = None
+    count_stmt = count_statement(count, count_query, query, Program.__tablename__)
+    if count_stmt is not None:
+        total = parse_count(session.scalar(count_stmt))
 
-    # Apply pagination and ordering
-    offset = (page - 1) * limit
-    query = query.order_by(Program.updated_at.desc()).offset(offset).limit(limit)
+    # Apply pagination and ordering (updated_at, id) so cursors are stable
+    query = apply_keyset(query, Program.updated_at, Program.id, limit, cursor=cursor, page=page)
 
     # Execute query
-    programs = session.exec(query).all()
+    programs, next_cursor = split_page(session.exec(query).all(), limit, "updated_at")
 
-    # Build response items with department info
+    # Build response items with department info (one query for all departments)
+    departments = loader_for(session, Department.id).load_many(program.department_id for program in programs)
     items = []
     for program in programs:
-        dept = session.get(Department, program.department_id)
+        dept = departments.get(program.department_id)
         dept_info = None
         if dept:
             dept_info = DepartmentInfo(id=dept.id, name=dept.name, code=dept.code)
@@ -215,15 +226,13 @@ async def list_programs(
             updated_at=program.updated_at,
         ))
 
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if total > 0 else 1
-
     return ProgramListResponse(
         items=items,
         total=total,
         page=page,
         limit=limit,
-        pages=pages,
+        pages=total_pages(total, limit),
+        next_cursor=next_cursor,
     )
 
 
@@ -3,11 +3,12 @@ QCEW (Quarterly Census of Employment and Wages) API Routes
 ==========================================================
 
 Endpoints for accessing county-level employment and wage data by industry.
-Data source: BLS QCEW Open Data API
+Data source: BLS QCEW Open Data API, or quarters loaded locally from the
+QCEW bulk files
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from pydantic import BaseModel
 
 from app.services.qcew_client import (
@@ -18,6 +19,7 @@ from app.services.qcew_client import (
     IndustryInfo,
     QCEW_AREAS,
     KEY_INDUSTRIES,
+    get_qcew_client,
 )
 
 router = APIRouter()
@@ -44,28 +46,32 @@ class QCEWIndustryResponse(BaseModel):
     data: QCEWIndustryData
 
 
+class QCEWTrendResponse(BaseModel):
+    """Response for an industry trend across areas."""
+    industry_code: str
+    points: List[QCEWIndustryData]
+
+
 @router.get("/areas", response_model=QCEWAreasResponse)
-async def get_available_areas():
+async def get_available_areas(client: QCEWClient = Depends(get_qcew_client)):
     """
     Get list of available areas for QCEW queries.
 
     Returns California counties available in the QCEW database.
     """
-    async with QCEWClient() as client:
-        areas = client.get_available_areas()
-        return QCEWAreasResponse(areas=areas)
+    areas = client.get_available_areas()
+    return QCEWAreasResponse(areas=areas)
 
 
 @router.get("/industries", response_model=QCEWIndustriesResponse)
-async def get_available_industries():
+async def get_available_industries(client: QCEWClient = Depends(get_qcew_client)):
     """
     Get list of key industries tracked.
 
     Returns 2-digit NAICS industry sectors commonly used for workforce analysis.
     """
-    async with QCEWClient() as client:
-        industries = client.get_available_industries()
-        return QCEWIndustriesResponse(industries=industries)
+    industries = client.get_available_industries()
+    return QCEWIndustriesResponse(industries=industries)
 
 
 @router.get("/summary/{area}", response_model=QCEWSummaryResponse)
@@ -78,6 +84,7 @@ async def get_area_summary(
         le=4,
         description="Quarter 1-4 (defaults to latest available)"
     ),
+    client: QCEWClient = Depends(get_qcew_client),
 ):
     """
     Get employment summary for an area.
@@ -103,13 +110,12 @@ async def get_area_summary(
         )
 
     try:
-        async with QCEWClient() as client:
-            summary = await client.get_area_summary(
-                area=area,
-                year=year,
-                quarter=quarter,
-            )
-            return QCEWSummaryResponse(summary=summary)
+        summary = await client.get_area_summary(
+            area=area,
+            year=year,
+            quarter=quarter,
+        )
+        return QCEWSummaryResponse(summary=summary)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -126,6 +132,7 @@ async def get_default_summary(
         le=4,
         description="Quarter 1-4 (defaults to latest available)"
     ),
+    client: QCEWClient = Depends(get_qcew_client),
 ):
     """
     Get employment summary for LA County (default area).
@@ -134,13 +141,12 @@ async def get_default_summary(
     Use /summary/{area} to query other areas.
     """
     try:
-        async with QCEWClient() as client:
-            summary = await client.get_area_summary(
-                area="los_angeles",
-                year=year,
-                quarter=quarter,
-            )
-            return QCEWSummaryResponse(summary=summary)
+        summary = await client.get_area_summary(
+            area="los_angeles",
+            year=year,
+            quarter=quarter,
+        )
+        return QCEWSummaryResponse(summary=summary)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -154,6 +160,7 @@ async def get_industry_data(
     industry_code: str,
     year: Optional[int] = Query(default=None, description="Year"),
     quarter: Optional[int] = Query(default=None, ge=1, le=4, description="Quarter 1-4"),
+    client: QCEWClient = Depends(get_qcew_client),
 ):
     """
     Get data for a specific industry in an area.
@@ -181,21 +188,20 @@ async def get_industry_data(
         )
 
     try:
-        async with QCEWClient() as client:
-            data = await client.get_industry_data(
-                area=area,
-                industry_code=industry_code,
-                year=year,
-                quarter=quarter,
-            )
+        data = await client.get_industry_data(
+            area=area,
+            industry_code=industry_code,
+            year=year,
+            quarter=quarter,
+        )
 
-            if not data:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No data found for industry {industry_code} in {area}"
-                )
+        if not data:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No data found for industry {industry_code} in {area}"
+            )
 
-            return QCEWIndustryResponse(data=data)
+        return QCEWIndustryResponse(data=data)
     except HTTPException:
         raise
     except Exception as e:
@@ -203,3 +209,41 @@ async def get_industry_data(
             status_code=500,
             detail=f"Failed to fetch QCEW data: {str(e)}"
         )
+
+
+@router.get("/trend/{industry_code}", response_model=QCEWTrendResponse)
+async def get_industry_trend(
+    industry_code: str,
+    areas: str = Query(default="los_angeles", description="Comma-separated area keys"),
+    quarters: int = Query(default=8, ge=1, le=20, description="Number of quarters (1-20)"),
+    client: QCEWClient = Depends(get_qcew_client),
+):
+    """
+    Get one industry's private-sector employment and wages across areas over
+    recent quarters.
+
+    Quarters loaded from the QCEW bulk files (scripts/ingest_qcew.py) are
+    served locally in a single query; others are fetched from the QCEW API.
+
+    Example: /trend/62?areas=los_angeles,orange,riverside&quarters=12
+    """
+    area_keys = [area.strip() for area in areas.split(",") if area.strip()]
+    unknown = [area for area in area_keys if area not in QCEW_AREAS]
+    if not area_keys or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown area: {', '.join(unknown)}. Available areas: {list(QCEW_AREAS.keys())}"
+        )
+
+    try:
+        points = await client.get_industry_trend(
+            areas=area_keys,
+            industry_code=industry_code,
+            quarters=quarters,
+        )
+        return QCEWTrendResponse(industry_code=industry_code, points=points)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch QCEW data: {str(e)}"
+        )
@@ -16,6 +16,7 @@ from pydantic import BaseModel
 
 from app.core.database import get_session
 from app.core.deps import get_current_user, require_admin
+from app.core.pagination import CountMode, apply_keyset, count_statement, parse_count, split_page, total_pages
 from app.models.user import User, UserRole
 from app.models.workflow import (
     Comment,
@@ -64,10 +65,11 @@ class CommentResponse(BaseModel):
 class CommentListResponse(BaseModel):
     """Paginated response for comment list."""
     items: List[CommentResponse]
-    total: int
+    total: Optional[int]
     page: int
     limit: int
-    pages: int
+    pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class CommentCreateRequest(BaseModel):
@@ -175,6 +177,8 @@ async def list_comments(
     user_id: Optional[uuid.UUID] = Query(None, description="Filter by user ID"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    count: CountMode = Query(CountMode.EXACT, description="How to compute total: exact, estimate, or none"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
@@ -191,6 +195,8 @@ async def list_comments(
     **Pagination:**
     - `page`: Page number (default: 1)
     - `limit`: Items per page (default: 50, max: 100)
+    - `cursor`: Keyset cursor from `next_cursor`; overrides `page`
+    - `count`: `exact` (default), `estimate`, or `none`
     """
     # Build base query
     query = select(Comment)
@@ -218,14 +224,16 @@ async def list_comments(
         count_query = count_query.where(Comment.user_id == user_id)
 
     # Get total count
-    total = session.exec(count_query).one()
+    total = None
+    count_stmt = count_statement(count, count_query, query, Comment.__tablename__)
+    if count_stmt is not None:
+        total = parse_count(session.scalar(count_stmt))
 
-    # Apply pagination and ordering (newest first)
-    offset = (page - 1) * limit
-    query = query.order_by(Comment.created_at.desc()).offset(offset).limit(limit)
+    # Apply pagination and ordering (newest first, id breaks ties)
+    query = apply_keyset(query, Comment.created_at, Comment.id, limit, cursor=cursor, page=page)
 
     # Execute query
-    comments = session.exec(query).all()
+    comments, next_cursor = split_page(session.exec(query).all(), limit, "created_at")
 
     # Build response items with user info
     items = []
@@ -257,15 +265,13 @@ async def list_comments(
             created_at=comment.created_at,
         ))
 
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if total > 0 else 1
-
     return CommentListResponse(
         items=items,
         total=total,
         page=page,
         limit=limit,
-        pages=pages,
+        pages=total_pages(total, limit),
+        next_cursor=next_cursor,
     )
 
 
@@ -0,0 +1,199 @@
+"""
+Authentication Caches
+
+Two in-process caches that take the Firebase signature check and the user
+lookup off the per-request path of get_current_user:
+
+- token_cache: decoded ID-token claims keyed by a SHA-256 of the token, held
+  until the token's own `exp`. Claims without an `exp` (dev-mode tokens) are
+  not cached. verify_id_token does not check revocation, so serving a cached
+  verification until expiry accepts nothing the SDK would reject.
+- user_cache: the users row keyed by firebase_uid for a short TTL. Entries
+  are dropped whenever a User is updated or deleted through the ORM (checked
+  at flush and again at commit). Each worker process has its own cache, and
+  changes made by another worker or outside the ORM are picked up when the
+  TTL runs out.
+
+Cached users are stored as column values, not instances, and are attached to
+the request's session with `merge(load=False)`, so routes get an ordinary
+persistent User they can modify and whose relationships lazy-load as usual.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as SASession, make_transient_to_detached
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.user import User
+
+# session.info key for firebase_uids to invalidate again after commit
+_PENDING_KEY = "auth_cache_invalidate"
+
+
+class _ExpiringLRU:
+    """Bounded LRU mapping with a per-entry expiry time (time.monotonic())."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =============================================================================
+# Verified tokens
+# =============================================================================
+
+class TokenCache:
+    """Decoded token claims, valid until the token expires."""
+
+    def __init__(self, max_size: int):
+        self._entries = _ExpiringLRU(max_size)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Raw tokens are bearer credentials; keep only a digest in memory
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        claims = self._entries.get(self._key(token))
+        record_cache("auth_token", hits=int(claims is not None), misses=int(claims is None))
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        remaining = exp - time.time()
+        if remaining > 0:
+            self._entries.put(self._key(token), claims, time.monotonic() + remaining)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# =============================================================================
+# Users by firebase_uid
+# =============================================================================
+
+class UserCache:
+    """
+    Users by firebase_uid with a short TTL and invalidation on update.
+
+    `generation` changes on every invalidation. Callers read it before
+    querying the database and pass it to put(); a row read before a
+    concurrent update committed is then not cached.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = _ExpiringLRU(max_size if ttl_seconds > 0 else 0)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, session: Session, firebase_uid: str) -> Optional[User]:
+        """The cached user attached to `session`, or None."""
+        values = self._entries.get(firebase_uid)
+        record_cache("auth_user", hits=int(values is not None), misses=int(values is None))
+        if values is None:
+            return None
+        user = User(**values)
+        make_transient_to_detached(user)
+        return session.merge(user, load=False)
+
+    def put(self, user: User, generation: int) -> None:
+        values = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries.put(user.firebase_uid, values, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, *firebase_uids: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for firebase_uid in firebase_uids:
+                self._entries.pop(firebase_uid)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+token_cache = TokenCache(max_size=settings.AUTH_TOKEN_CACHE_SIZE)
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+def _changed_uids(session) -> Set[str]:
+    uids: Set[str] = set()
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            history = inspect(obj).attrs.firebase_uid.history
+            uids.update(uid for uid in (*history.unchanged, *history.added, *history.deleted) if uid)
+    return uids
+
+
+@event.listens_for(SASession, "after_flush")
+def _invalidate_on_flush(session, flush_context):
+    uids = _changed_uids(session)
+    if uids:
+        user_cache.invalidate(*uids)
+        session.info.setdefault(_PENDING_KEY, set()).update(uids)
+
+
+@event.listens_for(SASession, "after_commit")
+def _invalidate_on_commit(session):
+    # A request may have re-cached the old row between our flush and commit
+    uids = session.info.pop(_PENDING_KEY, None)
+    if uids:
+        user_cache.invalidate(*uids)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
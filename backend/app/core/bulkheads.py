@@ -0,0 +1,194 @@
+"""
+Concurrency bulkheads for expensive route classes.
+
+AI generation, PDF export, eLumen proxying and BLS/QCEW fetches each get a
+fixed number of concurrent request slots and a short bounded queue, so a
+burst in one class can't take every worker thread, DB connection and
+event-loop turn away from course editing. A request that finds the queue
+full, or waits longer than BULKHEAD_QUEUE_TIMEOUT_SECONDS, is shed with a
+503 and a Retry-After estimated from recent hold times.
+
+Usage (router level, in main.py):
+    app.include_router(export.router, dependencies=[Depends(bulkhead("export"))])
+
+Metrics:
+- bulkhead_queue_wait_seconds{bulkhead}: time from arrival to a slot
+- bulkhead_rejections_total{bulkhead,reason}: queue_full / timeout
+- bulkhead_requests{bulkhead,state}: active and queued, at scrape time
+
+Limits are per worker process.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import POOL_WAIT_BUCKETS, CallbackGauge, Counter, Histogram
+
+QUEUE_WAIT = Histogram(
+    "bulkhead_queue_wait_seconds",
+    "Time requests waited for a bulkhead slot",
+    ["bulkhead"],
+    buckets=POOL_WAIT_BUCKETS,
+)
+REJECTIONS = Counter(
+    "bulkhead_rejections_total",
+    "Requests shed by a saturated bulkhead",
+    ["bulkhead", "reason"],
+)
+
+# Bounds for the Retry-After sent with a 503
+MIN_RETRY_AFTER_SECONDS = 1
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Weight of the latest request in the moving average of slot hold time
+HOLD_TIME_SMOOTHING = 0.2
+
+
+class BulkheadFull(Exception):
+    """Raised when a request is shed; `retry_after` is in seconds."""
+
+    def __init__(self, name: str, reason: str, retry_after: int):
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Bulkhead {name} saturated ({reason})")
+
+
+class Bulkhead:
+    """
+    Counting semaphore with a bounded FIFO queue and a queue timeout.
+
+    Slots are handed directly to the oldest waiter on release, so a request
+    arriving while others queue can't jump ahead of them.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._hold_seconds = 1.0  # Moving average, seeds the first Retry-After
+        self._wait = QUEUE_WAIT.labels(name)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new arrival."""
+        rounds = (self.queued + 1) / max(self.max_concurrent, 1)
+        estimate = math.ceil(self._hold_seconds * rounds)
+        return min(max(estimate, MIN_RETRY_AFTER_SECONDS), MAX_RETRY_AFTER_SECONDS)
+
+    def _shed(self, reason: str) -> BulkheadFull:
+        REJECTIONS.labels(self.name, reason).inc()
+        return BulkheadFull(self.name, reason, self.retry_after())
+
+    async def acquire(self) -> None:
+        """Take a slot, queueing if none is free; raises BulkheadFull when shed."""
+        start = time.perf_counter()
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self._wait.observe(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            # Unless a slot was handed over just as the timeout fired
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                raise self._shed("timeout")
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot we were handed meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        self._wait.observe(time.perf_counter() - start)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        """Free a slot; `held_seconds` feeds the Retry-After estimate."""
+        if held_seconds is not None:
+            self._hold_seconds += HOLD_TIME_SMOOTHING * (held_seconds - self._hold_seconds)
+        # Hand the slot straight to the oldest live waiter
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+def _configured() -> Dict[str, Bulkhead]:
+    timeout = settings.BULKHEAD_QUEUE_TIMEOUT_SECONDS
+    return {
+        name: Bulkhead(name, concurrent, queue, timeout)
+        for name, concurrent, queue in (
+            ("ai", settings.BULKHEAD_AI_CONCURRENCY, settings.BULKHEAD_AI_QUEUE),
+            ("export", settings.BULKHEAD_EXPORT_CONCURRENCY, settings.BULKHEAD_EXPORT_QUEUE),
+            ("elumen", settings.BULKHEAD_ELUMEN_CONCURRENCY, settings.BULKHEAD_ELUMEN_QUEUE),
+            ("labor_market", settings.BULKHEAD_LABOR_MARKET_CONCURRENCY, settings.BULKHEAD_LABOR_MARKET_QUEUE),
+        )
+    }
+
+
+BULKHEADS: Dict[str, Bulkhead] = _configured()
+
+
+def _bulkhead_samples():
+    for bulkhead in BULKHEADS.values():
+        yield (bulkhead.name, "active"), bulkhead.active
+        yield (bulkhead.name, "queued"), bulkhead.queued
+
+
+CallbackGauge(
+    "bulkhead_requests",
+    "Requests holding or waiting for a bulkhead slot",
+    ["bulkhead", "state"],
+    _bulkhead_samples,
+)
+
+
+def bulkhead(name: str) -> Callable[[], AsyncIterator[None]]:
+    """
+    FastAPI dependency holding a slot of bulkhead `name` for the request.
+
+    The slot is released when the endpoint (and any dependency cleanup
+    registered after this one) has finished. Raises 503 with Retry-After
+    when the bulkhead is saturated.
+    """
+
+    async def hold_slot() -> AsyncIterator[None]:
+        if not settings.BULKHEADS_ENABLED:
+            yield
+            return
+        compartment = BULKHEADS[name]
+        try:
+            await compartment.acquire()
+        except BulkheadFull as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Server is busy with other {name.replace('_', ' ')} requests. Please retry shortly.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            compartment.release(time.perf_counter() - start)
+
+    return hold_slot
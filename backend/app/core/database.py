@@ -5,20 +5,70 @@ Configures connection pooling optimized for:
 - Local Docker PostgreSQL (default settings)
 - Neon serverless PostgreSQL (with connection recycling)
 - High-concurrency production workloads
+
+Optionally routes read-only (GET/HEAD) requests to read replicas
+configured via DATABASE_REPLICA_URLS.
 """
 
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy.pool import QueuePool, NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, NullPool
+from sqlalchemy.sql import Select
 from sqlalchemy import event, text
-from typing import Generator
+from fastapi import Request
+from typing import AsyncGenerator, Dict, Generator, List, Optional
+import hashlib
+import itertools
 import logging
+import threading
+import time
 
 from app.core.config import settings
+from app.core.deadlines import install_statement_timeout
+from app.core.metrics import POOL_CHECKOUT_WAIT, CallbackGauge
+from app.core.query_stats import instrument_engine
 
 logger = logging.getLogger(__name__)
 
+# HTTP methods that never write and can be served from a replica
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time (db_pool_checkout_wait_seconds{pool="sync"})."""
+    pool_type = "QueuePool"
+    _wait = POOL_CHECKOUT_WAIT.labels("sync")
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self._wait.observe(time.perf_counter() - start)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async counterpart of TimedQueuePool (pool="async")."""
+    pool_type = "AsyncAdaptedQueuePool"
+    _wait = POOL_CHECKOUT_WAIT.labels("async")
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self._wait.observe(time.perf_counter() - start)
+
+
+# SQLAlchemy names pool loggers after the pool class, which puts these under
+# app.*; keep them at SQLAlchemy's own default level instead of the app's
+for _pool_class in (TimedQueuePool, TimedAsyncQueuePool):
+    logging.getLogger(f"{_pool_class.__module__}.{_pool_class.__name__}").setLevel(logging.WARNING)
+
 
-def create_db_engine():
+def create_db_engine(database_url: Optional[str] = None):
     """
     Create database engine with configurable connection pooling.
 
@@ -30,6 +80,9 @@ def create_db_engine():
     2. NullPool: No connection pooling, new connection per request
        - Good for serverless/edge deployments
        - Set DB_USE_NULLPOOL=true to enable
+
+    Args:
+        database_url: URL to connect to (defaults to DATABASE_URL)
     """
 
     # Common engine arguments
@@ -50,7 +103,7 @@ def create_db_engine():
             f"recycle={settings.DB_POOL_RECYCLE}s)"
         )
         engine_args.update({
-            "poolclass": QueuePool,
+            "poolclass": TimedQueuePool,
             "pool_size": settings.DB_POOL_SIZE,
             "max_overflow": settings.DB_MAX_OVERFLOW,
             "pool_timeout": settings.DB_POOL_TIMEOUT,
@@ -58,7 +111,12 @@ def create_db_engine():
             "pool_pre_ping": settings.DB_POOL_PRE_PING,
         })
 
-    engine = create_engine(settings.DATABASE_URL, **engine_args)
+    engine = create_engine(database_url or settings.DATABASE_URL, **engine_args)
+
+    # Per-request query counting and timing (see app.core.query_stats)
+    instrument_engine(engine)
+    # statement_timeout from the request deadline (see app.core.deadlines)
+    install_statement_timeout(engine)
 
     # Add connection event listeners for debugging/monitoring
     if settings.DEBUG:
@@ -81,6 +139,262 @@ def create_db_engine():
 engine = create_db_engine()
 
 
+def get_async_database_url(database_url: str) -> tuple[str, dict]:
+    """
+    Convert a sync DATABASE_URL into an asyncpg URL plus connect_args.
+
+    psycopg2-style query options that asyncpg does not understand
+    (sslmode, channel_binding) are stripped; sslmode is translated
+    into asyncpg's `ssl` connect argument so Neon URLs keep working.
+
+    Returns:
+        Tuple of (async_url, connect_args)
+    """
+    url = make_url(database_url)
+    connect_args = {}
+
+    if url.get_backend_name() != "postgresql":
+        # Non-Postgres URLs (e.g. an explicit sqlite+aiosqlite URL) pass through
+        return database_url, connect_args
+
+    query = dict(url.query)
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+
+    url = url.set(drivername="postgresql+asyncpg", query=query)
+    return url.render_as_string(hide_password=False), connect_args
+
+
+def create_async_db_engine(database_url: Optional[str] = None):
+    """
+    Create the asyncio engine used by `async def` route handlers.
+
+    Mirrors create_db_engine(): same pool sizing, recycling and
+    NullPool switch, but backed by asyncpg so queries await instead
+    of blocking the event loop.
+
+    Args:
+        database_url: Sync-style URL to derive from (defaults to DATABASE_URL)
+    """
+    async_url, connect_args = get_async_database_url(database_url or settings.DATABASE_URL)
+
+    engine_args = {
+        "echo": settings.DEBUG,
+        "connect_args": connect_args,
+    }
+
+    if settings.DB_USE_NULLPOOL:
+        engine_args["poolclass"] = NullPool
+    else:
+        engine_args.update({
+            "poolclass": TimedAsyncQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        })
+
+    async_engine = create_async_engine(async_url, **engine_args)
+    instrument_engine(async_engine.sync_engine)
+    install_statement_timeout(async_engine.sync_engine)
+    return async_engine
+
+
+# Create the async engine instance (no connections are opened until first use)
+async_engine = create_async_db_engine()
+
+
+# =============================================================================
+# Read Replica Routing
+# =============================================================================
+
+class ReplicaEndpoint:
+    """
+    A single read replica with its sync and async engines plus health state.
+
+    Health is tracked passively: connection-level errors count as failures,
+    and after DB_REPLICA_MAX_FAILURES consecutive failures the replica is
+    ejected for DB_REPLICA_EJECT_SECONDS. Once the window passes it is
+    tried again; a successful checkout resets the failure count.
+    """
+
+    def __init__(self, name: str, database_url: str):
+        self.name = name
+        self.engine = create_db_engine(database_url)
+        self.async_engine = create_async_db_engine(database_url)
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.reads_routed = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        for sync_engine in (self.engine, self.async_engine.sync_engine):
+            event.listen(sync_engine, "handle_error", self._on_error)
+            event.listen(sync_engine, "checkout", self._on_checkout)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def _on_checkout(self, dbapi_conn, connection_record, connection_proxy):
+        self.consecutive_failures = 0
+
+    def _on_error(self, context):
+        # Only connection-level failures say anything about replica health;
+        # SQL errors (constraint violations, bad queries) would fail on primary too.
+        if not (context.is_disconnect or context.connection is None):
+            return
+        self.record_failure()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.errors += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= settings.DB_REPLICA_MAX_FAILURES:
+                self.ejected_until = time.monotonic() + settings.DB_REPLICA_EJECT_SECONDS
+                self.consecutive_failures = 0
+                logger.warning(
+                    f"Database: Replica {self.name} ejected for "
+                    f"{settings.DB_REPLICA_EJECT_SECONDS}s after repeated errors"
+                )
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "reads_routed": self.reads_routed,
+            "errors": self.errors,
+            "pool": describe_pool(self.engine.pool),
+            "async_pool": describe_pool(self.async_engine.pool),
+        }
+
+
+class ReplicaRouter:
+    """
+    Chooses replicas round-robin and remembers recent writers.
+
+    Clients that wrote within DB_REPLICA_STICKY_SECONDS keep reading from
+    the primary so they always see their own writes despite replica lag.
+    """
+
+    # Upper bound on remembered writers before stale entries are pruned
+    MAX_TRACKED_WRITERS = 10000
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [
+            ReplicaEndpoint(f"replica-{i + 1}", url) for i, url in enumerate(urls)
+        ]
+        self._counter = itertools.count()
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def choose(self) -> Optional[ReplicaEndpoint]:
+        """Return the next healthy replica, or None to fall back to primary."""
+        count = len(self.replicas)
+        start = next(self._counter)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.healthy:
+                replica.reads_routed += 1
+                return replica
+        return None
+
+    def mark_write(self, client_key: Optional[str]) -> None:
+        if not client_key:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._recent_writes) >= self.MAX_TRACKED_WRITERS:
+                cutoff = now - settings.DB_REPLICA_STICKY_SECONDS
+                self._recent_writes = {
+                    key: ts for key, ts in self._recent_writes.items() if ts > cutoff
+                }
+            self._recent_writes[client_key] = now
+
+    def recently_wrote(self, client_key: Optional[str]) -> bool:
+        if not client_key:
+            return False
+        wrote_at = self._recent_writes.get(client_key)
+        return wrote_at is not None and time.monotonic() - wrote_at < settings.DB_REPLICA_STICKY_SECONDS
+
+    def status(self) -> List[dict]:
+        return [replica.status() for replica in self.replicas]
+
+
+# Router is only created when replicas are configured
+replica_router: Optional[ReplicaRouter] = (
+    ReplicaRouter(settings.DATABASE_REPLICA_URLS) if settings.DATABASE_REPLICA_URLS else None
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a replica until the first write.
+
+    Flushes, DML, SELECT ... FOR UPDATE and raw text() statements always go
+    to the primary, and once anything has gone to the primary the rest of
+    the session stays there (read-after-write within a request).
+    """
+
+    def __init__(self, *args, replica_engine=None, client_key: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_engine = replica_engine
+        self.info["client_key"] = client_key
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica_engine is not None and not self.info.get("wrote"):
+            if (
+                not self._flushing
+                and isinstance(clause, Select)
+                and clause._for_update_arg is None
+            ):
+                return self.replica_engine
+            if clause is not None or self._flushing:
+                self.info["wrote"] = True
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session):
+    if replica_router is not None and session.info.get("wrote"):
+        replica_router.mark_write(session.info.get("client_key"))
+
+
+def _client_key(request: Request) -> Optional[str]:
+    """Identify a client for read-after-write stickiness (token, else IP)."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    return request.client.host if request.client else None
+
+
+def _choose_replica(request: Request) -> Optional[ReplicaEndpoint]:
+    """Pick a replica for this request, or None if it must use the primary."""
+    if replica_router is None or request.method not in READ_ONLY_METHODS:
+        return None
+    if replica_router.recently_wrote(_client_key(request)):
+        return None
+    return replica_router.choose()
+
+
+# Sessions keep loaded attributes after commit - lazy refresh is not possible
+# under asyncio, so expiring on commit would break attribute access.
+async_session_factory = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
+
+
 def create_db_and_tables():
     """Create all database tables from SQLModel metadata."""
     SQLModel.metadata.create_all(engine)
@@ -101,42 +415,108 @@ def update_schema_for_lmi():
             logger.error(f"Database: Schema update failed: {e}")
 
 
-def get_session() -> Generator[Session, None, None]:
+def get_session(request: Request) -> Generator[Session, None, None]:
     """
     Get a database session for dependency injection.
 
+    When read replicas are configured, GET/HEAD requests read from a
+    replica; writes (and everything after them) use the primary.
+
     Usage in FastAPI endpoints:
         @app.get("/items")
         def read_items(session: Session = Depends(get_session)):
             return session.exec(select(Item)).all()
     """
-    with Session(engine) as session:
+    replica = _choose_replica(request)
+    with RoutingSession(
+        engine,
+        replica_engine=replica.engine if replica else None,
+        client_key=_client_key(request) if replica_router else None,
+    ) as session:
         yield session
 
 
-def get_pool_status() -> dict:
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
-    Get current connection pool status for monitoring.
+    Get an async database session for dependency injection.
 
-    Returns dict with:
-    - pool_size: Configured pool size
-    - checked_out: Currently active connections
-    - overflow: Connections beyond pool_size
-    - checkedin: Available connections in pool
+    Use this in `async def` endpoints so queries do not block the
+    event loop. Relationships must be eager-loaded (joinedload /
+    selectinload) since lazy loading is unavailable under asyncio.
+    Replica routing works the same as get_session().
+
+    Usage in FastAPI endpoints:
+        @app.get("/items")
+        async def read_items(session: AsyncSession = Depends(get_async_session)):
+            result = await session.exec(select(Item))
+            return result.all()
     """
-    pool = engine.pool
+    replica = _choose_replica(request)
+    async with async_session_factory(
+        replica_engine=replica.async_engine.sync_engine if replica else None,
+        client_key=_client_key(request) if replica_router else None,
+    ) as session:
+        yield session
 
-    if settings.DB_USE_NULLPOOL:
+
+async def dispose_async_engine() -> None:
+    """Close all pooled async connections (called on application shutdown)."""
+    await async_engine.dispose()
+    if replica_router is not None:
+        for replica in replica_router.replicas:
+            await replica.async_engine.dispose()
+
+
+def describe_pool(pool) -> dict:
+    """Describe a connection pool's current usage."""
+    if isinstance(pool, NullPool):
         return {
             "pool_type": "NullPool",
             "message": "No connection pooling - each request uses fresh connection"
         }
 
     return {
-        "pool_type": "QueuePool",
+        "pool_type": getattr(pool, "pool_type", type(pool).__name__),
         "pool_size": pool.size(),
         "checked_out": pool.checkedout(),
         "overflow": pool.overflow(),
         "checkedin": pool.checkedin(),
         "invalidated": pool.invalidatedcount if hasattr(pool, 'invalidatedcount') else 0,
     }
+
+
+def get_pool_status() -> dict:
+    """
+    Get current connection pool status for monitoring.
+
+    Returns dict with:
+    - pool_size: Configured pool size
+    - checked_out: Currently active connections
+    - overflow: Connections beyond pool_size
+    - checkedin: Available connections in pool
+    - async_pool: The same metrics for the asyncpg engine
+    - replicas: Per-replica health, routed reads and pool metrics (if configured)
+    """
+    status = describe_pool(engine.pool)
+    status["async_pool"] = describe_pool(async_engine.pool)
+    if replica_router is not None:
+        status["replicas"] = replica_router.status()
+    return status
+
+
+def _pool_connection_samples():
+    """db_pool_connections samples for the primary engines (taken at scrape time)."""
+    for name, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+        if isinstance(pool, NullPool):
+            continue
+        yield (name, "checked_out"), pool.checkedout()
+        yield (name, "checked_in"), pool.checkedin()
+        yield (name, "overflow"), max(pool.overflow(), 0)
+
+
+CallbackGauge(
+    "db_pool_connections",
+    "Primary database pool connections by state",
+    ["pool", "state"],
+    _pool_connection_samples,
+)
@@ -0,0 +1,210 @@
+"""
+End-to-end request deadlines.
+
+Every HTTP request gets an absolute deadline when it arrives: the client's
+X-Request-Timeout header (seconds, capped at REQUEST_DEADLINE_MAX_SECONDS),
+else the default for the route class (AI, export, labor market), else
+REQUEST_DEADLINE_SECONDS. The deadline lives in a ContextVar, so sync
+routes running in the threadpool see it too, and is spent by everything the
+request waits on:
+
+- Database: each transaction starts with SET LOCAL statement_timeout set to
+  the remaining budget (install_statement_timeout(), registered by the engine
+  factories in app.core.database)
+- HTTP: the timed httpx transports in app.core.metrics cap connect/read/
+  write/pool timeouts at the remaining budget (cap_timeouts())
+- Gemini: the AI services pass timeout_for() as the per-call timeout
+
+When the deadline passes, DeadlineMiddleware cancels the request and answers
+504 if nothing has been sent yet. Sync endpoints can't be interrupted in
+their thread; they stop at their next DB statement or outbound call.
+
+Outside a request (scripts, startup) there is no deadline and nothing is
+capped.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Request header carrying the client's own budget, in seconds
+DEADLINE_HEADER = b"x-request-timeout"
+
+# PostgreSQL SQLSTATE for a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+# Absolute time.monotonic() by which the current request must finish
+deadline_var: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised by work started after the request deadline has passed."""
+
+    def __init__(self, message: str = "Request deadline exceeded"):
+        super().__init__(message)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (None without one)."""
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def timeout_for(default: Optional[float] = None) -> Optional[float]:
+    """
+    Timeout for an operation started now: `default` shrunk to the remaining
+    budget. Raises DeadlineExceeded when the deadline has already passed.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded()
+    return left if default is None else min(default, left)
+
+
+def cap_timeouts(timeouts: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+    """Cap an httpx timeout dict (connect/read/write/pool) at the remaining budget."""
+    if deadline_var.get() is None:
+        return timeouts
+    return {phase: timeout_for(value) for phase, value in timeouts.items()}
+
+
+# =============================================================================
+# Database
+# =============================================================================
+
+def _set_statement_timeout(conn) -> None:
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise DeadlineExceeded()
+    # Through the raw DBAPI cursor, so it isn't counted as a request query
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SET LOCAL statement_timeout = {max(math.ceil(left * 1000), 1)}")
+    finally:
+        cursor.close()
+
+
+def install_statement_timeout(engine) -> None:
+    """
+    Bound every statement of a transaction begun during a request by the time
+    left on its deadline. SET LOCAL ends with the transaction, so pooled
+    connections go back without it.
+    """
+    if engine.dialect.name == "postgresql":
+        event.listen(engine, "begin", _set_statement_timeout)
+
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    """True for a DB error raised by statement_timeout (psycopg2 or asyncpg)."""
+    orig = getattr(exc, "orig", exc)
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == QUERY_CANCELED
+
+
+# =============================================================================
+# ASGI middleware
+# =============================================================================
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware that sets the request deadline and enforces it.
+
+    `route_deadlines` maps path prefixes to default budgets (longest prefix
+    wins). A request still running at its deadline is cancelled; errors
+    caused by the deadline (cancelled statements, DeadlineExceeded) become a
+    504 if the response hasn't started.
+    """
+
+    def __init__(
+        self,
+        app,
+        default_seconds: float,
+        max_seconds: float,
+        route_deadlines: Optional[Dict[str, float]] = None,
+        exclude_paths: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.default_seconds = default_seconds
+        self.max_seconds = max_seconds
+        self.route_deadlines = sorted((route_deadlines or {}).items(), key=lambda item: -len(item[0]))
+        self.exclude_paths = set(exclude_paths or ())
+
+    def budget(self, scope) -> float:
+        """Seconds allowed for this request."""
+        for name, value in scope.get("headers", ()):
+            if name == DEADLINE_HEADER:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0 and math.isfinite(requested):
+                    return min(requested, self.max_seconds)
+                break
+        path = scope.get("path", "")
+        for prefix, seconds in self.route_deadlines:
+            if path.startswith(prefix):
+                return seconds
+        return self.default_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budget(scope)
+        token = deadline_var.set(time.monotonic() + budget)
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        loop = asyncio.get_running_loop()
+        timeout = asyncio.timeout_at(loop.time() + budget)
+        try:
+            async with timeout:
+                await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            deadline_hit = (
+                timeout.expired()
+                or isinstance(exc, DeadlineExceeded)
+                or is_statement_timeout(exc)
+            )
+            if started or not deadline_hit:
+                raise
+            logger.warning(
+                f"Request deadline exceeded: {scope.get('method')} {scope.get('path')}",
+                extra={"extra_fields": {"deadline_seconds": budget, "cause": type(exc).__name__}},
+            )
+            await self._send_timeout(send, budget)
+        finally:
+            deadline_var.reset(token)
+
+    @staticmethod
+    async def _send_timeout(send, budget: float) -> None:
+        body = json.dumps({"detail": f"Request did not complete within {budget:g} seconds"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 504,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -5,24 +5,44 @@ Provides dependency injection for:
 - get_current_user: Authenticate requests and get the current user
 - require_role: Require specific user roles for endpoints
 - require_roles: Allow multiple roles for endpoints
+- verify_token: Verify a Firebase ID token without blocking the event loop
 """
 
 from typing import List, Optional, Callable
+import logging
 import uuid
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
 
+from app.core.auth_cache import token_cache, user_cache
 from app.core.database import get_session
-from app.core.firebase import verify_firebase_token
+from app.core.firebase import verifies_from_memory, verify_firebase_token
 from app.models.user import User, UserRole
 
+logger = logging.getLogger(__name__)
+
 # Security scheme for Swagger UI
 security = HTTPBearer(auto_error=False)
 
 
+async def verify_token(token: str) -> dict:
+    """
+    verify_firebase_token for async code.
+
+    A token whose signing key is cached is checked inline (a signature check,
+    no I/O). Anything else may fetch Google's certificates (key rotation) or
+    go through the Admin SDK, so it runs in the threadpool.
+    """
+    if verifies_from_memory(token):
+        return verify_firebase_token(token)
+    return await run_in_threadpool(verify_firebase_token, token)
+
+
 async def get_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     session: Session = Depends(get_session),
 ) -> User:
@@ -35,6 +55,12 @@ async def get_current_user(
     3. Looks up the user in our database by firebase_uid
     4. Returns the User object
 
+    The user is also stored on request.state.user, which the rate limiter
+    uses to key limits per user and to exempt admins.
+
+    Verified tokens and users are cached (app.core.auth_cache), so repeat
+    requests usually skip both the signature check and the user query.
+
     Usage:
         @router.get("/protected")
         async def protected_endpoint(current_user: User = Depends(get_current_user)):
@@ -56,7 +82,10 @@ async def get_current_user(
     token = credentials.credentials
 
     # Verify the token with Firebase
-    decoded_token = verify_firebase_token(token)
+    decoded_token = token_cache.get(token)
+    if decoded_token is None:
+        decoded_token = await verify_token(token)
+        token_cache.put(token, decoded_token)
     firebase_uid = decoded_token.get("uid")
 
     if not firebase_uid:
@@ -66,11 +95,19 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user = user_cache.get(session, firebase_uid)
+    if user is not None:
+        request.state.user = user
+        return user
+
     # Look up user in database
+    generation = user_cache.generation
     statement = select(User).where(User.firebase_uid == firebase_uid)
     user = session.exec(statement).first()
 
-    if not user:
+    if user:
+        user_cache.put(user, generation)
+    else:
         # Auto-provision: Create new user with default FACULTY role
         email = decoded_token.get("email")
         name = decoded_token.get("name") or (email.split("@")[0] if email else "New User")
@@ -85,12 +122,14 @@ async def get_current_user(
         session.commit()
         session.refresh(user)
 
-        print(f"Auto-provisioned new user: {email} with role FACULTY")
+        logger.info("Auto-provisioned new user %s with role FACULTY", user.id)
 
+    request.state.user = user
     return user
 
 
 async def get_current_user_optional(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     session: Session = Depends(get_session),
 ) -> Optional[User]:
@@ -103,7 +142,7 @@ async def get_current_user_optional(
         return None
 
     try:
-        return await get_current_user(credentials, session)
+        return await get_current_user(request, credentials, session)
     except HTTPException:
         return None
 
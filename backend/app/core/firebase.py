@@ -2,21 +2,46 @@
 Firebase Admin SDK Configuration
 
 Provides Firebase authentication token verification for the API.
+
+ID tokens are verified locally with python-jose against Google's public
+signing certificates (see SigningKeyCache), so a request costs one RSA
+signature check and no network call. The certificates are fetched once,
+kept for their Cache-Control max-age, and refreshed in the background
+shortly before they expire; if a refresh fails the current keys stay in
+use. FIREBASE_CERTS_URL can point at a local stand-in key server.
+
+Verification blocks while a key has to be fetched (an unknown `kid`) or the
+Admin SDK is used; async callers check verifies_from_memory() and run other
+tokens in the threadpool (see app.core.deps.verify_token).
 """
 
+import logging
 import os
-from typing import Optional
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
 
 import firebase_admin
+import httpx
 from firebase_admin import auth, credentials
 from fastapi import HTTPException, status
+from jose import jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import ExpiredSignatureError, JOSEError
 
 from app.core.config import settings
+from app.core.metrics import timed_sync_transport
 
+logger = logging.getLogger(__name__)
 
 # Initialize Firebase Admin SDK
 _firebase_app: Optional[firebase_admin.App] = None
 
+# Set once missing configuration has been reported, so unconfigured (dev)
+# setups don't re-check and re-warn on every authenticated request
+_firebase_unconfigured = False
+
 
 def initialize_firebase() -> Optional[firebase_admin.App]:
     """
@@ -24,31 +49,216 @@ def initialize_firebase() -> Optional[firebase_admin.App]:
 
     Returns None if credentials are not configured (for development without Firebase).
     """
-    global _firebase_app
+    global _firebase_app, _firebase_unconfigured
 
-    if _firebase_app is not None:
+    if _firebase_app is not None or _firebase_unconfigured:
         return _firebase_app
 
     # Check if Firebase is configured
     if not settings.FIREBASE_SERVICE_ACCOUNT_PATH:
-        print("Warning: Firebase not configured. Authentication will be disabled.")
+        logger.warning("Firebase not configured. Authentication will be disabled.")
+        _firebase_unconfigured = True
         return None
 
     # Check if service account file exists and is a file (not a directory)
     if not os.path.isfile(settings.FIREBASE_SERVICE_ACCOUNT_PATH):
-        print(f"Warning: Firebase service account file not found at {settings.FIREBASE_SERVICE_ACCOUNT_PATH}")
+        logger.warning("Firebase service account file not found at %s", settings.FIREBASE_SERVICE_ACCOUNT_PATH)
+        _firebase_unconfigured = True
         return None
 
     try:
         cred = credentials.Certificate(settings.FIREBASE_SERVICE_ACCOUNT_PATH)
         _firebase_app = firebase_admin.initialize_app(cred)
-        print("Firebase Admin SDK initialized successfully")
+        logger.info("Firebase Admin SDK initialized successfully")
         return _firebase_app
     except Exception as e:
-        print(f"Error initializing Firebase: {e}")
+        logger.error("Error initializing Firebase: %s", e)
         return None
 
 
+# Used when the certificate response has no Cache-Control max-age
+DEFAULT_KEY_MAX_AGE_SECONDS = 3600
+
+# Start a background refresh this long before the cached keys expire
+KEY_REFRESH_AHEAD_SECONDS = 300
+
+# Minimum time between fetches triggered by unknown key IDs, so tokens with
+# made-up `kid` headers can't turn into a request per token
+MIN_KEY_FETCH_INTERVAL_SECONDS = 30
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class SigningKeyCache:
+    """
+    Firebase token signing keys by key ID (`kid`).
+
+    Certificates are parsed into jose key objects once per fetch. Keys are
+    served from memory until they expire; from KEY_REFRESH_AHEAD_SECONDS
+    before expiry (and after it, should refreshing fail) requests keep using
+    the current keys while one background thread fetches new ones. Only an
+    unknown `kid`, e.g. right after Google rotates keys, waits on a fetch.
+    Fetches are at least MIN_KEY_FETCH_INTERVAL_SECONDS apart.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._keys: Dict[str, Key] = {}
+        self._expires_at = 0.0
+        self._last_attempt = float("-inf")
+        self._fetched_at = float("-inf")
+        self._fetch_lock = threading.Lock()
+        self._background_lock = threading.Lock()
+
+    def has(self, kid: str) -> bool:
+        """Whether get(kid) is answered from memory, without waiting on a fetch."""
+        return kid in self._keys
+
+    def get(self, kid: str) -> Optional[Key]:
+        now = time.monotonic()
+        can_fetch = now - self._last_attempt >= MIN_KEY_FETCH_INTERVAL_SECONDS
+        key = self._keys.get(kid)
+        if key is not None:
+            if can_fetch and now >= self._expires_at - KEY_REFRESH_AHEAD_SECONDS:
+                self._refresh_in_background()
+            return key
+
+        if can_fetch:
+            self.refresh()
+        return self._keys.get(kid)
+
+    def refresh(self) -> None:
+        """Fetch the certificates now (serialized; concurrent callers share one fetch)."""
+        started = time.monotonic()
+        with self._fetch_lock:
+            if self._fetched_at >= started:
+                return
+            self._last_attempt = time.monotonic()
+            with httpx.Client(timeout=self.timeout, transport=timed_sync_transport("firebase-certs")) as client:
+                response = client.get(self.url)
+                response.raise_for_status()
+
+            keys = {kid: jwk.construct(cert, "RS256") for kid, cert in response.json().items()}
+            match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+            max_age = int(match.group(1)) if match else DEFAULT_KEY_MAX_AGE_SECONDS
+
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self._expires_at = self._fetched_at + max_age
+            logger.debug("Fetched %d Firebase signing keys (max-age %ds)", len(keys), max_age)
+
+    def _refresh_in_background(self) -> None:
+        if not self._background_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._background_refresh, name="firebase-key-refresh", daemon=True).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Refreshing Firebase signing keys failed; keeping cached keys: %s", e)
+        finally:
+            self._background_lock.release()
+
+    def clear(self) -> None:
+        self._keys = {}
+        self._expires_at = 0.0
+        self._last_attempt = float("-inf")
+        self._fetched_at = float("-inf")
+
+
+signing_keys = SigningKeyCache(settings.FIREBASE_CERTS_URL)
+
+
+def _project_id() -> Optional[str]:
+    if settings.FIREBASE_PROJECT_ID:
+        return settings.FIREBASE_PROJECT_ID
+    return _firebase_app.project_id if _firebase_app is not None else None
+
+
+def warm_signing_keys() -> None:
+    """Fetch the signing keys ahead of the first authenticated request."""
+    if _firebase_app is None:
+        initialize_firebase()
+    if _firebase_app is None or _project_id() is None:
+        return
+    try:
+        signing_keys.refresh()
+    except Exception as e:
+        logger.warning("Could not prefetch Firebase signing keys: %s", e)
+
+
+def verifies_from_memory(id_token: str) -> bool:
+    """
+    Whether verify_firebase_token can check this token without network I/O:
+    local verification is configured and the token's signing key is cached.
+    """
+    if _firebase_app is None or _project_id() is None:
+        return False
+    try:
+        kid = jwt.get_unverified_header(id_token).get("kid", "")
+    except JOSEError:
+        return False
+    return signing_keys.has(kid)
+
+
+def verify_id_token_locally(id_token: str, project_id: str) -> Dict[str, Any]:
+    """
+    Verify a Firebase ID token's signature and claims without the Admin SDK.
+
+    Applies the checks Firebase documents for ID tokens: RS256 signed with a
+    current Google key, audience is the project, issuer is
+    securetoken.google.com/<project>, unexpired, and a non-empty subject.
+    Errors are raised as the Admin SDK's exception types so callers handle
+    both paths alike. Like auth.verify_id_token (without check_revoked),
+    revocation is not checked.
+
+    Returns:
+        The decoded claims, with `uid` set from `sub`
+    """
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except JOSEError as e:
+        raise auth.InvalidIdTokenError(f"Malformed ID token: {e}", cause=e)
+    if header.get("alg") != "RS256":
+        raise auth.InvalidIdTokenError(f"ID token has incorrect algorithm: {header.get('alg')}")
+
+    try:
+        key = signing_keys.get(header.get("kid", ""))
+    except Exception as e:
+        raise auth.CertificateFetchError(f"Failed to fetch Firebase signing keys: {e}", e)
+    if key is None:
+        raise auth.InvalidIdTokenError("ID token has no matching signing key")
+
+    try:
+        claims = jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=project_id,
+            issuer=f"https://securetoken.google.com/{project_id}",
+            options={"verify_at_hash": False},
+        )
+    except ExpiredSignatureError as e:
+        raise auth.ExpiredIdTokenError("Token expired", e)
+    except JOSEError as e:
+        raise auth.InvalidIdTokenError(f"Invalid ID token: {e}", cause=e)
+
+    subject = claims.get("sub")
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise auth.InvalidIdTokenError("ID token has an invalid subject")
+    claims["uid"] = subject
+    return claims
+
+
+def _verify_id_token(id_token: str) -> dict:
+    project_id = _project_id()
+    if project_id is None:
+        return auth.verify_id_token(id_token)
+    return verify_id_token_locally(id_token, project_id)
+
+
 def verify_firebase_token(id_token: str) -> dict:
     """
     Verify a Firebase ID token and return the decoded claims.
@@ -82,21 +292,21 @@ def verify_firebase_token(id_token: str) -> dict:
                 initialize_firebase()
 
             if _firebase_app is not None:
-                decoded_token = auth.verify_id_token(id_token)
+                decoded_token = _verify_id_token(id_token)
                 email = decoded_token.get("email", "").lower()
 
                 # Only allow users with "demo" in their email for demo mode
                 if "demo" in email:
-                    print(f"[DEMO MODE] Access granted to demo user: {email}")
+                    logger.debug("[DEMO MODE] Access granted to demo user")
                     return decoded_token
                 else:
-                    print(f"[DEMO MODE] Access denied for non-demo user: {email}")
+                    logger.info("[DEMO MODE] Access denied for non-demo user")
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
                         detail="Demo mode only allows access to users with 'demo' in their email address",
                     )
         except Exception as e:
-            print(f"[DEMO MODE] Auth error: {e}")
+            logger.info("[DEMO MODE] Auth error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Demo mode authentication failed",
@@ -137,33 +347,32 @@ def verify_firebase_token(id_token: str) -> dict:
 
     try:
         # Verify the token
-        print(f"[AUTH] Verifying token (first 20 chars): {id_token[:20]}...")
-        decoded_token = auth.verify_id_token(id_token)
-        print(f"[AUTH] Token verified successfully for uid: {decoded_token.get('uid')}, email: {decoded_token.get('email')}")
+        decoded_token = _verify_id_token(id_token)
+        logger.debug("[AUTH] Token verified for uid: %s", decoded_token.get("uid"))
         return decoded_token
     except auth.InvalidIdTokenError as e:
-        print(f"[AUTH] Invalid token error: {e}")
+        logger.info("[AUTH] Invalid token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except auth.ExpiredIdTokenError as e:
-        print(f"[AUTH] Expired token error: {e}")
+        logger.info("[AUTH] Expired token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except auth.RevokedIdTokenError as e:
-        print(f"[AUTH] Revoked token error: {e}")
+        logger.warning("[AUTH] Revoked token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except Exception as e:
-        print(f"[AUTH] Unexpected auth error: {type(e).__name__}: {e}")
+        logger.warning("[AUTH] Unexpected auth error: %s: %s", type(e).__name__, e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Authentication error: {str(e)}",
@@ -222,5 +431,5 @@ def create_firebase_user(email: str, password: str, display_name: str = None) ->
         )
         return user
     except Exception as e:
-        print(f"Error creating Firebase user: {e}")
+        logger.error("Error creating Firebase user: %s", e)
         return None
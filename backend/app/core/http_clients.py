@@ -0,0 +1,162 @@
+"""
+Process-wide pooled HTTP clients for external data services.
+
+BLS, QCEW and CKAN (California LMI) calls share one long-lived
+httpx.AsyncClient per service instead of opening a client, and a fresh
+TCP+TLS connection, per request. Each client keeps up to
+HTTP_CLIENT_MAX_KEEPALIVE idle connections for HTTP_CLIENT_KEEPALIVE_SECONDS,
+can speak HTTP/2 (HTTP_CLIENT_HTTP2, needs the `h2` package), and is limited
+to HTTP_CLIENT_MAX_CONCURRENCY_PER_HOST requests in flight per upstream host
+across all services. A request that can't get a slot within the pool
+timeout (or its deadline) fails with httpx.PoolTimeout.
+
+Clients are opened in the app lifespan and closed on shutdown. Route code
+gets a service client through a dependency:
+
+    @router.get("/oes")
+    async def get_oes(client: BLSClient = Depends(get_bls_client)):
+        ...
+
+Outside the lifespan (scripts, tests) clients are created on first use.
+Connections belong to the event loop that opened them, so a client first
+used on another loop is replaced rather than shared.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Iterable, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.deadlines import cap_timeouts
+from app.core.metrics import timed_transport
+
+logger = logging.getLogger(__name__)
+
+# Services with a pooled client (the metrics service label of each)
+SERVICES = ("bls", "qcew", "ckan")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that frees its host slot once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Caps requests in flight per host; a slot is held until the body is closed."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, host_slots: Callable[[str], asyncio.Semaphore]):
+        self._transport = transport
+        self._host_slots = host_slots
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slots = self._host_slots(request.url.host)
+        pool_timeout = cap_timeouts(request.extensions.get("timeout", {})).get("pool")
+        try:
+            await asyncio.wait_for(slots.acquire(), pool_timeout)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"No free connection slot for {request.url.host}", request=request)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slots.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slots.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HTTPClientPool:
+    """One shared httpx.AsyncClient per service, bound to the running event loop."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http2 = settings.HTTP_CLIENT_HTTP2 and _http2_available()
+        if settings.HTTP_CLIENT_HTTP2 and not self._http2:
+            logger.warning("HTTP_CLIENT_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+
+    def _slots(self, host: str) -> asyncio.Semaphore:
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(settings.HTTP_CLIENT_MAX_CONCURRENCY_PER_HOST)
+        return slots
+
+    def _create(self, service: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+        )
+        transport = timed_transport(service, limits=limits, http2=self._http2)
+        return httpx.AsyncClient(
+            timeout=settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+            transport=_HostLimitedTransport(transport, self._slots),
+        )
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        """The shared client for `service`, created on first use."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections and slots from another (possibly closed) loop can't be reused
+            self._clients.clear()
+            self._host_slots.clear()
+            self._loop = loop
+        client = self._clients.get(service)
+        if client is None:
+            client = self._clients[service] = self._create(service)
+        return client
+
+    async def start(self, services: Iterable[str] = SERVICES) -> None:
+        """Open the clients up front (app startup)."""
+        services = tuple(services)
+        for service in services:
+            self.get(service)
+        logger.info(
+            "HTTP client pool ready",
+            extra={"extra_fields": {
+                "services": list(services),
+                "max_connections": settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                "http2": self._http2,
+            }},
+        )
+
+    async def aclose(self) -> None:
+        """Close every client opened on the running loop (app shutdown)."""
+        clients, self._clients = self._clients, {}
+        owned = self._loop is asyncio.get_running_loop()
+        self._host_slots.clear()
+        self._loop = None
+        if owned:
+            for client in clients.values():
+                await client.aclose()
+
+
+http_clients = HTTPClientPool()
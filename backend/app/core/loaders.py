@@ -0,0 +1,115 @@
+"""
+Request-scoped batch loaders.
+
+Replaces per-row lookups such as
+
+    for pc in program_courses:
+        course = session.get(Course, pc.course_id)   # one query per row
+
+with one `IN (...)` query per batch:
+
+    courses = loader_for(session, Course.id).load_many(pc.course_id for pc in program_courses)
+
+Loaders live in `session.info`, so they share the lifetime of the request's
+session and memoize every key they have resolved. Keys can be queued with
+prime() and are fetched together on the first get()/load_many().
+
+Usage:
+    # One row per key (primary key or unique column)
+    course = loader_for(session, Course.id).get(course_id)
+
+    # Many rows per key (child collections), ordered within each key
+    slos_by_course = loader_for(
+        session, StudentLearningOutcome.course_id, many=True,
+        order_by=StudentLearningOutcome.sequence,
+    ).load_many(course_ids)
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlmodel import Session, select
+
+from app.core.metrics import record_cache
+
+# Keys per IN (...) query; larger batches are split
+MAX_BATCH_SIZE = 1000
+
+
+class BatchLoader:
+    """Batches and memoizes lookups of one model by one column."""
+
+    def __init__(self, session: Session, column: Any, many: bool = False, order_by: Any = None):
+        self.session = session
+        self.column = column
+        self.model = column.class_
+        self.attr = column.key
+        self.many = many
+        self.order_by = order_by
+        self._cache: Dict[Any, Any] = {}
+        self._pending: Set[Any] = set()
+
+    def prime(self, keys: Iterable[Any]) -> "BatchLoader":
+        """Queue keys to be fetched with the next batch."""
+        for key in keys:
+            if key is not None and key not in self._cache:
+                self._pending.add(key)
+        return self
+
+    def _dispatch(self) -> None:
+        """Fetch all queued keys, one query per MAX_BATCH_SIZE keys."""
+        keys = list(self._pending)
+        self._pending.clear()
+        for start in range(0, len(keys), MAX_BATCH_SIZE):
+            chunk = keys[start:start + MAX_BATCH_SIZE]
+            query = select(self.model).where(self.column.in_(chunk))
+            if self.order_by is not None:
+                query = query.order_by(self.order_by)
+            rows = self.session.exec(query).all()
+
+            for key in chunk:
+                self._cache[key] = [] if self.many else None
+            for row in rows:
+                key = getattr(row, self.attr)
+                if self.many:
+                    self._cache[key].append(row)
+                else:
+                    self._cache[key] = row
+
+    def load_many(self, keys: Iterable[Any]) -> Dict[Any, Any]:
+        """
+        Resolve keys, querying only for those not seen before.
+
+        Returns:
+            Dict of key -> row (or None), or key -> list of rows when many=True.
+            None keys are skipped.
+        """
+        keys = [key for key in keys if key is not None]
+        self.prime(keys)
+        misses = len(self._pending)
+        if self._pending:
+            self._dispatch()
+        record_cache("batch_loader", hits=max(len(keys) - misses, 0), misses=misses)
+        return {key: self._cache[key] for key in keys}
+
+    def get(self, key: Any) -> Any:
+        """Resolve a single key (flushing any primed keys in the same query)."""
+        if key is None:
+            return [] if self.many else None
+        return self.load_many([key])[key]
+
+    def clear(self, key: Optional[Any] = None) -> None:
+        """Forget one memoized key, or all of them."""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+
+def loader_for(session: Session, column: Any, many: bool = False, order_by: Any = None) -> BatchLoader:
+    """Get (or create) the session's loader for `column`."""
+    loaders: Dict[tuple, BatchLoader] = session.info.setdefault("batch_loaders", {})
+    cache_key = (column.class_, column.key, many, str(order_by) if order_by is not None else None)
+    loader = loaders.get(cache_key)
+    if loader is None:
+        loader = loaders[cache_key] = BatchLoader(session, column, many=many, order_by=order_by)
+    return loader
@@ -7,20 +7,25 @@ Provides:
 - Request ID tracking for distributed tracing
 - Request/response timing
 - Error logging with stack traces
+- Non-blocking output: records are queued and formatted/written by a
+  background listener thread, so request handlers never wait on stdout
 """
 
+import atexit
+import copy
 import json
 import logging
+import queue
+import random
 import sys
 import time
 import uuid
 from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Sequence
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from app.core.metrics import Counter
 
 # Context variable for request ID - allows access across async tasks
 request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
@@ -31,6 +36,16 @@ def get_request_id() -> Optional[str]:
     return request_id_var.get()
 
 
+def _record_request_id(record: logging.LogRecord) -> Optional[str]:
+    """
+    Request ID for a record.
+
+    Records formatted on the listener thread carry the ID captured when they
+    were queued; the context variable is only meaningful on the logging thread.
+    """
+    return getattr(record, "request_id", None) or get_request_id()
+
+
 class JSONFormatter(logging.Formatter):
     """
     Custom JSON formatter for structured logging.
@@ -39,14 +54,14 @@ class JSONFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
         # Add request ID if available
-        request_id = get_request_id()
+        request_id = _record_request_id(record)
         if request_id:
             log_data["request_id"] = request_id
 
@@ -90,10 +105,10 @@ class DevelopmentFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         color = self.COLORS.get(record.levelname, self.RESET)
-        request_id = get_request_id()
+        request_id = _record_request_id(record)
         rid_str = f"[{request_id[:8]}] " if request_id else ""
 
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = datetime.utcfromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
 
         message = f"{color}{timestamp} {record.levelname:8}{self.RESET} {rid_str}{record.getMessage()}"
 
@@ -139,35 +154,166 @@ class StructuredLogger(logging.Logger):
         self._log_with_extra(logging.WARNING, msg, (), **kwargs)
 
 
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records discarded before being written",
+    ["reason"],
+)
+
+# Records below WARNING are dropped once the queue is this full, leaving the
+# remaining capacity for warnings and errors
+QUEUE_HIGH_WATER = 0.8
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the thread doing the logging.
+
+    Records are queued unformatted; a QueueListener thread formats them and
+    writes them out. Policy, applied on enqueue:
+    - DEBUG records are kept with probability debug_sample_rate
+    - Records below WARNING are dropped once the queue passes the high-water
+      mark (backpressure)
+    - Anything that does not fit in the full queue is dropped
+
+    Drops are counted in log_records_dropped_total{reason}. After an overflow,
+    a single warning with the number of lost records is queued as soon as
+    there is room again.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        debug_sample_rate: float = 1.0,
+        high_water: float = QUEUE_HIGH_WATER,
+    ):
+        super().__init__(log_queue)
+        self.debug_sample_rate = debug_sample_rate
+        self.high_water_mark = int(log_queue.maxsize * high_water) if log_queue.maxsize > 0 else 0
+        # Guarded by the handler lock (Handler.handle holds it around emit)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Make a record safe to format on another thread.
+
+        The message is interpolated now (arguments may be mutated after the
+        call returns) and the request ID is copied off the context variable.
+        JSON formatting, tracebacks and the write happen on the listener.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if getattr(record, "request_id", None) is None:
+            record.request_id = get_request_id()
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno < logging.WARNING:
+            if record.levelno <= logging.DEBUG and random.random() >= self.debug_sample_rate:
+                LOG_RECORDS_DROPPED.labels("sampled").inc()
+                return
+            if self.high_water_mark and self.queue.qsize() >= self.high_water_mark:
+                self._drop("backpressure")
+                return
+
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self._drop("queue_full")
+            return
+        except Exception:
+            self.handleError(record)
+            return
+
+        if self.dropped:
+            self._report_drops()
+
+    def _drop(self, reason: str) -> None:
+        self.dropped += 1
+        LOG_RECORDS_DROPPED.labels(reason).inc()
+
+    def _report_drops(self) -> None:
+        notice = logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Log queue overflow: dropped {self.dropped} records",
+            "extra_fields": {"dropped_records": self.dropped},
+        })
+        try:
+            self.queue.put_nowait(notice)
+        except queue.Full:
+            return
+        self.dropped = 0
+
+
+class _BlockingStopListener(QueueListener):
+    """QueueListener whose stop() waits for room instead of failing on a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[QueueListener] = None
+
+
+def shutdown_logging() -> None:
+    """
+    Stop the background listener, writing out everything still queued.
+
+    Registered to run at interpreter exit (after the ASGI lifespan has shut
+    down); safe to call more than once.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 def configure_logging(
     log_level: str = "INFO",
     json_format: bool = True,
     service_name: str = "calricula-api",
+    queue_size: int = 10000,
+    debug_sample_rate: float = 1.0,
+    capture_loggers: Sequence[str] = ("app",),
 ) -> logging.Logger:
     """
     Configure application logging.
 
+    Log calls only enqueue records; a listener thread formats them and writes
+    them to stdout (see BoundedQueueHandler for the drop policy).
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         json_format: If True, output JSON logs. If False, use human-readable format.
         service_name: Name of the service for log identification
+        queue_size: Capacity of the log queue. 0 writes synchronously on the
+            calling thread (no listener).
+        debug_sample_rate: Fraction of DEBUG records kept (1.0 keeps all)
+        capture_loggers: Other logger namespaces routed through the same
+            pipeline, e.g. the module loggers under app.*
 
     Returns:
         Configured logger instance
     """
+    global _listener
+
     # Set the custom logger class
     logging.setLoggerClass(StructuredLogger)
+    level = getattr(logging, log_level.upper(), logging.INFO)
 
-    # Get or create the main logger
-    logger = logging.getLogger(service_name)
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-
-    # Remove existing handlers
-    logger.handlers.clear()
+    # Replace any pipeline from a previous call, flushing what it still holds
+    shutdown_logging()
 
     # Create handler for stdout (Docker-friendly)
     handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    handler.setLevel(level)
 
     # Set formatter based on environment
     if json_format:
@@ -176,106 +322,136 @@ def configure_logging(
         formatter = DevelopmentFormatter()
 
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
-    # Prevent propagation to root logger
-    logger.propagate = False
+    if queue_size > 0:
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        _listener = _BlockingStopListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        entry_handler: logging.Handler = BoundedQueueHandler(log_queue, debug_sample_rate=debug_sample_rate)
+    else:
+        entry_handler = handler
+
+    # Get or create the main logger
+    logger = logging.getLogger(service_name)
+    for name in (service_name, *capture_loggers):
+        target = logging.getLogger(name)
+        target.setLevel(level)
+
+        # Remove existing handlers
+        target.handlers.clear()
+        target.addHandler(entry_handler)
+
+        # Prevent propagation to root logger
+        target.propagate = False
 
     return logger
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+# Incoming X-Request-ID values longer than this are replaced with a fresh ID
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestLoggingMiddleware:
     """
-    Middleware for logging HTTP requests and responses.
+    Pure ASGI middleware for request IDs and one structured log line per request.
 
     Features:
-    - Assigns unique request ID to each request
-    - Logs request method, path, and timing
-    - Logs response status code and duration
-    - Captures errors with stack traces
+    - Assigns each request an ID (or reuses a caller's X-Request-ID), makes it
+      available through request_id_var for every log line emitted while the
+      request is handled, and returns it in the X-Request-ID response header
+    - Logs method, route template, status, duration, time to first byte,
+      response bytes and the request's DB query count/time (from
+      QueryStatsMiddleware, when enabled)
+    - Captures unhandled errors with stack traces
+
+    Response messages are passed straight through rather than buffered, so
+    StreamingResponse exports stream as before; their duration covers the
+    whole body.
     """
 
     def __init__(self, app, logger: logging.Logger, exclude_paths: Optional[list] = None):
-        super().__init__(app)
+        self.app = app
         self.logger = logger
-        self.exclude_paths = exclude_paths or ["/health", "/health/db", "/health/pool", "/docs", "/redoc", "/openapi.json"]
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Skip logging for excluded paths
-        if request.url.path in self.exclude_paths:
-            return await call_next(request)
-
-        # Generate and set request ID
-        request_id = str(uuid.uuid4())
-        request_id_var.set(request_id)
-
-        # Record start time
+        self.exclude_paths = set(exclude_paths or ["/health", "/health/db", "/health/pool", "/docs", "/redoc", "/openapi.json"])
+
+    @staticmethod
+    def _incoming_request_id(scope) -> Optional[str]:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1").strip()
+                if 0 < len(request_id) <= MAX_REQUEST_ID_LENGTH and request_id.isprintable():
+                    return request_id
+                return None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._incoming_request_id(scope) or str(uuid.uuid4())
+        token = request_id_var.set(request_id)
         start_time = time.perf_counter()
+        status_code = 500
+        first_byte_ms: Optional[float] = None
+        response_bytes = 0
+
+        async def send_with_logging(message):
+            nonlocal status_code, first_byte_ms, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                first_byte_ms = (time.perf_counter() - start_time) * 1000
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
 
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
-
-        # Log request
-        self.logger.info(
-            f"Request started: {request.method} {request.url.path}",
-        )
-
-        # Process request
         try:
-            response = await call_next(request)
-
-            # Calculate duration
-            duration_ms = (time.perf_counter() - start_time) * 1000
-
-            # Log response
-            log_data = {
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": round(duration_ms, 2),
-                "client_ip": client_ip,
-                "request_id": request_id,
-            }
-
-            # Add query params if present
-            if request.query_params:
-                log_data["query_params"] = dict(request.query_params)
-
-            # Log at appropriate level based on status code
-            if response.status_code >= 500:
-                self.logger.error(
-                    f"Request completed: {request.method} {request.url.path} - {response.status_code} ({duration_ms:.2f}ms)"
-                )
-            elif response.status_code >= 400:
-                self.logger.warning(
-                    f"Request completed: {request.method} {request.url.path} - {response.status_code} ({duration_ms:.2f}ms)"
-                )
-            else:
-                self.logger.info(
-                    f"Request completed: {request.method} {request.url.path} - {response.status_code} ({duration_ms:.2f}ms)"
-                )
-
-            # Add request ID to response headers for tracing
-            response.headers["X-Request-ID"] = request_id
-
-            return response
-
+            await self.app(scope, receive, send_with_logging)
         except Exception as e:
-            # Calculate duration even on error
             duration_ms = (time.perf_counter() - start_time) * 1000
-
-            # Log error with stack trace
             self.logger.error(
-                f"Request failed: {request.method} {request.url.path} - {type(e).__name__}: {str(e)} ({duration_ms:.2f}ms)",
+                f"Request failed: {scope['method']} {scope['path']} - {type(e).__name__}: {str(e)} ({duration_ms:.2f}ms)",
                 exc_info=True,
+                extra={"extra_fields": self._fields(scope, status_code, duration_ms, first_byte_ms, response_bytes, request_id)},
             )
-
-            # Re-raise to let FastAPI handle the error response
             raise
-
+        else:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            if status_code >= 500:
+                level = logging.ERROR
+            elif status_code >= 400:
+                level = logging.WARNING
+            else:
+                level = logging.INFO
+            self.logger.log(
+                level,
+                f"Request completed: {scope['method']} {scope['path']} - {status_code} ({duration_ms:.2f}ms)",
+                extra={"extra_fields": self._fields(scope, status_code, duration_ms, first_byte_ms, response_bytes, request_id)},
+            )
         finally:
-            # Clean up context
-            request_id_var.set(None)
+            request_id_var.reset(token)
+
+    @staticmethod
+    def _fields(scope, status_code, duration_ms, first_byte_ms, response_bytes, request_id) -> Dict[str, Any]:
+        route = scope.get("route")
+        client = scope.get("client")
+        fields: Dict[str, Any] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "ttfb_ms": round(first_byte_ms, 2) if first_byte_ms is not None else None,
+            "response_bytes": response_bytes,
+            "client_ip": client[0] if client else "unknown",
+            "request_id": request_id,
+        }
+        # Set by QueryStatsMiddleware (app.core.query_stats)
+        stats = scope.get("query_stats")
+        if stats is not None:
+            fields.update(stats.summary())
+        return fields
 
 
 def get_logger(name: str = "calricula-api") -> logging.Logger:
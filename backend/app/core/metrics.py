@@ -0,0 +1,459 @@
+"""
+Application metrics in Prometheus text format.
+
+Exposed at GET /metrics (METRICS_ENABLED). Recorded series:
+- http_request_duration_seconds{method,route,status}: latency per route template
+- http_requests_in_flight: requests currently being handled
+- db_pool_checkout_wait_seconds{pool}: time spent waiting for a pooled connection
+- db_pool_connections{pool,state}: pool snapshot taken at scrape time
+- external_request_duration_seconds{service,outcome}: BLS, QCEW, CKAN, eLumen, Gemini
+- cache_requests_total{cache,result}: hits and misses per cache
+
+Feature modules register their own series on the same registry, e.g.
+bulkhead_* (app.core.bulkheads), rate_limit_rejections_total
+(app.core.rate_limiter) and log_records_dropped_total (app.core.logging).
+
+Recording is lock-free: every thread increments its own value array
+(see _Shards), and scrapes sum the arrays plus the totals of threads that
+have exited. Children for a label set are
+created once and cached, so the hot path is a dict lookup on a tuple of
+label values plus a few float additions; callers on very hot paths can
+bind a child up front with .labels(...) and reuse it.
+
+Usage:
+    REQUESTS = Counter("widgets_total", "Widgets processed", ["kind"])
+    REQUESTS.labels("blue").inc()
+
+    with track_external_call("gemini"):
+        response = client.models.generate_content(...)
+
+    client = httpx.AsyncClient(transport=timed_transport("bls"))
+"""
+
+import math
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.core.deadlines import cap_timeouts
+
+# Default latency buckets (seconds)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _ThreadValues:
+    """A thread's value array; when the thread exits, its finalizer folds it into the base."""
+
+    __slots__ = ("values", "__weakref__")
+
+    def __init__(self, values: List[float]):
+        self.values = values
+
+
+class _Shards:
+    """
+    Per-thread value arrays.
+
+    Each thread only ever writes its own array, so increments need no lock;
+    totals() sums the live arrays for a scrape (a read may miss an increment
+    that is in flight, which is fine for monotonically increasing metrics).
+    Worker threads come and go, so when a thread exits its values are added
+    to a base total and its array is dropped; the lock only guards that
+    bookkeeping, never an increment.
+    """
+
+    __slots__ = ("_size", "_local", "_arrays", "_base", "_lock")
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._arrays: List[List[float]] = []
+        self._base = [0.0] * size
+        self._lock = threading.Lock()
+
+    def local(self) -> List[float]:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            values = [0.0] * self._size
+            holder = self._local.holder = _ThreadValues(values)
+            with self._lock:
+                self._arrays.append(values)
+            # Runs when the thread's locals are cleared at thread exit
+            weakref.finalize(holder, self._retire, values).atexit = False
+        return holder.values
+
+    def _retire(self, values: List[float]) -> None:
+        with self._lock:
+            for i, value in enumerate(values):
+                self._base[i] += value
+            self._arrays = [array for array in self._arrays if array is not values]
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            totals = list(self._base)
+            arrays = list(self._arrays)
+        for values in arrays:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+# =============================================================================
+# Metric types
+# =============================================================================
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.local()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shards.local()[0] -= amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_shards")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One slot per bucket, one for +Inf, one for the sum
+        self._shards = _Shards(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.local()
+        values[bisect_left(self._bounds, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(cumulative bucket counts, count, sum)"""
+        totals = self._shards.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _Metric(ABC):
+    """A metric family: one child per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    @abstractmethod
+    def _new_child(self):
+        """A child recording the values for one label set."""
+
+    def labels(self, *values: str):
+        """Child for these label values (created on first use, then cached)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """(sample name, labels, value) for every sample to expose."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, tuple(zip(self.labelnames, values)), child.value
+
+
+class Gauge(Counter):
+    """Value that goes up and down (inc/dec)."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are produced by a function at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames, callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]], registry=None):
+        self.callback = callback
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        raise TypeError(f"{self.name} is computed by its callback and cannot be recorded to")
+
+    def samples(self):
+        for values, value in self.callback():
+            yield self.name, tuple(zip(self.labelnames, values)), value
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = REQUEST_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            labels = tuple(zip(self.labelnames, values))
+            cumulative, count, total = child.snapshot()
+            for bound, bucket_count in zip((*self.buckets, math.inf), cumulative):
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), bucket_count
+            yield f"{self.name}_count", labels, count
+            yield f"{self.name}_sum", labels, total
+
+
+# =============================================================================
+# Registry and exposition
+# =============================================================================
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                    lines.append(f"{name}{{{label_str}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# =============================================================================
+# Application metrics
+# =============================================================================
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_request_duration_seconds",
+    "Latency of calls to external services",
+    ["service", "outcome"],
+    buckets=EXTERNAL_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result", ["cache", "result"])
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    """Count cache hits and misses for `cache`."""
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+@contextmanager
+def track_external_call(service: str) -> Iterator[None]:
+    """Time a call to an external service; exceptions are recorded as outcome="error"."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, outcome).observe(time.perf_counter() - start)
+
+
+def _outcome(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class _TimedAsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, service: str, **kwargs):
+        super().__init__(**kwargs)
+        self.service = service
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["timeout"] = cap_timeouts(request.extensions.get("timeout", {}))
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await super().handle_async_request(request)
+            outcome = _outcome(response.status_code)
+            return response
+        finally:
+            EXTERNAL_CALL_DURATION.labels(self.service, outcome).observe(time.perf_counter() - start)
+
+
+class _TimedTransport(httpx.HTTPTransport):
+    def __init__(self, service: str, **kwargs):
+        super().__init__(**kwargs)
+        self.service = service
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["timeout"] = cap_timeouts(request.extensions.get("timeout", {}))
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = super().handle_request(request)
+            outcome = _outcome(response.status_code)
+            return response
+        finally:
+            EXTERNAL_CALL_DURATION.labels(self.service, outcome).observe(time.perf_counter() - start)
+
+
+def timed_transport(service: str, **kwargs) -> httpx.AsyncHTTPTransport:
+    """
+    httpx async transport that records external_request_duration_seconds.
+
+    Latency is measured to the response headers; outcome is the status
+    class ("2xx", "5xx", ...) or "error" for connection failures/timeouts.
+    During a request, timeouts are capped at the time left on its deadline
+    (app.core.deadlines); past the deadline the call raises DeadlineExceeded
+    without being sent.
+    Extra kwargs (limits, http2, retries) go to httpx.AsyncHTTPTransport.
+    """
+    return _TimedAsyncTransport(service, **kwargs)
+
+
+def timed_sync_transport(service: str, **kwargs) -> httpx.HTTPTransport:
+    """Synchronous counterpart of timed_transport()."""
+    return _TimedTransport(service, **kwargs)
+
+
+# =============================================================================
+# ASGI middleware
+# =============================================================================
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency and in-flight requests.
+
+    Latency covers the whole response, including streamed bodies. Requests
+    that match no route are recorded under route="unmatched" so unknown
+    paths cannot grow the label set.
+    """
+
+    def __init__(self, app, exclude_paths: Optional[List[str]] = None):
+        self.app = app
+        self.exclude_paths = set(exclude_paths or [])
+        self._in_flight = REQUESTS_IN_FLIGHT.labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        self._in_flight.inc()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.labels(scope["method"], route_path, str(status_code)).observe(
+                time.perf_counter() - start
+            )
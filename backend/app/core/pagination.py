@@ -0,0 +1,165 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+OFFSET pagination gets slower the deeper a client pages, because the database
+still has to walk and discard every skipped row. Keyset pagination instead
+remembers the sort key of the last row returned and asks for rows "after" it,
+which an index on (sort column, id) answers directly at any depth.
+
+Provides:
+- encode_cursor / decode_cursor: opaque cursors over (sort timestamp, id)
+- apply_keyset: order a query newest-first and seek past a cursor
+- split_page: trim the look-ahead row and build the next cursor
+- CountMode / count_statement / parse_count: exact, estimated or skipped totals
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import CompileError
+from sqlalchemy.sql import Select
+
+
+class CountMode(str, Enum):
+    """How list endpoints compute the `total` field."""
+    EXACT = "exact"        # SELECT count(*) with the same filters
+    ESTIMATE = "estimate"  # Planner estimate (pg_class.reltuples / EXPLAIN rows)
+    NONE = "none"          # Skip counting entirely; total is null
+
+
+# =============================================================================
+# Cursors
+# =============================================================================
+
+def encode_cursor(sort_value: datetime, row_id: uuid.UUID) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = json.dumps({"t": sort_value.isoformat(), "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def apply_keyset(
+    query: Select,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+) -> Select:
+    """
+    Order a query by (sort_column DESC, id DESC) and select one page.
+
+    With a cursor, rows strictly after the cursor position are selected and
+    `page` is ignored; without one, the classic OFFSET for `page` is used so
+    existing page-number clients keep working. One extra row is fetched so
+    split_page can tell whether another page exists.
+    """
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    else:
+        query = query.offset((page - 1) * limit)
+    return query.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, sort_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Drop the look-ahead row fetched by apply_keyset.
+
+    Returns:
+        (rows for this page, cursor for the next page or None on the last page)
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
+
+
+# =============================================================================
+# Totals
+# =============================================================================
+
+def count_statement(
+    count_mode: CountMode,
+    count_query: Select,
+    row_query: Select,
+    table_name: str,
+) -> Optional[Any]:
+    """
+    Build the statement that produces `total` for the requested count mode.
+
+    - EXACT: the filtered count query itself
+    - ESTIMATE: pg_class.reltuples when the list is unfiltered, otherwise the
+      planner's row estimate for the filtered query (EXPLAIN, not executed)
+    - NONE: None; callers report total as null
+
+    Run the result with `session.scalar()` and pass it to parse_count.
+    """
+    if count_mode == CountMode.NONE:
+        return None
+    if count_mode == CountMode.EXACT:
+        return count_query
+
+    if row_query.whereclause is None:
+        return (
+            text("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:table_name)")
+            .bindparams(table_name=table_name)
+        )
+
+    # EXPLAIN cannot take bind parameters, so render the filters as literals.
+    # Only the row estimate is read back; the query itself never runs.
+    try:
+        compiled = row_query.order_by(None).limit(None).offset(None).compile(
+            dialect=postgresql.dialect(paramstyle="named"),
+            compile_kwargs={"literal_binds": True},
+        )
+    except CompileError:
+        # A filter value with no literal renderer; fall back to counting
+        return count_query
+    return text("EXPLAIN (FORMAT JSON) " + str(compiled).replace(":", "\\:"))
+
+
+def parse_count(value: Any) -> int:
+    """Normalize the scalar returned by a count_statement into an int."""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return max(int(value), 0)
+    if isinstance(value, str):
+        value = json.loads(value)
+    # EXPLAIN (FORMAT JSON): [{"Plan": {"Plan Rows": ..., ...}}]
+    return max(int(value[0]["Plan"]["Plan Rows"]), 0)
+
+
+def total_pages(total: Optional[int], limit: int) -> Optional[int]:
+    """Number of pages for a total, or None when the total was not counted."""
+    if total is None:
+        return None
+    return (total + limit - 1) // limit if total > 0 else 1
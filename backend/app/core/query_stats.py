@@ -0,0 +1,190 @@
+"""
+Per-request SQL query statistics and N+1 detection.
+
+Engine events (registered by instrument_engine() from create_db_engine() and
+create_async_db_engine()) record every statement into the QueryStats object
+for the current request, held in a ContextVar so sync routes running in the
+threadpool and async routes on the event loop report into the same place.
+
+For each request, QueryStatsMiddleware:
+- adds `X-DB-Queries: <count>` and `Server-Timing: db;dur=<ms>;desc="<n> queries"`
+- stores the QueryStats in `scope["query_stats"]`, from which
+  RequestLoggingMiddleware adds db_queries / db_time_ms / db_repeated to its
+  per-request line (without it, log_summary=True logs a separate line)
+- warns when one statement shape runs DB_N_PLUS_ONE_THRESHOLD+ times, the
+  signature of a per-row lookup (N+1)
+
+Tests can assert a query budget from the X-DB-Queries header, or wrap direct
+calls in track_queries().
+
+Statements slower than DB_SLOW_QUERY_MS are also handed to
+app.core.slow_queries together with the route that issued them.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.slow_queries import EXPLAINING_KEY, capture_slow_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while a request (or tracked block) was active."""
+    count: int = 0
+    total_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    scope: Optional[dict] = field(default=None, repr=False)
+
+    @property
+    def route(self) -> Optional[str]:
+        """Method and route template (or raw path before routing) of the request."""
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope["path"]
+        return f"{self.scope.get('method', '')} {path}"
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most frequent first."""
+        return [(sql, n) for sql, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self) -> Dict[str, object]:
+        """Fields for structured logs."""
+        repeated = self.repeated(settings.DB_N_PLUS_ONE_THRESHOLD)
+        return {
+            "db_queries": self.count,
+            "db_time_ms": round(self.total_ms, 2),
+            "db_repeated": sum(n for _, n in repeated),
+        }
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """QueryStats for the current request, if one is being tracked."""
+    return query_stats_var.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Track queries issued inside the block.
+
+    Usage:
+        with track_queries() as stats:
+            validate_cross_listings_for_approval(course, session)
+        assert stats.count <= 4
+    """
+    stats = QueryStats()
+    token = query_stats_var.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_var.reset(token)
+
+
+# =============================================================================
+# Engine instrumentation
+# =============================================================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration_ms = (time.perf_counter() - start_times.pop()) * 1000
+    if conn.info.get(EXPLAINING_KEY):
+        return
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+    if 0 < settings.DB_SLOW_QUERY_MS <= duration_ms:
+        capture_slow_query(
+            conn, statement, parameters, duration_ms, executemany,
+            route=stats.route if stats is not None else None,
+        )
+
+
+def instrument_engine(sync_engine) -> None:
+    """Attach query counting/timing to an engine (use `.sync_engine` for async engines)."""
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# =============================================================================
+# ASGI middleware
+# =============================================================================
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware that tracks queries per HTTP request.
+
+    Headers are added when the response starts, which for regular responses
+    is after the route (and its queries) has finished.
+    """
+
+    def __init__(self, app, exclude_paths: Optional[List[str]] = None, log_summary: bool = True):
+        self.app = app
+        self.exclude_paths = set(exclude_paths or [])
+        self.log_summary = log_summary
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+        scope["query_stats"] = stats
+        token = query_stats_var.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries"'.encode(),
+                ))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            query_stats_var.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats) -> None:
+        route = stats.route
+        summary = stats.summary()
+        if self.log_summary:
+            logger.info(
+                f"DB stats: {route} - {stats.count} queries, {stats.total_ms:.2f}ms",
+                extra={"extra_fields": {"route": route, **summary}},
+            )
+        for statement, n in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                f"Possible N+1: {route} ran the same statement {n} times: {' '.join(statement.split())[:200]}",
+                extra={"extra_fields": {"route": route, "repeat_count": n, **summary}},
+            )
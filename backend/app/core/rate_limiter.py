@@ -2,7 +2,21 @@
 Rate Limiting for Calricula API
 
 Provides per-user rate limiting for AI endpoints to prevent abuse.
-Uses SlowAPI with in-memory storage (suitable for single-instance deployment).
+
+Limits are token buckets: "10/minute" allows a burst of 10 requests and
+refills one token every 6 seconds. Each check is a single read-modify-write
+of one bucket (tokens, last refill time) in the configured storage:
+
+- memory://                 per process (single-worker deployments, tests)
+- sqlite:///path/to/file    shared by all workers on the host; put the file
+                            on tmpfs, e.g. sqlite:////dev/shm/calricula-ratelimit.db
+- redis://[:password@]host:port/db
+                            shared across hosts; one Lua script per check
+
+Responses from limited endpoints carry X-RateLimit-Limit/-Remaining/-Reset
+headers; rejections are 429s with a Retry-After of exactly when the next
+token arrives. If the storage is unreachable, requests are allowed (and a
+warning logged) rather than failing the endpoint.
 
 Rate Limits:
 - AI Generation endpoints: 10 requests/minute per user
@@ -11,17 +25,43 @@ Rate Limits:
 - Admin users: Exempt from rate limiting (optional)
 """
 
+import asyncio
+import hashlib
+import inspect
 import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import wraps
-from typing import Callable, Optional
+from typing import Any, Callable, Optional, Tuple
+from urllib.parse import unquote, urlparse
 
-from fastapi import HTTPException, Request, Response
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import Counter
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by a rate limit",
+    ["scope"],
+)
+
+
+def get_remote_address(request: Request) -> str:
+    """Client IP address of the request."""
+    return request.client.host if request.client else "127.0.0.1"
+
 
 def get_user_identifier(request: Request) -> str:
     """
@@ -34,7 +74,7 @@ def get_user_identifier(request: Request) -> str:
     This allows per-user rate limiting for authenticated users
     and IP-based limiting for anonymous users.
     """
-    # Try to get user from request state (set by auth middleware)
+    # Try to get user from request state (set by get_current_user)
     if hasattr(request.state, "user") and request.state.user:
         user = request.state.user
         user_id = getattr(user, "id", None) or getattr(user, "uid", None)
@@ -64,13 +104,446 @@ def check_admin_exempt(request: Request) -> bool:
     return False
 
 
+# =============================================================================
+# Rates and results
+# =============================================================================
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A token bucket: `capacity` tokens, refilled at `capacity` per `period` seconds."""
+    capacity: int
+    period: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+    def __str__(self) -> str:
+        return f"{self.capacity}/{self.period:g}s"
+
+
+def parse_rate(limit: str) -> Rate:
+    """Parse "10/minute", "100 per hour" or "5/10 seconds"."""
+    match = _RATE_RE.match(limit.lower())
+    if not match:
+        raise ValueError(f"Invalid rate limit: {limit!r}")
+    count, multiplier, unit = match.groups()
+    return Rate(capacity=int(count), period=int(multiplier or 1) * _PERIODS[unit])
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of one bucket check, with the values for the response headers."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until a token is available (0 when allowed)
+    reset_after: float  # Seconds until the bucket is full again
+
+    @classmethod
+    def from_tokens(cls, allowed: bool, tokens: float, rate: Rate, cost: float = 1) -> "RateLimitResult":
+        """Build a result from the tokens left in the bucket after the check."""
+        per_second = rate.refill_per_second
+        return cls(
+            allowed=allowed,
+            limit=rate.capacity,
+            remaining=max(int(tokens), 0),
+            retry_after=0.0 if allowed else max(cost - tokens, 0) / per_second,
+            reset_after=max(rate.capacity - tokens, 0) / per_second,
+        )
+
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(time.time() + self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: Rate) -> float:
+    return min(rate.capacity, tokens + max(now - updated_at, 0) * rate.refill_per_second)
+
+
+# =============================================================================
+# Storage backends
+# =============================================================================
+
+class RateLimitStorage(ABC):
+    """
+    Token bucket storage.
+
+    acquire() refills the bucket for the elapsed time and takes `cost`
+    tokens if available, atomically with respect to every other caller
+    sharing the storage.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: Rate, cost: float = 1) -> RateLimitResult:
+        """Take `cost` tokens from the bucket for `key` if it has them."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget all buckets."""
+
+
+class MemoryStorage(RateLimitStorage):
+    """Buckets in a process-local LRU dict; idle buckets are evicted past max_keys."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire_sync(self, key: str, rate: Rate, cost: float = 1) -> RateLimitResult:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (rate.capacity, now))
+            tokens = _refill(tokens, updated_at, now, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return RateLimitResult.from_tokens(allowed, tokens, rate, cost)
+
+    async def acquire(self, key: str, rate: Rate, cost: float = 1) -> RateLimitResult:
+        return self.acquire_sync(key, rate, cost)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteStorage(RateLimitStorage):
+    """
+    Buckets in a SQLite file shared by every worker process on the host.
+
+    Each check is one BEGIN IMMEDIATE transaction (SQLite's write lock
+    serializes workers), run in the threadpool so waiting for the lock never
+    blocks the event loop. A check that can't get the lock within `timeout`
+    raises, and the limiter allows the request. The file only holds
+    rate-limit state, so durability is traded away: WAL without fsync.
+    Stale buckets are pruned occasionally.
+    """
+
+    PRUNE_EVERY = 1000  # Checks between deletes of full, idle buckets
+
+    def __init__(self, path: str, timeout: float = 1.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._checks = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not be inherited across fork (gunicorn preload)
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def acquire_sync(self, key: str, rate: Rate, cost: float = 1) -> RateLimitResult:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = _refill(*row, now, rate) if row else float(rate.capacity)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                expires_at = now + (rate.capacity - tokens) / rate.refill_per_second
+                connection.execute(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated_at, expires_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens,"
+                    " updated_at = excluded.updated_at, expires_at = excluded.expires_at",
+                    (key, tokens, now, expires_at),
+                )
+                self._checks += 1
+                if self._checks % self.PRUNE_EVERY == 0:
+                    connection.execute("DELETE FROM rate_limit_buckets WHERE expires_at < ?", (now,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return RateLimitResult.from_tokens(allowed, tokens, rate, cost)
+
+    async def acquire(self, key: str, rate: Rate, cost: float = 1) -> RateLimitResult:
+        return await run_in_threadpool(self.acquire_sync, key, rate, cost)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM rate_limit_buckets")
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server."""
+
+
+# KEYS[1] = bucket; ARGV = capacity, refill per second, cost.
+# Returns {allowed, tokens left}; tokens as a string since Lua numbers are
+# truncated to integers in replies. The server clock is used so that every
+# app host agrees on elapsed time.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+TOKEN_BUCKET_SHA = hashlib.sha1(TOKEN_BUCKET_SCRIPT.encode()).hexdigest()
+
+
+class RedisStorage(RateLimitStorage):
+    """
+    Buckets in Redis (or any server speaking the Redis protocol with EVAL).
+
+    A minimal RESP client over asyncio streams: one connection per event
+    loop, commands serialized on it. The bucket script is sent once and then
+    invoked by SHA (EVALSHA, falling back to EVAL after a server restart).
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        prefix: str = "ratelimit:",
+        timeout: float = 1.0,
+    ):
+        self.host, self.port, self.db, self.password = host, port, db, password
+        self.prefix = prefix
+        self.timeout = timeout
+        self._connection: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _encode(*args: Any) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    @classmethod
+    async def _read_reply(cls, reader: asyncio.StreamReader) -> Any:
+        line = (await reader.readline()).rstrip(b"\r\n")
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, body = line[:1], line[1:]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RedisError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [await cls._read_reply(reader) for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def _send(self, *args: Any) -> Any:
+        reader, writer = self._connection
+        writer.write(self._encode(*args))
+        await writer.drain()
+        return await self._read_reply(reader)
+
+    async def _command(self, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._connection, self._loop, self._lock = None, loop, asyncio.Lock()
+        async with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout
+                    )
+                    if self.password:
+                        await self._send("AUTH", self.password)
+                    if self.db:
+                        await self._send("SELECT", self.db)
+                return await asyncio.wait_for(self._send(*args), self.timeout)
+            except RedisError:
+                # An error reply was read in full; the connection is still in step
+                raise
+            except BaseException:
+                # Anything else, including cancellation while waiting for the
+                # reply (deadline, client disconnect), may leave a reply unread
+                # that the next command would take as its own
+                self._close()
+                raise
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection[1].close()
+            self._connection = None
+
+    async def acquire(self, key: str, rate: Rate, cost: float = 1) -> RateLimitResult:
+        args = (1, self.prefix + key, rate.capacity, repr(rate.refill_per_second), cost)
+        try:
+            allowed, tokens = await self._command("EVALSHA", TOKEN_BUCKET_SHA, *args)
+        except RedisError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+            allowed, tokens = await self._command("EVAL", TOKEN_BUCKET_SCRIPT, *args)
+        return RateLimitResult.from_tokens(bool(allowed), float(tokens), rate, cost)
+
+    def reset(self) -> None:
+        # Buckets expire on their own once full; nothing process-local to clear
+        pass
+
+
+def create_storage(uri: str) -> RateLimitStorage:
+    """Storage for a memory://, sqlite:/// or redis:// URI."""
+    parsed = urlparse(uri)
+    if parsed.scheme == "memory":
+        return MemoryStorage()
+    if parsed.scheme == "sqlite":
+        return SQLiteStorage(unquote(parsed.path))
+    if parsed.scheme == "redis":
+        return RedisStorage(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+        )
+    raise ValueError(f"Unsupported rate limit storage: {uri!r}")
+
+
+# =============================================================================
+# Limiter
+# =============================================================================
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is over its limit; rendered by rate_limit_exceeded_handler."""
+
+    def __init__(self, result: RateLimitResult, limit: str):
+        self.result = result
+        self.detail = limit
+        super().__init__(f"Rate limit exceeded: {limit}")
+
+
+class Limiter:
+    """Applies token-bucket limits to endpoints, keyed per user (or IP) and endpoint."""
+
+    def __init__(
+        self,
+        storage: RateLimitStorage,
+        key_func: Callable[[Request], str] = get_user_identifier,
+        enabled: bool = True,
+    ):
+        self.storage = storage
+        self.key_func = key_func
+        self.enabled = enabled
+
+    async def hit(self, key: str, rate: Rate, cost: float = 1) -> Optional[RateLimitResult]:
+        """Take `cost` tokens from bucket `key`; None when the storage is unavailable."""
+        try:
+            return await self.storage.acquire(key, rate, cost)
+        except Exception as e:
+            logger.warning("Rate limit storage unavailable, allowing request: %s", e)
+            return None
+
+    def limit(self, limit_value: str, exempt_admins: bool = True, scope: Optional[str] = None):
+        """
+        Decorator enforcing `limit_value` (e.g. "10/minute") on an endpoint.
+
+        The endpoint needs a `request: Request` parameter. Buckets are per
+        endpoint (or per `scope`, to share one bucket between endpoints) and
+        per caller. Rate limit headers are added to the response.
+        """
+        rate = parse_rate(limit_value)
+
+        def decorator(func: Callable):
+            bucket_scope = scope or f"{func.__module__}.{func.__name__}"
+            signature = inspect.signature(func)
+            params = list(signature.parameters.values())
+
+            request_param = next(
+                (p.name for p in params if p.annotation is Request or p.name == "request"), None
+            )
+            if request_param is None:
+                raise TypeError(f"{func.__qualname__} needs a 'request: Request' parameter to be rate limited")
+
+            # FastAPI passes a Response for headers when the endpoint asks for one
+            response_param = next((p.name for p in params if p.annotation is Response), None)
+            injected = response_param is None
+            if injected:
+                response_param = "rate_limit_response"
+                params.append(inspect.Parameter(response_param, inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request: Request = kwargs[request_param]
+                response: Response = kwargs.pop(response_param) if injected else kwargs[response_param]
+
+                result = None
+                if self.enabled and not (exempt_admins and check_admin_exempt(request)):
+                    key = f"{bucket_scope}:{self.key_func(request)}"
+                    result = await self.hit(key, rate)
+                    if result is not None and not result.allowed:
+                        RATE_LIMIT_REJECTIONS.labels(bucket_scope).inc()
+                        raise RateLimitExceeded(result, limit_value)
+
+                if inspect.iscoroutinefunction(func):
+                    value = await func(*args, **kwargs)
+                else:
+                    value = await run_in_threadpool(func, *args, **kwargs)
+
+                if result is not None:
+                    target = value if isinstance(value, Response) else response
+                    target.headers.update(result.headers())
+                return value
+
+            wrapper.__signature__ = signature.replace(parameters=params)
+            return wrapper
+
+        return decorator
+
+
 # Create the rate limiter instance
-# Using in-memory storage - for production with multiple instances,
-# consider using Redis: Limiter(key_func=get_user_identifier, storage_uri="redis://localhost:6379")
 limiter = Limiter(
-    key_func=get_user_identifier,
-    default_limits=["100/minute"],  # Default for non-AI endpoints
-    strategy="fixed-window",  # Simple fixed window strategy
+    storage=create_storage(settings.RATE_LIMIT_STORAGE_URI),
+    enabled=settings.RATE_LIMIT_ENABLED,
 )
 
 
@@ -103,27 +576,25 @@ def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Res
     user_id = get_user_identifier(request)
     logger.warning(
         f"Rate limit exceeded for {user_id} on {request.url.path}",
-        extra={
+        extra={"extra_fields": {
             "user_identifier": user_id,
             "path": request.url.path,
             "method": request.method,
             "limit": str(exc.detail),
-        }
+        }},
     )
 
-    # Parse retry-after from the exception detail
-    # SlowAPI includes the limit info in the detail
-    retry_after = 60  # Default to 60 seconds
+    retry_after = math.ceil(exc.result.retry_after)
 
-    raise HTTPException(
+    return JSONResponse(
         status_code=429,
-        detail={
+        content={"detail": {
             "error": "rate_limit_exceeded",
-            "message": f"Too many requests. Please wait before trying again.",
+            "message": "Too many requests. Please wait before trying again.",
             "limit": str(exc.detail),
             "retry_after_seconds": retry_after,
-        },
-        headers={"Retry-After": str(retry_after)},
+        }},
+        headers=exc.result.headers(),
     )
 
 
@@ -138,36 +609,10 @@ def rate_limited(limit_type: str = "ai_generation", exempt_admins: bool = True):
     Usage:
         @router.post("/suggest/catalog-description")
         @rate_limited("ai_generation")
-        async def suggest_catalog_description(...):
+        async def suggest_catalog_description(request: Request, ...):
             ...
     """
-    limit = RATE_LIMITS.get(limit_type, "10/minute")
-
-    def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(*args, request: Request = None, **kwargs):
-            # Find request in args or kwargs
-            if request is None:
-                for arg in args:
-                    if isinstance(arg, Request):
-                        request = arg
-                        break
-
-            if request is None:
-                # No request found, just call the function
-                return await func(*args, **kwargs)
-
-            # Check if admin is exempt
-            if exempt_admins and check_admin_exempt(request):
-                logger.debug(f"Admin user exempt from rate limiting on {request.url.path}")
-                return await func(*args, request=request, **kwargs)
-
-            # Apply rate limiting using SlowAPI's shared limiter
-            # The actual rate limiting is done via dependency injection
-            return await func(*args, request=request, **kwargs)
-
-        return wrapper
-    return decorator
+    return limiter.limit(RATE_LIMITS.get(limit_type, "10/minute"), exempt_admins=exempt_admins)
 
 
 # Dependency functions for FastAPI
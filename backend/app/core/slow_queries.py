@@ -0,0 +1,238 @@
+"""
+Slow-query capture with sampled EXPLAIN plans.
+
+Statements slower than DB_SLOW_QUERY_MS (timed by the engine events in
+app.core.query_stats) are logged and kept in an in-memory ring buffer with:
+- normalized SQL (placeholders and literals replaced by `?`, IN lists collapsed)
+- the shape of the bind parameters (types and list lengths, never values)
+- the route that issued them and the request ID
+- for a sample of SELECT/WITH statements, their EXPLAIN plan
+
+The buffer is served by GET /api/admin/slow-queries, grouped by statement,
+to show which list filters are missing an index.
+
+Plans are sampled (DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE), at most once per
+statement shape every EXPLAIN_COOLDOWN_SECONDS, and taken on the same
+connection inside a savepoint that is always rolled back. By default they
+are estimated plans: plain EXPLAIN plans the statement without running it,
+so it costs the slow request only planning time. With
+DB_SLOW_QUERY_EXPLAIN_ANALYZE, plain read-only SELECTs are instead run
+again under EXPLAIN (ANALYZE, BUFFERS) for actual row counts and timings;
+WITH statements (which may hold data-modifying CTEs) and locking SELECTs
+are never executed again.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_request_id
+
+logger = logging.getLogger(__name__)
+
+# Minimum gap between two EXPLAINs of the same normalized statement
+EXPLAIN_COOLDOWN_SECONDS = 300
+
+# Set in conn.info while an EXPLAIN runs so it is not timed or captured itself
+EXPLAINING_KEY = "slow_query_explaining"
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \(\s*\?(::\w+)?(?:\s*,\s*\?(?:::\w+)?)+\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace bind placeholders/literals with `?`."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _PLACEHOLDER.sub("?", sql)
+    return _IN_LIST.sub(lambda m: f"IN (?{m.group(1) or ''}, ...)", sql)
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Types (and list lengths) of bind parameters, without their values."""
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+_LOCKING_CLAUSE = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+
+def _head(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+
+
+def _explainable(statement: str) -> bool:
+    return _head(statement) in ("SELECT", "WITH")
+
+
+def _analyzable(statement: str) -> bool:
+    """Whether running the statement again is harmless: a plain SELECT that takes no row locks."""
+    return _head(statement) == "SELECT" and not _LOCKING_CLAUSE.search(statement)
+
+
+@dataclass
+class SlowQuery:
+    """One captured slow statement."""
+    timestamp: float
+    duration_ms: float
+    statement: str
+    parameters: Any
+    route: Optional[str]
+    request_id: Optional[str]
+    explain: Optional[str] = None
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of the most recent slow statements."""
+
+    def __init__(self, maxlen: int = 200):
+        self._entries: Deque[SlowQuery] = deque(maxlen=maxlen)
+        self._explained_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry: SlowQuery) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> List[SlowQuery]:
+        """Captured statements, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._explained_at.clear()
+
+    def claim_explain(self, statement: str, sample_rate: float) -> bool:
+        """Decide whether this occurrence of `statement` should be explained."""
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained_at.get(statement)
+            if last is not None and now - last < EXPLAIN_COOLDOWN_SECONDS:
+                return False
+            self._explained_at[statement] = now
+            return True
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Captured statements grouped by normalized SQL, slowest total first.
+
+        Each group carries its routes, the latest parameter shape and the
+        most recent EXPLAIN plan captured for it.
+        """
+        groups: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries():
+            group = groups.get(entry.statement)
+            if group is None:
+                group = groups[entry.statement] = {
+                    "statement": entry.statement,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": [],
+                    "parameters": entry.parameters,
+                    "last_seen": entry.timestamp,
+                    "explain": None,
+                }
+            group["count"] += 1
+            group["total_ms"] += entry.duration_ms
+            group["max_ms"] = max(group["max_ms"], entry.duration_ms)
+            if entry.route and entry.route not in group["routes"]:
+                group["routes"].append(entry.route)
+            if group["explain"] is None and entry.explain:
+                group["explain"] = entry.explain
+
+        for group in groups.values():
+            group["avg_ms"] = round(group["total_ms"] / group["count"], 2)
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["max_ms"] = round(group["max_ms"], 2)
+        return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+
+slow_query_log = SlowQueryLog(maxlen=settings.DB_SLOW_QUERY_BUFFER_SIZE)
+
+
+def explain_statement(conn, statement: str, parameters: Any, analyze: bool = False) -> Optional[str]:
+    """
+    EXPLAIN a statement on `conn`; with `analyze`, EXPLAIN (ANALYZE, BUFFERS).
+
+    Runs inside a savepoint that is always rolled back, so neither a failing
+    EXPLAIN nor anything an analyzed run did survives into the caller's
+    transaction. Returns the plan text, or None if it could not be produced.
+    """
+    conn.info[EXPLAINING_KEY] = True
+    try:
+        try:
+            conn.exec_driver_sql("SAVEPOINT slow_query_explain")
+        except Exception:
+            # No transaction to protect (autocommit); don't risk it
+            return None
+        try:
+            rows = conn.exec_driver_sql(
+                ("EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN ") + statement, parameters or ()
+            ).fetchall()
+        except Exception as e:
+            logger.debug(f"Slow query EXPLAIN failed: {e}")
+            return None
+        finally:
+            conn.exec_driver_sql("ROLLBACK TO SAVEPOINT slow_query_explain")
+            conn.exec_driver_sql("RELEASE SAVEPOINT slow_query_explain")
+        return "\n".join(row[0] for row in rows)
+    finally:
+        conn.info.pop(EXPLAINING_KEY, None)
+
+
+def capture_slow_query(
+    conn,
+    statement: str,
+    parameters: Any,
+    duration_ms: float,
+    executemany: bool,
+    route: Optional[str] = None,
+) -> SlowQuery:
+    """Record a statement that exceeded DB_SLOW_QUERY_MS (and maybe EXPLAIN it)."""
+    normalized = normalize_sql(statement)
+    entry = SlowQuery(
+        timestamp=time.time(),
+        duration_ms=round(duration_ms, 2),
+        statement=normalized,
+        parameters=parameter_shape(parameters) if not executemany else f"executemany[{len(parameters)}]",
+        route=route,
+        request_id=get_request_id(),
+    )
+
+    if (
+        not executemany
+        and _explainable(statement)
+        and slow_query_log.claim_explain(normalized, settings.DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE)
+    ):
+        analyze = settings.DB_SLOW_QUERY_EXPLAIN_ANALYZE and _analyzable(statement)
+        entry.explain = explain_statement(conn, statement, parameters, analyze=analyze)
+
+    slow_query_log.add(entry)
+    logger.warning(
+        f"Slow query: {route or '-'} {entry.duration_ms:.2f}ms: {normalized[:200]}",
+        extra={"extra_fields": {k: v for k, v in asdict(entry).items() if k != "explain"}},
+    )
+    return entry
@@ -5,26 +5,33 @@ This is the main entry point for the Calricula backend API.
 It configures CORS, routes, and provides health check endpoints.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlmodel import Session, text
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 
+from app.core.bulkheads import bulkhead
 from app.core.config import settings
-from app.core.database import create_db_and_tables, get_session, engine, get_pool_status, update_schema_for_lmi
+from app.core.database import create_db_and_tables, get_session, engine, get_pool_status, update_schema_for_lmi, dispose_async_engine
+from app.core.deadlines import DeadlineMiddleware
+from app.core.firebase import warm_signing_keys
+from app.core.http_clients import http_clients
 from app.core.logging import configure_logging, RequestLoggingMiddleware, get_logger, get_request_id
-from app.core.rate_limiter import limiter, rate_limit_exceeded_handler
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS_REGISTRY, MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.rate_limiter import RateLimitExceeded, limiter, rate_limit_exceeded_handler
 
 # Configure logging at module load
 logger = configure_logging(
     log_level=settings.LOG_LEVEL,
     json_format=settings.LOG_JSON_FORMAT,
     service_name="calricula-api",
+    queue_size=settings.LOG_QUEUE_SIZE,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
 )
 
 
@@ -41,10 +48,18 @@ async def lifespan(app: FastAPI):
     
     # Run manual schema update for LMI
     update_schema_for_lmi()
+
+    # Fetch Firebase token signing keys before the first authenticated request
+    await asyncio.to_thread(warm_signing_keys)
+
+    # Pooled clients for BLS, QCEW and CKAN, shared by all requests
+    await http_clients.start()
     
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await http_clients.aclose()
+    await dispose_async_engine()
 
 
 # Create FastAPI application
@@ -82,6 +97,24 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
+# Request deadlines (innermost, so a 504 still gets CORS, metrics and log headers)
+if settings.REQUEST_DEADLINES_ENABLED:
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_seconds=settings.REQUEST_DEADLINE_SECONDS,
+        max_seconds=settings.REQUEST_DEADLINE_MAX_SECONDS,
+        route_deadlines={
+            "/api/ai": settings.REQUEST_DEADLINE_AI_SECONDS,
+            "/api/documents": settings.REQUEST_DEADLINE_AI_SECONDS,
+            "/api/export": settings.REQUEST_DEADLINE_EXPORT_SECONDS,
+            "/api/bls": settings.REQUEST_DEADLINE_LABOR_MARKET_SECONDS,
+            "/api/qcew": settings.REQUEST_DEADLINE_LABOR_MARKET_SECONDS,
+            "/api/lmi": settings.REQUEST_DEADLINE_LABOR_MARKET_SECONDS,
+            "/api/elumen": settings.REQUEST_DEADLINE_LABOR_MARKET_SECONDS,
+        },
+        exclude_paths=["/metrics"],
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -91,9 +124,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add request logging middleware
-# Temporarily disabled due to FastAPI middleware compatibility issue
-# app.add_middleware(RequestLoggingMiddleware, logger=logger, exclude_paths=["/health", "/health/db", "/health/pool", "/docs", "/redoc", "/openapi.json"])
+# Per-request query counts (X-DB-Queries / Server-Timing headers, N+1 warnings).
+# The DB summary goes on the request log line when request logging is enabled.
+if settings.DB_QUERY_STATS_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        exclude_paths=["/health", "/docs", "/redoc", "/openapi.json", "/metrics"],
+        log_summary=not settings.REQUEST_LOGGING_ENABLED,
+    )
+
+# Request latency histograms / in-flight gauge for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, exclude_paths=["/metrics"])
+
+# Request IDs and per-request log line (outermost, so every log line of a request carries its ID)
+if settings.REQUEST_LOGGING_ENABLED:
+    app.add_middleware(RequestLoggingMiddleware, logger=logger, exclude_paths=["/health", "/health/db", "/health/pool", "/docs", "/redoc", "/openapi.json", "/metrics"])
 
 
 # =============================================================================
@@ -155,6 +201,8 @@ async def health_check_pool():
     - checked_out: Currently active connections
     - overflow: Connections beyond pool_size
     - checkedin: Available connections in pool
+    - async_pool: The same metrics for the asyncpg engine
+    - replicas: Per-replica health, routed reads and pool metrics (when configured)
     """
     pool_status = get_pool_status()
     return {
@@ -164,11 +212,26 @@ async def health_check_pool():
     }
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics():
+        """
+        Application metrics in Prometheus text format.
+
+        Includes per-route request latency histograms, in-flight requests,
+        DB pool checkout wait and connection counts, external API latency
+        (BLS, QCEW, CKAN, eLumen, Gemini) and cache hit/miss counters.
+        """
+        return Response(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # =============================================================================
 # API Routes
 # =============================================================================
+# AI, export, eLumen and BLS/QCEW routes hold a bulkhead slot per request
+# (app.core.bulkheads) so bursts there can't starve interactive editing.
 
-from app.api.routes import auth, courses, departments, approvals, programs, ai, export, reference, compliance, workflow, elumen, documents, notifications, cross_listings, lmi, dashboard, bls, qcew
+from app.api.routes import auth, courses, departments, approvals, programs, ai, export, reference, compliance, workflow, elumen, documents, notifications, cross_listings, lmi, dashboard, bls, qcew, admin
 
 # Authentication routes
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -186,10 +249,10 @@ app.include_router(approvals.router, prefix="/api/approvals", tags=["Approvals"]
 app.include_router(programs.router, prefix="/api/programs", tags=["Programs"])
 
 # AI Assistant routes
-app.include_router(ai.router, tags=["AI Assistant"])
+app.include_router(ai.router, tags=["AI Assistant"], dependencies=[Depends(bulkhead("ai"))])
 
 # Export routes (PDF, eLumen)
-app.include_router(export.router, tags=["Export"])
+app.include_router(export.router, tags=["Export"], dependencies=[Depends(bulkhead("export"))])
 
 # Reference data routes (CCN, TOP codes)
 app.include_router(reference.router, prefix="/api/reference", tags=["Reference Data"])
@@ -201,7 +264,7 @@ app.include_router(compliance.router, prefix="/api/compliance", tags=["Complianc
 app.include_router(workflow.router, prefix="/api/workflow", tags=["Workflow"])
 
 # eLumen browser routes
-app.include_router(elumen.router, tags=["eLumen Browser"])
+app.include_router(elumen.router, tags=["eLumen Browser"], dependencies=[Depends(bulkhead("elumen"))])
 
 # Document upload routes
 app.include_router(documents.router, tags=["Documents"])
@@ -216,14 +279,17 @@ app.include_router(cross_listings.router, prefix="/api/courses", tags=["Cross-Li
 app.include_router(lmi.router, prefix="/api/lmi", tags=["Labor Market Information"])
 
 # BLS routes (U.S. Bureau of Labor Statistics)
-app.include_router(bls.router, prefix="/api/bls", tags=["BLS Data"])
+app.include_router(bls.router, prefix="/api/bls", tags=["BLS Data"], dependencies=[Depends(bulkhead("labor_market"))])
 
 # QCEW routes (Quarterly Census of Employment and Wages)
-app.include_router(qcew.router, prefix="/api/qcew", tags=["QCEW County Data"])
+app.include_router(qcew.router, prefix="/api/qcew", tags=["QCEW County Data"], dependencies=[Depends(bulkhead("labor_market"))])
 
 # Dashboard routes
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 
+# Admin routes (slow-query inspection)
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+
 
 @app.get("/", tags=["Root"])
 async def root():
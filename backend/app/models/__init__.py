@@ -21,7 +21,7 @@ from app.models.course import (
     StudentLearningOutcome, SLOCreate, SLORead, SLOUpdate, BloomLevel,
     CourseContent, CourseContentCreate, CourseContentRead, CourseContentUpdate,
     CourseRequisite, CourseRequisiteCreate, CourseRequisiteRead, CourseRequisiteUpdate,
-    RequisiteType, RequisiteValidationType
+    RequisiteType, RequisiteValidationType, CourseStatusStats
 )
 
 # Programs
@@ -54,6 +54,9 @@ from app.models.document import (
     AIChatHistory, AIChatHistoryCreate, AIChatHistoryRead, AIChatHistoryUpdate
 )
 
+# Labor Market Data
+from app.models.labor_market import BLSSeriesCache, QCEWQuarterly, LMIMirrorRecord, LMIMirrorSync
+
 # Notifications
 from app.models.notification import (
     Notification, NotificationCreate, NotificationRead, NotificationUpdate,
@@ -71,7 +74,7 @@ __all__ = [
     "StudentLearningOutcome", "SLOCreate", "SLORead", "SLOUpdate", "BloomLevel",
     "CourseContent", "CourseContentCreate", "CourseContentRead", "CourseContentUpdate",
     "CourseRequisite", "CourseRequisiteCreate", "CourseRequisiteRead", "CourseRequisiteUpdate",
-    "RequisiteType", "RequisiteValidationType",
+    "RequisiteType", "RequisiteValidationType", "CourseStatusStats",
     # Program
     "Program", "ProgramCreate", "ProgramRead", "ProgramUpdate", "ProgramBase",
     "ProgramType", "ProgramStatus", "RequirementType",
@@ -90,6 +93,8 @@ __all__ = [
     "RAGDocument", "RAGDocumentCreate", "RAGDocumentRead", "RAGDocumentUpdate",
     "RAGDocumentType", "IndexingStatus",
     "AIChatHistory", "AIChatHistoryCreate", "AIChatHistoryRead", "AIChatHistoryUpdate",
+    # Labor Market
+    "BLSSeriesCache", "QCEWQuarterly", "LMIMirrorRecord", "LMIMirrorSync",
     # Notifications
     "Notification", "NotificationCreate", "NotificationRead", "NotificationUpdate",
     "NotificationType", "NotificationCounts",
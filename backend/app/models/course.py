@@ -375,3 +375,25 @@ class CourseRequisiteUpdate(SQLModel):
     content_review: Optional[str] = None
     requisite_course_id: Optional[uuid.UUID] = None
     requisite_text: Optional[str] = None
+
+
+# =============================================================================
+# Course Status Statistics (pre-aggregated for dashboards)
+# =============================================================================
+
+class CourseStatusStats(SQLModel, table=True):
+    """
+    Running course totals per department and workflow status.
+
+    Maintained incrementally as courses are created, deleted or transitioned
+    (see app.services.course_stats) so dashboard and approval-count endpoints
+    read a handful of rows instead of scanning courses and workflow history.
+    """
+    __tablename__ = "course_status_stats"
+
+    department_id: uuid.UUID = Field(foreign_key="departments.id", primary_key=True)
+    status: CourseStatus = Field(primary_key=True)
+    course_count: int = Field(default=0)  # Courses currently in this status
+    updated_at_sum: float = Field(default=0.0)  # Sum of their updated_at as epoch seconds (for average age)
+    entered_count: int = Field(default=0)  # Workflow transitions into this status
+    returned_count: int = Field(default=0)  # Workflow transitions from this status back to Draft
@@ -0,0 +1,110 @@
+"""
+Labor market data models: cached BLS API responses, locally loaded QCEW
+quarterly data and the mirror of the California LMI (CKAN) datasets.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlmodel import Field, SQLModel, Column
+from sqlalchemy import JSON, BigInteger, Index
+
+
+# =============================================================================
+# BLS Series Cache
+# =============================================================================
+
+class BLSSeriesCache(SQLModel, table=True):
+    """
+    One BLS series as returned by the Public Data API, for one request shape.
+
+    Persistent tier of app.services.bls_cache, shared by all workers so
+    annual and monthly series aren't re-fetched (and the daily API quota
+    isn't spent) on every request.
+    """
+    __tablename__ = "bls_series_cache"
+
+    cache_key: str = Field(primary_key=True)  # "<series_id>:<start_year>:<end_year>:<catalog 0/1>"
+    series_id: str = Field(index=True)
+    payload: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))  # Series object from the API response
+    fetched_at: datetime
+    fresh_until: datetime  # Served without revalidation until then
+    stale_until: datetime = Field(index=True)  # Served while revalidating until then; dropped after
+
+
+# =============================================================================
+# QCEW Quarterly Data
+# =============================================================================
+
+class QCEWQuarterly(SQLModel, table=True):
+    """
+    One row of a QCEW quarterly single-file CSV: an area, ownership,
+    industry and establishment size class in one quarter.
+
+    Loaded from the bulk files by scripts/ingest_qcew.py and read by
+    app.services.qcew_store, so QCEWClient can answer summaries and trends
+    for loaded quarters without calling the QCEW API.
+    """
+    __tablename__ = "qcew_quarterly"
+    __table_args__ = (
+        Index("ix_qcew_quarterly_industry", "industry_code", "own_code", "year", "qtr"),
+    )
+
+    # Key columns, ordered so lookups by area and quarter use the primary key
+    area_fips: str = Field(primary_key=True)
+    year: int = Field(primary_key=True)
+    qtr: int = Field(primary_key=True)
+    own_code: str = Field(primary_key=True)
+    industry_code: str = Field(primary_key=True)
+    agglvl_code: str = Field(primary_key=True)
+    size_code: str = Field(primary_key=True)
+
+    industry_title: str = ""  # From the BLS industry titles file; "" if not known
+    disclosure_code: str = ""  # "N" when BLS suppressed the values
+    qtrly_estabs: Optional[int] = None
+    month1_emplvl: Optional[int] = None
+    month2_emplvl: Optional[int] = None
+    month3_emplvl: Optional[int] = None
+    total_qtrly_wages: Optional[int] = Field(default=None, sa_column=Column(BigInteger))
+    avg_wkly_wage: Optional[int] = None
+
+
+# =============================================================================
+# California LMI (CKAN) Mirror
+# =============================================================================
+
+class LMIMirrorRecord(SQLModel, table=True):
+    """
+    One record of a data.ca.gov datastore resource (OEWS wages or long-term
+    projections), copied by app.services.lmi_mirror so LMIClient can query
+    it locally instead of calling CKAN.
+
+    The columns LMIClient filters on are pulled out of the record; the
+    record itself is kept as CKAN returns it.
+    """
+    __tablename__ = "lmi_mirror_records"
+    __table_args__ = (
+        Index("ix_lmi_mirror_records_soc", "resource_id", "soc_code"),
+        Index("ix_lmi_mirror_records_area_year", "resource_id", "area_name", "year"),
+    )
+
+    resource_id: str = Field(primary_key=True)
+    record_id: int = Field(primary_key=True)  # CKAN datastore _id
+    soc_code: str = ""  # Without hyphen, as CKAN stores it
+    area_name: str = ""
+    year: str = ""  # "Year" of wage records, "Period" of projections
+    occupation_title: str = ""
+    wage_type: str = ""  # "Hourly wage" / "Annual wage" (wage records only)
+    record: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    synced_at: datetime  # Start of the sync that last wrote the row
+
+
+class LMIMirrorSync(SQLModel, table=True):
+    """Sync state of one mirrored CKAN resource."""
+    __tablename__ = "lmi_mirror_sync"
+
+    resource_id: str = Field(primary_key=True)
+    last_modified: Optional[str] = None  # Resource last_modified at the last full copy
+    record_count: int = 0
+    max_record_id: int = 0
+    synced_at: datetime
@@ -0,0 +1,219 @@
+"""
+BLS Series Cache
+
+Two-tier cache for BLS Public Data API series, used by BLSClient.fetch_series.
+Each series is cached on its own, keyed by (series_id, start_year, end_year,
+catalog), so requests whose series lists overlap share entries:
+
+- memory: a per-process LRU of BLS_CACHE_MEMORY_ENTRIES series
+- database: the `bls_series_cache` table, shared by all workers
+
+Entries are fresh for a survey-specific TTL (OES wages are annual, CPI and
+unemployment series monthly). After that they are served stale for up to
+BLS_CACHE_STALE_SECONDS while the caller refreshes them in the background
+(stale-while-revalidate); past that they count as misses.
+
+Databases that have not been migrated yet (no `bls_series_cache` table) use
+the memory tier only.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import record_cache
+from app.models.labor_market import BLSSeriesCache
+
+logger = logging.getLogger(__name__)
+
+# (series_id, start_year, end_year, catalog)
+SeriesKey = Tuple[str, int, int, bool]
+
+# Survey (series ID prefix) -> TTL setting; see ttl_for()
+SURVEY_TTL_SETTINGS = {
+    "OE": "BLS_CACHE_TTL_ANNUAL_SECONDS",  # OES wages, published once a year
+    "CU": "BLS_CACHE_TTL_MONTHLY_SECONDS",  # CPI-U
+    "CW": "BLS_CACHE_TTL_MONTHLY_SECONDS",  # CPI-W
+    "LA": "BLS_CACHE_TTL_MONTHLY_SECONDS",  # Local area unemployment
+    "LN": "BLS_CACHE_TTL_MONTHLY_SECONDS",  # National unemployment (CPS)
+    "CE": "BLS_CACHE_TTL_MONTHLY_SECONDS",  # Current employment statistics
+    "SM": "BLS_CACHE_TTL_MONTHLY_SECONDS",  # State and metro employment
+}
+
+
+def ttl_for(series_id: str) -> float:
+    """Seconds a series stays fresh, by survey."""
+    name = SURVEY_TTL_SETTINGS.get(series_id[:2].upper(), "BLS_CACHE_TTL_DEFAULT_SECONDS")
+    return getattr(settings, name)
+
+
+def cache_key(key: SeriesKey) -> str:
+    series_id, start_year, end_year, catalog = key
+    return f"{series_id}:{start_year}:{end_year}:{int(catalog)}"
+
+
+@dataclass(frozen=True)
+class CachedSeries:
+    """A cached series object (as returned by the API) and its lifetimes (epoch seconds)."""
+    payload: Dict[str, Any]
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class BLSSeriesCacheStore:
+    """Memory LRU in front of the bls_series_cache table."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CachedSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_available: Optional[bool] = None
+
+    def _remember(self, key: str, entry: CachedSeries) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _recall(self, key: str, now: float) -> Optional[CachedSeries]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if not entry.is_usable(now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def _detect_table(self, session: Session) -> bool:
+        if self._table_available is None:
+            if session.get_bind().dialect.name != "postgresql":
+                self._table_available = False
+            else:
+                self._table_available = bool(session.connection().execute(
+                    text("SELECT to_regclass('bls_series_cache') IS NOT NULL")
+                ).scalar())
+            if not self._table_available:
+                logger.info("BLS cache: bls_series_cache missing; run migrations for a shared cache")
+        return self._table_available
+
+    def _load(self, keys: Iterable[str], now: float) -> Dict[str, CachedSeries]:
+        keys = list(keys)
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                return {}
+            rows = session.exec(
+                select(BLSSeriesCache).where(
+                    BLSSeriesCache.cache_key.in_(keys),
+                    BLSSeriesCache.stale_until > datetime.utcfromtimestamp(now),
+                )
+            ).all()
+            return {
+                row.cache_key: CachedSeries(
+                    payload=row.payload,
+                    fresh_until=_epoch(row.fresh_until),
+                    stale_until=_epoch(row.stale_until),
+                )
+                for row in rows
+            }
+
+    def _store(self, entries: Dict[str, Tuple[str, CachedSeries]], now: float) -> None:
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                return
+            values = [
+                {
+                    "cache_key": key,
+                    "series_id": series_id,
+                    "payload": entry.payload,
+                    "fetched_at": datetime.utcfromtimestamp(now),
+                    "fresh_until": datetime.utcfromtimestamp(entry.fresh_until),
+                    "stale_until": datetime.utcfromtimestamp(entry.stale_until),
+                }
+                for key, (series_id, entry) in entries.items()
+            ]
+            statement = insert(BLSSeriesCache).values(values)
+            session.exec(statement.on_conflict_do_update(
+                index_elements=["cache_key"],
+                set_={column: statement.excluded[column]
+                      for column in ("payload", "fetched_at", "fresh_until", "stale_until")},
+            ))
+            # Expired rows are never served; clear them as new ones arrive
+            session.exec(delete(BLSSeriesCache).where(
+                BLSSeriesCache.stale_until <= datetime.utcfromtimestamp(now)
+            ))
+            session.commit()
+
+    async def get_many(self, keys: Iterable[SeriesKey]) -> Dict[SeriesKey, CachedSeries]:
+        """Usable (fresh or stale) entries for `keys`; missing keys are absent."""
+        now = time.time()
+        found: Dict[SeriesKey, CachedSeries] = {}
+        missing: Dict[str, SeriesKey] = {}
+        for key in keys:
+            entry = self._recall(cache_key(key), now)
+            if entry is not None:
+                found[key] = entry
+            else:
+                missing[cache_key(key)] = key
+        requested = len(found) + len(missing)
+
+        if missing:
+            try:
+                loaded = await asyncio.to_thread(self._load, list(missing), now)
+            except Exception as e:
+                logger.warning(f"BLS cache: database read failed: {e}")
+                loaded = {}
+            for stored_key, entry in loaded.items():
+                self._remember(stored_key, entry)
+                found[missing[stored_key]] = entry
+
+        record_cache("bls_series", hits=len(found), misses=requested - len(found))
+        return found
+
+    async def put_many(self, series: Dict[SeriesKey, Dict[str, Any]]) -> None:
+        """Cache series objects from a successful API response."""
+        if not series:
+            return
+        now = time.time()
+        entries: Dict[str, Tuple[str, CachedSeries]] = {}
+        for key, payload in series.items():
+            ttl = ttl_for(key[0])
+            entry = CachedSeries(payload, now + ttl, now + ttl + settings.BLS_CACHE_STALE_SECONDS)
+            self._remember(cache_key(key), entry)
+            entries[cache_key(key)] = (key[0], entry)
+        try:
+            await asyncio.to_thread(self._store, entries, now)
+        except Exception as e:
+            logger.warning(f"BLS cache: database write failed: {e}")
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier (tests, or after editing the table by hand)."""
+        with self._lock:
+            self._memory.clear()
+        self._table_available = None
+
+
+def _epoch(value: datetime) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+bls_series_cache = BLSSeriesCacheStore(settings.BLS_CACHE_MEMORY_ENTRIES)
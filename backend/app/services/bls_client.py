@@ -11,17 +11,31 @@ Provides access to:
 API Documentation: https://www.bls.gov/developers/api_signature_v2.htm
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
+from dataclasses import dataclass
 from datetime import datetime
+import asyncio
+import logging
+import time
 import httpx
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
-from app.services.soc_occupations import get_occupation_by_code
+from app.core.deadlines import deadline_var
+from app.core.http_clients import http_clients
+from app.core.metrics import timed_transport
+from app.services.bls_cache import bls_series_cache, cache_key
+from app.services.occupation_index import occupation_index
+
+logger = logging.getLogger(__name__)
 
 # API Configuration
 BLS_API_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
 
+# Series per API request: 50 with a registration key, 25 without
+BLS_MAX_SERIES_PER_REQUEST = 50
+BLS_MAX_SERIES_PER_REQUEST_UNREGISTERED = 25
+
 # California Area Codes
 CALIFORNIA_AREAS = {
     "california": {"code": "ST0600000000000", "name": "California"},
@@ -184,29 +198,33 @@ class BLSClient:
     """
     Async client for BLS Public Data API v2.0.
 
-    Usage:
+    Routes inject one on the shared connection pool with
+    Depends(get_bls_client). Standalone usage:
         async with BLSClient() as client:
             data = await client.fetch_series(["LNS14000000"])
     """
 
-    def __init__(self, timeout: float = 30.0):
+    def __init__(self, timeout: float = 30.0, http_client: Optional[httpx.AsyncClient] = None):
         self.timeout = timeout
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = http_client
+        self._owns_client = http_client is None
         self.api_key = settings.BLS_API_KEY
 
     async def __aenter__(self) -> "BLSClient":
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=timed_transport("bls"))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self._client:
+        # A shared client (get_bls_client) stays open for the next request
+        if self._client and self._owns_client:
             await self._client.aclose()
             self._client = None
 
     @property
     def client(self) -> httpx.AsyncClient:
         if self._client is None:
-            raise RuntimeError("Client not initialized. Use 'async with BLSClient() as client:'")
+            raise RuntimeError("Client not initialized. Use 'async with BLSClient() as client:' or get_bls_client()")
         return self._client
 
     def _parse_float(self, value: Any) -> Optional[float]:
@@ -228,8 +246,17 @@ class BLSClient:
         """
         Fetch data for one or more BLS series.
 
+        Series are answered from the series cache (app.services.bls_cache)
+        where possible and only the rest are requested from the API. Stale
+        cached series are returned as-is and refreshed in the background.
+
+        Series already being fetched by a concurrent call are waited for
+        rather than requested again, and the remainder is split into
+        requests within the API's per-request series limit, sent
+        concurrently.
+
         Args:
-            series_ids: List of BLS series IDs (max 50)
+            series_ids: List of BLS series IDs
             start_year: Start year (defaults to 3 years ago)
             end_year: End year (defaults to current year)
             catalog: Include catalog metadata (requires API key)
@@ -241,7 +268,95 @@ class BLSClient:
             end_year = datetime.now().year
         if not start_year:
             start_year = end_year - 3
+        # Catalog metadata is only requested with an API key
+        catalog = bool(catalog and self.api_key)
+
+        keys = {series_id: (series_id, start_year, end_year, catalog) for series_id in series_ids}
+        cached = await bls_series_cache.get_many(keys.values()) if settings.BLS_CACHE_ENABLED else {}
+        raw = {series_id: cached[key].payload for series_id, key in keys.items() if key in cached}
 
+        status, response_time, message = "REQUEST_SUCCEEDED", 0, []
+        to_fetch = [series_id for series_id, key in keys.items() if key not in cached]
+        if to_fetch:
+            fetched = await self._fetch_coalesced(to_fetch, start_year, end_year, catalog)
+            status, response_time, message = fetched.status, fetched.response_time, fetched.message
+            raw.update(fetched.series)
+
+        now = time.time()
+        stale = [series_id for series_id, key in keys.items() if key in cached and not cached[key].is_fresh(now)]
+        if stale:
+            _revalidate_in_background(stale, start_year, end_year, catalog)
+
+        return BLSResponse(
+            status=status,
+            response_time=response_time,
+            message=message,
+            series=[self._parse_series(raw[series_id]) for series_id in keys if series_id in raw],
+        )
+
+    async def _fetch_coalesced(
+        self,
+        series_ids: List[str],
+        start_year: int,
+        end_year: int,
+        catalog: bool,
+    ) -> "_Fetched":
+        """Fetch series, joining fetches already in flight for any of them (singleflight)."""
+        loop = asyncio.get_running_loop()
+        flights: Dict[asyncio.Task, None] = {}  # ordered set
+        owned = []
+        for series_id in series_ids:
+            flight = _in_flight.get(cache_key((series_id, start_year, end_year, catalog)))
+            if flight is not None and flight.get_loop() is loop:
+                flights[flight] = None
+            else:
+                owned.append(series_id)
+
+        if owned:
+            # A task rather than a plain await: callers that joined it still
+            # get their series if the one that started it is cancelled
+            flight = loop.create_task(self._fetch_chunked(owned, start_year, end_year, catalog))
+            keys = [cache_key((series_id, start_year, end_year, catalog)) for series_id in owned]
+            for key in keys:
+                _in_flight[key] = flight
+            flight.add_done_callback(lambda task: _land(task, keys))
+            flights[flight] = None
+
+        if len(owned) < len(series_ids):
+            logger.debug(f"BLS: {len(series_ids) - len(owned)} series joined fetches already in flight")
+        return _merge([await asyncio.shield(flight) for flight in flights])
+
+    async def _fetch_chunked(
+        self,
+        series_ids: List[str],
+        start_year: int,
+        end_year: int,
+        catalog: bool,
+    ) -> "_Fetched":
+        """Fetch series in concurrent requests of at most the API's series limit."""
+        size = BLS_MAX_SERIES_PER_REQUEST if self.api_key else BLS_MAX_SERIES_PER_REQUEST_UNREGISTERED
+        chunks = [series_ids[i:i + size] for i in range(0, len(series_ids), size)]
+        results = await asyncio.gather(*(
+            self._fetch_and_cache(chunk, start_year, end_year, catalog) for chunk in chunks
+        ))
+        return _merge([
+            _Fetched(
+                series=fetched,
+                status=result.get("status", "UNKNOWN"),
+                response_time=result.get("responseTime", 0),
+                message=result.get("message", []),
+            )
+            for result, fetched in results
+        ])
+
+    async def _fetch_and_cache(
+        self,
+        series_ids: List[str],
+        start_year: int,
+        end_year: int,
+        catalog: bool,
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """POST series to the BLS API; returns the raw result and its series by ID."""
         # Build request payload
         payload: Dict[str, Any] = {
             "seriesid": series_ids,
@@ -266,35 +381,40 @@ class BLSClient:
         resp.raise_for_status()
         result = resp.json()
 
-        # Parse response
-        series_list = []
-        for series in result.get("Results", {}).get("series", []):
-            catalog_info = series.get("catalog", {})
-
-            data_points = []
-            for item in series.get("data", []):
-                data_points.append(BLSDataPoint(
-                    year=item.get("year", ""),
-                    period=item.get("period", ""),
-                    period_name=item.get("periodName", ""),
-                    value=item.get("value", ""),
-                    latest=item.get("latest"),
-                    footnotes=item.get("footnotes", []),
-                ))
-
-            series_list.append(BLSSeriesData(
-                series_id=series.get("seriesID", ""),
-                series_title=catalog_info.get("series_title"),
-                survey_name=catalog_info.get("survey_name"),
-                area=catalog_info.get("area"),
-                data=data_points,
+        fetched = {
+            series.get("seriesID", ""): series
+            for series in result.get("Results", {}).get("series", [])
+        }
+        # Failed requests (e.g. quota exceeded) come back as 200s with another status
+        if settings.BLS_CACHE_ENABLED and result.get("status") == "REQUEST_SUCCEEDED":
+            await bls_series_cache.put_many({
+                (series_id, start_year, end_year, catalog): series
+                for series_id, series in fetched.items()
+                if series_id in series_ids
+            })
+        return result, fetched
+
+    def _parse_series(self, series: Dict[str, Any]) -> BLSSeriesData:
+        """Build BLSSeriesData from a series object of the API response."""
+        catalog_info = series.get("catalog", {})
+
+        data_points = []
+        for item in series.get("data", []):
+            data_points.append(BLSDataPoint(
+                year=item.get("year", ""),
+                period=item.get("period", ""),
+                period_name=item.get("periodName", ""),
+                value=item.get("value", ""),
+                latest=item.get("latest"),
+                footnotes=item.get("footnotes", []),
             ))
 
-        return BLSResponse(
-            status=result.get("status", "UNKNOWN"),
-            response_time=result.get("responseTime", 0),
-            message=result.get("message", []),
-            series=series_list,
+        return BLSSeriesData(
+            series_id=series.get("seriesID", ""),
+            series_title=catalog_info.get("series_title"),
+            survey_name=catalog_info.get("survey_name"),
+            area=catalog_info.get("area"),
+            data=data_points,
         )
 
     async def get_unemployment_rates(
@@ -498,10 +618,10 @@ class BLSClient:
         else:
             # Assume it's a raw SOC code (6 digits, no hyphen)
             occ_code = occupation.replace("-", "")
-            # Look up the occupation name from our SOC database
-            soc_occ = get_occupation_by_code(occ_code)
-            if soc_occ:
-                occ_name = soc_occ.title
+            # Look up the occupation name from the SOC/projections index
+            entry = occupation_index.get(occ_code)
+            if entry:
+                occ_name = entry.title
             else:
                 occ_name = f"SOC {occ_code[:2]}-{occ_code[2:]}"
 
@@ -540,7 +660,7 @@ class BLSClient:
         if not series_ids:
             return []
 
-        # Fetch all series (disable catalog to allow up to 50 series per request)
+        # Fetch all series (fetch_series batches them to the API's per-request limit)
         response = await self.fetch_series(series_ids, start_year, end_year, catalog=False)
 
         # Aggregate data by area
@@ -611,3 +731,75 @@ class BLSClient:
     def get_available_oes_areas(self) -> Dict[str, Dict[str, str]]:
         """Get list of areas available for OES queries."""
         return OES_AREAS
+
+
+async def get_bls_client() -> BLSClient:
+    """FastAPI dependency: a BLSClient on the process-wide connection pool."""
+    return BLSClient(http_client=http_clients.get("bls"))
+
+
+@dataclass
+class _Fetched:
+    """Series fetched from the API with the (combined) response status."""
+    series: Dict[str, Dict[str, Any]]
+    status: str
+    response_time: int
+    message: List[str]
+
+
+def _merge(results: List[_Fetched]) -> _Fetched:
+    """Combine responses: all series, the first failed status, the slowest time, every message."""
+    merged = _Fetched(series={}, status="REQUEST_SUCCEEDED", response_time=0, message=[])
+    for result in results:
+        merged.series.update(result.series)
+        if merged.status == "REQUEST_SUCCEEDED":
+            merged.status = result.status
+        merged.response_time = max(merged.response_time, result.response_time)
+        merged.message.extend(m for m in result.message if m not in merged.message)
+    return merged
+
+
+# Cache key -> task fetching that series from the API, for concurrent callers to join
+_in_flight: Dict[str, asyncio.Task] = {}
+
+
+def _land(flight: asyncio.Task, keys: List[str]) -> None:
+    for key in keys:
+        if _in_flight.get(key) is flight:
+            del _in_flight[key]
+    # Consumed here as well, in case every caller waiting on it was cancelled
+    if not flight.cancelled():
+        flight.exception()
+
+
+# Cache keys being refreshed, and the tasks refreshing them
+_revalidating: Set[str] = set()
+_revalidation_tasks: Set[asyncio.Task] = set()
+
+
+def _revalidate_in_background(series_ids: List[str], start_year: int, end_year: int, catalog: bool) -> None:
+    """Refresh stale cached series without holding up the request that served them."""
+    pending = [
+        series_id for series_id in series_ids
+        if cache_key((series_id, start_year, end_year, catalog)) not in _revalidating
+    ]
+    if not pending:
+        return
+    _revalidating.update(cache_key((series_id, start_year, end_year, catalog)) for series_id in pending)
+    task = asyncio.create_task(_revalidate(pending, start_year, end_year, catalog))
+    _revalidation_tasks.add(task)
+    task.add_done_callback(_revalidation_tasks.discard)
+
+
+async def _revalidate(series_ids: List[str], start_year: int, end_year: int, catalog: bool) -> None:
+    # Runs past the request that started it, so its deadline doesn't apply
+    deadline_var.set(None)
+    try:
+        client = BLSClient(http_client=http_clients.get("bls"))
+        await client._fetch_chunked(series_ids, start_year, end_year, catalog)
+    except Exception as e:
+        logger.warning(f"BLS cache: background refresh of {len(series_ids)} series failed: {e}")
+    finally:
+        _revalidating.difference_update(
+            cache_key((series_id, start_year, end_year, catalog)) for series_id in series_ids
+        )
@@ -0,0 +1,292 @@
+"""
+Course Autocomplete Index
+
+Process-local prefix index over "SUBJ NUM title" for course pickers
+(requisites, cross-listings, program builders) that query on every keystroke.
+
+The index is a sorted list of (normalized key, course id) pairs; a prefix
+lookup is a binary search followed by a short forward scan, so answering a
+query never touches the database. Each course is indexed under:
+- "math 101 introduction to algebra"  (full code + title)
+- "math101"                           (compact code)
+- "algebra", "to algebra", ...        (each word position in the title)
+
+The index is built from the database on first use, kept current by session
+events as courses are created, updated or deleted in this process, and
+rebuilt after COURSE_AUTOCOMPLETE_MAX_AGE_SECONDS to pick up writes made by
+other workers. Builds read only the indexed columns, in a worker thread;
+once the index exists, stale rebuilds run in the background while lookups
+keep using the current index, and changes committed during a rebuild are
+applied again on top of it.
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.course import Course, CourseStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AutocompleteEntry:
+    """Immutable snapshot of the course fields autocomplete returns."""
+    id: uuid.UUID
+    subject_code: str
+    course_number: str
+    title: str
+    status: CourseStatus
+    department_id: Optional[uuid.UUID]
+
+    @classmethod
+    def from_course(cls, course: Any) -> "AutocompleteEntry":
+        """From a Course, or a row of INDEXED_COLUMNS."""
+        return cls(
+            id=course.id,
+            subject_code=course.subject_code or "",
+            course_number=course.course_number or "",
+            title=course.title or "",
+            status=course.status,
+            department_id=course.department_id,
+        )
+
+
+# The Course columns an entry is built from (loaded without the text fields)
+INDEXED_COLUMNS = (
+    Course.id,
+    Course.subject_code,
+    Course.course_number,
+    Course.title,
+    Course.status,
+    Course.department_id,
+)
+
+
+def normalize(value: str) -> str:
+    """Lowercase and collapse whitespace so keys and queries compare equal."""
+    return " ".join(value.lower().split())
+
+
+def index_keys(entry: AutocompleteEntry) -> List[str]:
+    """All keys a course is reachable under."""
+    code = normalize(f"{entry.subject_code} {entry.course_number}")
+    title_words = normalize(entry.title).split()
+    keys = {
+        normalize(f"{code} {entry.title}"),
+        code.replace(" ", ""),
+    }
+    for i in range(len(title_words)):
+        keys.add(" ".join(title_words[i:]))
+    keys.discard("")
+    return sorted(keys)
+
+
+class CourseAutocompleteIndex:
+    """Thread-safe sorted prefix index of courses."""
+
+    def __init__(self, max_age_seconds: int = 300):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, uuid.UUID]] = []
+        self._entries: Dict[uuid.UUID, AutocompleteEntry] = {}
+        self._built_at: Optional[float] = None
+        # Changes seen while a rebuild reads the database (id -> entry, None if removed)
+        self._changes_during_load: Optional[Dict[uuid.UUID, Optional[AutocompleteEntry]]] = None
+        self._loading: Optional[asyncio.Task] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def tracks_changes(self) -> bool:
+        """Whether committed course changes need applying (built, or being built)."""
+        return self._built_at is not None or self._changes_during_load is not None
+
+    @property
+    def is_stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------------------------------------------------------------
+    # Building and incremental updates
+    # -------------------------------------------------------------------------
+
+    def build(self, entries: List[AutocompleteEntry]) -> None:
+        """Replace the index contents with `entries`."""
+        keys = sorted(
+            (key, entry.id) for entry in entries for key in index_keys(entry)
+        )
+        with self._lock:
+            self._keys = keys
+            self._entries = {entry.id: entry for entry in entries}
+            self._built_at = time.monotonic()
+            changes, self._changes_during_load = self._changes_during_load, None
+            for course_id, entry in (changes or {}).items():
+                self._remove_locked(course_id)
+                if entry is not None:
+                    self._insert_locked(entry)
+
+    def load(self) -> None:
+        """Rebuild the index from the database (blocking; see ensure_loaded)."""
+        with self._lock:
+            self._changes_during_load = {}
+        try:
+            with Session(engine) as session:
+                rows = session.exec(select(*INDEXED_COLUMNS)).all()
+        except BaseException:
+            with self._lock:
+                self._changes_during_load = None
+            raise
+        self.build([AutocompleteEntry.from_course(row) for row in rows])
+        logger.info(f"Course autocomplete: indexed {len(rows)} courses")
+
+    async def _load_in_background(self) -> None:
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logger.warning(f"Course autocomplete: loading the index failed: {e}")
+            raise
+
+    async def ensure_loaded(self) -> None:
+        """
+        Build the index on first use (waiting for it), or start a background
+        rebuild once it is stale and return straight away.
+
+        Concurrent callers share one build.
+        """
+        if not self.is_stale:
+            return
+        loading = self._loading
+        if loading is None or loading.done() or loading.get_loop() is not asyncio.get_running_loop():
+            loading = self._loading = asyncio.get_running_loop().create_task(self._load_in_background())
+            # Retrieve the exception of a background rebuild nobody awaits
+            loading.add_done_callback(lambda task: task.cancelled() or task.exception())
+        if not self.is_built:
+            await asyncio.shield(loading)
+
+    def upsert(self, entry: AutocompleteEntry) -> None:
+        """Add a course or replace its previous keys."""
+        with self._lock:
+            self._remove_locked(entry.id)
+            self._insert_locked(entry)
+            if self._changes_during_load is not None:
+                self._changes_during_load[entry.id] = entry
+
+    def remove(self, course_id: uuid.UUID) -> None:
+        """Drop a course from the index."""
+        with self._lock:
+            self._remove_locked(course_id)
+            if self._changes_during_load is not None:
+                self._changes_during_load[course_id] = None
+
+    def _insert_locked(self, entry: AutocompleteEntry) -> None:
+        for key in index_keys(entry):
+            bisect.insort(self._keys, (key, entry.id))
+        self._entries[entry.id] = entry
+
+    def _remove_locked(self, course_id: uuid.UUID) -> None:
+        old = self._entries.pop(course_id, None)
+        if old is None:
+            return
+        for key in index_keys(old):
+            i = bisect.bisect_left(self._keys, (key, course_id))
+            if i < len(self._keys) and self._keys[i] == (key, course_id):
+                del self._keys[i]
+
+    def clear(self) -> None:
+        """Empty the index; it is rebuilt on next use."""
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            self._built_at = None
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def search(
+        self,
+        q: str,
+        limit: int = 10,
+        status: Optional[CourseStatus] = None,
+        exclude_id: Optional[uuid.UUID] = None,
+    ) -> List[AutocompleteEntry]:
+        """
+        Return up to `limit` courses with a key starting with `q`.
+
+        Matches come back in key order, so code queries ("MATH 1") list
+        courses by subject and number.
+        """
+        prefix = normalize(q)
+        if not prefix:
+            return []
+
+        results: List[AutocompleteEntry] = []
+        seen = set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(results) < limit:
+                key, course_id = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                i += 1
+                if course_id in seen or course_id == exclude_id:
+                    continue
+                seen.add(course_id)
+                entry = self._entries[course_id]
+                if status is not None and entry.status != status:
+                    continue
+                results.append(entry)
+        return results
+
+
+course_autocomplete_index = CourseAutocompleteIndex(settings.COURSE_AUTOCOMPLETE_MAX_AGE_SECONDS)
+
+
+# =============================================================================
+# Session events: apply committed course changes to the index
+# =============================================================================
+
+@event.listens_for(SASession, "after_flush")
+def _collect_course_changes(session, flush_context):
+    if not course_autocomplete_index.tracks_changes:
+        return
+    changes = session.info.setdefault("autocomplete_changes", {})
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Course):
+            changes[obj.id] = AutocompleteEntry.from_course(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Course):
+            changes[obj.id] = None
+
+
+@event.listens_for(SASession, "after_commit")
+def _apply_course_changes(session):
+    changes = session.info.pop("autocomplete_changes", None)
+    if not changes:
+        return
+    for course_id, entry in changes.items():
+        if entry is None:
+            course_autocomplete_index.remove(course_id)
+        else:
+            course_autocomplete_index.upsert(entry)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_course_changes(session):
+    session.info.pop("autocomplete_changes", None)
@@ -0,0 +1,184 @@
+"""
+Course Search Service
+
+Full-text and trigram search over courses, used by the course list and
+search endpoints.
+
+Search runs against `courses.search_vector`, a weighted tsvector (code and
+title, catalog description, SLO text, content topics) kept current by
+database triggers. When the pg_trgm extension is installed, substring and
+fuzzy matches on the title and "SUBJ NUM" code are served by trigram GIN
+indexes (see the `add_course_search` migration).
+
+Databases that have not been migrated yet fall back to plain ILIKE matching,
+so the endpoints keep working, just without ranking or highlights.
+"""
+
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import case, func, literal, literal_column, or_, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.course import Course
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used by the search_vector triggers
+SEARCH_CONFIG = "english"
+
+# ts_headline options for result snippets
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+# Seconds before a probe that failed or found no search_vector (not yet
+# migrated) is repeated; a successful probe is kept for the process
+CAPABILITIES_RETRY_SECONDS = 60.0
+
+_CAPABILITIES_SQL = text("""
+    SELECT
+        EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'courses' AND column_name = 'search_vector'
+        ) AS fulltext,
+        EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AS trigram
+""")
+
+
+@dataclass(frozen=True)
+class SearchCapabilities:
+    """Which search features the connected database supports."""
+    fulltext: bool = False
+    trigram: bool = False
+
+
+_capabilities: Optional[SearchCapabilities] = None
+_capabilities_expire_at = 0.0  # time.monotonic() after which to probe again
+
+
+def _cached_capabilities() -> Optional[SearchCapabilities]:
+    if _capabilities is not None and time.monotonic() < _capabilities_expire_at:
+        return _capabilities
+    return None
+
+
+def _detect_capabilities(session: Session) -> SearchCapabilities:
+    """
+    Probe the database for search_vector and pg_trgm. A probe that finds
+    search_vector is cached for the process; otherwise it is repeated after
+    CAPABILITIES_RETRY_SECONDS, so a worker started before the migration (or
+    during a database hiccup) picks up full-text search without a restart.
+    """
+    global _capabilities, _capabilities_expire_at
+    capabilities = _cached_capabilities()
+    if capabilities is not None:
+        return capabilities
+    try:
+        row = session.connection().execute(_CAPABILITIES_SQL).one()
+        capabilities = SearchCapabilities(fulltext=bool(row.fulltext), trigram=bool(row.trigram))
+    except Exception as e:
+        logger.warning(f"Course search: capability probe failed, using ILIKE fallback: {e}")
+        capabilities = SearchCapabilities()
+    else:
+        if not capabilities.fulltext:
+            logger.info("Course search: courses.search_vector missing; run migrations for full-text search")
+    _capabilities = capabilities
+    _capabilities_expire_at = math.inf if capabilities.fulltext else time.monotonic() + CAPABILITIES_RETRY_SECONDS
+    return capabilities
+
+
+def get_search_capabilities(session: Session) -> SearchCapabilities:
+    """Search capabilities for a sync session (cached once detected)."""
+    return _detect_capabilities(session)
+
+
+async def get_search_capabilities_async(session: AsyncSession) -> SearchCapabilities:
+    """Search capabilities for an async session (cached once detected)."""
+    capabilities = _cached_capabilities()
+    if capabilities is not None:
+        return capabilities
+    return await session.run_sync(_detect_capabilities)
+
+
+def reset_search_capabilities() -> None:
+    """Forget cached capabilities (e.g. after running migrations in tests)."""
+    global _capabilities, _capabilities_expire_at
+    _capabilities = None
+    _capabilities_expire_at = 0.0
+
+
+def _prefix_tsquery(q: str) -> Optional[str]:
+    """
+    Turn free text into a prefix tsquery string, e.g. "intro calc" ->
+    "intro:* & calc:*", so partially typed words still match.
+    """
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+class CourseSearch:
+    """
+    SQL expressions for one search query.
+
+    Usage:
+        search = CourseSearch(q, get_search_capabilities(session))
+        query = (
+            select(Course, search.rank().label("rank"), search.highlight().label("highlight"))
+            .where(search.condition())
+            .order_by(search.rank().desc())
+        )
+    """
+
+    def __init__(self, q: str, capabilities: SearchCapabilities):
+        self.q = q.strip()
+        self.capabilities = capabilities
+        self.code = literal_column("(courses.subject_code || ' ' || courses.course_number)")
+        self.search_vector = literal_column("courses.search_vector", TSVECTOR)
+        tsquery = _prefix_tsquery(self.q) if capabilities.fulltext else None
+        self.tsquery = (
+            func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), tsquery)
+            if tsquery else None
+        )
+
+    def condition(self) -> ColumnElement:
+        """WHERE clause matching courses for this query."""
+        # Every arm has an index (title and code trigram, search_vector GIN) so
+        # Postgres can OR bitmap scans; one unindexed arm means a seq scan. A
+        # subject or number match is also a match on the combined code.
+        pattern = f"%{self.q}%"
+        clauses = [
+            Course.title.ilike(pattern),
+            self.code.ilike(pattern),
+        ]
+        if self.tsquery is not None:
+            clauses.append(self.search_vector.op("@@")(self.tsquery))
+        if self.capabilities.trigram:
+            clauses.append(Course.title.op("%")(self.q))
+        return or_(*clauses)
+
+    def rank(self) -> ColumnElement:
+        """Relevance score (higher is better); 0 without full-text support."""
+        score = case((self.code.ilike(f"{self.q}%"), 1.0), else_=0.0)
+        if self.tsquery is not None:
+            # Normalization 32 scales rank into [0, 1)
+            score = score + func.coalesce(func.ts_rank_cd(self.search_vector, self.tsquery, 32), 0.0)
+        if self.capabilities.trigram:
+            score = score + func.similarity(Course.title, self.q)
+        return score
+
+    def highlight(self) -> ColumnElement:
+        """Snippet of title and description with matches wrapped in <mark>."""
+        if self.tsquery is None:
+            return literal(None)
+        document = func.concat_ws(". ", Course.title, Course.catalog_description)
+        return func.ts_headline(
+            literal_column(f"'{SEARCH_CONFIG}'"), document, self.tsquery, HEADLINE_OPTIONS
+        )
@@ -0,0 +1,350 @@
+"""
+Course Status Statistics Service
+
+Pre-aggregated course totals per (department, status) in the
+`course_status_stats` table, used by the dashboard analytics/stats and the
+approval-count endpoints instead of scanning courses and workflow history.
+
+The table is maintained incrementally from session events, inside the same
+transaction as the change that caused it:
+- a course created, deleted, or moved to another status or department
+  (e.g. approvals.transition_course_status) moves its count, and its
+  updated_at for average-age figures, between rows
+- a course workflow history record bumps `entered_count` on the target status
+  and, for returns from a review status to Draft, `returned_count` on the
+  source status
+
+Counters are applied with INSERT ... ON CONFLICT DO UPDATE, so concurrent
+transitions in different workers add up correctly. Changes made outside the
+ORM (raw SQL, bulk updates) are not seen; rebuild_course_stats() recomputes
+the table from scratch.
+
+Databases that have not been migrated yet (no `course_status_stats` table)
+fall back to aggregating courses and workflow history directly.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.course import Course, CourseStatus, CourseStatusStats
+from app.models.workflow import EntityType, WorkflowHistory
+
+logger = logging.getLogger(__name__)
+
+REVIEW_STATUSES = (
+    CourseStatus.DEPT_REVIEW,
+    CourseStatus.CURRICULUM_COMMITTEE,
+    CourseStatus.ARTICULATION_REVIEW,
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Per-key counter deltas: (course_count, updated_at_sum, entered_count, returned_count)
+Delta = List[float]
+StatsKey = Tuple[uuid.UUID, CourseStatus]
+
+
+def _epoch_seconds(value: Optional[datetime]) -> float:
+    return (value - _EPOCH).total_seconds() if value is not None else 0.0
+
+
+# =============================================================================
+# Reading totals
+# =============================================================================
+
+@dataclass
+class StatusTotals:
+    """Course totals per status for one scope (all, a department, or a creator)."""
+    course_count: Dict[CourseStatus, int] = field(default_factory=dict)
+    updated_at_sum: Dict[CourseStatus, float] = field(default_factory=dict)
+    entered_count: Dict[CourseStatus, int] = field(default_factory=dict)
+    returned_count: Dict[CourseStatus, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.course_count.values())
+
+    def count(self, statuses: Iterable[CourseStatus]) -> int:
+        """Courses currently in any of `statuses`."""
+        return sum(self.course_count.get(s, 0) for s in statuses)
+
+    @property
+    def approvals(self) -> int:
+        """Transitions to Approved."""
+        return self.entered_count.get(CourseStatus.APPROVED, 0)
+
+    @property
+    def returns(self) -> int:
+        """Transitions from a review status back to Draft."""
+        return sum(self.returned_count.get(s, 0) for s in REVIEW_STATUSES)
+
+    def average_age_days(self, statuses: Iterable[CourseStatus], now: Optional[datetime] = None) -> Optional[float]:
+        """Average days since last update for courses in `statuses`, or None if there are none."""
+        statuses = list(statuses)
+        count = self.count(statuses)
+        if not count:
+            return None
+        now_seconds = _epoch_seconds(now or datetime.utcnow())
+        total_age = now_seconds * count - sum(self.updated_at_sum.get(s, 0.0) for s in statuses)
+        return total_age / count / 86400
+
+
+_stats_available: Optional[bool] = None
+
+
+def _detect_stats_table(session: Session) -> bool:
+    """Probe the database once per process for the course_status_stats table."""
+    global _stats_available
+    if _stats_available is None:
+        bind = session.get_bind()
+        if bind.dialect.name != "postgresql":
+            _stats_available = False
+        else:
+            _stats_available = bool(session.connection().execute(
+                text("SELECT to_regclass('course_status_stats') IS NOT NULL")
+            ).scalar())
+        if not _stats_available:
+            logger.info("Course stats: course_status_stats missing; run migrations for pre-aggregated dashboards")
+    return _stats_available
+
+
+def reset_course_stats_detection() -> None:
+    """Forget the cached table probe (e.g. after running migrations in tests)."""
+    global _stats_available
+    _stats_available = None
+
+
+def _totals_from_rows(rows) -> StatusTotals:
+    totals = StatusTotals()
+    for status, course_count, updated_at_sum, entered_count, returned_count in rows:
+        status = CourseStatus(status) if not isinstance(status, CourseStatus) else status
+        totals.course_count[status] = int(course_count or 0)
+        totals.updated_at_sum[status] = float(updated_at_sum or 0)
+        totals.entered_count[status] = int(entered_count or 0)
+        totals.returned_count[status] = int(returned_count or 0)
+    return totals
+
+
+def _live_totals(session: Session, *conditions) -> StatusTotals:
+    """Aggregate courses and workflow history for courses matching `conditions`."""
+    totals = _totals_from_rows(
+        (status, count, updated_sum, 0, 0)
+        for status, count, updated_sum in session.exec(
+            select(Course.status, func.count(Course.id), func.sum(func.extract("epoch", Course.updated_at)))
+            .where(*conditions)
+            .group_by(Course.status)
+        ).all()
+    )
+
+    history = (
+        select(WorkflowHistory.from_status, WorkflowHistory.to_status, func.count(WorkflowHistory.id))
+        .join(Course, and_(
+            WorkflowHistory.entity_type == EntityType.COURSE,
+            WorkflowHistory.entity_id == Course.id,
+        ))
+        .where(*conditions)
+        .group_by(WorkflowHistory.from_status, WorkflowHistory.to_status)
+    )
+    review_values = {s.value for s in REVIEW_STATUSES}
+    for from_status, to_status, count in session.exec(history).all():
+        if to_status in CourseStatus._value2member_map_:
+            target = CourseStatus(to_status)
+            totals.entered_count[target] = totals.entered_count.get(target, 0) + count
+        if to_status == CourseStatus.DRAFT.value and from_status in review_values:
+            source = CourseStatus(from_status)
+            totals.returned_count[source] = totals.returned_count.get(source, 0) + count
+    return totals
+
+
+def load_status_totals(
+    session: Session,
+    department_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+) -> StatusTotals:
+    """
+    Course totals per status.
+
+    Reads the pre-aggregated table (at most one row per department and
+    status) for all departments or a single department. Totals scoped to a
+    course creator are not pre-aggregated and are computed live.
+    """
+    if created_by is not None:
+        conditions = [Course.created_by == created_by]
+        if department_id is not None:
+            conditions.append(Course.department_id == department_id)
+        return _live_totals(session, *conditions)
+
+    if not _detect_stats_table(session):
+        conditions = [Course.department_id == department_id] if department_id is not None else []
+        return _live_totals(session, *conditions)
+
+    query = select(
+        CourseStatusStats.status,
+        func.sum(CourseStatusStats.course_count),
+        func.sum(CourseStatusStats.updated_at_sum),
+        func.sum(CourseStatusStats.entered_count),
+        func.sum(CourseStatusStats.returned_count),
+    ).group_by(CourseStatusStats.status)
+    if department_id is not None:
+        query = query.where(CourseStatusStats.department_id == department_id)
+    return _totals_from_rows(session.exec(query).all())
+
+
+async def load_status_totals_async(
+    session: AsyncSession,
+    department_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+) -> StatusTotals:
+    """load_status_totals() for an async session."""
+    return await session.run_sync(
+        lambda sync_session: load_status_totals(sync_session, department_id=department_id, created_by=created_by)
+    )
+
+
+# =============================================================================
+# Maintenance
+# =============================================================================
+
+def _committed_value(obj, attr: str):
+    """Value of `attr` as of the last flush/load (before pending changes)."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+
+def _add(deltas: Dict[StatsKey, Delta], department_id, status, count=0, updated_at_sum=0.0, entered=0, returned=0):
+    if department_id is None or status is None:
+        return
+    delta = deltas[(department_id, CourseStatus(status))]
+    delta[0] += count
+    delta[1] += updated_at_sum
+    delta[2] += entered
+    delta[3] += returned
+
+
+def _history_department(session, history: WorkflowHistory) -> Optional[uuid.UUID]:
+    course = session.identity_map.get(session.identity_key(Course, history.entity_id))
+    if course is not None:
+        return course.department_id
+    return session.connection().execute(
+        select(Course.department_id).where(Course.id == history.entity_id)
+    ).scalar()
+
+
+def collect_deltas(session) -> Dict[StatsKey, Delta]:
+    """Counter changes implied by the objects in a flush."""
+    deltas: Dict[StatsKey, Delta] = defaultdict(lambda: [0, 0.0, 0, 0])
+    review_values = {s.value for s in REVIEW_STATUSES}
+
+    for obj in session.new:
+        if isinstance(obj, Course):
+            _add(deltas, obj.department_id, obj.status, 1, _epoch_seconds(obj.updated_at))
+        elif isinstance(obj, WorkflowHistory) and obj.entity_type == EntityType.COURSE:
+            if obj.to_status not in CourseStatus._value2member_map_:
+                continue
+            department_id = _history_department(session, obj)
+            _add(deltas, department_id, obj.to_status, entered=1)
+            if obj.to_status == CourseStatus.DRAFT.value and obj.from_status in review_values:
+                _add(deltas, department_id, obj.from_status, returned=1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Course):
+            _add(
+                deltas, _committed_value(obj, "department_id"), _committed_value(obj, "status"),
+                -1, -_epoch_seconds(_committed_value(obj, "updated_at")),
+            )
+
+    for obj in session.dirty:
+        if not isinstance(obj, Course):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[a].history.has_changes() for a in ("department_id", "status", "updated_at")):
+            continue
+        _add(
+            deltas, _committed_value(obj, "department_id"), _committed_value(obj, "status"),
+            -1, -_epoch_seconds(_committed_value(obj, "updated_at")),
+        )
+        _add(deltas, obj.department_id, obj.status, 1, _epoch_seconds(obj.updated_at))
+
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+def apply_deltas(connection, deltas: Dict[StatsKey, Delta]) -> None:
+    """Add counter deltas to course_status_stats (upserting missing rows)."""
+    table = CourseStatusStats.__table__
+    # Fixed key order keeps concurrent transactions from deadlocking on row locks
+    for (department_id, status), (count, updated_sum, entered, returned) in sorted(
+        deltas.items(), key=lambda item: (str(item[0][0]), item[0][1].name)
+    ):
+        stmt = insert(table).values(
+            department_id=department_id,
+            status=status,
+            course_count=count,
+            updated_at_sum=updated_sum,
+            entered_count=entered,
+            returned_count=returned,
+        )
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.department_id, table.c.status],
+            set_={
+                "course_count": table.c.course_count + stmt.excluded.course_count,
+                "updated_at_sum": table.c.updated_at_sum + stmt.excluded.updated_at_sum,
+                "entered_count": table.c.entered_count + stmt.excluded.entered_count,
+                "returned_count": table.c.returned_count + stmt.excluded.returned_count,
+            },
+        ))
+
+
+def rebuild_course_stats(session: Session) -> None:
+    """Recompute course_status_stats from courses and workflow history (caller commits)."""
+    session.exec(delete(CourseStatusStats))
+    session.exec(text("""
+        INSERT INTO course_status_stats
+            (department_id, status, course_count, updated_at_sum, entered_count, returned_count)
+        SELECT department_id, status, count(*), sum(extract(epoch FROM updated_at)), 0, 0
+        FROM courses
+        GROUP BY department_id, status
+    """))
+    deltas: Dict[StatsKey, Delta] = defaultdict(lambda: [0, 0.0, 0, 0])
+    review_values = {s.value for s in REVIEW_STATUSES}
+    rows = session.exec(
+        select(Course.department_id, WorkflowHistory.from_status, WorkflowHistory.to_status, func.count())
+        .join(Course, and_(
+            WorkflowHistory.entity_type == EntityType.COURSE,
+            WorkflowHistory.entity_id == Course.id,
+        ))
+        .group_by(Course.department_id, WorkflowHistory.from_status, WorkflowHistory.to_status)
+    ).all()
+    for department_id, from_status, to_status, count in rows:
+        if to_status in CourseStatus._value2member_map_:
+            _add(deltas, department_id, to_status, entered=count)
+        if to_status == CourseStatus.DRAFT.value and from_status in review_values:
+            _add(deltas, department_id, from_status, returned=count)
+    apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(SASession, "after_flush")
+def _maintain_course_stats(session, flush_context):
+    if not any(
+        isinstance(obj, (Course, WorkflowHistory))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        return
+    if not _detect_stats_table(session):
+        return
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
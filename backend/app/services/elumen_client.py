@@ -20,6 +20,8 @@ from enum import Enum
 import httpx
 from pydantic import BaseModel, Field
 
+from app.core.metrics import timed_sync_transport, timed_transport
+
 
 # API Configuration
 BASE_URL = "https://portalapi-laccd.elumenapp.com"
@@ -314,6 +316,7 @@ class eLumenClient:
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=self.timeout,
+            transport=timed_transport("elumen"),
             headers={
                 "authorization": "public-token",
                 "Accept": "application/json",
@@ -636,6 +639,7 @@ class SynceLumenClient:
         self._client = httpx.Client(
             base_url=base_url,
             timeout=timeout,
+            transport=timed_sync_transport("elumen"),
             headers={
                 "authorization": "public-token",
                 "Accept": "application/json",
@@ -25,6 +25,10 @@ import hashlib
 import google.generativeai as genai
 # from google.generativeai import caching
 
+from app.core.config import settings
+from app.core.deadlines import timeout_for
+from app.core.metrics import track_external_call
+
 logger = logging.getLogger(__name__)
 
 
@@ -370,9 +374,13 @@ Format citations as [Source: document_name, Section: section_name].
 
         full_prompt += f"Question: {query}"
 
+        request_options = {"timeout": timeout_for(settings.GEMINI_TIMEOUT_SECONDS)}
         try:
             # Generate with file context
-            response = self.model.generate_content([*files_to_use, full_prompt])
+            with track_external_call("gemini"):
+                response = await self.model.generate_content_async(
+                    [*files_to_use, full_prompt], request_options=request_options
+                )
 
             # Extract citations from response
             citations = []
@@ -408,8 +416,10 @@ Format citations as [Source: document_name, Section: section_name].
             full_prompt = f"{system_prompt}\n\n---\n\n"
         full_prompt += query
 
+        request_options = {"timeout": timeout_for(settings.GEMINI_TIMEOUT_SECONDS)}
         try:
-            response = self.model.generate_content(full_prompt)
+            with track_external_call("gemini"):
+                response = await self.model.generate_content_async(full_prompt, request_options=request_options)
             return RAGResponse(
                 text=response.text,
                 citations=[],
@@ -13,6 +13,10 @@ from typing import Optional, List, Dict, Any
 from google import genai
 from google.genai import types
 
+from app.core.config import settings
+from app.core.deadlines import timeout_for
+from app.core.metrics import track_external_call
+
 logger = logging.getLogger(__name__)
 
 # System prompt for curriculum assistant
@@ -82,6 +86,12 @@ def get_api_key() -> str:
     raise ValueError("Google API key not found. Set GOOGLE_API_KEY environment variable.")
 
 
+def _http_options() -> types.HttpOptions:
+    """Per-call timeout: GEMINI_TIMEOUT_SECONDS, shrunk to the request deadline."""
+    timeout = timeout_for(settings.GEMINI_TIMEOUT_SECONDS)
+    return types.HttpOptions(timeout=max(int(timeout * 1000), 1))  # milliseconds
+
+
 class GeminiService:
     """Service for interacting with Google Gemini AI using the new google-genai SDK."""
 
@@ -139,15 +149,18 @@ class GeminiService:
 
         full_prompt = f"{system_prompt}{context_str}\n\n---\n\nUser request: {prompt}"
 
+        http_options = _http_options()
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    max_output_tokens=4096,
+            with track_external_call("gemini"):
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=full_prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=0.7,
+                        max_output_tokens=4096,
+                        http_options=http_options,
+                    )
                 )
-            )
 
             return {
                 "text": response.text,
@@ -621,15 +634,18 @@ Do not include placeholder text or generic statements - write content specific t
         """
         self._ensure_configured()
 
+        http_options = _http_options()
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
+            with track_external_call("gemini"):
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=temperature,
+                        max_output_tokens=max_tokens,
+                        http_options=http_options,
+                    )
                 )
-            )
 
             # Debug logging
             logger.info(f"Gemini response - model: {self.model_name}, max_tokens: {max_tokens}")
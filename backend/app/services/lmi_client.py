@@ -12,12 +12,26 @@ Data Source: https://data.ca.gov
 IMPORTANT: The OEWS dataset has SEPARATE ROWS for hourly and annual wages,
 distinguished by the "Wage Type" field. This client fetches hourly wage rows
 and calculates annual wages (hourly * 2080 hours).
+
+Both datasets can be mirrored locally (app.services.lmi_mirror, filled by
+sync_mirror); lookups use the mirror when it has been synced and CKAN
+otherwise.
 """
 
 from typing import Optional, List, Dict, Any
+from datetime import datetime
+import json
+import logging
 import httpx
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.metrics import timed_transport
+from app.services.lmi_mirror import SyncResult, lmi_mirror
+
+logger = logging.getLogger(__name__)
+
 # API Configuration
 CKAN_BASE_URL = "https://data.ca.gov/api/3/action"
 
@@ -28,6 +42,23 @@ RES_ID_WAGES = "aef4c53a-7e17-418c-acc1-d189e39b6caa"
 # Long-Term Occupational Employment Projections (2023-2033)
 RES_ID_OCC_PROJ = "274e273c-d18c-4d84-b8df-49b4d13c14ce"
 
+# Mirrored resources: indexed mirror column -> CKAN field
+MIRRORED_RESOURCES = {
+    RES_ID_WAGES: {
+        "soc_code": "Standard Occupational Classification",
+        "area_name": "Area Name",
+        "year": "Year",
+        "occupation_title": "Occupational Title",
+        "wage_type": "Wage Type",
+    },
+    RES_ID_OCC_PROJ: {
+        "soc_code": "Standard Occupational Classification (SOC)",
+        "area_name": "Area Name",
+        "year": "Period",
+        "occupation_title": "Occupational Title",
+    },
+}
+
 
 class WageData(BaseModel):
     """Occupational wage data from OEWS survey."""
@@ -82,23 +113,26 @@ class LMIClient:
     Async client for California LMI data.
     """
 
-    def __init__(self, timeout: float = 30.0):
+    def __init__(self, timeout: float = 30.0, http_client: Optional[httpx.AsyncClient] = None):
         self.timeout = timeout
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = http_client
+        self._owns_client = http_client is None
 
     async def __aenter__(self) -> "LMIClient":
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=timed_transport("ckan"))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self._client:
+        # A shared client (get_lmi_client) stays open for the next request
+        if self._client and self._owns_client:
             await self._client.aclose()
             self._client = None
 
     @property
     def client(self) -> httpx.AsyncClient:
         if self._client is None:
-            raise RuntimeError("Client not initialized. Use 'async with LMIClient() as client:'")
+            raise RuntimeError("Client not initialized. Use 'async with LMIClient() as client:' or get_lmi_client()")
         return self._client
 
     def _parse_float(self, value: Any) -> Optional[float]:
@@ -121,6 +155,13 @@ class LMIClient:
         except (ValueError, TypeError):
             return None
 
+    async def _datastore_search(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Records from a CKAN datastore_search call."""
+        resp = await self.client.get(f"{CKAN_BASE_URL}/datastore_search", params=params)
+        resp.raise_for_status()
+        result = resp.json().get("result", {})
+        return result.get("records", [])
+
     async def search_wages(self, keyword: str, limit: int = 10, area: Optional[str] = None) -> List[WageData]:
         """
         Search for wage data by occupation keyword.
@@ -133,23 +174,20 @@ class LMIClient:
             limit: Maximum results to return
             area: Optional area filter (e.g., "California", "Los Angeles")
         """
-        import json
-
-        # Build filters - MUST filter for Hourly wage type
-        filters = {"Wage Type": "Hourly wage"}
-
-        params = {
-            "resource_id": RES_ID_WAGES,
-            "q": keyword,
-            "filters": json.dumps(filters),
-            "limit": limit * 3,  # Fetch extra for filtering
-            "sort": "Year desc"
-        }
-
-        resp = await self.client.get(f"{CKAN_BASE_URL}/datastore_search", params=params)
-        resp.raise_for_status()
-        result = resp.json().get("result", {})
-        records = result.get("records", [])
+        records = await lmi_mirror.search(
+            RES_ID_WAGES, keyword=keyword, area=area, wage_type="Hourly wage", limit=limit * 3
+        )
+        if records is None:
+            # Build filters - MUST filter for Hourly wage type
+            filters = {"Wage Type": "Hourly wage"}
+
+            records = await self._datastore_search({
+                "resource_id": RES_ID_WAGES,
+                "q": keyword,
+                "filters": json.dumps(filters),
+                "limit": limit * 3,  # Fetch extra for filtering
+                "sort": "Year desc"
+            })
 
         wages = []
         seen_keys = set()  # Dedupe by occupation + area + year
@@ -219,17 +257,14 @@ class LMIClient:
             limit: Maximum results to return
             area: Optional area filter
         """
-        params = {
-            "resource_id": RES_ID_OCC_PROJ,
-            "q": keyword,
-            "limit": limit * 3,
-            "sort": "Period desc"
-        }
-
-        resp = await self.client.get(f"{CKAN_BASE_URL}/datastore_search", params=params)
-        resp.raise_for_status()
-        result = resp.json().get("result", {})
-        records = result.get("records", [])
+        records = await lmi_mirror.search(RES_ID_OCC_PROJ, keyword=keyword, area=area, limit=limit * 3)
+        if records is None:
+            records = await self._datastore_search({
+                "resource_id": RES_ID_OCC_PROJ,
+                "q": keyword,
+                "limit": limit * 3,
+                "sort": "Period desc"
+            })
 
         projections = []
         seen_keys = set()
@@ -309,25 +344,20 @@ class LMIClient:
             soc_code: SOC code (e.g., "29-1141" or "291141")
             area: Optional area filter (e.g., "Los Angeles County")
         """
-        import json
-
         # Normalize SOC code - CKAN stores them without hyphens
         normalized_soc = soc_code.replace("-", "")
 
-        # Build filters - use only SOC code filter (more reliable than multi-key filters)
-        filters = {"Standard Occupational Classification": normalized_soc}
-
-        params = {
-            "resource_id": RES_ID_WAGES,
-            "filters": json.dumps(filters),
-            "limit": 100,  # Get more results for SOC code
-            "sort": "Year desc"
-        }
+        records = await lmi_mirror.search(RES_ID_WAGES, soc_code=normalized_soc, limit=100)
+        if records is None:
+            # Build filters - use only SOC code filter (more reliable than multi-key filters)
+            filters = {"Standard Occupational Classification": normalized_soc}
 
-        resp = await self.client.get(f"{CKAN_BASE_URL}/datastore_search", params=params)
-        resp.raise_for_status()
-        result = resp.json().get("result", {})
-        records = result.get("records", [])
+            records = await self._datastore_search({
+                "resource_id": RES_ID_WAGES,
+                "filters": json.dumps(filters),
+                "limit": 100,  # Get more results for SOC code
+                "sort": "Year desc"
+            })
 
         wages = []
         seen_keys = set()  # Dedupe by occupation + area + year
@@ -394,17 +424,14 @@ class LMIClient:
         # Normalize SOC code - CKAN stores them without hyphens
         normalized_soc = soc_code.replace("-", "")
 
-        params = {
-            "resource_id": RES_ID_OCC_PROJ,
-            "filters": json.dumps({"Standard Occupational Classification (SOC)": normalized_soc}),
-            "limit": 100,
-            "sort": "Period desc"
-        }
-
-        resp = await self.client.get(f"{CKAN_BASE_URL}/datastore_search", params=params)
-        resp.raise_for_status()
-        result = resp.json().get("result", {})
-        records = result.get("records", [])
+        records = await lmi_mirror.search(RES_ID_OCC_PROJ, soc_code=normalized_soc, limit=100)
+        if records is None:
+            records = await self._datastore_search({
+                "resource_id": RES_ID_OCC_PROJ,
+                "filters": json.dumps({"Standard Occupational Classification (SOC)": normalized_soc}),
+                "limit": 100,
+                "sort": "Period desc"
+            })
 
         projections = []
         seen_keys = set()
@@ -470,3 +497,70 @@ class LMIClient:
                 continue
 
         return projections
+
+    async def sync_mirror(self, full: bool = False) -> List[SyncResult]:
+        """
+        Bring the local mirror of the wage and projection resources up to date.
+
+        A resource is copied in full on its first sync, when CKAN reports a
+        new `last_modified` for it, or with full=True; otherwise only records
+        added since the last sync are fetched.
+        """
+        return [
+            await self._sync_resource(resource_id, fields, full)
+            for resource_id, fields in MIRRORED_RESOURCES.items()
+        ]
+
+    async def _sync_resource(self, resource_id: str, fields: Dict[str, str], full: bool) -> SyncResult:
+        started = datetime.utcnow()
+        resp = await self.client.get(f"{CKAN_BASE_URL}/resource_show", params={"id": resource_id})
+        resp.raise_for_status()
+        resource = resp.json().get("result", {})
+        last_modified = resource.get("last_modified") or resource.get("metadata_modified")
+
+        state = await lmi_mirror.state(resource_id)
+        full = full or state is None or state.last_modified != last_modified
+        offset = 0 if full else state.record_count
+        max_record_id = 0 if full else state.max_record_id
+        fetched = 0
+
+        # Pages in datastore order, so records added since the last sync come last
+        while True:
+            resp = await self.client.get(f"{CKAN_BASE_URL}/datastore_search", params={
+                "resource_id": resource_id,
+                "offset": offset,
+                "limit": settings.LMI_MIRROR_PAGE_SIZE,
+                "sort": "_id asc",
+            })
+            resp.raise_for_status()
+            result = resp.json().get("result", {})
+            records = result.get("records", [])
+            if not records:
+                break
+            await lmi_mirror.store(resource_id, fields, records, started)
+            fetched += len(records)
+            offset += len(records)
+            max_record_id = max(max_record_id, *(record["_id"] for record in records))
+            if offset >= result.get("total", 0):
+                break
+
+        if not full and not fetched:
+            return SyncResult(resource_id, "unchanged", record_count=state.record_count)
+        outcome = await lmi_mirror.finish(resource_id, last_modified, started, full, max_record_id)
+        outcome.fetched = fetched
+        logger.info(
+            "LMI mirror: synced resource",
+            extra={"extra_fields": {
+                "resource_id": resource_id,
+                "mode": outcome.mode,
+                "fetched": fetched,
+                "removed": outcome.removed,
+                "records": outcome.record_count,
+            }},
+        )
+        return outcome
+
+
+async def get_lmi_client() -> LMIClient:
+    """FastAPI dependency: a LMIClient on the process-wide connection pool."""
+    return LMIClient(http_client=http_clients.get("ckan"))
@@ -0,0 +1,213 @@
+"""
+California LMI Mirror
+
+Local copy of the data.ca.gov (CKAN) datastore resources behind LMIClient:
+OEWS wages and long-term occupational projections. Records are stored in
+`lmi_mirror_records`, indexed by SOC code and by area and year, so wage and
+projection lookups (course LMI attach and refresh) are answered by one
+local query instead of a CKAN `datastore_search` round trip.
+
+The mirror is filled by LMIClient.sync_mirror (scripts/sync_lmi_mirror.py).
+A resource is copied in full the first time and whenever its
+`last_modified` changes; otherwise only records added since the last sync
+(higher datastore `_id`) are fetched. Rows a full copy didn't see are
+removed at the end of it.
+
+Resources that were never synced, databases without the tables, and
+LMI_MIRROR_ENABLED=false all make search() return None, and LMIClient asks
+CKAN as before.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.labor_market import LMIMirrorRecord, LMIMirrorSync
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of syncing one resource."""
+    resource_id: str
+    mode: str  # "full", "incremental" or "unchanged"
+    fetched: int = 0
+    removed: int = 0
+    record_count: int = 0
+
+
+def _like(value: str) -> str:
+    """An ILIKE pattern matching `value` anywhere, with wildcards escaped."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class LMIMirror:
+    """Reads and writes the lmi_mirror tables."""
+
+    def __init__(self):
+        self._table_available: Optional[bool] = None
+
+    def _detect_table(self, session: Session) -> bool:
+        if self._table_available is None:
+            if session.get_bind().dialect.name != "postgresql":
+                self._table_available = False
+            else:
+                self._table_available = bool(session.connection().execute(
+                    text("SELECT to_regclass('lmi_mirror_records') IS NOT NULL")
+                ).scalar())
+            if not self._table_available:
+                logger.info("LMI mirror: lmi_mirror_records missing; run migrations to mirror CKAN data")
+        return self._table_available
+
+    def reset(self) -> None:
+        """Check for the tables again on next use (after migrating)."""
+        self._table_available = None
+
+    # =========================================================================
+    # Sync (driven by LMIClient.sync_mirror)
+    # =========================================================================
+
+    def _state(self, resource_id: str) -> Optional[LMIMirrorSync]:
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                raise RuntimeError("lmi_mirror tables not found; run `alembic upgrade head` first")
+            return session.get(LMIMirrorSync, resource_id)
+
+    def _store(self, resource_id: str, fields: Dict[str, str], records: List[Dict[str, Any]], synced_at: datetime) -> None:
+        values = [
+            {
+                "resource_id": resource_id,
+                "record_id": record["_id"],
+                **{column: str(record.get(field) or "").strip() for column, field in fields.items()},
+                "record": record,
+                "synced_at": synced_at,
+            }
+            for record in records
+        ]
+        statement = insert(LMIMirrorRecord).values(values)
+        with Session(engine) as session:
+            session.exec(statement.on_conflict_do_update(
+                index_elements=["resource_id", "record_id"],
+                set_={column: statement.excluded[column] for column in [*fields, "record", "synced_at"]},
+            ))
+            session.commit()
+
+    def _finish(
+        self,
+        resource_id: str,
+        last_modified: Optional[str],
+        synced_at: datetime,
+        full: bool,
+        max_record_id: int,
+    ) -> SyncResult:
+        removed = 0
+        with Session(engine) as session:
+            if full:
+                removed = session.exec(delete(LMIMirrorRecord).where(
+                    LMIMirrorRecord.resource_id == resource_id,
+                    LMIMirrorRecord.synced_at < synced_at,
+                )).rowcount
+            count = session.exec(
+                select(func.count()).select_from(LMIMirrorRecord).where(LMIMirrorRecord.resource_id == resource_id)
+            ).one()
+            state = session.get(LMIMirrorSync, resource_id) or LMIMirrorSync(resource_id=resource_id, synced_at=synced_at)
+            state.last_modified = last_modified
+            state.record_count = count
+            state.max_record_id = max_record_id
+            state.synced_at = synced_at
+            session.add(state)
+            session.commit()
+        return SyncResult(resource_id, "full" if full else "incremental", removed=removed, record_count=count)
+
+    async def state(self, resource_id: str) -> Optional[LMIMirrorSync]:
+        """Sync state of a resource (None if never synced)."""
+        return await asyncio.to_thread(self._state, resource_id)
+
+    async def store(self, resource_id: str, fields: Dict[str, str], records: List[Dict[str, Any]], synced_at: datetime) -> None:
+        """
+        Upsert a page of CKAN records.
+
+        Args:
+            fields: Indexed column -> CKAN field it is copied from
+        """
+        if records:
+            await asyncio.to_thread(self._store, resource_id, fields, records, synced_at)
+
+    async def finish(
+        self,
+        resource_id: str,
+        last_modified: Optional[str],
+        synced_at: datetime,
+        full: bool,
+        max_record_id: int,
+    ) -> SyncResult:
+        """Record a completed sync; a full one drops rows it didn't write."""
+        return await asyncio.to_thread(self._finish, resource_id, last_modified, synced_at, full, max_record_id)
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def _search(
+        self,
+        resource_id: str,
+        keyword: Optional[str],
+        soc_code: Optional[str],
+        area: Optional[str],
+        wage_type: Optional[str],
+        limit: int,
+    ) -> Optional[List[Dict[str, Any]]]:
+        with Session(engine) as session:
+            if not self._detect_table(session) or session.get(LMIMirrorSync, resource_id) is None:
+                return None
+            query = select(LMIMirrorRecord.record).where(LMIMirrorRecord.resource_id == resource_id)
+            if soc_code:
+                query = query.where(LMIMirrorRecord.soc_code == soc_code)
+            if keyword:
+                query = query.where(LMIMirrorRecord.occupation_title.ilike(_like(keyword)))
+            if area:
+                query = query.where(LMIMirrorRecord.area_name.ilike(_like(area)))
+            if wage_type:
+                query = query.where(LMIMirrorRecord.wage_type == wage_type)
+            query = query.order_by(LMIMirrorRecord.year.desc(), LMIMirrorRecord.record_id).limit(limit)
+            return list(session.exec(query).all())
+
+    async def search(
+        self,
+        resource_id: str,
+        keyword: Optional[str] = None,
+        soc_code: Optional[str] = None,
+        area: Optional[str] = None,
+        wage_type: Optional[str] = None,
+        limit: int = 100,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Mirrored CKAN records, newest year/period first.
+
+        keyword and area match the occupation title and area name anywhere
+        (case-insensitive); soc_code (without hyphen) and wage_type exactly.
+
+        Returns:
+            Records as CKAN returns them, or None when the resource isn't
+            mirrored (the caller should ask CKAN)
+        """
+        if not settings.LMI_MIRROR_ENABLED:
+            return None
+        try:
+            return await asyncio.to_thread(self._search, resource_id, keyword, soc_code, area, wage_type, limit)
+        except Exception as e:
+            logger.warning(f"LMI mirror: query failed, using CKAN: {e}")
+            return None
+
+
+lmi_mirror = LMIMirror()
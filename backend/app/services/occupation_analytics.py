@@ -0,0 +1,259 @@
+"""
+Occupation Analytics
+====================
+
+Column-oriented view of the employment projections for dashboard queries
+such as "top 20 associate-level occupations in group 29 by openings x wage".
+
+The projections (from occupation_index, in SOC code order) are copied once
+into NumPy arrays, one per field: employment, change, openings, median wage,
+major group, education and outlook. A query is then a handful of vectorized
+operations over those arrays instead of a loop over models:
+- filters combine into one boolean mask
+- ranking uses a partial sort (np.partition) to find the top `limit` rows
+  and fully sorts only those, ties broken by SOC code
+- group-by major group sums and counts with np.bincount over the mask
+
+Only the returned rows are turned back into OccupationProjection records
+(the shared ones from the index).
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.services.occupation_index import occupation_index
+from app.services.occupation_projections import EDUCATION_LEVELS, OUTLOOK_CATEGORIES, OccupationProjection
+from app.services.soc_occupations import MAJOR_GROUPS
+
+logger = logging.getLogger(__name__)
+
+# Sortable metrics and what they mean
+METRICS = {
+    "employment_2023": "Base year employment",
+    "employment_2033": "Projected employment",
+    "change_percent": "Projected growth (%)",
+    "change_numeric": "Projected change in employment",
+    "annual_openings": "Annual job openings",
+    "median_wage": "Annual median wage",
+    "openings_wage": "Annual openings x median wage (wages of a year's openings)",
+}
+
+GROUP_BY_FIELDS = ("major_group",)
+
+# EDUCATION_LEVELS is ordered highest first; a lower rank means more education
+EDUCATION_RANK = {code: rank for rank, code in enumerate(EDUCATION_LEVELS)}
+OUTLOOK_POSITION = {code: i for i, code in enumerate(OUTLOOK_CATEGORIES)}
+
+
+@dataclass(frozen=True)
+class AnalyticsQuery:
+    """Filters, ranking and grouping for one analytics call (all filters optional)."""
+    major_groups: Sequence[str] = ()  # 2-digit SOC major groups
+    education: Sequence[str] = ()  # Exact entry education codes
+    max_education: Optional[str] = None  # This education level or less
+    outlook: Sequence[str] = ()  # Outlook categories
+    min_wage: Optional[float] = None
+    min_growth: Optional[float] = None  # Minimum change_percent
+    min_openings: Optional[float] = None
+    sort_by: str = "annual_openings"
+    descending: bool = True
+    limit: int = 20
+    group_by: Optional[str] = None
+
+    def validate(self) -> None:
+        """Raise ValueError naming the first unknown code or option."""
+        checks = [
+            ("major group", self.major_groups, MAJOR_GROUPS),
+            ("education level", [*self.education, *filter(None, [self.max_education])], EDUCATION_LEVELS),
+            ("outlook", self.outlook, OUTLOOK_CATEGORIES),
+            ("sort metric", [self.sort_by], METRICS),
+            ("group_by field", filter(None, [self.group_by]), GROUP_BY_FIELDS),
+        ]
+        for name, values, allowed in checks:
+            unknown = [value for value in values if value not in allowed]
+            if unknown:
+                raise ValueError(f"Unknown {name}: {', '.join(unknown)}. Available: {list(allowed)}")
+        if self.limit < 1:
+            raise ValueError("limit must be at least 1")
+
+
+class GroupSummary(BaseModel):
+    """Totals for the matching occupations in one major group."""
+    major_group: str
+    major_group_title: str
+    occupations: int
+    employment_2023: int
+    employment_2033: int
+    change_numeric: int
+    change_percent: Optional[float]  # Of the group's combined employment
+    annual_openings: int
+    median_wage: Optional[int] = None  # Employment-weighted mean of occupation median wages
+
+
+@dataclass
+class AnalyticsResult:
+    """Ranked rows (projection, sort metric value), match count and optional groups."""
+    rows: List[Tuple[OccupationProjection, Optional[float]]]
+    total: int
+    groups: Optional[List[GroupSummary]] = None
+
+
+@dataclass
+class _Columns:
+    projections: List[OccupationProjection]
+    numeric: Dict[str, np.ndarray]
+    major_group: np.ndarray  # Position in group_codes
+    group_codes: List[str]
+    education_rank: np.ndarray
+    outlook: np.ndarray  # Position in OUTLOOK_CATEGORIES
+
+
+def _codes(values: Sequence[str], positions: Dict[str, int]) -> np.ndarray:
+    return np.array([positions[value] for value in values], dtype=np.int16)
+
+
+class OccupationAnalytics:
+    """Vectorized filter / top-k / group-by over projection columns, built on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns: Optional[_Columns] = None
+
+    def _build(self) -> _Columns:
+        projections = occupation_index.projections()
+        numeric = {
+            name: np.array([getattr(p, name) for p in projections], dtype=np.float64)
+            for name in ("employment_2023", "employment_2033", "change_percent", "change_numeric", "annual_openings")
+        }
+        numeric["median_wage"] = np.array(
+            [np.nan if p.median_wage is None else p.median_wage for p in projections], dtype=np.float64
+        )
+        numeric["openings_wage"] = numeric["annual_openings"] * numeric["median_wage"]
+
+        group_codes = sorted({p.soc_code[:2] for p in projections})
+        columns = _Columns(
+            projections=projections,
+            numeric=numeric,
+            major_group=_codes([p.soc_code[:2] for p in projections], {g: i for i, g in enumerate(group_codes)}),
+            group_codes=group_codes,
+            education_rank=np.array(
+                [EDUCATION_RANK.get(p.entry_education, len(EDUCATION_RANK)) for p in projections], dtype=np.int16
+            ),
+            outlook=_codes([p.outlook for p in projections], OUTLOOK_POSITION),
+        )
+        logger.info(f"Occupation analytics: {len(projections)} projections in column arrays")
+        return columns
+
+    def _get_columns(self) -> _Columns:
+        columns = self._columns
+        if columns is None:
+            with self._lock:
+                if self._columns is None:
+                    self._columns = self._build()
+                columns = self._columns
+        return columns
+
+    def clear(self) -> None:
+        """Drop the arrays; they are rebuilt on next use."""
+        with self._lock:
+            self._columns = None
+
+    def _mask(self, columns: _Columns, query: AnalyticsQuery) -> np.ndarray:
+        mask = np.ones(len(columns.projections), dtype=bool)
+        if query.major_groups:
+            wanted = [columns.group_codes.index(g) for g in query.major_groups if g in columns.group_codes]
+            mask &= np.isin(columns.major_group, wanted)
+        if query.education:
+            mask &= np.isin(columns.education_rank, [EDUCATION_RANK[code] for code in query.education])
+        if query.max_education:
+            mask &= columns.education_rank >= EDUCATION_RANK[query.max_education]
+        if query.outlook:
+            mask &= np.isin(columns.outlook, [OUTLOOK_POSITION[code] for code in query.outlook])
+        for name, minimum in (
+            ("median_wage", query.min_wage),
+            ("change_percent", query.min_growth),
+            ("annual_openings", query.min_openings),
+        ):
+            if minimum is not None:
+                mask &= columns.numeric[name] >= minimum
+        return mask
+
+    @staticmethod
+    def _top(values: np.ndarray, limit: int, descending: bool) -> np.ndarray:
+        """Positions of the best `limit` values, best first, ties (and NaN last) in position order."""
+        key = -values if descending else values.copy()
+        key[np.isnan(key)] = np.inf
+        if limit < len(key):
+            cutoff = np.partition(key, limit - 1)[limit - 1]
+            candidates = np.flatnonzero(key <= cutoff)
+        else:
+            candidates = np.arange(len(key))
+        return candidates[np.lexsort((candidates, key[candidates]))][:limit]
+
+    def _groups(self, columns: _Columns, mask: np.ndarray) -> List[GroupSummary]:
+        groups = columns.major_group[mask]
+        size = len(columns.group_codes)
+
+        def total(name: str, weights: Optional[np.ndarray] = None) -> np.ndarray:
+            values = columns.numeric[name][mask]
+            if weights is not None:
+                values = values * weights
+            return np.bincount(groups, weights=np.nan_to_num(values), minlength=size)
+
+        counts = np.bincount(groups, minlength=size)
+        employment_2023 = total("employment_2023")
+        employment_2033 = total("employment_2033")
+        change = total("change_numeric")
+        openings = total("annual_openings")
+        # Occupations without a wage don't count toward the group's wage
+        wage_weights = np.where(np.isnan(columns.numeric["median_wage"][mask]), 0.0, columns.numeric["employment_2023"][mask])
+        wage_sum = total("median_wage", wage_weights)
+        wage_employment = np.bincount(groups, weights=wage_weights, minlength=size)
+
+        summaries = []
+        for i in np.flatnonzero(counts):
+            code = columns.group_codes[i]
+            summaries.append(GroupSummary(
+                major_group=code,
+                major_group_title=MAJOR_GROUPS.get(code, "Unknown"),
+                occupations=int(counts[i]),
+                employment_2023=int(employment_2023[i]),
+                employment_2033=int(employment_2033[i]),
+                change_numeric=int(change[i]),
+                change_percent=round(float(change[i] / employment_2023[i] * 100), 1) if employment_2023[i] else None,
+                annual_openings=int(openings[i]),
+                median_wage=round(float(wage_sum[i] / wage_employment[i])) if wage_employment[i] else None,
+            ))
+        return summaries
+
+    def query(self, query: AnalyticsQuery) -> AnalyticsResult:
+        """
+        Filter, rank and optionally group the projections in one pass.
+
+        Raises:
+            ValueError: For unknown codes, metrics or group_by fields
+        """
+        query.validate()
+        columns = self._get_columns()
+        mask = self._mask(columns, query)
+        matches = np.flatnonzero(mask)
+        values = columns.numeric[query.sort_by][matches]
+        top = matches[self._top(values, query.limit, query.descending)]
+        top_values = columns.numeric[query.sort_by][top]
+
+        return AnalyticsResult(
+            rows=[
+                (columns.projections[i], None if np.isnan(value) else float(value))
+                for i, value in zip(top, top_values)
+            ],
+            total=len(matches),
+            groups=self._groups(columns, mask) if query.group_by else None,
+        )
+
+
+occupation_analytics = OccupationAnalytics()
@@ -0,0 +1,234 @@
+"""
+Occupation Index
+
+Process-local index joining the SOC occupation list (soc_occupations) with
+the employment projections (occupation_projections), behind the BLS
+occupation search, the /bls/projections endpoints and OES title lookups.
+
+The index is built once, on first use, from the static data in those
+modules:
+- by_code: SOC code -> OccupationEntry, holding the prebuilt (immutable)
+  SOCOccupation and, where there is one, OccupationProjection. Codes with a
+  projection but missing from the SOC list get an occupation built from the
+  projection title.
+- an inverted index of title words -> codes, plus the sorted word list for
+  prefix lookups (bisect, as in course_autocomplete).
+
+Searches rank matches instead of returning them in code order:
+1. Exact SOC code, then codes starting with the query ("29-11", "2911")
+2. Titles where every query word matches a title word, exactly (plurals
+   included) scoring above a prefix ("nur"); a word no title word starts
+   with is matched to close spellings ("nurce", via difflib), scoring lowest
+3. Ties go to titles that start with the query, then shorter titles
+"""
+
+import bisect
+import difflib
+import logging
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.occupation_projections import (
+    OCCUPATION_PROJECTIONS,
+    OccupationProjection,
+    build_projection,
+)
+from app.services.soc_occupations import SOC_OCCUPATIONS, SOCOccupation, build_occupation
+
+logger = logging.getLogger(__name__)
+
+# Word scores: an exact (or plural) word beats a prefix, which beats a close spelling
+EXACT_WORD_SCORE = 3.0
+PREFIX_WORD_SCORE = 2.0
+FUZZY_WORD_SCORE = 1.0
+
+# difflib similarity a misspelled word needs, and how many spellings it may expand to
+FUZZY_CUTOFF = 0.8
+FUZZY_MAX_WORDS = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_code(code: str) -> str:
+    """SOC code without hyphen or surrounding spaces ("29-1141" -> "291141")."""
+    return code.replace("-", "").strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a title or query, punctuation dropped."""
+    return _WORD.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class OccupationEntry:
+    """One SOC code with its occupation and, if available, its projection."""
+    code: str
+    occupation: SOCOccupation
+    projection: Optional[OccupationProjection]
+    words: Tuple[str, ...]
+
+    @property
+    def title(self) -> str:
+        return self.occupation.title
+
+
+class OccupationIndex:
+    """Lazily built, thread-safe index of SOC occupations and projections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_code: Optional[Dict[str, OccupationEntry]] = None
+        self._word_codes: Dict[str, Set[str]] = {}
+        self._words: List[str] = []
+        self._projections: List[OccupationProjection] = []
+
+    @property
+    def is_built(self) -> bool:
+        return self._by_code is not None
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    # -------------------------------------------------------------------------
+    # Building
+    # -------------------------------------------------------------------------
+
+    def _entries(self) -> Dict[str, OccupationEntry]:
+        by_code = self._by_code
+        if by_code is None:
+            with self._lock:
+                if self._by_code is None:
+                    self._build()
+                by_code = self._by_code
+        return by_code
+
+    def _build(self) -> None:
+        titles = {occ["code"]: occ["title"] for occ in SOC_OCCUPATIONS}
+        for code, data in OCCUPATION_PROJECTIONS.items():
+            titles.setdefault(code, data["title"])
+
+        by_code: Dict[str, OccupationEntry] = {}
+        word_codes: Dict[str, Set[str]] = defaultdict(set)
+        for code in sorted(titles):
+            data = OCCUPATION_PROJECTIONS.get(code)
+            entry = OccupationEntry(
+                code=code,
+                occupation=build_occupation(code, titles[code]),
+                projection=build_projection(code, data) if data else None,
+                words=tuple(tokenize(titles[code])),
+            )
+            by_code[code] = entry
+            for word in entry.words:
+                word_codes[word].add(code)
+
+        self._word_codes = dict(word_codes)
+        self._words = sorted(word_codes)
+        self._projections = [entry.projection for entry in by_code.values() if entry.projection]
+        self._by_code = by_code
+        logger.info(
+            f"Occupation index: {len(by_code)} occupations, {len(self._projections)} with projections, "
+            f"{len(self._words)} title words"
+        )
+
+    def clear(self) -> None:
+        """Drop the index; it is rebuilt on next use."""
+        with self._lock:
+            self._by_code = None
+            self._word_codes = {}
+            self._words = []
+            self._projections = []
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def get(self, code: str) -> Optional[OccupationEntry]:
+        """Entry for a SOC code (with or without hyphen)."""
+        return self._entries().get(normalize_code(code))
+
+    def occupations(self) -> List[SOCOccupation]:
+        """Every occupation, in code order."""
+        return [entry.occupation for entry in self._entries().values()]
+
+    def projections(self) -> List[OccupationProjection]:
+        """Every projection, in code order."""
+        self._entries()
+        return list(self._projections)
+
+    def _word_matches(self, word: str) -> Dict[str, float]:
+        """Codes whose titles contain `word` (or, failing that, a close spelling), with its best score."""
+        scores: Dict[str, float] = {}
+
+        def add(codes: Iterable[str], score: float) -> None:
+            for code in codes:
+                if scores.get(code, 0.0) < score:
+                    scores[code] = score
+
+        i = bisect.bisect_left(self._words, word)
+        while i < len(self._words) and self._words[i].startswith(word):
+            title_word = self._words[i]
+            exact = title_word in (word, word + "s", word + "es")
+            add(self._word_codes[title_word], EXACT_WORD_SCORE if exact else PREFIX_WORD_SCORE)
+            i += 1
+
+        # Only words no title word starts with are treated as misspellings
+        if not scores and len(word) >= 4:
+            for close in difflib.get_close_matches(word, self._words, n=FUZZY_MAX_WORDS, cutoff=FUZZY_CUTOFF):
+                for plural in (close, close + "s", close + "es"):
+                    add(self._word_codes.get(plural, ()), FUZZY_WORD_SCORE)
+        return scores
+
+    def search(self, query: str, limit: int = 20, with_projection: bool = False) -> List[OccupationEntry]:
+        """
+        Rank occupations against a title or SOC code query.
+
+        Args:
+            query: Title words ("registered nurse") or SOC code, with or
+                without hyphen, in full or as a prefix ("29-11")
+            limit: Maximum results to return
+            with_projection: Only occupations that have projection data
+
+        Returns:
+            Best matches first
+        """
+        entries = self._entries()
+        if with_projection:
+            def wanted(code: str) -> bool:
+                return entries[code].projection is not None
+        else:
+            def wanted(code: str) -> bool:
+                return True
+
+        code_query = normalize_code(query)
+        if code_query.isdigit():
+            exact = [code_query] if code_query in entries else []
+            prefixed = [c for c in entries if c.startswith(code_query) and c != code_query]
+            return [entries[c] for c in exact + prefixed if wanted(c)][:limit]
+
+        words = tokenize(query)
+        if not words:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for word in dict.fromkeys(words):
+            matches = self._word_matches(word)
+            if scores is None:
+                scores = {code: score for code, score in matches.items() if wanted(code)}
+            else:
+                scores = {code: score + matches[code] for code, score in scores.items() if code in matches}
+            if not scores:
+                return []
+
+        phrase = " ".join(words)
+
+        def rank(code: str) -> Tuple[float, bool, int, str]:
+            entry = entries[code]
+            return (-scores[code], not " ".join(entry.words).startswith(phrase), len(entry.words), entry.title)
+
+        return [entries[code] for code in sorted(scores, key=rank)[:limit]]
+
+
+occupation_index = OccupationIndex()
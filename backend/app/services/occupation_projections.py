@@ -11,7 +11,7 @@ Last updated: Based on 2023-2033 projections (released September 2024)
 """
 
 from typing import Optional, List, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 # Education level codes and labels
@@ -54,7 +54,9 @@ OUTLOOK_CATEGORIES = {
 
 
 class OccupationProjection(BaseModel):
-    """Employment projection data for an occupation."""
+    """Employment projection data for an occupation (immutable; shared by the occupation index)."""
+    model_config = ConfigDict(frozen=True)
+
     soc_code: str
     title: str
     employment_2023: int  # Base year employment (thousands)
@@ -1439,23 +1441,8 @@ OCCUPATION_PROJECTIONS: Dict[str, Dict] = {
 }
 
 
-def get_projection(soc_code: str) -> Optional[OccupationProjection]:
-    """
-    Get projection data for a specific SOC code.
-
-    Args:
-        soc_code: SOC code (e.g., "291141" or "29-1141")
-
-    Returns:
-        OccupationProjection or None if not found
-    """
-    # Normalize SOC code (remove hyphen if present)
-    normalized_code = soc_code.replace("-", "")
-
-    data = OCCUPATION_PROJECTIONS.get(normalized_code)
-    if not data:
-        return None
-
+def build_projection(soc_code: str, data: Dict) -> OccupationProjection:
+    """Build the OccupationProjection for an OCCUPATION_PROJECTIONS entry."""
     # Get outlook category
     outlook, outlook_label = get_outlook(data["change_percent"])
 
@@ -1465,7 +1452,7 @@ def get_projection(soc_code: str) -> Optional[OccupationProjection]:
     training_label = TRAINING_LEVELS.get(data["on_job_training"], data["on_job_training"])
 
     return OccupationProjection(
-        soc_code=normalized_code,
+        soc_code=soc_code,
         title=data["title"],
         employment_2023=data["employment_2023"],
         employment_2033=data["employment_2033"],
@@ -1484,36 +1471,43 @@ def get_projection(soc_code: str) -> Optional[OccupationProjection]:
     )
 
 
+def get_projection(soc_code: str) -> Optional[OccupationProjection]:
+    """
+    Get projection data for a specific SOC code.
+
+    Args:
+        soc_code: SOC code (e.g., "291141" or "29-1141")
+
+    Returns:
+        OccupationProjection or None if not found
+    """
+    from app.services.occupation_index import occupation_index
+
+    entry = occupation_index.get(soc_code)
+    return entry.projection if entry else None
+
+
 def search_projections(query: str, limit: int = 20) -> List[OccupationProjection]:
     """
     Search projections by occupation title or SOC code.
 
     Args:
-        query: Search query (title or SOC code)
+        query: Search query (title words or a full/partial SOC code)
         limit: Maximum results to return
 
     Returns:
-        List of matching OccupationProjection objects
+        List of matching OccupationProjection objects, best matches first
     """
-    query_lower = query.lower().strip()
-    results = []
+    from app.services.occupation_index import occupation_index
 
-    for soc_code, data in OCCUPATION_PROJECTIONS.items():
-        # Check if query matches SOC code or title
-        if query_lower in soc_code or query_lower in data["title"].lower():
-            projection = get_projection(soc_code)
-            if projection:
-                results.append(projection)
-
-        if len(results) >= limit:
-            break
-
-    return results
+    return [entry.projection for entry in occupation_index.search(query, limit=limit, with_projection=True)]
 
 
 def get_all_projections() -> List[OccupationProjection]:
     """Get all available occupation projections."""
-    return [get_projection(code) for code in OCCUPATION_PROJECTIONS.keys() if get_projection(code)]
+    from app.services.occupation_index import occupation_index
+
+    return occupation_index.projections()
 
 
 def get_available_soc_codes() -> List[str]:
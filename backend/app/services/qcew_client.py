@@ -6,15 +6,32 @@ Client for accessing BLS QCEW data via the Open Data API.
 Provides county-level employment and wage data by industry.
 
 API Documentation: https://www.bls.gov/cew/additional-resources/open-data/home.htm
+
+Quarters loaded from the BLS bulk files (app.services.qcew_store) are
+answered from the local table without calling the API.
+
+Area files are parsed as they stream in: rows are filtered on their codes
+before anything else is converted, and only the columns a caller needs are
+kept. Published quarters never change, so each worker keeps parsed area
+summaries (QCEW_CACHE_MAX_SUMMARIES) and, for QCEW_PROBE_TTL_SECONDS, which
+quarter a request for an unpublished one fell back to.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Collection, Hashable, Iterator, Tuple
+from collections import OrderedDict
+import asyncio
 from datetime import datetime
 import csv
-import io
+import threading
+import time
 import httpx
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.metrics import record_cache, timed_transport
+from app.services.qcew_store import qcew_store
+
 
 # API Configuration
 QCEW_API_BASE = "https://data.bls.gov/cew/data/api"
@@ -92,6 +109,13 @@ OWNERSHIP_CODES = {
     "3": "Local Government",
 }
 
+# Rows and columns of an area file that get_area_summary uses
+SUMMARY_FILTER = {"own_code": {"5"}, "agglvl_code": {"71", "74"}}
+SUMMARY_COLUMNS = (
+    "own_code", "industry_code", "agglvl_code", "industry_title", "qtrly_estabs",
+    "month1_emplvl", "month2_emplvl", "month3_emplvl", "total_qtrly_wages", "avg_wkly_wage",
+)
+
 
 class QCEWIndustryData(BaseModel):
     """QCEW data for a single industry in an area."""
@@ -136,6 +160,78 @@ class IndustryInfo(BaseModel):
     name: str
 
 
+class _QuarterCache:
+    """Bounded LRU whose entries may expire (time.monotonic())."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (float("inf") if ttl is None else time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# (area_fips, year, quarter) -> QCEWAreaSummary for that published quarter
+_summaries = _QuarterCache(settings.QCEW_CACHE_MAX_SUMMARIES)
+# (area_fips, year, quarter) requested -> (year, quarter) actually published
+_published_quarters = _QuarterCache(settings.QCEW_CACHE_MAX_SUMMARIES)
+
+
+def clear_caches() -> None:
+    """Drop cached summaries and quarter lookups (tests, or after a revision)."""
+    _summaries.clear()
+    _published_quarters.clear()
+
+
+def _fallback_quarters(year: int, quarter: int) -> Iterator[Tuple[int, int]]:
+    """The quarter asked for, then earlier ones down to Q1 of two years back."""
+    oldest_year = datetime.now().year - 2
+    while True:
+        yield year, quarter
+        if quarter > 1:
+            quarter -= 1
+        elif year > oldest_year:
+            year, quarter = year - 1, 4
+        else:
+            return
+
+
+def _select(
+    lines: List[str],
+    positions: Dict[str, int],
+    where: Dict[int, Collection[str]],
+    columns: List[Tuple[str, int]],
+) -> Iterator[Dict[str, str]]:
+    for fields in csv.reader(lines):
+        if len(fields) < len(positions):
+            continue
+        if all(fields[index] in allowed for index, allowed in where.items()):
+            yield {name: fields[index] for name, index in columns}
+
+
 class QCEWClient:
     """
     Async client for BLS QCEW Open Data API.
@@ -143,28 +239,32 @@ class QCEWClient:
     The QCEW API returns CSV data for a specific area and time period.
     URL pattern: https://data.bls.gov/cew/data/api/{YEAR}/{QTR}/area/{FIPS}.csv
 
-    Usage:
+    Routes inject one on the shared connection pool with
+    Depends(get_qcew_client). Standalone usage:
         async with QCEWClient() as client:
             data = await client.get_area_summary("los_angeles")
     """
 
-    def __init__(self, timeout: float = 30.0):
+    def __init__(self, timeout: float = 30.0, http_client: Optional[httpx.AsyncClient] = None):
         self.timeout = timeout
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = http_client
+        self._owns_client = http_client is None
 
     async def __aenter__(self) -> "QCEWClient":
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=timed_transport("qcew"))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self._client:
+        # A shared client (get_qcew_client) stays open for the next request
+        if self._client and self._owns_client:
             await self._client.aclose()
             self._client = None
 
     @property
     def client(self) -> httpx.AsyncClient:
         if self._client is None:
-            raise RuntimeError("Client not initialized. Use 'async with QCEWClient() as client:'")
+            raise RuntimeError("Client not initialized. Use 'async with QCEWClient() as client:' or get_qcew_client()")
         return self._client
 
     def _parse_int(self, value: Any) -> Optional[int]:
@@ -199,11 +299,71 @@ class QCEWClient:
             # Second half, use Q4 of previous year or Q1 of current year
             return now.year - 1, 4
 
+    async def _open_area_file(self, area_fips: str, year: int, quarter: int) -> Tuple[httpx.Response, int, int]:
+        """
+        Start streaming the area file for a quarter, or for the latest earlier
+        quarter that has been published if it hasn't (404).
+
+        Returns the open response (the caller closes it) and its year and quarter.
+        """
+        probe = (area_fips, year, quarter)
+        known = _published_quarters.get(probe)
+        candidates = [known] if known else list(_fallback_quarters(year, quarter))
+
+        for file_year, file_quarter in candidates:
+            url = f"{QCEW_API_BASE}/{file_year}/{file_quarter}/area/{area_fips}.csv"
+            response = await self.client.send(self.client.build_request("GET", url), stream=True)
+            if response.is_success:
+                _published_quarters.put(probe, (file_year, file_quarter), ttl=settings.QCEW_PROBE_TTL_SECONDS)
+                return response, file_year, file_quarter
+            await response.aclose()
+            if response.status_code != 404:
+                break
+        response.raise_for_status()
+
+    async def _iter_rows(
+        self,
+        response: httpx.Response,
+        where: Optional[Dict[str, Collection[str]]] = None,
+        columns: Optional[Collection[str]] = None,
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Parse a streaming area file into row dicts as the bytes arrive.
+
+        Rows whose `where` columns have other values are skipped before any
+        dict is built, and only `columns` (default: all) are kept.
+        """
+        header: Optional[List[str]] = None
+        positions: Dict[str, int] = {}
+        where_at: Dict[int, Collection[str]] = {}
+        keep: List[Tuple[str, int]] = []
+        pending = ""
+
+        async for text in response.aiter_text():
+            lines = (pending + text).split("\n")
+            pending = lines.pop()
+            if header is None and lines:
+                header = next(csv.reader([lines.pop(0)]))
+                positions = {name: index for index, name in enumerate(header)}
+                where_at = {positions[name]: allowed for name, allowed in (where or {}).items() if name in positions}
+                keep = [(name, positions[name]) for name in (columns or header) if name in positions]
+                # A filter on a column the file lacks matches nothing
+                if where and len(where_at) < len(where):
+                    return
+            if lines:
+                for row in _select(lines, positions, where_at, keep):
+                    yield row
+        if header is not None and pending.strip():
+            for row in _select([pending], positions, where_at, keep):
+                yield row
+
     async def fetch_area_csv(
         self,
         area_fips: str,
         year: Optional[int] = None,
         quarter: Optional[int] = None,
+        where: Optional[Dict[str, Collection[str]]] = None,
+        columns: Optional[Collection[str]] = None,
     ) -> List[Dict[str, str]]:
         """
         Fetch raw CSV data for an area.
@@ -212,6 +372,8 @@ class QCEWClient:
             area_fips: FIPS code for the area
             year: Year (defaults to latest available)
             quarter: Quarter 1-4 (defaults to latest available)
+            where: Keep only rows whose column values are in these sets
+            columns: Columns to keep (defaults to all)
 
         Returns:
             List of dictionaries representing CSV rows
@@ -219,24 +381,42 @@ class QCEWClient:
         if year is None or quarter is None:
             year, quarter = self._get_latest_quarter()
 
-        url = f"{QCEW_API_BASE}/{year}/{quarter}/area/{area_fips}.csv"
-
+        response, _, _ = await self._open_area_file(area_fips, year, quarter)
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-
-            # Parse CSV
-            content = response.text
-            reader = csv.DictReader(io.StringIO(content))
-            return list(reader)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                # Try earlier quarter if not found
-                if quarter > 1:
-                    return await self.fetch_area_csv(area_fips, year, quarter - 1)
-                elif year > datetime.now().year - 2:
-                    return await self.fetch_area_csv(area_fips, year - 1, 4)
-            raise
+            return [row async for row in self._iter_rows(response, where, columns)]
+        finally:
+            await response.aclose()
+
+    def _industry_from_row(
+        self,
+        area_info: Dict[str, str],
+        year: int,
+        quarter: int,
+        row: Dict[str, Any],
+    ) -> QCEWIndustryData:
+        """QCEWIndustryData for a private-sector row of an area file or the local store."""
+        industry_code = row.get("industry_code", "")
+        industry_name = KEY_INDUSTRIES.get(industry_code, {}).get("name")
+        if not industry_name:
+            # Use the industry title from the CSV (or the store) if not in our map
+            industry_name = row.get("industry_title") or f"Industry {industry_code}"
+
+        return QCEWIndustryData(
+            area_fips=area_info["fips"],
+            area_name=area_info["name"],
+            industry_code=industry_code,
+            industry_name=industry_name,
+            year=year,
+            quarter=quarter,
+            ownership="5",
+            ownership_label="Private",
+            establishments=self._parse_int(row.get("qtrly_estabs")),
+            month1_employment=self._parse_int(row.get("month1_emplvl")),
+            month2_employment=self._parse_int(row.get("month2_emplvl")),
+            month3_employment=self._parse_int(row.get("month3_emplvl")),
+            total_quarterly_wages=self._parse_int(row.get("total_qtrly_wages")),
+            avg_weekly_wage=self._parse_float(row.get("avg_wkly_wage")),
+        )
 
     async def get_area_summary(
         self,
@@ -262,7 +442,30 @@ class QCEWClient:
         if year is None or quarter is None:
             year, quarter = self._get_latest_quarter()
 
-        rows = await self.fetch_area_csv(area_info["fips"], year, quarter)
+        # A quarter that isn't out yet falls back to the one last seen published
+        probe = (area_info["fips"], year, quarter)
+        year, quarter = _published_quarters.get(probe) or (year, quarter)
+        cached = _summaries.get((area_info["fips"], year, quarter))
+        record_cache("qcew_summary", hits=int(cached is not None), misses=int(cached is None))
+        if cached is not None:
+            return cached.model_copy(deep=True)
+
+        # Quarters loaded from the bulk files are answered locally. An earlier
+        # loaded quarter only stands in for the latest once the API says it is
+        # the one published; the store may hold nothing but older files.
+        stored = await qcew_store.area_quarter(area_info["fips"], [(year, quarter)], SUMMARY_FILTER)
+        if stored is None:
+            checked = (year, quarter)
+            response, year, quarter = await self._open_area_file(area_info["fips"], year, quarter)
+            try:
+                if (year, quarter) != checked:
+                    stored = await qcew_store.area_quarter(area_info["fips"], [(year, quarter)], SUMMARY_FILTER)
+                if stored is None:
+                    rows = [row async for row in self._iter_rows(response, SUMMARY_FILTER, SUMMARY_COLUMNS)]
+            finally:
+                await response.aclose()
+        if stored is not None:
+            (year, quarter), rows = stored
 
         # Filter for private sector (own_code = 5) and supersector industries
         industries = []
@@ -288,27 +491,7 @@ class QCEWClient:
 
             # 2-digit NAICS industries (private sector supersector level)
             if agglvl_code == "74":
-                industry_name = KEY_INDUSTRIES.get(industry_code, {}).get("name")
-                if not industry_name:
-                    # Use the industry title from CSV if not in our map
-                    industry_name = row.get("industry_title", f"Industry {industry_code}")
-
-                industries.append(QCEWIndustryData(
-                    area_fips=area_info["fips"],
-                    area_name=area_info["name"],
-                    industry_code=industry_code,
-                    industry_name=industry_name,
-                    year=year,
-                    quarter=quarter,
-                    ownership="5",
-                    ownership_label="Private",
-                    establishments=self._parse_int(row.get("qtrly_estabs")),
-                    month1_employment=self._parse_int(row.get("month1_emplvl")),
-                    month2_employment=self._parse_int(row.get("month2_emplvl")),
-                    month3_employment=self._parse_int(row.get("month3_emplvl")),
-                    total_quarterly_wages=self._parse_int(row.get("total_qtrly_wages")),
-                    avg_weekly_wage=self._parse_float(row.get("avg_wkly_wage")),
-                ))
+                industries.append(self._industry_from_row(area_info, year, quarter, row))
 
         # Sort industries by employment (month3) descending
         industries.sort(
@@ -326,7 +509,7 @@ class QCEWClient:
             total_estab = self._parse_int(total_row.get("qtrly_estabs"))
             avg_wage = self._parse_float(total_row.get("avg_wkly_wage"))
 
-        return QCEWAreaSummary(
+        summary = QCEWAreaSummary(
             area_fips=area_info["fips"],
             area_name=area_info["name"],
             year=year,
@@ -336,6 +519,8 @@ class QCEWClient:
             avg_weekly_wage=avg_wage,
             industries=industries,
         )
+        _summaries.put((area_info["fips"], year, quarter), summary.model_copy(deep=True))
+        return summary
 
     async def get_industry_data(
         self,
@@ -364,6 +549,63 @@ class QCEWClient:
 
         return None
 
+    async def get_industry_trend(
+        self,
+        areas: List[str],
+        industry_code: str = "62",
+        quarters: int = 8,
+    ) -> List[QCEWIndustryData]:
+        """
+        Private-sector data for one industry across areas over recent quarters.
+
+        Quarters loaded into the local store come from one query; the rest
+        are looked up through get_industry_data (the API, or its caches).
+        Area/quarter pairs with no published data are left out.
+
+        Args:
+            areas: Area keys (e.g., ["los_angeles", "orange"])
+            industry_code: NAICS industry code ("10" for all industries, from the store only)
+            quarters: Number of quarters, ending with the latest expected to be
+                published (or a later one loaded locally)
+
+        Returns:
+            QCEWIndustryData per area and quarter, oldest quarter first
+        """
+        unknown = [area for area in areas if area not in QCEW_AREAS]
+        if unknown:
+            raise ValueError(f"Unknown area: {unknown[0]}. Available: {list(QCEW_AREAS.keys())}")
+        by_fips = {QCEW_AREAS[area]["fips"]: area for area in areas}
+
+        # Older bulk files in the store don't hold the trend back from newer API quarters
+        year, quarter = max(
+            self._get_latest_quarter(),
+            await qcew_store.latest_period(list(by_fips)) or (0, 0),
+        )
+        periods = []
+        for _ in range(quarters):
+            periods.append((year, quarter))
+            year, quarter = (year, quarter - 1) if quarter > 1 else (year - 1, 4)
+        periods.reverse()
+
+        points: Dict[Tuple[str, int, int], QCEWIndustryData] = {}
+        for row in await qcew_store.industry_rows(list(by_fips), industry_code, periods, SUMMARY_FILTER):
+            area = by_fips[row["area_fips"]]
+            points[(area, row["year"], row["qtr"])] = self._industry_from_row(
+                QCEW_AREAS[area], row["year"], row["qtr"], row
+            )
+
+        missing = [(area, period) for area in areas for period in periods if (area,) + period not in points]
+        if missing:
+            fetched = await asyncio.gather(*(
+                self.get_industry_data(area, industry_code, year, quarter) for area, (year, quarter) in missing
+            ))
+            for (area, period), data in zip(missing, fetched):
+                # Skip quarters the API substituted an earlier one for
+                if data is not None and (data.year, data.quarter) == period:
+                    points[(area,) + period] = data
+
+        return [points[(area,) + period] for period in periods for area in areas if (area,) + period in points]
+
     def get_available_areas(self) -> List[AreaInfo]:
         """Get list of available areas for QCEW queries."""
         return [
@@ -377,3 +619,8 @@ class QCEWClient:
             IndustryInfo(naics=info["naics"], name=info["name"])
             for info in KEY_INDUSTRIES.values()
         ]
+
+
+async def get_qcew_client() -> QCEWClient:
+    """FastAPI dependency: a QCEWClient on the process-wide connection pool."""
+    return QCEWClient(http_client=http_clients.get("qcew"))
@@ -0,0 +1,276 @@
+"""
+QCEW Local Store
+
+Quarterly QCEW data loaded from the BLS bulk "single file" CSVs
+(https://www.bls.gov/cew/downloadable-data-files.htm) into the
+`qcew_quarterly` table, so QCEWClient can answer area summaries, industry
+lookups and multi-area, multi-quarter trends for loaded quarters with one
+indexed query instead of one QCEW API download per area and quarter.
+
+Files are loaded with scripts/ingest_qcew.py, by default keeping only
+California areas (FIPS prefix "06"). Loading a file again updates the
+rows it contains. The single files carry codes only, so industry titles
+come from the BLS industry titles file (industry_titles.csv, see
+read_industry_titles) when it is given, keeping names the same as in
+summaries served from the API. Databases without the table (not migrated yet) report
+nothing as loaded, and QCEWClient uses the API as before.
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.labor_market import QCEWQuarterly
+
+logger = logging.getLogger(__name__)
+
+# (year, quarter)
+Period = Tuple[int, int]
+
+KEY_COLUMNS = ("area_fips", "year", "qtr", "own_code", "industry_code", "agglvl_code", "size_code")
+VALUE_COLUMNS = (
+    "industry_title", "disclosure_code", "qtrly_estabs", "month1_emplvl", "month2_emplvl", "month3_emplvl",
+    "total_qtrly_wages", "avg_wkly_wage",
+)
+_INT_COLUMNS = {
+    "year", "qtr", "qtrly_estabs", "month1_emplvl", "month2_emplvl", "month3_emplvl",
+    "total_qtrly_wages", "avg_wkly_wage",
+}
+
+
+def _parse_row(row: Dict[str, str], industry_titles: Dict[str, str]) -> Dict[str, Any]:
+    """The stored columns of a CSV row, with numeric columns converted."""
+    values: Dict[str, Any] = {}
+    for column in KEY_COLUMNS + VALUE_COLUMNS:
+        value = (row.get(column) or "").strip()
+        if column in _INT_COLUMNS:
+            values[column] = int(float(value)) if value else None
+        else:
+            values[column] = value
+    if not values["industry_title"]:
+        values["industry_title"] = industry_titles.get(values["industry_code"], "")
+    return values
+
+
+def _open_csv(path: Path) -> io.TextIOBase:
+    """A text stream of the CSV, or of the first CSV inside a .zip."""
+    if path.suffix.lower() == ".zip":
+        archive = zipfile.ZipFile(path)
+        members = [name for name in archive.namelist() if name.lower().endswith(".csv")]
+        if not members:
+            raise ValueError(f"No CSV file in {path}")
+        return io.TextIOWrapper(archive.open(members[0]), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def read_industry_titles(path: Path) -> Dict[str, str]:
+    """
+    Industry code -> title from the BLS industry titles CSV
+    (https://data.bls.gov/cew/doc/titles/industry/industry_titles.csv).
+    """
+    with _open_csv(path) as stream:
+        return {
+            (row.get("industry_code") or "").strip(): (row.get("industry_title") or "").strip()
+            for row in csv.DictReader(stream)
+        }
+
+
+def _periods(periods: Collection[Period]):
+    return tuple_(QCEWQuarterly.year, QCEWQuarterly.qtr).in_(list(periods))
+
+
+class QCEWStore:
+    """Reads and loads the qcew_quarterly table."""
+
+    def __init__(self):
+        self._table_available: Optional[bool] = None
+
+    def _detect_table(self, session: Session) -> bool:
+        if self._table_available is None:
+            if session.get_bind().dialect.name != "postgresql":
+                self._table_available = False
+            else:
+                self._table_available = bool(session.connection().execute(
+                    text("SELECT to_regclass('qcew_quarterly') IS NOT NULL")
+                ).scalar())
+            if not self._table_available:
+                logger.info("QCEW store: qcew_quarterly missing; run migrations to load bulk files")
+        return self._table_available
+
+    def reset(self) -> None:
+        """Check for the table again on next use (after migrating)."""
+        self._table_available = None
+
+    # =========================================================================
+    # Loading
+    # =========================================================================
+
+    def read_file(
+        self,
+        path: Path,
+        area_prefixes: Optional[Sequence[str]] = ("06",),
+        industry_titles: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Rows of a single-file CSV (or .zip) for areas starting with `area_prefixes` (None: all).
+        Rows without an industry_title take theirs from `industry_titles` (code -> title).
+        """
+        prefixes = tuple(area_prefixes) if area_prefixes else None
+        with _open_csv(path) as stream:
+            for row in csv.DictReader(stream):
+                area_fips = (row.get("area_fips") or "").strip()
+                if prefixes is None or area_fips.startswith(prefixes):
+                    yield _parse_row(row, industry_titles or {})
+
+    def ingest(
+        self,
+        path: Path,
+        area_prefixes: Optional[Sequence[str]] = ("06",),
+        batch_size: int = 5000,
+        industry_titles: Optional[Dict[str, str]] = None,
+    ) -> Dict[Period, int]:
+        """
+        Load a single-file CSV into the table, updating rows already loaded.
+        A row loaded again without a title keeps the one stored before.
+
+        Returns:
+            Rows loaded per (year, quarter)
+        """
+        loaded: Counter = Counter()
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                raise RuntimeError("qcew_quarterly table not found; run `alembic upgrade head` first")
+
+            batch: List[Dict[str, Any]] = []
+            for row in self.read_file(path, area_prefixes, industry_titles):
+                batch.append(row)
+                loaded[(row["year"], row["qtr"])] += 1
+                if len(batch) >= batch_size:
+                    self._upsert(session, batch)
+                    batch = []
+            if batch:
+                self._upsert(session, batch)
+            session.commit()
+
+        logger.info(
+            "QCEW store: loaded file",
+            extra={"extra_fields": {"path": str(path), "rows": sum(loaded.values()), "quarters": len(loaded)}},
+        )
+        return dict(loaded)
+
+    def _upsert(self, session: Session, rows: List[Dict[str, Any]]) -> None:
+        statement = insert(QCEWQuarterly).values(rows)
+        updates = {column: statement.excluded[column] for column in VALUE_COLUMNS}
+        updates["industry_title"] = func.coalesce(
+            func.nullif(statement.excluded.industry_title, ""), QCEWQuarterly.industry_title
+        )
+        session.exec(statement.on_conflict_do_update(index_elements=list(KEY_COLUMNS), set_=updates))
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def _area_quarter(
+        self,
+        area_fips: str,
+        periods: Sequence[Period],
+        where: Dict[str, Collection[str]],
+    ) -> Optional[Tuple[Period, List[Dict[str, Any]]]]:
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                return None
+            query = select(QCEWQuarterly).where(QCEWQuarterly.area_fips == area_fips, _periods(periods))
+            for column, allowed in where.items():
+                query = query.where(getattr(QCEWQuarterly, column).in_(list(allowed)))
+            rows = session.exec(query).all()
+
+        by_period: Dict[Period, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_period.setdefault((row.year, row.qtr), []).append(row.model_dump())
+        for period in periods:
+            if period in by_period:
+                return period, by_period[period]
+        return None
+
+    def _industry_rows(
+        self,
+        area_fips: Sequence[str],
+        industry_code: str,
+        periods: Sequence[Period],
+        where: Dict[str, Collection[str]],
+    ) -> List[Dict[str, Any]]:
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                return []
+            query = select(QCEWQuarterly).where(
+                QCEWQuarterly.industry_code == industry_code,
+                QCEWQuarterly.area_fips.in_(list(area_fips)),
+                _periods(periods),
+            )
+            for column, allowed in where.items():
+                query = query.where(getattr(QCEWQuarterly, column).in_(list(allowed)))
+            return [row.model_dump() for row in session.exec(query).all()]
+
+    def _latest_period(self, area_fips: Sequence[str]) -> Optional[Period]:
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                return None
+            latest = session.exec(
+                select(QCEWQuarterly.year, QCEWQuarterly.qtr)
+                .where(QCEWQuarterly.area_fips.in_(list(area_fips)))
+                .order_by(QCEWQuarterly.year.desc(), QCEWQuarterly.qtr.desc())
+                .limit(1)
+            ).first()
+            return (latest[0], latest[1]) if latest else None
+
+    def loaded_quarters(self) -> Dict[Period, int]:
+        """Rows loaded per (year, quarter)."""
+        with Session(engine) as session:
+            if not self._detect_table(session):
+                return {}
+            rows = session.exec(
+                select(QCEWQuarterly.year, QCEWQuarterly.qtr, func.count())
+                .group_by(QCEWQuarterly.year, QCEWQuarterly.qtr)
+            ).all()
+            return {(year, qtr): count for year, qtr, count in rows}
+
+    async def area_quarter(
+        self,
+        area_fips: str,
+        periods: Sequence[Period],
+        where: Optional[Dict[str, Collection[str]]] = None,
+    ) -> Optional[Tuple[Period, List[Dict[str, Any]]]]:
+        """
+        Rows of the first of `periods` loaded for the area, matching `where`.
+
+        Returns:
+            ((year, quarter), rows), or None if none of the periods is loaded
+        """
+        return await asyncio.to_thread(self._area_quarter, area_fips, list(periods), where or {})
+
+    async def industry_rows(
+        self,
+        area_fips: Sequence[str],
+        industry_code: str,
+        periods: Sequence[Period],
+        where: Optional[Dict[str, Collection[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rows for one industry across areas and quarters, in one query."""
+        return await asyncio.to_thread(self._industry_rows, list(area_fips), industry_code, list(periods), where or {})
+
+    async def latest_period(self, area_fips: Sequence[str]) -> Optional[Period]:
+        """The latest quarter loaded for any of the areas."""
+        return await asyncio.to_thread(self._latest_period, list(area_fips))
+
+
+qcew_store = QCEWStore()
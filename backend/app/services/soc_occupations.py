@@ -16,11 +16,13 @@ workforce development and career technical education programs.
 """
 
 from typing import List, Dict, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class SOCOccupation(BaseModel):
-    """SOC occupation with code and title."""
+    """SOC occupation with code and title (immutable; instances are shared by the occupation index)."""
+    model_config = ConfigDict(frozen=True)
+
     code: str  # 6-digit code without hyphen (e.g., "291141")
     title: str  # Occupation title
     major_group: str  # 2-digit major group code
@@ -907,23 +909,29 @@ SOC_OCCUPATIONS: List[Dict[str, str]] = [
 ]
 
 
+def build_occupation(code: str, title: str) -> SOCOccupation:
+    """Build the SOCOccupation for a 6-digit code and title."""
+    major_group = code[:2]
+    return SOCOccupation(
+        code=code,
+        title=title,
+        major_group=major_group,
+        major_group_title=MAJOR_GROUPS.get(major_group, "Unknown"),
+    )
+
+
 def get_occupation_list() -> List[SOCOccupation]:
     """
     Get the full list of SOC occupations with major group information.
 
+    Includes occupations that only appear in the projections data.
+
     Returns:
-        List of SOCOccupation objects
+        List of SOCOccupation objects, in code order
     """
-    result = []
-    for occ in SOC_OCCUPATIONS:
-        major_group = occ["code"][:2]
-        result.append(SOCOccupation(
-            code=occ["code"],
-            title=occ["title"],
-            major_group=major_group,
-            major_group_title=MAJOR_GROUPS.get(major_group, "Unknown"),
-        ))
-    return result
+    from app.services.occupation_index import occupation_index
+
+    return occupation_index.occupations()
 
 
 def search_occupations(query: str, limit: int = 20) -> List[SOCOccupation]:
@@ -931,35 +939,16 @@ def search_occupations(query: str, limit: int = 20) -> List[SOCOccupation]:
     Search occupations by title or code.
 
     Args:
-        query: Search string (matches title or SOC code)
+        query: Search string (title words or a full/partial SOC code)
         limit: Maximum results to return
 
     Returns:
-        List of matching SOCOccupation objects
+        List of matching SOCOccupation objects, best matches first
+        (see occupation_index for the ranking)
     """
-    query_lower = query.lower().strip()
+    from app.services.occupation_index import occupation_index
 
-    if not query_lower:
-        return []
-
-    results = []
-
-    for occ in SOC_OCCUPATIONS:
-        # Match by code or title
-        if (query_lower in occ["code"] or
-            query_lower in occ["title"].lower()):
-            major_group = occ["code"][:2]
-            results.append(SOCOccupation(
-                code=occ["code"],
-                title=occ["title"],
-                major_group=major_group,
-                major_group_title=MAJOR_GROUPS.get(major_group, "Unknown"),
-            ))
-
-            if len(results) >= limit:
-                break
-
-    return results
+    return [entry.occupation for entry in occupation_index.search(query, limit=limit)]
 
 
 def get_occupation_by_code(code: str) -> Optional[SOCOccupation]:
@@ -972,19 +961,10 @@ def get_occupation_by_code(code: str) -> Optional[SOCOccupation]:
     Returns:
         SOCOccupation or None if not found
     """
-    code_clean = code.replace("-", "").strip()
-
-    for occ in SOC_OCCUPATIONS:
-        if occ["code"] == code_clean:
-            major_group = occ["code"][:2]
-            return SOCOccupation(
-                code=occ["code"],
-                title=occ["title"],
-                major_group=major_group,
-                major_group_title=MAJOR_GROUPS.get(major_group, "Unknown"),
-            )
-
-    return None
+    from app.services.occupation_index import occupation_index
+
+    entry = occupation_index.get(code)
+    return entry.occupation if entry else None
 
 
 def get_major_groups() -> Dict[str, str]:
@@ -0,0 +1,122 @@
+"""
+Calricula - Load QCEW Bulk Files
+=================================
+
+Loads QCEW quarterly "single file" CSVs downloaded from
+https://www.bls.gov/cew/downloadable-data-files.htm (e.g.
+2024_qtrly_singlefile.zip) into the qcew_quarterly table. QCEW summaries,
+industry lookups and trends for loaded quarters are then answered locally
+instead of from the QCEW API.
+
+Only California areas (FIPS prefix 06) are kept unless --areas says
+otherwise. Files can be loaded again; existing rows are updated.
+
+The single files have industry codes but no titles; pass the BLS industry
+titles file (https://data.bls.gov/cew/doc/titles/industry/industry_titles.csv)
+with --industry-titles so industries outside the app's own list are named
+as they are in summaries from the QCEW API.
+
+Usage:
+    python scripts/ingest_qcew.py 2024_qtrly_singlefile.zip
+    python scripts/ingest_qcew.py 2024_qtrly_singlefile.zip --industry-titles industry_titles.csv
+    python scripts/ingest_qcew.py 2023.q1-q4.singlefile.csv 2024.q1-q4.singlefile.csv
+    python scripts/ingest_qcew.py 2024_qtrly_singlefile.zip --areas 06037 06059
+    python scripts/ingest_qcew.py 2024_qtrly_singlefile.zip --all-areas
+    python scripts/ingest_qcew.py 2024_qtrly_singlefile.zip --dry-run
+    python scripts/ingest_qcew.py --list
+"""
+
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.qcew_store import qcew_store, read_industry_titles
+
+
+def print_quarters(counts: dict) -> None:
+    for (year, quarter), rows in sorted(counts.items()):
+        print(f"  {year} Q{quarter}: {rows:,} rows")
+
+
+def ingest_files(
+    paths: list[Path],
+    area_prefixes: list[str] | None,
+    dry_run: bool = False,
+    industry_titles: dict[str, str] | None = None,
+) -> None:
+    """Load (or with dry_run, just count) the rows of each file."""
+    for path in paths:
+        print("\n" + "=" * 60)
+        print(f"  {path.name}")
+        print("=" * 60)
+
+        if dry_run:
+            counts = Counter((row["year"], row["qtr"]) for row in qcew_store.read_file(path, area_prefixes))
+        else:
+            counts = qcew_store.ingest(path, area_prefixes, industry_titles=industry_titles)
+        print_quarters(counts)
+
+    if dry_run:
+        print("\n  ** DRY RUN - No changes were made **")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load QCEW quarterly single-file CSVs into the local QCEW store"
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help="Single-file CSVs or the .zip files they are distributed in"
+    )
+    parser.add_argument(
+        "--areas",
+        nargs="+",
+        default=["06"],
+        help="Area FIPS codes or prefixes to keep (default: 06, California)"
+    )
+    parser.add_argument(
+        "--all-areas",
+        action="store_true",
+        help="Keep every area in the file"
+    )
+    parser.add_argument(
+        "--industry-titles",
+        type=Path,
+        help="BLS industry_titles.csv, for the titles of loaded industries"
+    )
+    parser.add_argument(
+        "--dry-run", "-n",
+        action="store_true",
+        help="Count the rows that would be loaded without loading them"
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List the quarters already loaded"
+    )
+
+    args = parser.parse_args()
+
+    if args.list:
+        print_quarters(qcew_store.loaded_quarters())
+        return
+    if not args.files:
+        parser.error("no files given")
+
+    ingest_files(
+        args.files,
+        area_prefixes=None if args.all_areas else args.areas,
+        dry_run=args.dry_run,
+        industry_titles=read_industry_titles(args.industry_titles) if args.industry_titles else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
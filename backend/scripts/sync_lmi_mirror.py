@@ -0,0 +1,56 @@
+"""
+Calricula - Sync California LMI Mirror
+=======================================
+
+Copies the data.ca.gov OEWS wage and long-term projection datasets into the
+local lmi_mirror tables, which LMI lookups (course LMI attach/refresh, the
+/api/lmi endpoints) then use instead of calling CKAN.
+
+The first run copies each dataset in full; later runs fetch only records
+added since, or copy a dataset again if data.ca.gov reports it changed.
+Run it on a schedule (e.g. nightly cron) to keep the mirror current.
+
+Usage:
+    python scripts/sync_lmi_mirror.py
+    python scripts/sync_lmi_mirror.py --full
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.lmi_client import LMIClient
+
+
+async def sync(full: bool = False) -> None:
+    async with LMIClient(timeout=120.0) as client:
+        results = await client.sync_mirror(full=full)
+
+    for result in results:
+        print(
+            f"  {result.resource_id}: {result.mode}, {result.fetched:,} fetched, "
+            f"{result.removed:,} removed, {result.record_count:,} records"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sync the local mirror of the California LMI (CKAN) datasets"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Copy every record again instead of only new ones"
+    )
+
+    args = parser.parse_args()
+    asyncio.run(sync(full=args.full))
+
+
+if __name__ == "__main__":
+    main()
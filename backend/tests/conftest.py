@@ -15,10 +15,16 @@ from typing import Generator
 from unittest.mock import MagicMock, patch
 
 from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.core.database import engine, get_session
+from app.core.config import settings
+from app.core.database import engine, get_session, get_async_session, get_async_database_url
+from app.core.deadlines import install_statement_timeout
+from app.core.query_stats import instrument_engine
 from app.models.user import User, UserRole
 from app.models.course import Course, CourseStatus, StudentLearningOutcome, CourseContent
 from app.models.department import Department
@@ -37,6 +43,31 @@ def test_engine():
     return engine
 
 
+@pytest.fixture(scope="session", autouse=True)
+def async_session_override():
+    """
+    Serve async routes from a NullPool engine during tests.
+
+    TestClient runs each request on a fresh event loop, and asyncpg
+    connections cannot be reused across loops, so the pooled app engine
+    is swapped for one that opens a new connection per session.
+    """
+    async_url, connect_args = get_async_database_url(settings.DATABASE_URL)
+    test_async_engine = create_async_engine(
+        async_url, poolclass=NullPool, connect_args=connect_args
+    )
+    instrument_engine(test_async_engine.sync_engine)
+    install_statement_timeout(test_async_engine.sync_engine)
+
+    async def override_get_async_session():
+        async with AsyncSession(test_async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    yield
+    app.dependency_overrides.pop(get_async_session, None)
+
+
 @pytest.fixture
 def db_session(test_engine) -> Generator[Session, None, None]:
     """
@@ -66,6 +97,30 @@ def authenticated_client(client, faculty_user) -> TestClient:
     return client
 
 
+@pytest.fixture
+def assert_max_queries():
+    """
+    Assert that a request stayed within a SQL query budget.
+
+    Reads the X-DB-Queries header set by QueryStatsMiddleware, so a new
+    per-row lookup (N+1) in an endpoint fails the test.
+
+    Usage:
+        def test_list(client, assert_max_queries):
+            response = client.get("/api/courses", headers=auth_headers)
+            assert_max_queries(response, 4)
+    """
+    def _assert_max_queries(response, budget: int) -> None:
+        assert "x-db-queries" in response.headers, "X-DB-Queries header missing (DB_QUERY_STATS_ENABLED off?)"
+        count = int(response.headers["x-db-queries"])
+        assert count <= budget, (
+            f"{response.request.method} {response.request.url.path} issued {count} SQL queries "
+            f"(budget {budget}); see 'Possible N+1' warnings in the log"
+        )
+
+    return _assert_max_queries
+
+
 # =============================================================================
 # User Fixtures
 # =============================================================================
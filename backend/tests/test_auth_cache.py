@@ -0,0 +1,100 @@
+"""
+Tests for the verified-token and user caches behind get_current_user.
+
+Tests cover:
+- Token claims cached until exp, keyed by hash, never for tokens without exp
+- Users served from cache and invalidated when the row is updated
+- Rows read before a concurrent invalidation are not cached
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.auth_cache import TokenCache, UserCache, token_cache, user_cache
+from app.core.metrics import CACHE_REQUESTS
+from app.models.user import UserRole
+
+AUTH = {"Authorization": "Bearer cached_token"}
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    token_cache.clear()
+    user_cache.clear()
+    yield
+    token_cache.clear()
+    user_cache.clear()
+
+
+class TestTokenCache:
+    """Decoded claims are held until the token expires."""
+
+    def test_cached_until_exp(self):
+        """Claims with a future exp are cached; expired or exp-less claims are not."""
+        cache = TokenCache(max_size=10)
+        cache.put("live", {"uid": "a", "exp": time.time() + 60})
+        cache.put("expired", {"uid": "b", "exp": time.time() - 1})
+        cache.put("dev", {"uid": "c"})
+        assert cache.get("live")["uid"] == "a"
+        assert cache.get("expired") is None
+        assert cache.get("dev") is None
+        assert "live" not in cache._entries._entries
+
+    def test_bounded(self):
+        """The least recently used token is evicted past max_size."""
+        cache = TokenCache(max_size=2)
+        exp = time.time() + 60
+        for token in ("t1", "t2"):
+            cache.put(token, {"uid": token, "exp": exp})
+        cache.get("t1")
+        cache.put("t3", {"uid": "t3", "exp": exp})
+        assert cache.get("t2") is None
+        assert cache.get("t1") and cache.get("t3")
+
+    def test_verification_skipped_on_repeat(self, client, faculty_user):
+        """A token is verified once across requests."""
+        claims = {"uid": faculty_user.firebase_uid, "exp": time.time() + 3600}
+        with patch("app.core.deps.verify_firebase_token", return_value=claims) as verify:
+            assert client.post("/api/auth/logout", headers=AUTH).status_code == 200
+            assert client.post("/api/auth/logout", headers=AUTH).status_code == 200
+        assert verify.call_count == 1
+
+
+class TestUserCache:
+    """Users by firebase_uid."""
+
+    def test_hit_then_invalidated_by_update(self, client, db_session, faculty_user):
+        """Repeat requests hit the cache; updating the user drops the entry."""
+        hits = CACHE_REQUESTS.labels("auth_user", "hit")
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": faculty_user.firebase_uid}):
+            client.get("/api/auth/me", headers=AUTH)
+            before = hits.value
+            assert client.get("/api/auth/me", headers=AUTH).json()["role"] == "Faculty"
+            assert hits.value == before + 1
+
+            faculty_user.role = UserRole.CURRICULUM_CHAIR
+            db_session.add(faculty_user)
+            db_session.commit()
+            assert client.get("/api/auth/me", headers=AUTH).json()["role"] == "CurriculumChair"
+            assert hits.value == before + 1
+
+    def test_cached_user_is_usable_in_session(self, db_session, faculty_user):
+        """A cached user attaches to a new session and can be modified."""
+        user_cache.put(faculty_user, user_cache.generation)
+        db_session.expunge_all()
+        user = user_cache.get(db_session, faculty_user.firebase_uid)
+        assert user in db_session
+        assert not db_session.is_modified(user)
+        user.full_name = "Renamed"
+        db_session.commit()
+        assert user_cache.get(db_session, faculty_user.firebase_uid) is None
+
+    def test_stale_generation_not_cached(self, faculty_user):
+        """A row read before an invalidation is not stored."""
+        cache = UserCache(max_size=10, ttl_seconds=30)
+        generation = cache.generation
+        cache.invalidate(faculty_user.firebase_uid)
+        cache.put(faculty_user, generation)
+        assert len(cache._entries) == 0
@@ -0,0 +1,213 @@
+"""
+Tests for the BLS series cache.
+
+The BLS API is replaced by an httpx MockTransport that records the series
+requested in each POST.
+
+Tests cover:
+- Per-survey TTLs
+- Repeat and overlapping requests only fetching uncached series
+- The database tier answering after the worker's memory is cleared
+- Stale entries served immediately and refreshed once in the background
+- Failed API responses (e.g. quota exceeded) not being cached
+- Long series lists split into concurrent requests within the API limit
+- Concurrent calls for the same series sharing one request (singleflight)
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.models.labor_market import BLSSeriesCache
+from app.services import bls_cache, bls_client
+from app.services.bls_cache import bls_series_cache, ttl_for
+from app.services.bls_client import BLSClient
+
+
+class FakeBLS:
+    """Answers every requested series with one data point whose value is the call number."""
+
+    def __init__(self, status="REQUEST_SUCCEEDED"):
+        self.status = status
+        self.status_code = 200
+        self.delay = 0.0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request):
+        series_ids = json.loads(request.content)["seriesid"]
+        self.requests.append(series_ids)
+        value = str(len(self.requests))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return httpx.Response(self.status_code, json={
+            "status": self.status,
+            "responseTime": 12,
+            "message": [],
+            "Results": {"series": [
+                {"seriesID": sid, "data": [{"year": "2025", "period": "M01", "periodName": "January",
+                                            "value": value, "footnotes": [{}]}]}
+                for sid in series_ids
+            ]},
+        })
+
+    def client(self):
+        return BLSClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handler)))
+
+
+@pytest.fixture
+def fake_bls():
+    """A fake BLS API; cache rows for the test's series are removed before and after."""
+    def clear():
+        bls_series_cache.clear_memory()
+        with Session(engine) as session:
+            session.exec(delete(BLSSeriesCache).where(BLSSeriesCache.series_id.like("TEST%")))
+            session.commit()
+
+    clear()
+    yield FakeBLS()
+    clear()
+
+
+def _values(response):
+    return {series.series_id: series.data[0].value for series in response.series}
+
+
+class TestTTL:
+    """Freshness by survey."""
+
+    def test_survey_ttls(self):
+        """OES series are annual, CPI/unemployment monthly, others the default."""
+        assert ttl_for("OEUS060000000000029114104") == bls_cache.settings.BLS_CACHE_TTL_ANNUAL_SECONDS
+        assert ttl_for("CUUR0000SA0") == bls_cache.settings.BLS_CACHE_TTL_MONTHLY_SECONDS
+        assert ttl_for("LNS14000000") == bls_cache.settings.BLS_CACHE_TTL_MONTHLY_SECONDS
+        assert ttl_for("XX123") == bls_cache.settings.BLS_CACHE_TTL_DEFAULT_SECONDS
+
+
+class TestFetchSeries:
+    """fetch_series through the cache."""
+
+    async def test_only_uncached_series_fetched(self, fake_bls):
+        """Repeats are served from cache; overlapping lists fetch only the new series."""
+        client = fake_bls.client()
+        first = await client.fetch_series(["TESTA", "TESTB"], 2022, 2025)
+        again = await client.fetch_series(["TESTB", "TESTA"], 2022, 2025)
+        overlap = await client.fetch_series(["TESTB", "TESTC"], 2022, 2025)
+
+        assert fake_bls.requests == [["TESTA", "TESTB"], ["TESTC"]]
+        assert _values(first) == {"TESTA": "1", "TESTB": "1"}
+        assert [s.series_id for s in again.series] == ["TESTB", "TESTA"]
+        assert _values(overlap) == {"TESTB": "1", "TESTC": "2"}
+
+        # Another year range is another entry
+        await client.fetch_series(["TESTA"], 2020, 2025)
+        assert fake_bls.requests[-1] == ["TESTA"]
+
+    async def test_database_tier(self, fake_bls):
+        """Series cached by one worker are read from the table by another."""
+        client = fake_bls.client()
+        await client.fetch_series(["TESTD"], 2022, 2025)
+        bls_series_cache.clear_memory()
+        response = await client.fetch_series(["TESTD"], 2022, 2025)
+        assert _values(response) == {"TESTD": "1"}
+        assert len(fake_bls.requests) == 1
+
+    async def test_stale_while_revalidate(self, fake_bls):
+        """A stale series is returned at once and refreshed by a single background fetch."""
+        with patch.object(bls_cache.settings, "BLS_CACHE_TTL_DEFAULT_SECONDS", 0), \
+                patch.object(bls_client, "http_clients") as pool:
+            pool.get.return_value = fake_bls.client().client
+            client = fake_bls.client()
+            await client.fetch_series(["TESTE"], 2022, 2025)
+
+            stale = await asyncio.gather(*(client.fetch_series(["TESTE"], 2022, 2025) for _ in range(3)))
+            assert all(_values(response) == {"TESTE": "1"} for response in stale)
+            await asyncio.gather(*bls_client._revalidation_tasks)
+
+        assert fake_bls.requests == [["TESTE"], ["TESTE"]]
+        key = ("TESTE", 2022, 2025, bool(client.api_key))
+        refreshed = await bls_series_cache.get_many([key])
+        assert refreshed[key].payload["data"][0]["value"] == "2"
+
+    async def test_failures_not_cached(self, fake_bls):
+        """Responses without REQUEST_SUCCEEDED are passed through but not stored."""
+        fake_bls.status = "REQUEST_NOT_PROCESSED"
+        client = fake_bls.client()
+        response = await client.fetch_series(["TESTF"], 2022, 2025)
+        assert response.status == "REQUEST_NOT_PROCESSED"
+        await client.fetch_series(["TESTF"], 2022, 2025)
+        assert len(fake_bls.requests) == 2
+
+
+class TestBatching:
+    """Chunked and coalesced API requests."""
+
+    async def test_long_lists_chunked(self, fake_bls):
+        """120 series go out as concurrent requests of at most 50 (25 without a key)."""
+        fake_bls.delay = 0.05
+        series_ids = [f"TESTL{i:03d}" for i in range(120)]
+        client = fake_bls.client()
+        client.api_key = "key"
+        response = await client.fetch_series(series_ids, 2022, 2025, catalog=False)
+
+        assert [len(ids) for ids in fake_bls.requests] == [50, 50, 20]
+        assert fake_bls.max_in_flight == 3
+        assert [s.series_id for s in response.series] == series_ids
+
+        client.api_key = None
+        await client.fetch_series(series_ids, 2018, 2025)
+        assert [len(ids) for ids in fake_bls.requests[3:]] == [25, 25, 25, 25, 20]
+
+    async def test_concurrent_calls_coalesced(self, fake_bls):
+        """Series already being fetched are waited for, not requested again."""
+        fake_bls.delay = 0.05
+        client = fake_bls.client()
+        first, second, third = await asyncio.gather(
+            client.fetch_series(["TESTM", "TESTN"], 2022, 2025),
+            client.fetch_series(["TESTN", "TESTO"], 2022, 2025),
+            client.fetch_series(["TESTM"], 2022, 2025),
+        )
+        # Whichever call claims a series first fetches it; each is fetched once
+        requested = [series_id for ids in fake_bls.requests for series_id in ids]
+        assert sorted(requested) == ["TESTM", "TESTN", "TESTO"]
+        assert [s.series_id for s in second.series] == ["TESTN", "TESTO"]
+        assert _values(first)["TESTN"] == _values(second)["TESTN"]
+        assert _values(first)["TESTM"] == _values(third)["TESTM"]
+        assert not bls_client._in_flight
+
+    async def test_errors_reach_every_caller(self, fake_bls):
+        """A failed shared request fails each caller waiting on it."""
+        fake_bls.delay = 0.05
+        fake_bls.status_code = 500
+        client = fake_bls.client()
+        results = await asyncio.gather(
+            client.fetch_series(["TESTP"], 2022, 2025),
+            client.fetch_series(["TESTP"], 2022, 2025),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+        assert len(fake_bls.requests) == 1
+        assert not bls_client._in_flight
+
+    async def test_joiner_survives_cancelled_starter(self, fake_bls):
+        """Cancelling the caller that started a fetch doesn't cancel it for the others."""
+        fake_bls.delay = 0.1
+        client = fake_bls.client()
+        starter = asyncio.create_task(client.fetch_series(["TESTQ"], 2022, 2025))
+        await asyncio.sleep(0.02)
+        joiner = asyncio.create_task(client.fetch_series(["TESTQ"], 2022, 2025))
+        await asyncio.sleep(0.02)
+        starter.cancel()
+
+        assert _values(await joiner) == {"TESTQ": "1"}
+        assert starter.cancelled()
+        assert len(fake_bls.requests) == 1
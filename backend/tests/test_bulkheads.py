@@ -0,0 +1,130 @@
+"""
+Tests for per-class concurrency bulkheads.
+
+Tests cover:
+- Concurrency cap with FIFO hand-off to queued requests
+- Shedding when the queue is full or the wait times out, with Retry-After
+- Cancelled waiters giving up their place (or slot)
+- The FastAPI dependency: 503 + Retry-After, unaffected routes, queue-wait metrics
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from app.core import bulkheads
+from app.core.bulkheads import QUEUE_WAIT, Bulkhead, BulkheadFull, bulkhead
+
+
+async def _hold(compartment, order, name, release_event):
+    await compartment.acquire()
+    order.append(name)
+    await release_event.wait()
+    compartment.release(0.5)
+
+
+class TestBulkhead:
+    """Bulkhead admission."""
+
+    async def test_cap_and_fifo(self):
+        """At most max_concurrent run; queued requests get slots in arrival order."""
+        compartment = Bulkhead("test", max_concurrent=2, max_queue=5, queue_timeout=5)
+        order, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(compartment, order, i, release)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        assert order == [0, 1]
+        assert (compartment.active, compartment.queued) == (2, 3)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2, 3, 4]
+        assert (compartment.active, compartment.queued) == (0, 0)
+
+    async def test_queue_full_sheds_with_retry_after(self):
+        """Arrivals beyond the queue cap are rejected immediately."""
+        compartment = Bulkhead("test", max_concurrent=1, max_queue=1, queue_timeout=5)
+        compartment._hold_seconds = 4.0
+        await compartment.acquire()
+        waiter = asyncio.create_task(compartment.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(BulkheadFull) as exc_info:
+            await compartment.acquire()
+        assert exc_info.value.reason == "queue_full"
+        assert exc_info.value.retry_after == 8  # two holds ahead of a new arrival
+        compartment.release()
+        await waiter
+
+    async def test_timeout_and_cancellation(self):
+        """Timed-out or cancelled waiters leave the queue; slots aren't lost."""
+        compartment = Bulkhead("test", max_concurrent=1, max_queue=5, queue_timeout=0.02)
+        await compartment.acquire()
+        with pytest.raises(BulkheadFull) as exc_info:
+            await compartment.acquire()
+        assert exc_info.value.reason == "timeout"
+
+        compartment.queue_timeout = 5
+        cancelled = asyncio.create_task(compartment.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert compartment.queued == 0
+
+        compartment.release()
+        assert compartment.active == 0
+        await compartment.acquire()
+        assert compartment.active == 1
+
+
+class TestDependency:
+    """bulkhead() as a route dependency."""
+
+    async def test_sheds_only_its_class(self):
+        """A saturated class returns 503 + Retry-After; other routes still answer."""
+        app = FastAPI()
+        started, finish = asyncio.Event(), asyncio.Event()
+
+        @app.get("/export", dependencies=[Depends(bulkhead("export"))])
+        async def export():
+            started.set()
+            await finish.wait()
+            return {"ok": True}
+
+        @app.get("/courses")
+        async def courses():
+            return {"ok": True}
+
+        compartment = Bulkhead("export", max_concurrent=1, max_queue=0, queue_timeout=1)
+        wait = QUEUE_WAIT.labels("export")
+        observed = wait.snapshot()[1]
+        with patch.dict(bulkheads.BULKHEADS, {"export": compartment}):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                slow = asyncio.create_task(client.get("/export"))
+                await started.wait()
+                shed = await client.get("/export")
+                assert shed.status_code == 503
+                assert shed.headers["retry-after"] == "1"
+                assert (await client.get("/courses")).status_code == 200
+                finish.set()
+                assert (await slow).status_code == 200
+
+        assert compartment.active == 0
+        assert wait.snapshot()[1] == observed + 1
+
+    def test_registered_on_expensive_routers(self, client):
+        """The app's AI, export, eLumen and BLS/QCEW routes carry a bulkhead."""
+        guarded = {
+            route.path
+            for route in client.app.routes
+            if any(getattr(d.dependency, "__qualname__", "").startswith("bulkhead.")
+                   for d in getattr(route, "dependencies", []))
+        }
+        assert "/api/ai/chat" in guarded
+        assert "/api/export/course/{course_id}/pdf" in guarded
+        assert "/api/bls/oes" in guarded
+        assert "/api/qcew/areas" in guarded
+        assert "/api/courses/{course_id}" not in guarded
@@ -0,0 +1,196 @@
+"""
+Unit tests for the in-memory course autocomplete index.
+
+Tests cover:
+- Key generation for code, compact code and title words
+- Prefix lookup ordering, de-duplication, limits and filters
+- Incremental upsert and removal
+- Loading: indexed columns only, first build shared, stale rebuilds in the
+  background, changes made during a rebuild kept
+"""
+
+import asyncio
+import threading
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import select
+
+from app.core.database import engine
+
+from app.models.course import Course, CourseStatus
+from app.services.course_autocomplete import (
+    AutocompleteEntry,
+    CourseAutocompleteIndex,
+    index_keys,
+)
+
+
+def _entry(subject, number, title, status=CourseStatus.DRAFT):
+    return AutocompleteEntry(
+        id=uuid.uuid4(),
+        subject_code=subject,
+        course_number=number,
+        title=title,
+        status=status,
+        department_id=None,
+    )
+
+
+@pytest.fixture
+def entries():
+    return [
+        _entry("MATH", "101", "College Algebra", CourseStatus.APPROVED),
+        _entry("MATH", "201", "Calculus I"),
+        _entry("MATH", "202", "Calculus II"),
+        _entry("ENGL", "101", "College Composition", CourseStatus.APPROVED),
+    ]
+
+
+@pytest.fixture
+def index(entries):
+    idx = CourseAutocompleteIndex()
+    idx.build(entries)
+    return idx
+
+
+class TestIndexKeys:
+    """Tests for index_keys."""
+
+    def test_keys(self):
+        """A course is reachable by full code, compact code and title words."""
+        keys = index_keys(_entry("MATH", "101", "College  Algebra"))
+        assert keys == sorted(["math 101 college algebra", "math101", "college algebra", "algebra"])
+
+
+class TestSearch:
+    """Tests for CourseAutocompleteIndex.search."""
+
+    def test_code_prefix_in_code_order(self, index):
+        """Code prefixes return courses in subject/number order."""
+        results = index.search("math 2")
+        assert [(e.subject_code, e.course_number) for e in results] == [("MATH", "201"), ("MATH", "202")]
+
+    def test_compact_code_and_case(self, index):
+        """Queries are case-insensitive and match codes typed without a space."""
+        assert [e.course_number for e in index.search("Math10")] == ["101"]
+
+    def test_title_word_prefix(self, index):
+        """Any title word can start a match."""
+        assert [e.title for e in index.search("alg")] == ["College Algebra"]
+
+    def test_each_course_once(self, index):
+        """A course matching under several keys is returned once."""
+        results = index.search("college")
+        assert len(results) == len({e.id for e in results}) == 2
+
+    def test_limit_status_and_exclude(self, index, entries):
+        """Limit, status filter and exclude_id are applied."""
+        assert len(index.search("math", limit=1)) == 1
+        assert [e.subject_code for e in index.search("college", status=CourseStatus.APPROVED)] == ["MATH", "ENGL"]
+        assert entries[1].id not in {e.id for e in index.search("calc", exclude_id=entries[1].id)}
+
+    def test_blank_query(self, index):
+        """Whitespace-only queries match nothing."""
+        assert index.search("   ") == []
+
+
+class TestIncrementalUpdates:
+    """Tests for upsert / remove."""
+
+    def test_upsert_replaces_old_keys(self, index, entries):
+        """Renaming a course drops its old keys and adds the new ones."""
+        renamed = AutocompleteEntry(**{**entries[1].__dict__, "title": "Differential Calculus"})
+        index.upsert(renamed)
+        assert [e.title for e in index.search("diff")] == ["Differential Calculus"]
+        assert [e.title for e in index.search("calculus i")] == ["Calculus II"]
+
+    def test_upsert_new_and_remove(self, index):
+        """New courses appear immediately and removed courses disappear."""
+        course = _entry("CS", "110", "Intro to Programming")
+        index.upsert(course)
+        assert index.search("cs 1")[0].id == course.id
+        index.remove(course.id)
+        assert index.search("cs 1") == []
+        assert len(index) == 4
+
+    def test_staleness(self):
+        """A never-built index is stale; a fresh build is not."""
+        idx = CourseAutocompleteIndex(max_age_seconds=60)
+        assert idx.is_stale
+        idx.build([])
+        assert not idx.is_stale
+
+
+@pytest.fixture
+def statements():
+    """SQL statements sent to the database during the test."""
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(engine, "before_cursor_execute", record)
+
+
+class TestLoading:
+    """Tests for load / ensure_loaded."""
+
+    def test_load_reads_indexed_columns(self, db_session, statements):
+        """Loading indexes every course but selects only the indexed columns."""
+        idx = CourseAutocompleteIndex()
+        idx.load()
+        assert len(idx) == db_session.exec(select(func.count()).select_from(Course)).one()
+        load_sql = next(s for s in statements if "FROM courses" in s)
+        assert "catalog_description" not in load_sql
+
+    async def test_first_build_shared(self):
+        """Concurrent first lookups wait for a single build."""
+        idx = CourseAutocompleteIndex()
+        calls = []
+
+        def load():
+            calls.append(1)
+            idx.build([_entry("MATH", "101", "College Algebra")])
+
+        with patch.object(idx, "load", side_effect=load):
+            await asyncio.gather(*(idx.ensure_loaded() for _ in range(3)))
+        assert len(calls) == 1
+        assert idx.search("math")
+
+    async def test_stale_rebuild_in_background(self):
+        """A stale index keeps answering while it is rebuilt off the request."""
+        idx = CourseAutocompleteIndex(max_age_seconds=0)
+        idx.build([_entry("MATH", "101", "College Algebra")])
+        release = threading.Event()
+
+        def load():
+            release.wait(5)
+            idx.build([_entry("ENGL", "101", "College Composition")])
+
+        with patch.object(idx, "load", side_effect=load):
+            await asyncio.wait_for(idx.ensure_loaded(), timeout=1)
+            assert [e.subject_code for e in idx.search("college")] == ["MATH"]
+            release.set()
+            await idx._loading
+        assert [e.subject_code for e in idx.search("college")] == ["ENGL"]
+
+    def test_changes_during_rebuild_kept(self, statements):
+        """A course committed while the rebuild reads the database survives the swap."""
+        idx = CourseAutocompleteIndex()
+        added = _entry("ZOOL", "999", "Changed During Rebuild")
+
+        def commit_during_read(conn, cursor, statement, parameters, context, executemany):
+            if "FROM courses" in statement:
+                idx.upsert(added)
+
+        event.listen(engine, "before_cursor_execute", commit_during_read)
+        try:
+            idx.load()
+        finally:
+            event.remove(engine, "before_cursor_execute", commit_during_read)
+        assert [e.id for e in idx.search("zool")] == [added.id]
@@ -0,0 +1,143 @@
+"""
+Unit tests for the course search service.
+
+Tests cover:
+- Prefix tsquery construction from free text
+- Search predicates with and without full-text / trigram support
+- Rank and highlight expressions
+- The search condition being answered by index scans (EXPLAIN, needs pg_trgm)
+- Capability probes: kept once full-text search is found, retried otherwise
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.models.course import Course
+from app.services import course_search
+from app.services.course_search import (
+    CourseSearch,
+    SearchCapabilities,
+    _prefix_tsquery,
+    get_search_capabilities,
+    reset_search_capabilities,
+)
+
+
+def _sql(expr) -> str:
+    """Compile an expression for PostgreSQL with literal values inlined."""
+    return str(expr.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class TestPrefixTsquery:
+    """Tests for _prefix_tsquery."""
+
+    def test_words_become_prefix_terms(self):
+        """Each word becomes a prefix term, ANDed together."""
+        assert _prefix_tsquery("Intro Calc") == "intro:* & calc:*"
+
+    def test_operators_are_stripped(self):
+        """tsquery operators in user input cannot change the query shape."""
+        assert _prefix_tsquery("math & !(101 | ') ") == "math:* & 101:*"
+
+    def test_no_words(self):
+        """Input without word characters yields no tsquery."""
+        assert _prefix_tsquery("!?& ") is None
+
+
+class TestCourseSearch:
+    """Tests for CourseSearch expressions."""
+
+    def test_fallback_uses_ilike_only(self):
+        """Without search_vector the condition is an ILIKE match on title and code."""
+        search = CourseSearch("alg", SearchCapabilities())
+        sql = _sql(search.condition())
+        assert "courses.title ILIKE '%%alg%%'" in sql
+        assert "(courses.subject_code || ' ' || courses.course_number) ILIKE '%%alg%%'" in sql
+        assert "courses.subject_code ILIKE" not in sql and "courses.course_number ILIKE" not in sql
+        assert "search_vector" not in sql
+        assert "NULL" in _sql(search.highlight())
+
+    def test_fulltext_condition_and_rank(self):
+        """With full-text support, the vector is matched and ranked."""
+        search = CourseSearch("linear equations", SearchCapabilities(fulltext=True))
+        assert "courses.search_vector @@ to_tsquery('english', 'linear:* & equations:*')" in _sql(search.condition())
+        assert "ts_rank_cd" in _sql(search.rank())
+        assert "ts_headline" in _sql(search.highlight())
+
+    def test_trigram_adds_similarity(self):
+        """With pg_trgm, fuzzy title matches are included and scored."""
+        search = CourseSearch("calclus", SearchCapabilities(fulltext=True, trigram=True))
+        assert "courses.title %% 'calclus'" in _sql(search.condition())
+        assert "similarity(courses.title, 'calclus')" in _sql(search.rank())
+
+    def test_code_prefix_boost(self):
+        """Queries that look like a course code boost code-prefix matches."""
+        sql = _sql(CourseSearch("MATH 1", SearchCapabilities()).rank())
+        assert "(courses.subject_code || ' ' || courses.course_number) ILIKE 'MATH 1%%'" in sql
+
+
+class TestQueryPlan:
+    """EXPLAIN of the search condition on the test database."""
+
+    def test_condition_uses_indexes(self, test_engine):
+        """Every arm of the full condition is served by an index; no sequential scan."""
+        with test_engine.connect() as conn:
+            if not conn.exec_driver_sql("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'").scalar():
+                pytest.skip("pg_trgm is not available on this server")
+            if not conn.exec_driver_sql("SELECT to_regclass('ix_courses_search_vector') IS NOT NULL").scalar():
+                pytest.skip("courses.search_vector has not been migrated")
+
+            # The extension and indexes of the migration; rolled back below
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_courses_title_trgm ON courses USING GIN (title gin_trgm_ops)"
+            )
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_courses_code_trgm "
+                "ON courses USING GIN ((subject_code || ' ' || course_number) gin_trgm_ops)"
+            )
+            # Small test tables would often be scanned anyway; make any seq scan a last resort
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+            search = CourseSearch("calc", SearchCapabilities(fulltext=True, trigram=True))
+            compiled = select(Course.id).where(search.condition()).compile(dialect=conn.dialect)
+            plan = "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params))
+            conn.rollback()
+
+        assert "Seq Scan" not in plan, plan
+        for index in ("ix_courses_title_trgm", "ix_courses_code_trgm", "ix_courses_search_vector"):
+            assert f"Bitmap Index Scan on {index}" in plan, plan
+
+
+class TestCapabilities:
+    """Tests for the cached capability probe."""
+
+    def test_failed_probe_is_retried(self):
+        """A failed or pre-migration probe is repeated after the retry interval; a good one is kept."""
+        session = MagicMock()
+        session.connection.return_value.execute.return_value.one.side_effect = [
+            RuntimeError("connection reset"),
+            SimpleNamespace(fulltext=False, trigram=False),
+            SimpleNamespace(fulltext=True, trigram=True),
+        ]
+        retry = course_search.CAPABILITIES_RETRY_SECONDS
+        reset_search_capabilities()
+        try:
+            with patch.object(course_search.time, "monotonic") as clock:
+                clock.return_value = 1000.0
+                assert get_search_capabilities(session) == SearchCapabilities()
+                clock.return_value += retry / 2
+                assert get_search_capabilities(session) == SearchCapabilities()
+                clock.return_value += retry
+                assert get_search_capabilities(session) == SearchCapabilities()
+                clock.return_value += retry
+                assert get_search_capabilities(session) == SearchCapabilities(fulltext=True, trigram=True)
+                clock.return_value += retry * 100
+                assert get_search_capabilities(session) == SearchCapabilities(fulltext=True, trigram=True)
+            assert session.connection.return_value.execute.call_count == 3
+        finally:
+            reset_search_capabilities()
@@ -0,0 +1,135 @@
+"""
+Tests for pre-aggregated course status statistics.
+
+Tests cover:
+- Incremental maintenance on course create, transition, return and delete
+- Agreement between the maintained table, a rebuild and live aggregation
+- Dashboard analytics and approval counts served from the totals
+"""
+
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models.course import Course, CourseStatus
+from app.models.department import Department
+from app.models.user import UserRole
+from app.services.course_stats import (
+    _live_totals,
+    load_status_totals,
+    rebuild_course_stats,
+)
+
+AUTH = {"Authorization": "Bearer test_token"}
+
+
+@pytest.fixture
+def department(db_session):
+    unique_id = uuid.uuid4().hex[:8]
+    dept = Department(name=f"Stats Test {unique_id}", code=f"STA{unique_id[:4]}")
+    db_session.add(dept)
+    db_session.commit()
+    return dept
+
+
+@pytest.fixture
+def courses(db_session, department, faculty_user):
+    """Three draft courses in the test department."""
+    created = []
+    for i in range(3):
+        course = Course(
+            subject_code=department.code,
+            course_number=f"S{i}{uuid.uuid4().hex[:3]}",
+            title=f"Stats Test {i}",
+            department_id=department.id,
+            created_by=faculty_user.id,
+            status=CourseStatus.DRAFT,
+            units=Decimal("3.0"),
+        )
+        db_session.add(course)
+        created.append(course)
+    db_session.commit()
+    return created
+
+
+def _transition(client, user, course_id, new_status):
+    with patch("app.core.deps.verify_firebase_token", return_value={"uid": user.firebase_uid}):
+        response = client.post(
+            f"/api/approvals/{course_id}/transition",
+            json={"new_status": new_status.value},
+            headers=AUTH,
+        )
+    assert response.status_code == 200, response.text
+    return response
+
+
+class TestIncrementalMaintenance:
+    """course_status_stats follows ORM changes."""
+
+    def test_create_and_delete(self, db_session, department, courses):
+        """New courses are counted; deleted courses are removed."""
+        assert load_status_totals(db_session, department_id=department.id).course_count[CourseStatus.DRAFT] == 3
+        db_session.delete(courses[0])
+        db_session.commit()
+        assert load_status_totals(db_session, department_id=department.id).course_count[CourseStatus.DRAFT] == 2
+
+    def test_transitions(self, client, db_session, admin_user, department, courses):
+        """Transitions move counts between statuses and record approvals and returns."""
+        _transition(client, admin_user, courses[0].id, CourseStatus.DEPT_REVIEW)
+        _transition(client, admin_user, courses[1].id, CourseStatus.DEPT_REVIEW)
+        _transition(client, admin_user, courses[0].id, CourseStatus.APPROVED)
+        _transition(client, admin_user, courses[1].id, CourseStatus.DRAFT)
+
+        totals = load_status_totals(db_session, department_id=department.id)
+        assert totals.course_count[CourseStatus.DRAFT] == 2
+        assert totals.course_count[CourseStatus.DEPT_REVIEW] == 0
+        assert totals.course_count[CourseStatus.APPROVED] == 1
+        assert totals.entered_count[CourseStatus.DEPT_REVIEW] == 2
+        assert (totals.approvals, totals.returns) == (1, 1)
+
+    def test_matches_rebuild_and_live(self, client, db_session, admin_user, department, courses):
+        """Maintained totals equal a full rebuild and a live aggregation."""
+        _transition(client, admin_user, courses[2].id, CourseStatus.CURRICULUM_COMMITTEE)
+        db_session.expire_all()
+        maintained = load_status_totals(db_session, department_id=department.id)
+        live = _live_totals(db_session, Course.department_id == department.id)
+        assert [maintained.count([s]) for s in CourseStatus] == [live.count([s]) for s in CourseStatus]
+        assert maintained.average_age_days([CourseStatus.CURRICULUM_COMMITTEE]) == pytest.approx(
+            live.average_age_days([CourseStatus.CURRICULUM_COMMITTEE]), abs=1e-3
+        )
+
+        rebuild_course_stats(db_session)
+        rebuilt = load_status_totals(db_session, department_id=department.id)
+        db_session.rollback()
+        assert rebuilt.count(CourseStatus) == maintained.count(CourseStatus) == 3
+        assert rebuilt.approvals + rebuilt.returns == maintained.approvals + maintained.returns
+
+
+class TestEndpoints:
+    """Endpoints read the pre-aggregated totals."""
+
+    def test_chair_analytics(self, client, db_session, department, courses, admin_user):
+        """A chair's analytics reflect their department's totals."""
+        chair = admin_user
+        chair.role = UserRole.CURRICULUM_CHAIR
+        chair.department_id = department.id
+        db_session.add(chair)
+        db_session.commit()
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": chair.firebase_uid}):
+            response = client.get("/api/dashboard/analytics", headers=AUTH)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_courses"] == 3
+        assert data["courses_by_status"] == [{"status": "Draft", "count": 3, "percentage": 100.0}]
+        assert data["avg_review_days"] is None
+
+    def test_approval_counts(self, client, admin_user, courses):
+        """Pending counts include newly submitted courses."""
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": admin_user.firebase_uid}):
+            before = client.get("/api/approvals/counts", headers=AUTH).json()
+        _transition(client, admin_user, courses[0].id, CourseStatus.DEPT_REVIEW)
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": admin_user.firebase_uid}):
+            after = client.get("/api/approvals/counts", headers=AUTH).json()
+        assert after["all_pending"] == before["all_pending"] + 1
@@ -0,0 +1,197 @@
+"""
+Tests for end-to-end request deadlines.
+
+Tests cover:
+- Budget selection: X-Request-Timeout header (capped), route prefix, default
+- Remaining-budget arithmetic for timeouts, and DeadlineExceeded once past
+- statement_timeout on the app's PostgreSQL engine, scoped to the transaction
+- Outbound httpx calls cut short by the deadline
+- The middleware: 504 for requests running past the deadline, deadline
+  visible to sync endpoints
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import exc, text
+
+from app.core.database import engine
+from app.core.deadlines import (
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    cap_timeouts,
+    deadline_var,
+    is_statement_timeout,
+    remaining,
+    timeout_for,
+)
+from app.core.metrics import timed_transport
+
+
+@pytest.fixture
+def deadline():
+    """Set the current deadline `seconds` from now (None clears it); reset afterwards."""
+    tokens = []
+
+    def _set(seconds):
+        tokens.append(deadline_var.set(None if seconds is None else time.monotonic() + seconds))
+
+    yield _set
+    for token in reversed(tokens):
+        deadline_var.reset(token)
+
+
+def _scope(path, timeout=None):
+    headers = [(b"x-request-timeout", timeout.encode())] if timeout else []
+    return {"type": "http", "path": path, "headers": headers}
+
+
+class TestBudget:
+    """Deadline selection and remaining budget."""
+
+    def test_header_route_and_default(self):
+        """The header wins (capped); otherwise the longest matching prefix, then the default."""
+        middleware = DeadlineMiddleware(
+            None, default_seconds=30, max_seconds=300,
+            route_deadlines={"/api/ai": 150, "/api/ai/quick": 10},
+        )
+        assert middleware.budget(_scope("/api/courses")) == 30
+        assert middleware.budget(_scope("/api/ai/chat")) == 150
+        assert middleware.budget(_scope("/api/ai/quick/x")) == 10
+        assert middleware.budget(_scope("/api/ai/chat", "5")) == 5
+        assert middleware.budget(_scope("/api/courses", "9999")) == 300
+        assert middleware.budget(_scope("/api/courses", "soon")) == 30
+        assert middleware.budget(_scope("/api/courses", "-1")) == 30
+
+    def test_timeouts_shrink_to_remaining(self, deadline):
+        """Timeouts are unchanged without a deadline and capped by one."""
+        assert remaining() is None
+        assert timeout_for(30) == 30
+        assert cap_timeouts({"read": 30.0}) == {"read": 30.0}
+
+        deadline(2)
+        assert timeout_for(30) == pytest.approx(2, abs=0.1)
+        assert timeout_for(1) == 1
+        assert cap_timeouts({"connect": 5.0, "read": None})["read"] == pytest.approx(2, abs=0.1)
+
+        deadline(-1)
+        with pytest.raises(DeadlineExceeded):
+            timeout_for(30)
+
+
+class TestStatementTimeout:
+    """SET LOCAL statement_timeout from the request deadline."""
+
+    def test_slow_statement_cancelled(self, deadline):
+        """A statement outliving the deadline is cancelled by PostgreSQL."""
+        deadline(0.2)
+        start = time.monotonic()
+        with engine.connect() as conn:
+            with pytest.raises(exc.OperationalError) as exc_info:
+                conn.execute(text("SELECT pg_sleep(5)"))
+        assert time.monotonic() - start < 2
+        assert is_statement_timeout(exc_info.value)
+
+    def test_scoped_to_transaction(self, deadline):
+        """Connections carry no timeout outside a request or after the transaction."""
+        show = text("SHOW statement_timeout")
+        with engine.connect() as conn:
+            assert conn.execute(show).scalar() == "0"
+            conn.commit()
+            deadline(10)
+            assert conn.execute(show).scalar() != "0"
+            conn.commit()
+            deadline(None)
+            assert conn.execute(show).scalar() == "0"
+
+    def test_no_new_transactions_after_deadline(self, deadline):
+        """Starting a transaction past the deadline fails fast."""
+        deadline(-1)
+        with engine.connect() as conn:
+            with pytest.raises(DeadlineExceeded):
+                conn.execute(text("SELECT 1"))
+
+
+async def _stall(reader, writer):
+    """Read the request and never answer; returns once the client hangs up."""
+    await reader.read()
+    writer.close()
+
+
+class TestOutboundHTTP:
+    """Timed httpx transports respect the deadline."""
+
+    async def test_read_cut_to_deadline(self):
+        """A 30s client timeout is cut to the time left; past it, nothing is sent."""
+        # The test runs in its own task, so the deadline set here doesn't leak
+        server = await asyncio.start_server(_stall, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        try:
+            async with httpx.AsyncClient(timeout=30.0, transport=timed_transport("test")) as client:
+                deadline_var.set(time.monotonic() + 0.2)
+                start = time.monotonic()
+                with pytest.raises(httpx.ReadTimeout):
+                    await client.get(url)
+                assert time.monotonic() - start < 2
+
+                deadline_var.set(time.monotonic() - 1)
+                with pytest.raises(DeadlineExceeded):
+                    await client.get(url)
+        finally:
+            server.close()
+
+
+class TestMiddleware:
+    """DeadlineMiddleware on an app."""
+
+    async def test_slow_request_gets_504(self):
+        """Requests past their deadline are cancelled with a 504; others are untouched."""
+        app = FastAPI()
+        cancelled = asyncio.Event()
+
+        @app.get("/slow")
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        @app.get("/budget")
+        def budget():
+            return {"remaining": remaining()}
+
+        app.add_middleware(DeadlineMiddleware, default_seconds=0.2, max_seconds=10)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.monotonic()
+            response = await client.get("/slow")
+            assert response.status_code == 504
+            assert time.monotonic() - start < 2
+            assert cancelled.is_set()
+
+            response = await client.get("/budget", headers={"X-Request-Timeout": "5"})
+            assert response.status_code == 200
+            assert 4 < response.json()["remaining"] <= 5
+
+    async def test_deadline_errors_become_504(self):
+        """DeadlineExceeded raised by the endpoint maps to 504; other errors propagate."""
+        app = FastAPI()
+
+        @app.get("/late")
+        async def late():
+            raise DeadlineExceeded()
+
+        @app.get("/broken")
+        async def broken():
+            raise RuntimeError("boom")
+
+        app.add_middleware(DeadlineMiddleware, default_seconds=10, max_seconds=10)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/late")).status_code == 504
+            with pytest.raises(RuntimeError):
+                await client.get("/broken")
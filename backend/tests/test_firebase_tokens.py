@@ -0,0 +1,248 @@
+"""
+Tests for local Firebase ID token verification.
+
+A stand-in key server on localhost publishes certificates the way Google's
+securetoken endpoint does ({kid: PEM certificate} with Cache-Control).
+
+Tests cover:
+- Signature and claim checks (audience, issuer, expiry, algorithm, subject)
+- Keys fetched once and reused; refreshed in the background near expiry
+- Cached keys kept when the key server fails; rotated keys fetched on demand
+- verify_firebase_token using the local path
+- Key fetches for async callers running off the event loop
+"""
+
+import asyncio
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+from firebase_admin import auth
+from jose import jwt
+
+from app.core import firebase
+from app.core.deps import verify_token
+from app.core.firebase import SigningKeyCache, verify_id_token_locally
+
+PROJECT_ID = "calricula-test"
+
+
+def _make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer:
+    """Serves {kid: certificate} JSON with a configurable Cache-Control."""
+
+    def __init__(self):
+        self.keys = {}
+        self.certs = {}
+        self.max_age = 3600
+        self.fail = False
+        self.delay = 0.0
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.delay)
+                if server.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps(server.certs).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={server.max_age}, must-revalidate")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/certs"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def add_key(self, kid):
+        self.keys[kid], self.certs[kid] = _make_key(kid)
+
+    def token(self, kid="k1", alg="RS256", **overrides):
+        now = int(time.time())
+        claims = {
+            "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+            "aud": PROJECT_ID,
+            "sub": "user-123",
+            "iat": now - 10,
+            "auth_time": now - 10,
+            "exp": now + 3600,
+            "email": "faculty@calricula.com",
+        }
+        claims.update(overrides)
+        key = self.keys[kid] if alg == "RS256" else "shared-secret"
+        return jwt.encode(claims, key, algorithm=alg, headers={"kid": kid})
+
+
+@pytest.fixture(scope="module")
+def key_server():
+    server = KeyServer()
+    server.add_key("k1")
+    yield server
+    server.httpd.shutdown()
+
+
+@pytest.fixture
+def keys(key_server):
+    """A fresh SigningKeyCache pointed at the stand-in server."""
+    key_server.fail = False
+    key_server.delay = 0.0
+    key_server.max_age = 3600
+    key_server.requests = 0
+    cache = SigningKeyCache(key_server.url)
+    with patch.object(firebase, "signing_keys", cache):
+        yield cache
+
+
+class TestClaims:
+    """Signature and claim validation."""
+
+    def test_valid_token(self, key_server, keys):
+        """A well-formed token verifies and exposes uid."""
+        claims = verify_id_token_locally(key_server.token(), PROJECT_ID)
+        assert claims["uid"] == "user-123"
+        assert claims["email"] == "faculty@calricula.com"
+
+    @pytest.mark.parametrize("overrides", [
+        {"aud": "other-project"},
+        {"iss": "https://securetoken.google.com/other-project"},
+        {"sub": ""},
+    ])
+    def test_wrong_claims_rejected(self, key_server, keys, overrides):
+        """Audience, issuer and subject must match the project."""
+        with pytest.raises(auth.InvalidIdTokenError):
+            verify_id_token_locally(key_server.token(**overrides), PROJECT_ID)
+
+    def test_expired(self, key_server, keys):
+        """Expired tokens raise ExpiredIdTokenError."""
+        token = key_server.token(exp=int(time.time()) - 60)
+        with pytest.raises(auth.ExpiredIdTokenError):
+            verify_id_token_locally(token, PROJECT_ID)
+
+    def test_wrong_algorithm_and_forged_signature(self, key_server, keys):
+        """HS256 tokens and tokens signed with another key are rejected."""
+        with pytest.raises(auth.InvalidIdTokenError):
+            verify_id_token_locally(key_server.token(alg="HS256"), PROJECT_ID)
+
+        forged_key, _ = _make_key("k1")
+        now = int(time.time())
+        forged = jwt.encode(
+            {"iss": f"https://securetoken.google.com/{PROJECT_ID}", "aud": PROJECT_ID,
+             "sub": "admin", "iat": now, "exp": now + 60},
+            forged_key, algorithm="RS256", headers={"kid": "k1"},
+        )
+        with pytest.raises(auth.InvalidIdTokenError):
+            verify_id_token_locally(forged, PROJECT_ID)
+
+
+class TestKeyCache:
+    """Fetching, caching and refreshing signing keys."""
+
+    def test_fetched_once(self, key_server, keys):
+        """Many verifications share one fetch while the keys are fresh."""
+        for _ in range(5):
+            verify_id_token_locally(key_server.token(), PROJECT_ID)
+        assert key_server.requests == 1
+
+    def test_background_refresh_keeps_serving(self, key_server, keys):
+        """Near expiry, requests use the cached keys while a refresh runs; failures keep them."""
+        key_server.max_age = 0
+        verify_id_token_locally(key_server.token(), PROJECT_ID)
+        key_server.fail = True
+        with patch.object(firebase, "MIN_KEY_FETCH_INTERVAL_SECONDS", 0):
+            verify_id_token_locally(key_server.token(), PROJECT_ID)
+            for _ in range(50):
+                if key_server.requests >= 2 and not keys._background_lock.locked():
+                    break
+                time.sleep(0.02)
+        assert key_server.requests == 2
+        assert verify_id_token_locally(key_server.token(), PROJECT_ID)["uid"] == "user-123"
+
+    def test_rotated_key_fetched_on_demand(self, key_server, keys):
+        """An unknown kid triggers a fetch, rate-limited between attempts."""
+        verify_id_token_locally(key_server.token(), PROJECT_ID)
+        key_server.add_key("k2")
+        with patch.object(firebase, "MIN_KEY_FETCH_INTERVAL_SECONDS", 0):
+            assert verify_id_token_locally(key_server.token(kid="k2"), PROJECT_ID)["uid"] == "user-123"
+        assert key_server.requests == 2
+
+        key_server.keys["k3"], _ = _make_key("k3")
+        with pytest.raises(auth.InvalidIdTokenError):
+            verify_id_token_locally(key_server.token(kid="k3"), PROJECT_ID)
+        assert key_server.requests == 2
+
+
+class TestVerifyFirebaseToken:
+    """verify_firebase_token uses local verification when a project is known."""
+
+    def test_local_path(self, key_server, keys):
+        """Tokens verify without the Admin SDK; bad tokens are 401s."""
+        with patch.object(firebase, "_firebase_app", object()), \
+                patch.object(firebase.settings, "FIREBASE_PROJECT_ID", PROJECT_ID), \
+                patch.object(firebase.auth, "verify_id_token", side_effect=AssertionError("SDK called")):
+            assert firebase.verify_firebase_token(key_server.token())["uid"] == "user-123"
+            with pytest.raises(HTTPException) as exc_info:
+                firebase.verify_firebase_token(key_server.token(aud="other-project"))
+        assert exc_info.value.status_code == 401
+
+    async def test_key_fetch_off_the_loop(self, key_server, keys):
+        """A token whose key must be fetched is verified in the threadpool; cached keys are checked inline."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        key_server.delay = 0.3
+        with patch.object(firebase, "_firebase_app", object()), \
+                patch.object(firebase.settings, "FIREBASE_PROJECT_ID", PROJECT_ID):
+            assert not firebase.verifies_from_memory(key_server.token())
+            task = asyncio.create_task(ticker())
+            try:
+                claims = await verify_token(key_server.token())
+            finally:
+                task.cancel()
+            assert firebase.verifies_from_memory(key_server.token())
+            assert not firebase.verifies_from_memory("not-a-jwt")
+
+        assert claims["uid"] == "user-123"
+        assert ticks >= 10
@@ -0,0 +1,145 @@
+"""
+Tests for the pooled outbound HTTP clients.
+
+A stand-in upstream on localhost counts TCP connections and concurrent
+requests.
+
+Tests cover:
+- One client per service, reused across requests, and replaced on a new loop
+- Keep-alive: consecutive requests share a connection
+- The per-host concurrency cap and PoolTimeout when no slot frees up
+- BLS/QCEW/LMI routes getting their client from a dependency
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core import http_clients as http_clients_module
+from app.core.http_clients import HTTPClientPool
+from app.services.qcew_client import QCEWClient, get_qcew_client
+
+
+class Upstream:
+    """HTTP/1.1 server that sleeps `delay` per request and tracks concurrency."""
+
+    def __init__(self):
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                time.sleep(server.delay)
+                with server.lock:
+                    server.in_flight -= 1
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def upstream():
+    server = Upstream()
+    yield server
+    server.httpd.shutdown()
+
+
+class TestPool:
+    """Client lifecycle and connection reuse."""
+
+    async def test_shared_and_kept_alive(self, upstream):
+        """Requests share one client per service and one kept-alive connection."""
+        pool = HTTPClientPool()
+        await pool.start()
+        client = pool.get("bls")
+        assert pool.get("bls") is client
+        assert pool.get("qcew") is not client
+
+        for _ in range(3):
+            response = await pool.get("bls").get(upstream.url)
+            assert response.text == "ok"
+        assert upstream.connections == 1
+
+        await pool.aclose()
+        assert client.is_closed
+
+    def test_new_loop_gets_new_client(self):
+        """A client opened on one event loop isn't handed out on another."""
+        pool = HTTPClientPool()
+
+        async def get():
+            return pool.get("ckan")
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        assert first is not second
+
+
+class TestHostCap:
+    """Per-host concurrency cap."""
+
+    async def test_cap_and_pool_timeout(self, upstream):
+        """At most N requests reach a host at once; waiters past the pool timeout fail."""
+        with patch.object(http_clients_module.settings, "HTTP_CLIENT_MAX_CONCURRENCY_PER_HOST", 2):
+            pool = HTTPClientPool()
+            client = pool.get("qcew")
+            upstream.delay = 0.1
+            responses = await asyncio.gather(*(client.get(upstream.url) for _ in range(6)))
+            assert all(r.status_code == 200 for r in responses)
+            assert upstream.max_in_flight == 2
+
+            upstream.delay = 0.5
+            slow = [asyncio.create_task(client.get(upstream.url)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(httpx.PoolTimeout):
+                await client.get(upstream.url, timeout=httpx.Timeout(5.0, pool=0.05))
+            await asyncio.gather(*slow)
+            await pool.aclose()
+
+
+class TestDependencies:
+    """Routes receive their client through a dependency."""
+
+    def test_route_uses_injected_client(self, client):
+        """Overriding get_qcew_client changes the client a QCEW route gets."""
+        seen = []
+
+        class RecordingClient(QCEWClient):
+            def get_available_areas(self):
+                seen.append(self)
+                return super().get_available_areas()
+
+        client.app.dependency_overrides[get_qcew_client] = lambda: RecordingClient(http_client=httpx.AsyncClient())
+        try:
+            response = client.get("/api/qcew/areas")
+        finally:
+            client.app.dependency_overrides.pop(get_qcew_client, None)
+        assert response.status_code == 200
+        assert len(seen) == 1
@@ -0,0 +1,179 @@
+"""
+Tests for the local mirror of the California LMI (CKAN) datasets.
+
+data.ca.gov is replaced by an httpx MockTransport serving two small
+resources under test IDs.
+
+Tests cover:
+- Lookups going to CKAN until a resource has been synced, then to the mirror
+- Keyword, area, wage type and SOC filtering in the mirror
+- Incremental syncs fetching only new records
+- A changed resource being copied again in full, dropping removed records
+"""
+
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.models.labor_market import LMIMirrorRecord, LMIMirrorSync
+from app.services import lmi_client, lmi_mirror as lmi_mirror_module
+from app.services.lmi_client import LMIClient
+from app.services.lmi_mirror import lmi_mirror
+
+WAGES = "test-wages"
+PROJECTIONS = "test-projections"
+
+
+def _wage(record_id, title, soc, area, year, wage_type="Hourly wage", mean=30.0):
+    return {
+        "_id": record_id, "Occupational Title": title, "Standard Occupational Classification": soc,
+        "Area Name": area, "Area Type": "County", "Year": year, "Wage Type": wage_type,
+        "Mean Wage": mean, "50th Percentile (Median) Wage": mean, "Number of Employed": 1000,
+    }
+
+
+def _projection(record_id, title, soc, area, period="2022-2032"):
+    return {
+        "_id": record_id, "Occupational Title": title, "Standard Occupational Classification (SOC)": soc,
+        "Area Name": area, "Period": period, "Base Year Employment Estimate": 100,
+        "Projected Year Employment Estimate": 120, "Entry Level Education": "N/A",
+    }
+
+
+class FakeCKAN:
+    """resource_show and datastore_search over in-memory records."""
+
+    def __init__(self):
+        self.resources = {
+            WAGES: [
+                _wage(1, "Registered Nurses", "291141", "Los Angeles County", "2023"),
+                _wage(2, "Registered Nurses", "291141", "Los Angeles County", "2023", "Annual wage", 90000),
+                _wage(3, "Registered Nurses", "291141", "Orange County", "2024", mean=55.0),
+                _wage(4, "Nurse Practitioners", "291171", "Los Angeles County", "2024", mean=80.0),
+                _wage(5, "Software Developers", "151252", "Los Angeles County", "2024"),
+            ],
+            PROJECTIONS: [
+                _projection(1, "Registered Nurses", "291141", "Los Angeles County"),
+                _projection(2, "Software Developers", "151252", "Los Angeles County"),
+            ],
+        }
+        self.modified = {WAGES: "2025-01-01", PROJECTIONS: "2025-01-01"}
+        self.searches = []
+
+    def handler(self, request):
+        params = dict(request.url.params)
+        if request.url.path.endswith("/resource_show"):
+            return httpx.Response(200, json={"result": {"id": params["id"], "last_modified": self.modified[params["id"]]}})
+
+        self.searches.append(params)
+        records = self.resources[params["resource_id"]]
+        filters = json.loads(params.get("filters", "{}"))
+        records = [r for r in records if all(r.get(k) == v for k, v in filters.items())]
+        offset, limit = int(params.get("offset", 0)), int(params["limit"])
+        return httpx.Response(200, json={"result": {"records": records[offset:offset + limit], "total": len(records)}})
+
+    def client(self):
+        return LMIClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handler)))
+
+
+@pytest.fixture
+def ckan():
+    """A fake CKAN whose resources stand in for the real ones; mirror rows are cleared."""
+    def clear():
+        with Session(engine) as session:
+            for model in (LMIMirrorRecord, LMIMirrorSync):
+                session.exec(delete(model).where(model.resource_id.in_([WAGES, PROJECTIONS])))
+            session.commit()
+        lmi_mirror.reset()
+
+    resources = {
+        WAGES: lmi_client.MIRRORED_RESOURCES[lmi_client.RES_ID_WAGES],
+        PROJECTIONS: lmi_client.MIRRORED_RESOURCES[lmi_client.RES_ID_OCC_PROJ],
+    }
+    clear()
+    with patch.object(lmi_client, "RES_ID_WAGES", WAGES), \
+            patch.object(lmi_client, "RES_ID_OCC_PROJ", PROJECTIONS), \
+            patch.object(lmi_client, "MIRRORED_RESOURCES", resources), \
+            patch.object(lmi_client.settings, "LMI_MIRROR_PAGE_SIZE", 2):
+        yield FakeCKAN()
+    clear()
+
+
+class TestLookups:
+    """Where lookups are answered from."""
+
+    async def test_ckan_until_synced(self, ckan):
+        """Unsynced resources are looked up in CKAN, including by SOC code."""
+        client = ckan.client()
+        wages = await client.search_wages_by_soc("29-1141")
+        projections = await client.search_projections_by_soc("29-1141")
+        assert len(wages) == 2
+        assert projections[0].occupation_title == "Registered Nurses"
+        assert len(ckan.searches) == 2
+
+    async def test_mirror_after_sync(self, ckan):
+        """Synced resources are queried locally, filtered like CKAN results."""
+        client = ckan.client()
+        results = await client.sync_mirror()
+        assert [(r.mode, r.record_count) for r in results] == [("full", 5), ("full", 2)]
+        ckan.searches.clear()
+
+        nurses = await client.search_wages("nurse", limit=10)
+        assert [(w.occupation_title, w.area, w.year) for w in nurses] == [
+            ("Registered Nurses", "Orange County", "2024"),
+            ("Nurse Practitioners", "Los Angeles County", "2024"),
+            ("Registered Nurses", "Los Angeles County", "2023"),
+        ]
+        assert nurses[0].annual_mean == 55.0 * 2080
+
+        in_la = await client.search_wages("nurse", area="los angeles")
+        assert {w.area for w in in_la} == {"Los Angeles County"}
+        assert len(await client.search_wages_by_soc("29-1141", area="Orange")) == 1
+        projections = await client.search_projections_by_soc("15-1252")
+        assert projections[0].entry_level_education is None
+        assert await client.search_projections("50%_off") == []
+        assert ckan.searches == []
+
+    async def test_disabled_uses_ckan(self, ckan):
+        """With LMI_MIRROR_ENABLED off, CKAN is asked even after a sync."""
+        client = ckan.client()
+        await client.sync_mirror()
+        ckan.searches.clear()
+        with patch.object(lmi_mirror_module.settings, "LMI_MIRROR_ENABLED", False):
+            await client.search_wages("nurse")
+        assert len(ckan.searches) == 1
+
+
+class TestSync:
+    """Incremental and full refreshes."""
+
+    async def test_incremental(self, ckan):
+        """Later syncs fetch only records added since the last one."""
+        client = ckan.client()
+        await client.sync_mirror()
+        unchanged = await client.sync_mirror()
+        assert [r.mode for r in unchanged] == ["unchanged", "unchanged"]
+
+        ckan.resources[WAGES].append(_wage(6, "Dental Hygienists", "292021", "Los Angeles County", "2024"))
+        ckan.searches.clear()
+        wages, _ = await client.sync_mirror()
+        assert (wages.mode, wages.fetched, wages.record_count) == ("incremental", 1, 6)
+        assert [int(s["offset"]) for s in ckan.searches if s["resource_id"] == WAGES] == [5]
+        assert (await client.search_wages_by_soc("292021"))[0].occupation_title == "Dental Hygienists"
+
+    async def test_changed_resource_copied_again(self, ckan):
+        """A new last_modified triggers a full copy that drops removed records."""
+        client = ckan.client()
+        await client.sync_mirror()
+        ckan.resources[WAGES] = [r for r in ckan.resources[WAGES] if r["_id"] != 5]
+        ckan.modified[WAGES] = "2025-06-01"
+
+        wages, projections = await client.sync_mirror()
+        assert (wages.mode, wages.fetched, wages.removed, wages.record_count) == ("full", 4, 1, 4)
+        assert projections.mode == "unchanged"
+        assert await client.search_wages("software") == []
@@ -0,0 +1,114 @@
+"""
+Tests for request-scoped batch loaders.
+
+Tests cover:
+- One IN query per batch regardless of key count
+- Memoization of resolved keys (including misses)
+- Priming keys before single-key gets
+- Grouped (many=True) loads with ordering
+"""
+
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.core.loaders import loader_for
+from app.models.course import Course, CourseStatus, StudentLearningOutcome
+from app.models.department import Department
+
+
+@contextmanager
+def count_queries(engine):
+    """Count SQL statements executed on `engine` inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def courses(db_session, faculty_user):
+    """Five draft courses with two SLOs each."""
+    unique_id = uuid.uuid4().hex[:8]
+    department = Department(name=f"Loader Test {unique_id}", code=f"LDR{unique_id[:4]}")
+    db_session.add(department)
+    db_session.commit()
+
+    created = []
+    for i in range(5):
+        course = Course(
+            subject_code=department.code,
+            course_number=f"L{i}{uuid.uuid4().hex[:3]}",
+            title=f"Loader Test {i}",
+            department_id=department.id,
+            created_by=faculty_user.id,
+            status=CourseStatus.DRAFT,
+            units=Decimal("3.0"),
+        )
+        db_session.add(course)
+        created.append(course)
+    db_session.commit()
+    for course in created:
+        for seq in (2, 1):
+            db_session.add(StudentLearningOutcome(
+                course_id=course.id, sequence=seq, outcome_text=f"Outcome {seq}", bloom_level="Apply"
+            ))
+    db_session.commit()
+    ids = [course.id for course in created]
+    db_session.expunge_all()
+    return ids
+
+
+class TestBatchLoader:
+    """Tests for BatchLoader / loader_for."""
+
+    def test_load_many_single_query(self, db_session, test_engine, courses):
+        """Any number of keys resolves with one query."""
+        with count_queries(test_engine) as statements:
+            loaded = loader_for(db_session, Course.id).load_many(courses)
+        assert len(statements) == 1
+        assert [loaded[course_id].id for course_id in courses] == courses
+
+    def test_memoized_including_misses(self, db_session, test_engine, courses):
+        """Resolved keys, found or not, are not queried again."""
+        loader = loader_for(db_session, Course.id)
+        missing = uuid.uuid4()
+        loader.load_many(courses + [missing])
+        with count_queries(test_engine) as statements:
+            assert loader.get(courses[0]).id == courses[0]
+            assert loader.get(missing) is None
+        assert statements == []
+
+    def test_primed_gets_share_one_query(self, db_session, test_engine, courses):
+        """Keys primed up front are fetched together on the first get()."""
+        loader = loader_for(db_session, Course.id).prime(courses)
+        with count_queries(test_engine) as statements:
+            titles = [loader_for(db_session, Course.id).get(course_id).title for course_id in courses]
+        assert len(statements) == 1
+        assert titles == [f"Loader Test {i}" for i in range(5)]
+
+    def test_grouped_load_is_ordered(self, db_session, test_engine, courses):
+        """many=True groups rows per key, honoring order_by."""
+        with count_queries(test_engine) as statements:
+            slos = loader_for(
+                db_session, StudentLearningOutcome.course_id, many=True,
+                order_by=StudentLearningOutcome.sequence,
+            ).load_many(courses + [uuid.uuid4()])
+        assert len(statements) == 1
+        assert all([slo.sequence for slo in slos[course_id]] == [1, 2] for course_id in courses)
+        assert list(slos.values())[-1] == []
+
+    def test_none_keys_skipped(self, db_session):
+        """None keys never reach the database."""
+        loader = loader_for(db_session, Course.id)
+        assert loader.get(None) is None
+        assert loader.load_many([None]) == {}
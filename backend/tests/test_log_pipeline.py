@@ -0,0 +1,144 @@
+"""
+Tests for the queued logging pipeline.
+
+Tests cover:
+- Formatting and writing on the listener thread, not the logging thread
+- Request IDs carried across to the listener
+- Drops when the queue is full or past the high-water mark, with a notice
+- DEBUG sampling
+"""
+
+import io
+import json
+import logging
+import queue
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.core import logging as app_logging
+from app.core.config import settings
+from app.core.logging import (
+    BoundedQueueHandler,
+    JSONFormatter,
+    configure_logging,
+    request_id_var,
+)
+
+
+class _ThreadRecordingFormatter(JSONFormatter):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def format(self, record):
+        self.threads.append(threading.current_thread())
+        return super().format(record)
+
+
+@pytest.fixture
+def pipeline():
+    """Route a test logger through the queue pipeline into a buffer."""
+    stream = io.StringIO()
+    with patch.object(app_logging.sys, "stdout", stream):
+        logger = configure_logging(
+            log_level="DEBUG",
+            service_name="test.log_pipeline",
+            capture_loggers=(),
+            queue_size=100,
+        )
+    formatter = _ThreadRecordingFormatter()
+    app_logging._listener.handlers[0].setFormatter(formatter)
+    yield logger, stream, formatter
+    # Reinstate the application's pipeline (there is one listener per process)
+    configure_logging(
+        log_level=settings.LOG_LEVEL,
+        json_format=settings.LOG_JSON_FORMAT,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+    )
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def _handler(maxsize, **kwargs):
+    return BoundedQueueHandler(queue.Queue(maxsize=maxsize), **kwargs)
+
+
+def _record(level, msg="message"):
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+class TestListener:
+    """Records are written by the background listener."""
+
+    def test_formatted_off_thread_with_request_id(self, pipeline):
+        """Formatting runs on the listener; request IDs and arguments survive the hop."""
+        logger, stream, formatter = pipeline
+        items = ["a"]
+        token = request_id_var.set("req-123")
+        try:
+            logger.info("items: %s", items)
+        finally:
+            request_id_var.reset(token)
+        items.append("b")
+        logger.warning("outside", extra={"extra_fields": {"course_id": "c1"}})
+        app_logging.shutdown_logging()
+
+        first, second = _lines(stream)
+        assert first["message"] == "items: ['a']"
+        assert first["request_id"] == "req-123"
+        assert "request_id" not in second
+        assert second["course_id"] == "c1"
+        assert formatter.threads and threading.current_thread() not in formatter.threads
+
+    def test_reconfigure_flushes_previous_pipeline(self, pipeline):
+        """Reconfiguring stops the old listener after writing what it holds."""
+        logger, stream, _ = pipeline
+        logger.info("before reconfigure")
+        configure_logging(service_name="test.log_pipeline", capture_loggers=(), queue_size=0)
+        assert _lines(stream)[0]["message"] == "before reconfigure"
+        assert app_logging._listener is None
+
+
+class TestDropPolicy:
+    """BoundedQueueHandler never blocks."""
+
+    def test_full_queue_drops_and_reports(self):
+        """Records that don't fit are dropped; a notice follows once there is room."""
+        handler = _handler(2, high_water=1.0)
+        for _ in range(4):
+            handler.handle(_record(logging.ERROR))
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 2
+
+        handler.queue.get_nowait()
+        handler.queue.get_nowait()
+        handler.handle(_record(logging.ERROR, "after"))
+        messages = [handler.queue.get_nowait().getMessage() for _ in range(2)]
+        assert messages == ["after", "Log queue overflow: dropped 2 records"]
+        assert handler.dropped == 0
+
+    def test_high_water_keeps_room_for_warnings(self):
+        """Past the high-water mark INFO is dropped but WARNING still gets in."""
+        handler = _handler(10, high_water=0.5)
+        for _ in range(5):
+            handler.handle(_record(logging.INFO))
+        handler.handle(_record(logging.INFO, "dropped"))
+        handler.handle(_record(logging.WARNING, "kept"))
+        queued = [handler.queue.get_nowait().getMessage() for _ in range(handler.queue.qsize())]
+        assert "dropped" not in queued
+        assert "kept" in queued
+
+    def test_debug_sampling(self):
+        """DEBUG records are sampled; other levels are not."""
+        handler = _handler(1000, debug_sample_rate=0.25)
+        with patch.object(app_logging.random, "random", side_effect=[0.1, 0.3, 0.2, 0.9]):
+            for _ in range(4):
+                handler.handle(_record(logging.DEBUG))
+        handler.handle(_record(logging.INFO))
+        assert handler.queue.qsize() == 3
+        assert handler.dropped == 0
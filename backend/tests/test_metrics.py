@@ -0,0 +1,152 @@
+"""
+Tests for the Prometheus metrics subsystem.
+
+Tests cover:
+- Counter/Gauge/Histogram recording and text exposition
+- Lock-free per-thread recording under concurrency, exited threads folded in
+- External-call timing via the httpx transport and context manager
+- Request latency per route template and the /metrics endpoint
+"""
+
+import threading
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from sqlmodel import Session, text
+
+from app.core.metrics import (
+    EXTERNAL_CALL_DURATION,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    timed_transport,
+    track_external_call,
+)
+
+
+def _sample(rendered: str, prefix: str) -> float:
+    """Value of the first exposition line starting with `prefix`."""
+    for line in rendered.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found in:\n{rendered}")
+
+
+class TestMetricTypes:
+    """Recording and exposition."""
+
+    def test_counter_and_gauge(self):
+        """Counters accumulate per label set; label values are escaped."""
+        registry = Registry()
+        requests = Counter("test_requests_total", "Requests", ["path"], registry=registry)
+        in_flight = Gauge("test_in_flight", "In flight", registry=registry)
+        requests.labels("/a").inc()
+        requests.labels("/a").inc(2)
+        requests.labels('quote"d').inc()
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+
+        rendered = registry.render()
+        assert "# TYPE test_requests_total counter" in rendered
+        assert 'test_requests_total{path="/a"} 3' in rendered
+        assert 'test_requests_total{path="quote\\"d"} 1' in rendered
+        assert "test_in_flight 1" in rendered
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Buckets are cumulative with +Inf, count and sum."""
+        registry = Registry()
+        latency = Histogram("test_latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.labels("/x").observe(value)
+
+        rendered = registry.render()
+        assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 2' in rendered
+        assert 'test_latency_seconds_bucket{route="/x",le="1"} 3' in rendered
+        assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 4' in rendered
+        assert 'test_latency_seconds_count{route="/x"} 4' in rendered
+        assert _sample(rendered, 'test_latency_seconds_sum{route="/x"}') == pytest.approx(3.65)
+
+    def test_wrong_label_count(self):
+        """Label values must match the declared label names."""
+        counter = Counter("test_labels_total", "Labels", ["a", "b"], registry=Registry())
+        with pytest.raises(ValueError):
+            counter.labels("only-one")
+
+    def test_concurrent_increments(self):
+        """Per-thread shards add up exactly without locks."""
+        counter = Counter("test_threads_total", "Threads", registry=Registry())
+        child = counter.labels()
+
+        def work():
+            for _ in range(10000):
+                child.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert child.value == 80000
+
+    def test_exited_threads_are_folded_in(self):
+        """A finished thread's values move to the base total and its array is dropped."""
+        histogram = Histogram("test_churn_seconds", "Churn", buckets=(1.0,), registry=Registry())
+        child = histogram.labels()
+
+        for _ in range(50):
+            thread = threading.Thread(target=lambda: (child.observe(0.5), child.observe(2.0)))
+            thread.start()
+            thread.join()
+        child.observe(0.5)
+
+        assert len(child._shards._arrays) == 1
+        assert child.snapshot() == ([51.0, 101.0], 101.0, 125.5)
+
+
+class TestExternalCalls:
+    """external_request_duration_seconds recording."""
+
+    async def test_transport_records_status_class(self):
+        """The timed transport labels calls by service and status class."""
+        child = EXTERNAL_CALL_DURATION.labels("test-service", "5xx")
+        before = child.snapshot()[1]
+        with patch.object(
+            httpx.AsyncHTTPTransport, "handle_async_request",
+            AsyncMock(return_value=httpx.Response(503)),
+        ):
+            async with httpx.AsyncClient(transport=timed_transport("test-service")) as client:
+                response = await client.get("https://example.invalid/data")
+        assert response.status_code == 503
+        assert child.snapshot()[1] == before + 1
+
+    def test_context_manager_records_errors(self):
+        """Exceptions inside track_external_call count as outcome="error"."""
+        child = EXTERNAL_CALL_DURATION.labels("test-gemini", "error")
+        before = child.snapshot()[1]
+        with pytest.raises(RuntimeError):
+            with track_external_call("test-gemini"):
+                raise RuntimeError("quota exceeded")
+        assert child.snapshot()[1] == before + 1
+
+
+class TestMetricsEndpoint:
+    """/metrics and the request middleware."""
+
+    def test_route_template_and_pool_wait(self, client, test_engine):
+        """Requests are recorded by route template; pool checkouts are timed."""
+        with Session(test_engine) as session:
+            session.exec(text("SELECT 1"))
+        client.get("/api/courses/00000000-0000-0000-0000-000000000000")
+        client.get("/no/such/path")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/courses/{course_id}"' in body
+        assert 'route="unmatched",status="404"' in body
+        assert "http_requests_in_flight 0" in body
+        assert _sample(body, 'db_pool_checkout_wait_seconds_count{pool="sync"}') >= 1
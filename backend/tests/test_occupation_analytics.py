@@ -0,0 +1,107 @@
+"""
+Unit tests for the vectorized occupation projection analytics.
+
+Results are checked against the same query written as a plain loop over
+get_all_projections().
+
+Tests cover:
+- Filters (major group, education, outlook, minimums) and top-k ranking
+- Group-by major group totals
+- Validation of codes and metrics
+- The /bls/projections/analytics endpoint
+"""
+
+import pytest
+
+from app.services.occupation_analytics import EDUCATION_RANK, AnalyticsQuery, occupation_analytics
+from app.services.occupation_projections import get_all_projections
+
+
+def _at_most(level):
+    return [code for code, rank in EDUCATION_RANK.items() if rank >= EDUCATION_RANK[level]]
+
+
+class TestQuery:
+    """Filtering and ranking."""
+
+    def test_top_k_matches_loop(self):
+        """Group 29, associate or below, by openings x wage, equals the plain-Python answer."""
+        result = occupation_analytics.query(AnalyticsQuery(
+            major_groups=["29"], max_education="associate", sort_by="openings_wage", limit=3,
+        ))
+        expected = sorted(
+            (p for p in get_all_projections()
+             if p.soc_code.startswith("29") and p.entry_education in _at_most("associate")),
+            key=lambda p: (-p.annual_openings * p.median_wage, p.soc_code),
+        )
+        assert result.total == len(expected)
+        assert [p.soc_code for p, _ in result.rows] == [p.soc_code for p in expected[:3]]
+        projection, value = result.rows[0]
+        assert value == projection.annual_openings * projection.median_wage
+
+    def test_filters_and_ascending(self):
+        """Minimums and outlook combine; ascending order puts the lowest first."""
+        result = occupation_analytics.query(AnalyticsQuery(
+            outlook=["much_faster", "faster"], min_wage=60000, min_openings=5000,
+            sort_by="change_percent", descending=False, limit=200,
+        ))
+        rows = [p for p, _ in result.rows]
+        assert rows and len(rows) == result.total
+        assert all(p.outlook in ("much_faster", "faster") and p.median_wage >= 60000 for p in rows)
+        assert [p.change_percent for p in rows] == sorted(p.change_percent for p in rows)
+
+    def test_ties_by_code(self):
+        """Equal values keep SOC code order, also across the top-k cutoff."""
+        result = occupation_analytics.query(AnalyticsQuery(education=["doctoral", "master"], sort_by="employment_2023", limit=200))
+        values = [(-value, p.soc_code) for p, value in result.rows]
+        assert values == sorted(values)
+
+    def test_no_matches(self):
+        result = occupation_analytics.query(AnalyticsQuery(min_wage=10_000_000, group_by="major_group"))
+        assert (result.rows, result.total, result.groups) == ([], 0, [])
+
+    def test_validation(self):
+        for query in (
+            AnalyticsQuery(major_groups=["99"]),
+            AnalyticsQuery(max_education="phd"),
+            AnalyticsQuery(sort_by="title"),
+            AnalyticsQuery(group_by="outlook"),
+        ):
+            with pytest.raises(ValueError):
+                occupation_analytics.query(query)
+
+
+class TestGroups:
+    """Group-by major group."""
+
+    def test_totals(self):
+        """Group totals equal sums over the matching projections."""
+        result = occupation_analytics.query(AnalyticsQuery(min_growth=4.0, group_by="major_group", limit=1))
+        matching = [p for p in get_all_projections() if p.change_percent >= 4.0]
+        assert sum(g.occupations for g in result.groups) == len(matching) == result.total
+
+        healthcare = next(g for g in result.groups if g.major_group == "29")
+        in_group = [p for p in matching if p.soc_code.startswith("29")]
+        assert healthcare.annual_openings == sum(p.annual_openings for p in in_group)
+        assert healthcare.employment_2023 == sum(p.employment_2023 for p in in_group)
+        assert healthcare.major_group_title == "Healthcare Practitioners and Technical Occupations"
+
+
+class TestEndpoint:
+    """GET /api/bls/projections/analytics."""
+
+    def test_query(self, client):
+        response = client.get("/api/bls/projections/analytics", params={
+            "major_group": "29", "max_education": "associate", "sort_by": "openings_wage",
+            "limit": 5, "group_by": "major_group",
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert body["sort_by"] == "openings_wage"
+        assert all(r["projection"]["soc_code"].startswith("29") for r in body["results"])
+        assert [g["major_group"] for g in body["groups"]] == ["29"]
+
+    def test_bad_code(self, client):
+        response = client.get("/api/bls/projections/analytics", params={"education": "phd"})
+        assert response.status_code == 400
+        assert "phd" in response.json()["detail"]
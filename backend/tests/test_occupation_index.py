@@ -0,0 +1,109 @@
+"""
+Unit tests for the SOC occupation / projection index.
+
+Tests cover:
+- Lazy building and the join of SOC titles with projections
+- Code lookups with and without hyphens, shared immutable records
+- Ranked title search: exact words, prefixes, plurals, misspellings
+- Code prefix search and projection-only search
+- The BLS occupation and projection search endpoints
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.services.occupation_index import OccupationIndex, occupation_index, tokenize
+from app.services.occupation_projections import OCCUPATION_PROJECTIONS, get_all_projections, get_projection
+from app.services.soc_occupations import get_occupation_by_code, search_occupations
+
+
+@pytest.fixture
+def index():
+    return OccupationIndex()
+
+
+def _titles(entries):
+    return [entry.title for entry in entries]
+
+
+class TestBuild:
+    """Building and joining."""
+
+    def test_lazy(self, index):
+        """Nothing is built until the first lookup."""
+        assert not index.is_built
+        assert index.get("291141").title == "Registered Nurses"
+        assert index.is_built
+
+    def test_join(self, index):
+        """Projections hang off their SOC entry; projection-only codes get an occupation too."""
+        nurses = index.get("29-1141")
+        assert nurses.projection.soc_code == "291141"
+        assert nurses.occupation.major_group_title == "Healthcare Practitioners and Technical Occupations"
+
+        data_scientists = index.get("152211")
+        assert data_scientists.occupation.title == OCCUPATION_PROJECTIONS["152211"]["title"]
+        assert len(index.projections()) == len(OCCUPATION_PROJECTIONS)
+
+    def test_shared_immutable_records(self):
+        """Lookups return the same prebuilt records, which can't be changed."""
+        assert get_projection("29-1141") is get_projection("291141")
+        assert get_occupation_by_code("291141") is occupation_index.get("291141").occupation
+        with pytest.raises(ValidationError):
+            get_projection("291141").median_wage = 1
+        assert [p.soc_code for p in get_all_projections()] == sorted(OCCUPATION_PROJECTIONS)
+
+
+class TestSearch:
+    """Ranking."""
+
+    def test_tokenize(self):
+        assert tokenize("Electric Motor, Power-Tool Repairers") == ["electric", "motor", "power", "tool", "repairers"]
+
+    def test_words_and_prefixes(self, index):
+        """Every query word must match; exact and plural words outrank prefixes."""
+        assert _titles(index.search("registered nurse")) == ["Registered Nurses"]
+        assert _titles(index.search("software dev")) == ["Software Developers"]
+        assert _titles(index.search("electric", limit=2)) == [
+            "Electric Motor, Power Tool, and Related Repairers",
+            "Electricians",
+        ]
+        assert index.search("nurse")[0].title.startswith("Nurse")
+
+    def test_misspellings(self, index):
+        """Words no title word starts with match close spellings."""
+        assert _titles(index.search("regstered nurce")) == ["Registered Nurses"]
+        assert index.search("zzzzz") == []
+
+    def test_codes(self, index):
+        """Exact codes come first, then codes starting with the query."""
+        assert [e.code for e in index.search("29-1141")] == ["291141"]
+        codes = [e.code for e in index.search("2911", limit=50)]
+        assert codes and all(code.startswith("2911") for code in codes)
+        assert codes == sorted(codes)
+
+    def test_with_projection(self, index):
+        """Projection searches skip occupations without projection data."""
+        results = index.search("nurse", with_projection=True)
+        assert results and all(entry.projection for entry in results)
+        assert len(results) < len(index.search("nurse"))
+
+    def test_limit(self):
+        assert len(search_occupations("and", limit=3)) == 3
+
+
+class TestEndpoints:
+    """BLS routes backed by the index."""
+
+    def test_occupation_search(self, client):
+        response = client.get("/api/bls/occupations/search", params={"q": "29-1141"})
+        assert response.status_code == 200
+        assert response.json()["results"][0]["title"] == "Registered Nurses"
+
+    def test_projection_lookup_and_search(self, client):
+        found = client.get("/api/bls/projections/29-1141")
+        assert found.json()["projection"]["title"] == "Registered Nurses"
+        assert client.get("/api/bls/projections/999999").status_code == 404
+
+        results = client.get("/api/bls/projections/search", params={"q": "nurce"}).json()["results"]
+        assert "Registered Nurses" in [r["title"] for r in results]
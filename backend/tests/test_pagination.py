@@ -0,0 +1,129 @@
+"""
+Unit tests for keyset pagination helpers.
+
+Tests cover:
+- Cursor encoding round trip and rejection of malformed cursors
+- Keyset query construction (seek vs offset)
+- Page splitting and next-cursor generation
+- Count statement selection and parsing for each count mode
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select, func
+
+from app.core.pagination import (
+    CountMode,
+    apply_keyset,
+    count_statement,
+    decode_cursor,
+    encode_cursor,
+    parse_count,
+    split_page,
+    total_pages,
+)
+from app.models.course import Course, CourseStatus
+
+
+class TestCursor:
+    """Tests for encode_cursor / decode_cursor."""
+
+    def test_round_trip(self):
+        """A cursor decodes back to the timestamp and id it was built from."""
+        ts = datetime(2025, 12, 14, 3, 13, 5, 123456)
+        row_id = uuid.uuid4()
+        assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+    def test_cursor_is_url_safe(self):
+        """Cursors can be placed in a query string without escaping."""
+        cursor = encode_cursor(datetime.utcnow(), uuid.uuid4())
+        assert all(ch.isalnum() or ch in "-_" for ch in cursor)
+
+    @pytest.mark.parametrize("cursor", ["garbage", "", "e30", "eyJ0IjoiMjAyNSJ9"])
+    def test_malformed_cursor_rejected(self, cursor):
+        """Malformed cursors raise a 400 rather than a server error."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor)
+        assert exc_info.value.status_code == 400
+
+
+class TestApplyKeyset:
+    """Tests for apply_keyset."""
+
+    def test_without_cursor_uses_offset(self):
+        """Page-number requests keep OFFSET semantics and fetch one extra row."""
+        sql = str(apply_keyset(select(Course), Course.updated_at, Course.id, 20, page=3))
+        assert "OFFSET" in sql
+        assert "ORDER BY courses.updated_at DESC, courses.id DESC" in sql
+
+    def test_with_cursor_seeks(self):
+        """Cursor requests seek past the cursor instead of offsetting."""
+        cursor = encode_cursor(datetime.utcnow(), uuid.uuid4())
+        sql = str(apply_keyset(select(Course), Course.updated_at, Course.id, 20, cursor=cursor, page=3))
+        assert "OFFSET" not in sql
+        assert "(courses.updated_at, courses.id) <" in sql
+
+
+class TestSplitPage:
+    """Tests for split_page."""
+
+    @staticmethod
+    def _rows(n):
+        return [SimpleNamespace(id=uuid.uuid4(), updated_at=datetime(2025, 1, 1, 0, 0, i)) for i in range(n)]
+
+    def test_last_page_has_no_cursor(self):
+        """A short page means there is nothing after it."""
+        rows, next_cursor = split_page(self._rows(3), 5, "updated_at")
+        assert len(rows) == 3
+        assert next_cursor is None
+
+    def test_look_ahead_row_is_dropped(self):
+        """The extra row is trimmed and the cursor points at the last kept row."""
+        source = self._rows(6)
+        rows, next_cursor = split_page(source, 5, "updated_at")
+        assert rows == source[:5]
+        assert decode_cursor(next_cursor) == (source[4].updated_at, source[4].id)
+
+
+class TestCountStatement:
+    """Tests for count_statement / parse_count / total_pages."""
+
+    def test_exact_returns_count_query(self):
+        """Exact mode runs the filtered count query unchanged."""
+        count_query = select(func.count(Course.id))
+        assert count_statement(CountMode.EXACT, count_query, select(Course), "courses") is count_query
+
+    def test_none_skips_counting(self):
+        """None mode produces no statement and no page count."""
+        assert count_statement(CountMode.NONE, select(func.count(Course.id)), select(Course), "courses") is None
+        assert total_pages(None, 20) is None
+
+    def test_estimate_unfiltered_reads_reltuples(self):
+        """Unfiltered estimates come from pg_class statistics."""
+        stmt = count_statement(CountMode.ESTIMATE, select(func.count(Course.id)), select(Course), "courses")
+        assert "reltuples" in str(stmt)
+
+    def test_estimate_filtered_uses_explain(self):
+        """Filtered estimates ask the planner, with filters rendered inline."""
+        row_query = select(Course).where(Course.status == CourseStatus.DRAFT, Course.title.ilike("%o'k:%"))
+        stmt = count_statement(CountMode.ESTIMATE, select(func.count(Course.id)), row_query, "courses")
+        sql = str(stmt)
+        assert sql.startswith("EXPLAIN (FORMAT JSON)")
+        assert "'DRAFT'" in sql
+
+    def test_parse_count_values(self):
+        """Counts, reltuples floats and EXPLAIN plans all normalize to ints."""
+        assert parse_count(42) == 42
+        assert parse_count(1234.0) == 1234
+        assert parse_count(None) == 0
+        assert parse_count([{"Plan": {"Plan Rows": 17}}]) == 17
+        assert parse_count('[{"Plan": {"Plan Rows": 9}}]') == 9
+
+    def test_total_pages(self):
+        """Page count rounds up and is at least one."""
+        assert total_pages(0, 20) == 1
+        assert total_pages(41, 20) == 3
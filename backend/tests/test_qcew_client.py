@@ -0,0 +1,130 @@
+"""
+Tests for QCEW area file parsing and caching.
+
+The QCEW API is replaced by an httpx MockTransport serving a small area
+file in a few bytes at a time.
+
+Tests cover:
+- Rows filtered and columns trimmed while the file streams in
+- Parsed summaries cached per (area, year, quarter)
+- Falling back from an unpublished quarter, and remembering the fallback
+- Errors other than 404 failing without a fallback
+"""
+
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.services import qcew_client
+from app.services.qcew_client import QCEWClient
+
+AREA_FILE = (
+    '"area_fips","own_code","industry_code","agglvl_code","size_code","year","qtr",'
+    '"qtrly_estabs","month1_emplvl","month2_emplvl","month3_emplvl","total_qtrly_wages","avg_wkly_wage"\r\n'
+    '"06037","0","10","70","0","2024","3","500","9000","9100","9200","1000000","1500"\r\n'
+    '"06037","5","10","71","0","2024","3","400","7000","7100","7200","800000","1400"\r\n'
+    '"06037","5","62","74","0","2024","3","50","900","910","920","90000","1300"\r\n'
+    '"06037","5","23","74","0","2024","3","30","1500","1510","1520","100000","1600"\r\n'
+    '"06037","3","61","74","0","2024","3","10","300","310","320","30000","1200"\r\n'
+    '"06037","5","6211","75","0","2024","3","20","400","405","410","40000","1250"'
+)
+
+
+class FakeQCEW:
+    """Serves AREA_FILE for published quarters and 404 for the rest."""
+
+    def __init__(self, published=((2024, 3),), status_code=200):
+        self.published = set(published)
+        self.status_code = status_code
+        self.requests = []
+
+    def handler(self, request):
+        self.requests.append(request.url.path)
+        year, quarter = request.url.path.split("/api/")[1].split("/")[:2]
+        if (int(year), int(quarter)) not in self.published:
+            return httpx.Response(404)
+
+        async def chunks():
+            data = AREA_FILE.encode()
+            for i in range(0, len(data), 7):
+                yield data[i:i + 7]
+
+        return httpx.Response(self.status_code, content=chunks())
+
+    def client(self):
+        return QCEWClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handler)))
+
+
+@pytest.fixture
+def fake_qcew():
+    qcew_client.clear_caches()
+    yield FakeQCEW()
+    qcew_client.clear_caches()
+
+
+class TestParsing:
+    """Streaming, filtered parsing."""
+
+    async def test_summary(self, fake_qcew):
+        """Only private total and supersector rows make it into the summary."""
+        summary = await fake_qcew.client().get_area_summary("los_angeles", 2024, 3)
+        assert (summary.year, summary.quarter) == (2024, 3)
+        assert summary.total_employment == 7200
+        assert summary.total_establishments == 400
+        assert summary.avg_weekly_wage == 1400.0
+        assert [i.industry_code for i in summary.industries] == ["23", "62"]
+        assert summary.industries[1].industry_name == "Health Care and Social Assistance"
+        assert summary.industries[1].total_quarterly_wages == 90000
+
+    async def test_where_and_columns(self, fake_qcew):
+        """fetch_area_csv keeps matching rows and only the requested columns."""
+        rows = await fake_qcew.client().fetch_area_csv(
+            "06037", 2024, 3, where={"own_code": {"5"}, "agglvl_code": {"74"}},
+            columns=["industry_code", "month3_emplvl"],
+        )
+        assert rows == [
+            {"industry_code": "62", "month3_emplvl": "920"},
+            {"industry_code": "23", "month3_emplvl": "1520"},
+        ]
+        everything = await fake_qcew.client().fetch_area_csv("06037", 2024, 3)
+        assert len(everything) == 6
+        assert everything[-1]["avg_wkly_wage"] == "1250"
+
+
+class TestCaching:
+    """Summary and fallback caches."""
+
+    async def test_summary_cached(self, fake_qcew):
+        """A parsed quarter is served again without a download; callers get copies."""
+        client = fake_qcew.client()
+        first = await client.get_area_summary("los_angeles", 2024, 3)
+        first.industries.clear()
+        again = await client.get_industry_data("los_angeles", "62", 2024, 3)
+        assert again.month3_employment == 920
+        assert len(fake_qcew.requests) == 1
+
+    async def test_unpublished_quarter_falls_back(self, fake_qcew):
+        """A 404 quarter falls back to the latest earlier one, once."""
+        year = datetime.now().year - 1
+        fake_qcew.published = {(year - 1, 3)}
+        client = fake_qcew.client()
+        summary = await client.get_area_summary("los_angeles", year, 1)
+        assert (summary.year, summary.quarter) == (year - 1, 3)
+        assert fake_qcew.requests == [
+            f"/cew/data/api/{year}/1/area/06037.csv",
+            f"/cew/data/api/{year - 1}/4/area/06037.csv",
+            f"/cew/data/api/{year - 1}/3/area/06037.csv",
+        ]
+
+        await client.get_area_summary("los_angeles", year, 1)
+        assert len(fake_qcew.requests) == 3
+        await client.fetch_area_csv("06037", year, 1)
+        assert fake_qcew.requests[3:] == [f"/cew/data/api/{year - 1}/3/area/06037.csv"]
+
+    async def test_other_errors_not_retried(self, fake_qcew):
+        """A server error fails the call without trying earlier quarters."""
+        fake_qcew.status_code = 503
+        with pytest.raises(httpx.HTTPStatusError):
+            await fake_qcew.client().get_area_summary("los_angeles", 2024, 3)
+        assert len(fake_qcew.requests) == 1
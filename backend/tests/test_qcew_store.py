@@ -0,0 +1,202 @@
+"""
+Tests for the local QCEW store.
+
+A small single-file CSV (and a zipped copy) with made-up 1990-1991 data is
+loaded into qcew_quarterly; the QCEW API is replaced by a transport that
+records any request made.
+
+Tests cover:
+- Ingest: area filtering, typed columns, zip files, reloading, industry titles
+- Summaries and industry lookups answered locally, without the API
+- A loaded earlier quarter standing in for the latest only once the API
+  reports it as the published one; older loaded files never hide newer
+  published quarters
+- Multi-area, multi-quarter trends in one query
+"""
+
+import zipfile
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.labor_market import QCEWQuarterly
+from app.services import qcew_client
+from app.services.qcew_client import QCEWClient
+from app.services.qcew_store import qcew_store, read_industry_titles
+
+HEADER = (
+    "area_fips,own_code,industry_code,agglvl_code,size_code,year,qtr,disclosure_code,area_title,"
+    "qtrly_estabs,month1_emplvl,month2_emplvl,month3_emplvl,total_qtrly_wages,avg_wkly_wage\n"
+)
+
+
+def _row(area, own, industry, agglvl, year, qtr, employment, wage=1000):
+    return (f'"{area}","{own}","{industry}","{agglvl}","0","{year}","{qtr}","","Area",'
+            f'"10","{employment}","{employment}","{employment}","{employment * 13 * wage}","{wage}"\n')
+
+
+def _single_file():
+    rows = []
+    for year, qtr, growth in ((1990, 3, 0), (1990, 4, 10), (1991, 1, 20)):
+        for area, base in (("06037", 1000), ("06059", 500)):
+            rows.append(_row(area, "5", "10", "71", year, qtr, base * 10 + growth))
+            rows.append(_row(area, "5", "62", "74", year, qtr, base + growth))
+            rows.append(_row(area, "5", "23", "74", year, qtr, base // 2 + growth))
+            rows.append(_row(area, "3", "61", "74", year, qtr, 300))
+    rows.append(_row("36061", "5", "62", "74", 1991, 1, 99999))
+    return HEADER + "".join(rows)
+
+
+@pytest.fixture
+def single_file(tmp_path):
+    """Path of the test CSV; test rows are removed before and after."""
+    def clear():
+        with Session(engine) as session:
+            session.exec(delete(QCEWQuarterly).where(QCEWQuarterly.year < 2000))
+            session.commit()
+        qcew_client.clear_caches()
+        qcew_store.reset()
+
+    clear()
+    path = tmp_path / "1990.q1-q4.singlefile.csv"
+    path.write_text(_single_file())
+    yield path
+    clear()
+
+
+@pytest.fixture
+def offline():
+    """
+    A QCEWClient whose API calls are recorded. Area files put in
+    `client.published[(year, quarter, fips)]` are served; others are 404s.
+    """
+    requests = []
+    published = {}
+
+    def handler(request):
+        requests.append(request.url.path)
+        year, quarter, _, name = request.url.path.split("/api/")[1].split("/")
+        body = published.get((int(year), int(quarter), name.removesuffix(".csv")))
+        return httpx.Response(200, text=body) if body else httpx.Response(404)
+
+    client = QCEWClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    client.requests = requests
+    client.published = published
+    return client
+
+
+class TestIngest:
+    """Loading single files."""
+
+    def test_filters_and_types(self, single_file):
+        """Only the chosen areas are loaded, with numeric columns as numbers."""
+        counts = qcew_store.ingest(single_file)
+        assert counts == {(1990, 3): 8, (1990, 4): 8, (1991, 1): 8}
+
+        with Session(engine) as session:
+            rows = session.exec(select(QCEWQuarterly).where(QCEWQuarterly.year < 2000)).all()
+            assert {row.area_fips for row in rows} == {"06037", "06059"}
+            total = session.get(QCEWQuarterly, ("06037", 1991, 1, "5", "10", "71", "0"))
+            assert total.month3_emplvl == 10020
+            assert total.total_qtrly_wages == 10020 * 13 * 1000
+
+    def test_zip_and_reload(self, single_file):
+        """Zipped files load the same, and loading again updates rows in place."""
+        archive = single_file.with_suffix(".zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.write(single_file, single_file.name)
+
+        assert qcew_store.ingest(archive, area_prefixes=["06037"]) == {(1990, 3): 4, (1990, 4): 4, (1991, 1): 4}
+        assert qcew_store.ingest(single_file, area_prefixes=None)[(1991, 1)] == 9
+        assert qcew_store.loaded_quarters()[(1991, 1)] == 9
+
+    async def test_industry_titles(self, single_file, tmp_path, offline):
+        """Industries outside KEY_INDUSTRIES are named from the titles file, and keep the name on reload."""
+        with open(single_file, "a") as f:
+            f.write(_row("06059", "5", "99", "74", 1990, 4, 7))
+        titles = tmp_path / "industry_titles.csv"
+        titles.write_text('industry_code,industry_title\n"99","NAICS 99 Unclassified"\n')
+
+        qcew_store.ingest(single_file, industry_titles=read_industry_titles(titles))
+        qcew_store.ingest(single_file)
+        summary = await offline.get_area_summary("orange", 1990, 4)
+        names = {i.industry_code: i.industry_name for i in summary.industries}
+        assert names == {"62": "Health Care and Social Assistance", "23": "Construction", "99": "NAICS 99 Unclassified"}
+        assert offline.requests == []
+
+
+class TestClient:
+    """QCEWClient answering from the store."""
+
+    async def test_summary_and_industry(self, single_file, offline):
+        """Loaded quarters are summarized without calling the API."""
+        qcew_store.ingest(single_file)
+        summary = await offline.get_area_summary("los_angeles", 1990, 4)
+        assert (summary.year, summary.quarter) == (1990, 4)
+        assert summary.total_employment == 10010
+        assert [i.industry_code for i in summary.industries] == ["62", "23"]
+
+        industry = await offline.get_industry_data("orange", "23", 1991, 1)
+        assert industry.month3_employment == 270
+        assert offline.requests == []
+
+    async def test_latest_falls_back_to_loaded(self, single_file, offline):
+        """An unpublished latest quarter falls back to the loaded quarter the API publishes."""
+        qcew_store.ingest(single_file)
+        offline.published[(1991, 1, "06059")] = HEADER
+        with patch.object(QCEWClient, "_get_latest_quarter", return_value=(1991, 2)), \
+                patch.object(qcew_client, "datetime") as clock:
+            clock.now.return_value.year = 1992
+            summary = await offline.get_area_summary("orange")
+        assert (summary.year, summary.quarter) == (1991, 1)
+        assert summary.total_employment == 5020
+        assert offline.requests == ["/cew/data/api/1991/2/area/06059.csv", "/cew/data/api/1991/1/area/06059.csv"]
+
+    async def test_older_loaded_quarters_not_latest(self, single_file, offline):
+        """With only older quarters loaded, latest summaries and trends use the API's newer quarter."""
+        qcew_store.ingest(single_file)
+        with Session(engine) as session:
+            session.exec(delete(QCEWQuarterly).where(QCEWQuarterly.year == 1991))
+            session.commit()
+        offline.published[(1991, 1, "06059")] = (
+            HEADER + _row("06059", "5", "10", "71", 1991, 1, 7777) + _row("06059", "5", "62", "74", 1991, 1, 777)
+        )
+
+        with patch.object(QCEWClient, "_get_latest_quarter", return_value=(1991, 1)):
+            summary = await offline.get_area_summary("orange")
+            again = await offline.get_area_summary("orange")
+            points = await offline.get_industry_trend(["orange"], "62", quarters=2)
+        assert (summary.year, summary.quarter, summary.total_employment) == (1991, 1, 7777)
+        assert again.total_employment == 7777
+        assert [(p.year, p.quarter, p.month3_employment) for p in points] == [(1990, 4, 510), (1991, 1, 777)]
+
+    async def test_trend(self, single_file, offline):
+        """A trend across areas and quarters comes from one store query."""
+        qcew_store.ingest(single_file)
+        with patch.object(QCEWClient, "_get_latest_quarter", return_value=(1991, 1)):
+            points = await offline.get_industry_trend(["los_angeles", "orange"], "62", quarters=3)
+        assert [(p.area_fips, p.year, p.quarter, p.month3_employment) for p in points] == [
+            ("06037", 1990, 3, 1000), ("06059", 1990, 3, 500),
+            ("06037", 1990, 4, 1010), ("06059", 1990, 4, 510),
+            ("06037", 1991, 1, 1020), ("06059", 1991, 1, 520),
+        ]
+        assert offline.requests == []
+
+    def test_trend_route(self, client, single_file, offline):
+        """The trend endpoint validates areas and returns points oldest first."""
+        qcew_store.ingest(single_file)
+        client.app.dependency_overrides[qcew_client.get_qcew_client] = lambda: offline
+        try:
+            with patch.object(QCEWClient, "_get_latest_quarter", return_value=(1991, 1)):
+                response = client.get("/api/qcew/trend/62?areas=los_angeles&quarters=2")
+            bad = client.get("/api/qcew/trend/62?areas=atlantis")
+        finally:
+            client.app.dependency_overrides.pop(qcew_client.get_qcew_client, None)
+
+        assert response.status_code == 200
+        assert [(p["year"], p["quarter"]) for p in response.json()["points"]] == [(1990, 4), (1991, 1)]
+        assert bad.status_code == 400
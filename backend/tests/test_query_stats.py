@@ -0,0 +1,90 @@
+"""
+Tests for per-request query statistics.
+
+Tests cover:
+- QueryStats counting and repeated-shape (N+1) detection
+- track_queries() scoping
+- X-DB-Queries / Server-Timing headers and endpoint query budgets
+"""
+
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import select
+
+from app.core.query_stats import QueryStats, get_query_stats, track_queries
+from app.models.department import Department
+from app.models.program import Program, ProgramType, ProgramStatus
+
+
+class TestQueryStats:
+    """Tests for QueryStats."""
+
+    def test_record_and_repeated(self):
+        """Counts, time and repeated shapes are accumulated."""
+        stats = QueryStats()
+        for _ in range(3):
+            stats.record("SELECT * FROM departments WHERE id = %(pk_1)s", 1.5)
+        stats.record("SELECT count(*) FROM courses", 2.0)
+        assert stats.count == 4
+        assert stats.total_ms == pytest.approx(6.5)
+        assert stats.repeated(3) == [("SELECT * FROM departments WHERE id = %(pk_1)s", 3)]
+        assert stats.repeated(4) == []
+
+
+class TestTrackQueries:
+    """Tests for track_queries()."""
+
+    def test_counts_statements_in_block(self, db_session):
+        """Statements inside the block are counted; outside are not."""
+        with track_queries() as stats:
+            for _ in range(3):
+                db_session.exec(select(Department).limit(1)).all()
+        db_session.exec(select(Department).limit(1)).all()
+        assert stats.count == 3
+        assert stats.repeated(3)[0][1] == 3
+        assert get_query_stats() is None
+
+
+@pytest.fixture
+def programs(db_session, faculty_user):
+    """Six programs, each in its own department."""
+    created = []
+    for i in range(6):
+        unique_id = uuid.uuid4().hex[:8]
+        dept = Department(name=f"Budget Test {unique_id}", code=f"BDG{unique_id[:4]}")
+        db_session.add(dept)
+        db_session.commit()
+        program = Program(
+            title=f"Budget Test Program {i} {unique_id}",
+            type=ProgramType.AA,
+            status=ProgramStatus.DRAFT,
+            total_units=Decimal("60"),
+            department_id=dept.id,
+            created_by=faculty_user.id,
+        )
+        db_session.add(program)
+        created.append(program)
+    db_session.commit()
+    return created
+
+
+class TestEndpointQueryBudget:
+    """Endpoints report their query count and stay within budget."""
+
+    def test_headers_present(self, client, faculty_user):
+        """Responses carry X-DB-Queries and a Server-Timing db entry."""
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": faculty_user.firebase_uid}):
+            response = client.get("/api/courses?limit=5", headers={"Authorization": "Bearer test_token"})
+        assert response.status_code == 200
+        assert int(response.headers["x-db-queries"]) >= 1
+        assert response.headers["server-timing"].startswith("db;dur=")
+
+    def test_program_list_budget(self, client, faculty_user, programs, assert_max_queries):
+        """Listing programs does not issue a department query per row."""
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": faculty_user.firebase_uid}):
+            response = client.get("/api/programs?limit=20", headers={"Authorization": "Bearer test_token"})
+        assert response.status_code == 200
+        assert_max_queries(response, 4)
@@ -0,0 +1,314 @@
+"""
+Tests for the token-bucket rate limiter.
+
+Tests cover:
+- Rate parsing and bucket arithmetic (burst, refill, accurate Retry-After)
+- Memory, SQLite (shared across processes) and Redis-protocol storage; the
+  Redis backend runs against a local stand-in server
+- Endpoint enforcement: 429s, X-RateLimit-* headers, admin exemption,
+  the rate_limited decorator, and failing open when storage is down
+"""
+
+import asyncio
+import multiprocessing
+import sqlite3
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.core import rate_limiter
+from app.core.rate_limiter import (
+    TOKEN_BUCKET_SCRIPT,
+    TOKEN_BUCKET_SHA,
+    Limiter,
+    MemoryStorage,
+    Rate,
+    RateLimitExceeded,
+    RedisStorage,
+    SQLiteStorage,
+    create_storage,
+    parse_rate,
+    rate_limit_exceeded_handler,
+)
+
+
+class TestRates:
+    """Parsing and bucket arithmetic."""
+
+    def test_parse(self):
+        """Common limit strings parse to capacity and period."""
+        assert parse_rate("10/minute") == Rate(10, 60)
+        assert parse_rate("100 per hour") == Rate(100, 3600)
+        assert parse_rate("5/10 seconds") == Rate(5, 10)
+        with pytest.raises(ValueError):
+            parse_rate("often")
+
+    def test_burst_then_refill(self):
+        """A full bucket allows a burst; Retry-After is the time to the next token."""
+        storage = MemoryStorage()
+        rate = Rate(3, 30)  # one token per 10 seconds
+        with patch.object(rate_limiter.time, "monotonic", return_value=1000.0):
+            results = [storage.acquire_sync("k", rate) for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert results[3].retry_after == pytest.approx(10)
+        assert results[3].headers()["Retry-After"] == "10"
+
+        with patch.object(rate_limiter.time, "monotonic", return_value=1004.0):
+            blocked = storage.acquire_sync("k", rate)
+        assert not blocked.allowed and blocked.retry_after == pytest.approx(6)
+        with patch.object(rate_limiter.time, "monotonic", return_value=1010.0):
+            assert storage.acquire_sync("k", rate).allowed
+
+
+def _sqlite_worker(path, attempts, results):
+    storage = SQLiteStorage(path)
+    allowed = sum(storage.acquire_sync("shared", Rate(20, 3600)).allowed for _ in range(attempts))
+    results.put(allowed)
+
+
+class TestSQLiteStorage:
+    """Buckets shared by worker processes."""
+
+    def test_shared_across_processes(self, tmp_path):
+        """Four processes racing on one bucket get exactly its capacity."""
+        path = str(tmp_path / "ratelimit.db")
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_sqlite_worker, args=(path, 15, results)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+        assert sum(results.get(timeout=5) for _ in workers) == 20
+
+    async def test_locked_file_does_not_block_loop(self, tmp_path):
+        """Waiting for another worker's write lock happens off the event loop, and
+        a check that times out is allowed by the limiter."""
+        path = str(tmp_path / "ratelimit.db")
+        storage = SQLiteStorage(path, timeout=0.3)
+        storage.acquire_sync("k", Rate(5, 60))
+        other_worker = sqlite3.connect(path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                await storage.acquire("k", Rate(5, 60))
+            assert ticks >= 5
+            assert await Limiter(storage).hit("k", Rate(5, 60)) is None
+        finally:
+            ticker.cancel()
+            other_worker.execute("ROLLBACK")
+            other_worker.close()
+        assert (await storage.acquire("k", Rate(5, 60))).remaining == 3
+
+    def test_storage_uri(self, tmp_path):
+        """sqlite:/// URIs create SQLite storage at the path."""
+        storage = create_storage(f"sqlite:///{tmp_path}/limits.db")
+        assert isinstance(storage, SQLiteStorage)
+        assert storage.acquire_sync("k", Rate(1, 60)).allowed
+        assert not storage.acquire_sync("k", Rate(1, 60)).allowed
+
+
+class RedisStandIn:
+    """
+    Minimal Redis-protocol server: PING, AUTH, SELECT, EVAL and EVALSHA of
+    the token bucket script (executed in Python, against the server clock).
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.scripts = set()
+        self.commands = []
+        self.delay = 0.0  # Seconds to wait before each reply
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _handle(self, reader, writer):
+        while True:
+            try:
+                args = await self._read_command(reader)
+            except (asyncio.IncompleteReadError, ValueError):
+                break
+            self.commands.append(args[0].upper())
+            reply = self._reply(args)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+    @staticmethod
+    async def _read_command(reader):
+        count = int((await reader.readline())[1:])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        return args
+
+    def _reply(self, args):
+        command = args[0].upper()
+        if command in ("PING", "AUTH", "SELECT"):
+            return b"+OK\r\n"
+        if command == "EVALSHA" and args[1] not in self.scripts:
+            return b"-NOSCRIPT No matching script\r\n"
+        if command == "EVAL":
+            assert args[1] == TOKEN_BUCKET_SCRIPT
+            self.scripts.add(TOKEN_BUCKET_SHA)
+        allowed, tokens = self._token_bucket(args[3], *map(float, args[4:7]))
+        tokens = str(tokens).encode()
+        return b"*2\r\n:%d\r\n$%d\r\n%s\r\n" % (allowed, len(tokens), tokens)
+
+    def _token_bucket(self, key, capacity, rate, cost):
+        now = self.loop.time()
+        tokens, ts = self.hashes.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0, now - ts) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.hashes[key] = (tokens, now)
+        return int(allowed), tokens
+
+
+@pytest.fixture
+def redis_server():
+    server = RedisStandIn()
+    yield server
+    server.close()
+
+
+class TestRedisStorage:
+    """Redis-protocol storage against the stand-in server."""
+
+    async def test_script_loaded_once(self, redis_server):
+        """EVALSHA falls back to EVAL once, then runs by SHA."""
+        storage = create_storage(f"redis://:secret@127.0.0.1:{redis_server.port}/2")
+        assert isinstance(storage, RedisStorage)
+        results = [await storage.acquire("user:1", Rate(2, 60)) for _ in range(3)]
+        assert [r.allowed for r in results] == [True, True, False]
+        assert results[2].retry_after == pytest.approx(30, abs=0.5)
+        assert redis_server.commands == ["AUTH", "SELECT", "EVALSHA", "EVAL", "EVALSHA", "EVALSHA"]
+        assert "ratelimit:user:1" in redis_server.hashes
+
+    async def test_cancelled_call_does_not_leak_reply(self, redis_server):
+        """A call cancelled while waiting for its reply drops the connection, so
+        the next call doesn't read that reply as its own."""
+        storage = RedisStorage(port=redis_server.port)
+        await storage.acquire("user:a", Rate(1, 60))
+
+        redis_server.delay = 0.3
+        pending = asyncio.ensure_future(storage.acquire("user:a", Rate(1, 60)))
+        await asyncio.sleep(0.1)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        redis_server.delay = 0.0
+
+        result = await storage.acquire("user:b", Rate(5, 60))
+        assert (result.allowed, result.remaining) == (True, 4)
+
+
+def _app(limiter):
+    app = FastAPI()
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+    @app.middleware("http")
+    async def fake_auth(request: Request, call_next):
+        if request.headers.get("X-Role"):
+            request.state.user = SimpleNamespace(id="u1", role=SimpleNamespace(value=request.headers["X-Role"]))
+        return await call_next(request)
+
+    @app.get("/model")
+    @limiter.limit("2/minute")
+    async def model(request: Request):
+        return {"ok": True}
+
+    @app.get("/plain")
+    @limiter.limit("2/minute")
+    async def plain(request: Request):
+        return PlainTextResponse("ok")
+
+    @app.get("/own-response")
+    @limiter.limit("2/minute")
+    def own_response(request: Request, response: Response):
+        response.headers["X-Custom"] = "1"
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestEndpoints:
+    """Enforcement on decorated endpoints."""
+
+    def test_headers_and_rejection(self):
+        """Limited responses carry X-RateLimit-*; the third call is a 429 with Retry-After."""
+        client = _app(Limiter(MemoryStorage()))
+        first = client.get("/model")
+        assert first.json() == {"ok": True}
+        assert first.headers["x-ratelimit-limit"] == "2"
+        assert first.headers["x-ratelimit-remaining"] == "1"
+        assert "x-ratelimit-reset" in first.headers
+        client.get("/model")
+        rejected = client.get("/model")
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "30"
+        assert rejected.json()["detail"]["retry_after_seconds"] == 30
+
+    def test_returned_and_declared_responses(self):
+        """Headers land on returned Response objects and on a declared response parameter."""
+        client = _app(Limiter(MemoryStorage()))
+        assert client.get("/plain").headers["x-ratelimit-remaining"] == "1"
+        response = client.get("/own-response")
+        assert response.headers["x-custom"] == "1"
+        assert response.headers["x-ratelimit-remaining"] == "1"
+
+    def test_buckets_per_endpoint_and_admin_exempt(self):
+        """Endpoints have separate buckets; admins are not limited."""
+        client = _app(Limiter(MemoryStorage()))
+        for _ in range(2):
+            client.get("/model")
+        assert client.get("/plain").status_code == 200
+        assert all(client.get("/model", headers={"X-Role": "Admin"}).status_code == 200 for _ in range(3))
+        faculty = [client.get("/model", headers={"X-Role": "Faculty"}).status_code for _ in range(3)]
+        assert faculty == [200, 200, 429]
+
+    def test_storage_failure_allows(self):
+        """An unreachable storage lets requests through without headers."""
+        client = _app(Limiter(RedisStorage(port=1, timeout=0.2)))
+        response = client.get("/model")
+        assert response.status_code == 200
+        assert "x-ratelimit-limit" not in response.headers
+
+    def test_rate_limited_decorator_enforces(self):
+        """rate_limited() applies the named limit."""
+        app = FastAPI()
+        app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+        with patch.object(rate_limiter, "limiter", Limiter(MemoryStorage())):
+            @app.post("/generate")
+            @rate_limiter.rate_limited("ai_generation")
+            async def generate(request: Request):
+                return {"ok": True}
+
+        client = TestClient(app)
+        statuses = [client.post("/generate").status_code for _ in range(11)]
+        assert statuses == [200] * 10 + [429]
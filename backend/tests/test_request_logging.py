@@ -0,0 +1,123 @@
+"""
+Tests for the pure ASGI request logging middleware.
+
+Tests cover:
+- X-Request-ID generation, reuse and propagation to logs inside the route
+- One structured line per request with status, bytes and DB stats
+- StreamingResponse bodies passed through and counted
+- Unhandled errors logged with the request ID
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.logging import RequestLoggingMiddleware, get_request_id
+from app.core.query_stats import QueryStatsMiddleware
+
+route_logger = logging.getLogger("test.request_logging.route")
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        record.request_id = get_request_id()
+        self.records.append(record)
+
+
+@pytest.fixture
+def capture():
+    handler = _Capture()
+    request_logger = logging.getLogger("test.request_logging")
+    request_logger.addHandler(handler)
+    request_logger.setLevel(logging.DEBUG)
+    yield handler
+    request_logger.removeHandler(handler)
+
+
+@pytest.fixture
+def app_client():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        route_logger.info("handling item")
+        return {"id": item_id}
+
+    @app.get("/export")
+    async def export():
+        async def chunks():
+            for i in range(3):
+                yield b"x" * 1000
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("exploded")
+
+    app.add_middleware(QueryStatsMiddleware, log_summary=False)
+    app.add_middleware(RequestLoggingMiddleware, logger=logging.getLogger("test.request_logging"))
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _request_lines(capture):
+    return [r for r in capture.records if r.name == "test.request_logging"]
+
+
+class TestRequestLogging:
+    """Tests for RequestLoggingMiddleware."""
+
+    def test_one_line_with_fields(self, app_client, capture):
+        """A request gets an ID header and one line with route, status, bytes and DB stats."""
+        response = app_client.get("/items/7")
+        request_id = response.headers["x-request-id"]
+
+        lines = _request_lines(capture)
+        assert len(lines) == 1
+        fields = lines[0].extra_fields
+        assert fields["route"] == "/items/{item_id}"
+        assert fields["status_code"] == 200
+        assert fields["response_bytes"] == len(response.content)
+        assert fields["request_id"] == request_id
+        assert fields["db_queries"] == 0
+        assert fields["duration_ms"] >= fields["ttfb_ms"] >= 0
+
+        # Logs emitted by the route carry the same request ID
+        route_records = [r for r in capture.records if r.name == route_logger.name]
+        assert [r.request_id for r in route_records] == [request_id]
+        assert get_request_id() is None
+
+    def test_incoming_request_id_reused(self, app_client, capture):
+        """A caller-supplied X-Request-ID is kept; oversized ones are replaced."""
+        assert app_client.get("/items/1", headers={"X-Request-ID": "trace-abc"}).headers["x-request-id"] == "trace-abc"
+        assert app_client.get("/items/1", headers={"X-Request-ID": "a" * 500}).headers["x-request-id"] != "a" * 500
+
+    def test_streaming_response(self, app_client, capture):
+        """Streamed bodies arrive intact and are counted."""
+        response = app_client.get("/export")
+        assert response.content == b"x" * 3000
+        assert _request_lines(capture)[0].extra_fields["response_bytes"] == 3000
+
+    def test_unhandled_error(self, app_client, capture):
+        """Unhandled exceptions are logged at ERROR with a traceback."""
+        response = app_client.get("/boom")
+        assert response.status_code == 500
+        line = _request_lines(capture)[0]
+        assert line.levelno == logging.ERROR
+        assert line.exc_info is not None
+        assert line.extra_fields["status_code"] == 500
+
+
+class TestAppIntegration:
+    """The application returns request IDs."""
+
+    def test_api_response_has_request_id(self, client):
+        """Responses from the real app carry X-Request-ID."""
+        response = client.get("/api/reference/top-codes")
+        assert response.headers.get("x-request-id")
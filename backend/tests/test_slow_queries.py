@@ -0,0 +1,177 @@
+"""
+Tests for slow-query capture.
+
+Tests cover:
+- SQL normalization and bind-parameter shapes
+- Ring buffer bounds, grouping and EXPLAIN sampling/cooldown
+- Capture from the engine events, including a sampled EXPLAIN plan
+- EXPLAIN ANALYZE limited to plain SELECTs and always rolled back
+- Admin-only access to /api/admin/slow-queries
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.slow_queries import (
+    SlowQuery,
+    SlowQueryLog,
+    _analyzable,
+    normalize_sql,
+    parameter_shape,
+    slow_query_log,
+)
+
+
+def _entry(statement, duration_ms, route="GET /api/courses", explain=None):
+    return SlowQuery(
+        timestamp=0.0,
+        duration_ms=duration_ms,
+        statement=statement,
+        parameters={},
+        route=route,
+        request_id=None,
+        explain=explain,
+    )
+
+
+class TestNormalization:
+    """Tests for normalize_sql / parameter_shape."""
+
+    def test_placeholders_literals_and_in_lists(self):
+        """Placeholders and literals become `?` and IN lists collapse."""
+        sql = normalize_sql(
+            "SELECT *\n  FROM courses WHERE status = 'DRAFT' AND units > 3\n"
+            "  AND id IN (%(id_1_1)s::UUID, %(id_1_2)s::UUID, %(id_1_3)s::UUID) LIMIT $1"
+        )
+        assert sql == "SELECT * FROM courses WHERE status = ? AND units > ? AND id IN (?::UUID, ...) LIMIT ?"
+
+    def test_parameter_shape_hides_values(self):
+        """Only types and list lengths are kept."""
+        assert parameter_shape({"q": "secret", "ids": [1, 2, 3]}) == {"q": "str", "ids": "list[3]"}
+        assert parameter_shape(("secret", 5)) == ["str", "int"]
+        assert parameter_shape(None) is None
+
+
+class TestSlowQueryLog:
+    """Tests for SlowQueryLog."""
+
+    def test_ring_buffer_and_summary(self):
+        """Oldest entries fall off; summary groups by statement, slowest total first."""
+        log = SlowQueryLog(maxlen=3)
+        log.add(_entry("SELECT a", 900.0))
+        log.add(_entry("SELECT b", 300.0, explain="Seq Scan on b"))
+        log.add(_entry("SELECT c", 400.0, route="GET /api/programs"))
+        log.add(_entry("SELECT c", 200.0))
+        assert len(log) == 3
+        assert log.entries()[0].statement == "SELECT c"
+
+        groups = log.summary()
+        assert [g["statement"] for g in groups] == ["SELECT c", "SELECT b"]
+        assert groups[0]["count"] == 2
+        assert groups[0]["avg_ms"] == 300.0
+        assert groups[0]["routes"] == ["GET /api/courses", "GET /api/programs"]
+        assert groups[1]["explain"] == "Seq Scan on b"
+
+    def test_explain_sampling_and_cooldown(self):
+        """A statement is explained at most once per cooldown; rate 0 never explains."""
+        log = SlowQueryLog()
+        assert not log.claim_explain("SELECT a", 0.0)
+        assert log.claim_explain("SELECT a", 1.0)
+        assert not log.claim_explain("SELECT a", 1.0)
+        assert log.claim_explain("SELECT b", 1.0)
+
+
+@pytest.fixture
+def capture_everything():
+    """Treat every statement as slow and explain every SELECT."""
+    slow_query_log.clear()
+    with patch.object(settings, "DB_SLOW_QUERY_MS", 1e-9), \
+            patch.object(settings, "DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1.0):
+        yield slow_query_log
+    slow_query_log.clear()
+
+
+class TestCapture:
+    """Capture from the engine instrumentation."""
+
+    def test_select_captured_with_plan(self, db_session, capture_everything):
+        """A slow SELECT is captured with its parameter shape and an EXPLAIN plan."""
+        db_session.exec(text("SELECT count(*) FROM courses WHERE status = :status"), params={"status": "DRAFT"}).one()
+        entry = next(e for e in capture_everything.entries() if "FROM courses" in e.statement)
+        assert entry.statement == "SELECT count(*) FROM courses WHERE status = ?"
+        assert entry.parameters == {"status": "str"}
+        assert "Scan" in entry.explain
+        # Estimated plan only: the statement was not run again
+        assert "actual time" not in entry.explain
+        # The EXPLAIN itself is neither captured nor left in a broken transaction
+        assert not any(e.statement.startswith("EXPLAIN") for e in capture_everything.entries())
+        assert db_session.exec(text("SELECT 1")).one()[0] == 1
+
+    def test_failed_explain_keeps_transaction(self, db_session, capture_everything):
+        """A plan that cannot be produced leaves the caller's transaction usable."""
+        with patch("app.core.slow_queries._explainable", return_value=True):
+            db_session.exec(text("SHOW server_version")).one()
+        entry = next(e for e in capture_everything.entries() if e.statement == "SHOW server_version")
+        assert entry.explain is None
+        assert db_session.exec(text("SELECT 1")).one()[0] == 1
+
+
+class TestExplainAnalyze:
+    """DB_SLOW_QUERY_EXPLAIN_ANALYZE: what is run again, and that it is undone."""
+
+    @pytest.fixture
+    def analyze(self, capture_everything):
+        with patch.object(settings, "DB_SLOW_QUERY_EXPLAIN_ANALYZE", True):
+            yield capture_everything
+
+    def test_analyzable(self):
+        assert _analyzable("SELECT * FROM courses")
+        assert not _analyzable("SELECT * FROM courses FOR UPDATE")
+        assert not _analyzable("select id from courses for no key update skip locked")
+        assert not _analyzable("WITH x AS (DELETE FROM t RETURNING id) SELECT * FROM x")
+
+    def test_select_analyzed_and_rolled_back(self, db_session, analyze):
+        """The analyzed second run happens, but its effects are rolled back."""
+        db_session.exec(text("SELECT set_config('app.explain_probe', '0', true)")).one()
+        bump = "SELECT set_config('app.explain_probe', (current_setting('app.explain_probe')::int + 1)::text, true)"
+        assert db_session.exec(text(bump)).one()[0] == "1"
+
+        entry = next(e for e in analyze.entries() if "current_setting(?)::int" in e.statement)
+        assert "actual time" in entry.explain
+        assert db_session.exec(text("SELECT current_setting('app.explain_probe')")).one()[0] == "1"
+
+    def test_data_modifying_cte_not_run_twice(self, db_session, analyze):
+        """WITH statements get an estimated plan; their writes happen once."""
+        db_session.exec(text("CREATE TEMP TABLE explain_probe (id int)"))
+        db_session.exec(text(
+            "WITH added AS (INSERT INTO explain_probe VALUES (1) RETURNING id) SELECT count(*) FROM added"
+        )).one()
+
+        entry = next(e for e in analyze.entries() if e.statement.startswith("WITH added"))
+        assert entry.explain and "actual time" not in entry.explain
+        assert db_session.exec(text("SELECT count(*) FROM explain_probe")).one()[0] == 1
+
+
+class TestSlowQueryEndpoint:
+    """Tests for /api/admin/slow-queries."""
+
+    def test_admin_sees_route(self, client, admin_user, capture_everything):
+        """Admins get captured statements tagged with the route template."""
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": admin_user.firebase_uid}):
+            client.get("/api/programs?limit=1", headers={"Authorization": "Bearer test_token"})
+            response = client.get(
+                "/api/admin/slow-queries?route=/api/programs", headers={"Authorization": "Bearer test_token"}
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["captured"] >= 1
+        assert all(item["route"] == "GET /api/programs" for item in data["recent"])
+
+    def test_requires_admin(self, client, faculty_user):
+        """Non-admins are rejected."""
+        with patch("app.core.deps.verify_firebase_token", return_value={"uid": faculty_user.firebase_uid}):
+            response = client.get("/api/admin/slow-queries", headers={"Authorization": "Bearer test_token"})
+        assert response.status_code == 403